@@ -0,0 +1,358 @@
+"""
+Instrumentation of the API calls made by the scripts: latency histograms, retries, payload
+sizes, and error codes of each API method, recorded by an ApiCallsRecorder.
+
+Data Catalog calls are recorded by the api_throttling clients, and Google Sheets calls by
+load_template_google_sheets.GoogleSheetsFacade, so all the facades' calls go through the same
+process-wide recorder. Each script logs a summary table of the recorded calls when it finishes
+and may write them to a JSON or Prometheus text file. Calls are also traced as OpenTelemetry
+spans if requested and the opentelemetry-api package is installed.
+"""
+import json
+import logging
+import threading
+import time
+
+import lazy_imports
+
+message = lazy_imports.lazy_import('google.protobuf.message')
+proto = lazy_imports.lazy_import('proto')
+
+try:
+    trace = lazy_imports.lazy_import('opentelemetry.trace')
+except ImportError:
+    trace = None
+
+# Upper bounds of the latency histograms' buckets, in seconds, the same as Prometheus clients'.
+LATENCY_BUCKETS_SECONDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+_OK_CODE = 'OK'
+
+_METRICS_FORMATS = ['json', 'prometheus']
+
+_SUMMARY_HEADERS = [
+    'method', 'calls', 'retries', 'avg ms', 'p95 ms', 'max ms', 'avg req B', 'avg resp B', 'errors'
+]
+_SUMMARY_ROW_FORMAT = '{:<40} {:>7} {:>7} {:>8} {:>8} {:>8} {:>10} {:>10}  {}'
+
+
+class ApiCallsRecorder:
+    """
+    Thread-safe statistics of the API calls, by method name.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: An OpenTelemetry tracer the calls are traced by, if any.
+        """
+        self.__tracer = tracer
+        self.__methods_stats = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def methods_stats(self):
+        """
+        A copy of the statistics of each method, with the calls and retries counts, the
+        latency histogram, the request and response bytes, and the calls count by error code.
+        """
+        with self.__lock:
+            return {
+                method_name: {
+                    name: dict(value) if isinstance(value, dict) else value
+                    for name, value in stats.items()
+                }
+                for method_name, stats in self.__methods_stats.items()
+            }
+
+    def start_call(self, method_name, *request_parts):
+        """
+        Start recording a call, which is finished when the returned ApiCall context exits.
+
+        :param request_parts: The call's arguments, whose payload sizes add up to the request's.
+        """
+        span = self.__tracer.start_span(method_name) if self.__tracer else None
+        request_bytes = sum(get_payload_size(part) for part in request_parts)
+        return ApiCall(self, method_name, request_bytes, span)
+
+    def record(self,
+               method_name,
+               seconds,
+               error_code=_OK_CODE,
+               retries=0,
+               request_bytes=0,
+               response_bytes=0):
+
+        with self.__lock:
+            stats = self.__methods_stats.get(method_name)
+            if not stats:
+                stats = self.__methods_stats[method_name] = self.__make_stats()
+
+            stats['calls'] += 1
+            stats['retries'] += retries
+            stats['seconds_sum'] += seconds
+            stats['seconds_max'] = max(stats['seconds_max'], seconds)
+            for upper_bound in LATENCY_BUCKETS_SECONDS:
+                if seconds <= upper_bound:
+                    stats['latency_buckets'][upper_bound] += 1
+                    break
+            stats['request_bytes'] += request_bytes
+            stats['response_bytes'] += response_bytes
+            if error_code != _OK_CODE:
+                stats['errors'][error_code] = stats['errors'].get(error_code, 0) + 1
+
+    def log_summary(self):
+        methods_stats = self.methods_stats
+        if not methods_stats:
+            return
+
+        logging.info('===> API calls summary:')
+        logging.info(_SUMMARY_ROW_FORMAT.format(*_SUMMARY_HEADERS))
+        for method_name, stats in sorted(methods_stats.items()):
+            calls = stats['calls']
+            errors = ', '.join(f'{code}: {count}'
+                               for code, count in sorted(stats['errors'].items()))
+            logging.info(
+                _SUMMARY_ROW_FORMAT.format(
+                    method_name, calls, stats['retries'],
+                    f'{stats["seconds_sum"] / calls * 1000:.1f}',
+                    f'{self.__estimate_percentile(stats, 0.95) * 1000:.0f}',
+                    f'{stats["seconds_max"] * 1000:.1f}', stats['request_bytes'] // calls,
+                    stats['response_bytes'] // calls, errors or '-'))
+
+    def write_json(self, file_path):
+        methods_stats = self.methods_stats
+        for stats in methods_stats.values():
+            stats['latency_buckets'] = {
+                str(upper_bound): count
+                for upper_bound, count in stats['latency_buckets'].items()
+            }
+
+        with open(file_path, mode='w') as json_file:
+            json.dump(methods_stats, json_file, indent=2, sort_keys=True)
+
+    def write_prometheus(self, file_path):
+        """Write the statistics in the Prometheus text exposition format."""
+        lines = []
+        methods_stats = sorted(self.methods_stats.items())
+
+        lines.append(
+            '# HELP api_call_duration_seconds Latency of the API calls, retries included.')
+        lines.append('# TYPE api_call_duration_seconds histogram')
+        for method_name, stats in methods_stats:
+            cumulative_count = 0
+            for upper_bound in LATENCY_BUCKETS_SECONDS:
+                cumulative_count += stats['latency_buckets'][upper_bound]
+                lines.append(f'api_call_duration_seconds_bucket{{method="{method_name}",'
+                             f'le="{upper_bound}"}} {cumulative_count}')
+            lines.append(f'api_call_duration_seconds_bucket{{method="{method_name}",le="+Inf"}}'
+                         f' {stats["calls"]}')
+            lines.append(f'api_call_duration_seconds_sum{{method="{method_name}"}}'
+                         f' {stats["seconds_sum"]}')
+            lines.append(f'api_call_duration_seconds_count{{method="{method_name}"}}'
+                         f' {stats["calls"]}')
+
+        for metric_name, stats_name, help_text in [
+            ('api_call_retries_total', 'retries', 'Retries of the API calls.'),
+            ('api_call_request_bytes_total', 'request_bytes', 'Payload size of the requests.'),
+            ('api_call_response_bytes_total', 'response_bytes', 'Payload size of the responses.'),
+        ]:
+            lines.append(f'# HELP {metric_name} {help_text}')
+            lines.append(f'# TYPE {metric_name} counter')
+            for method_name, stats in methods_stats:
+                lines.append(f'{metric_name}{{method="{method_name}"}} {stats[stats_name]}')
+
+        lines.append('# HELP api_call_errors_total API calls that failed, by error code.')
+        lines.append('# TYPE api_call_errors_total counter')
+        for method_name, stats in methods_stats:
+            for code, count in sorted(stats['errors'].items()):
+                lines.append(f'api_call_errors_total{{method="{method_name}",code="{code}"}}'
+                             f' {count}')
+
+        with open(file_path, mode='w') as prometheus_file:
+            prometheus_file.write('\n'.join(lines) + '\n')
+
+    @classmethod
+    def __make_stats(cls):
+        return {
+            'calls': 0,
+            'retries': 0,
+            'seconds_sum': 0.0,
+            'seconds_max': 0.0,
+            # Calls slower than the last bucket's upper bound are only counted in calls.
+            'latency_buckets': {
+                upper_bound: 0
+                for upper_bound in LATENCY_BUCKETS_SECONDS
+            },
+            'request_bytes': 0,
+            'response_bytes': 0,
+            'errors': {},
+        }
+
+    @classmethod
+    def __estimate_percentile(cls, stats, quantile):
+        """
+        :return: The upper bound of the histogram bucket the percentile falls into, or the
+            maximum latency if it is beyond the last bucket.
+        """
+        cumulative_count = 0
+        for upper_bound in LATENCY_BUCKETS_SECONDS:
+            cumulative_count += stats['latency_buckets'][upper_bound]
+            if cumulative_count >= stats['calls'] * quantile:
+                return min(upper_bound, stats['seconds_max'])
+        return stats['seconds_max']
+
+
+class ApiCall:
+    """
+    A call being recorded, as a context manager: the call's latency and error code are
+    recorded when the context exits. The response should be set before exiting the context,
+    so its payload size is recorded.
+    """
+
+    def __init__(self, recorder, method_name, request_bytes, span=None):
+        self.response = None
+        self.__recorder = recorder
+        self.__method_name = method_name
+        self.__request_bytes = request_bytes
+        self.__span = span
+        self.__retries = 0
+        self.__start_time = None
+
+    def __enter__(self):
+        self.__start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.__start_time
+        error_code = get_error_code(exc_value) if exc_value else _OK_CODE
+        response_bytes = get_payload_size(self.response)
+
+        self.__recorder.record(self.__method_name, seconds, error_code, self.__retries,
+                               self.__request_bytes, response_bytes)
+
+        if self.__span:
+            self.__span.set_attributes({
+                'api.error_code': error_code,
+                'api.retries': self.__retries,
+                'api.request_bytes': self.__request_bytes,
+                'api.response_bytes': response_bytes,
+            })
+            if exc_value:
+                self.__span.record_exception(exc_value)
+                self.__span.set_status(trace.Status(trace.StatusCode.ERROR, error_code))
+            self.__span.end()
+
+    def add_retry(self, error=None):
+        """Count a retry, to be used as the on_error callback of the call's retry option."""
+        self.__retries += 1
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+def get_error_code(error):
+    """
+    :return: The gRPC status code name of a Google API error, the HTTP status of a Google API
+        client library error, or the exception's class name otherwise.
+    """
+    grpc_status_code = getattr(error, 'grpc_status_code', None)
+    if grpc_status_code:
+        return grpc_status_code.name
+
+    response = getattr(error, 'resp', None)
+    if response is not None and getattr(response, 'status', None):
+        return f'HTTP_{response.status}'
+
+    return type(error).__name__
+
+
+def get_payload_size(value):
+    """
+    :return: The serialized size of protobuf messages, the size of strings, bytes, and
+        JSON-like dicts and lists, the size of the page pagers were returned with, or 0 for
+        other values.
+    """
+    if isinstance(value, proto.Message):
+        return type(value).pb(value).ByteSize()
+    if isinstance(value, message.Message):
+        return value.ByteSize()
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value))
+    # The next pages are recorded as calls of their own, when the pager fetches them.
+    page = getattr(value, '_response', None)
+    if hasattr(value, 'pages') and isinstance(page, proto.Message):
+        return get_payload_size(page)
+    return 0
+
+
+_default_recorder = ApiCallsRecorder()
+
+
+def get_default_recorder():
+    return _default_recorder
+
+
+def configure(recorder):
+    """Set the process-wide ApiCallsRecorder."""
+    global _default_recorder
+    _default_recorder = recorder
+
+
+"""
+Command-line interface
+========================================
+"""
+
+
+def add_arguments(parser):
+    """Add the instrumentation arguments to an argparse parser."""
+    parser.add_argument('--api-metrics-file',
+                        help='file the API calls metrics are written to when the script'
+                        ' finishes')
+    parser.add_argument('--api-metrics-format',
+                        choices=_METRICS_FORMATS,
+                        default='json',
+                        help='format of --api-metrics-file (default: json)')
+    parser.add_argument('--api-tracing',
+                        action='store_true',
+                        help='trace the API calls as OpenTelemetry spans; requires the'
+                        ' opentelemetry-api package and a configured tracer provider')
+
+
+def configure_from_args(args):
+    """
+    Set the process-wide ApiCallsRecorder from the arguments added by add_arguments().
+
+    :raises ValueError: If tracing is requested and OpenTelemetry is not installed.
+    """
+    tracer = None
+    if args.api_tracing:
+        if not trace:
+            raise ValueError('--api-tracing requires the opentelemetry-api package')
+        tracer = trace.get_tracer(__name__)
+
+    recorder = ApiCallsRecorder(tracer)
+    configure(recorder)
+    return recorder
+
+
+def report_from_args(args):
+    """Log the summary of the recorded calls and write them to the requested file, if any."""
+    recorder = get_default_recorder()
+    recorder.log_summary()
+
+    if not args.api_metrics_file:
+        return
+
+    if args.api_metrics_format == 'prometheus':
+        recorder.write_prometheus(args.api_metrics_file)
+    else:
+        recorder.write_json(args.api_metrics_file)
+    logging.info(f'===> API calls metrics written to {args.api_metrics_file}')
@@ -0,0 +1,522 @@
+"""
+Client-side throttling and retries shared by the Data Catalog facades, which get their API
+clients with get_client() and create_async_client().
+
+API methods are grouped into the families Data Catalog's quotas are based on: read, search, and
+write. The calls of each family are spaced out by a token bucket, so a script runs at the
+maximum rate its quota allows, and calls that fail because of quota or transient errors are
+retried with exponential backoff and jitter. The settings are shared by all the API clients in
+a process, so each script configures them once from its command-line arguments.
+
+The clients connect to the API endpoint set by configure_api_endpoint(), if any, e.g. a regional
+endpoint or a local fake server. The sync clients are shared by all the facades in a process,
+and each of them may be backed by a pool of gRPC channels, set by configure_clients().
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+
+import api_instrumentation
+import lazy_imports
+
+exceptions = lazy_imports.lazy_import('google.api_core.exceptions')
+retry = lazy_imports.lazy_import('google.api_core.retry')
+retry_async = lazy_imports.lazy_import('google.api_core.retry_async')
+grpc = lazy_imports.lazy_import('grpc')
+
+_DEFAULT_TIMEOUT_SECONDS = 60
+_DEFAULT_RETRY_DEADLINE_SECONDS = 300
+
+_RETRY_INITIAL_DELAY_SECONDS = 1
+_RETRY_MAXIMUM_DELAY_SECONDS = 60
+_RETRY_DELAY_MULTIPLIER = 2
+
+# The same options as the API clients' own channels: messages of any size.
+_CHANNEL_OPTIONS = [('grpc.max_send_message_length', -1), ('grpc.max_receive_message_length', -1)]
+# Channels to the same endpoint share their connections, unless they have subchannels of their
+# own, which pooled channels need to spread the calls.
+_POOLED_CHANNEL_OPTIONS = _CHANNEL_OPTIONS + [('grpc.use_local_subchannel_pool', 1)]
+
+# Maps the API methods' name prefixes to their families. Other attributes of the clients, such
+# as the path helpers, are not API calls.
+_METHODS_FAMILIES_PREFIXES = [
+    ('search_', 'search'),
+    ('get_', 'read'),
+    ('list_', 'read'),
+    ('lookup_', 'read'),
+    ('export_', 'read'),
+    ('create_', 'write'),
+    ('update_', 'write'),
+    ('delete_', 'write'),
+    ('import_', 'write'),
+    ('rename_', 'write'),
+]
+
+METHODS_FAMILIES = ['read', 'search', 'write']
+
+
+class ApiCallPolicy:
+    """
+    Rate limits, timeout, and retries applied to the API calls, with thread-safe counters of
+    the calls made, throttled, and retried by each family.
+    """
+
+    def __init__(self,
+                 max_rates=None,
+                 timeout=_DEFAULT_TIMEOUT_SECONDS,
+                 retry_deadline=_DEFAULT_RETRY_DEADLINE_SECONDS):
+        """
+        :param max_rates: A dict with the maximum number of calls per second of each family.
+            Families with no rate are not throttled.
+        :param timeout: The timeout of each call, in seconds, or None for the API's default.
+        :param retry_deadline: How long a call is retried for, in seconds; 0 disables retries.
+        """
+        self.__token_buckets = {
+            family: TokenBucket(rate)
+            for family, rate in (max_rates or {}).items() if rate
+        }
+        self.__timeout = timeout
+        self.__retry_deadline = retry_deadline
+
+        self.__counters = {
+            family: {
+                'calls': 0,
+                'throttled': 0,
+                'retried': 0
+            }
+            for family in METHODS_FAMILIES
+        }
+        self.__counters_lock = threading.Lock()
+
+    @property
+    def counters(self):
+        """A copy of the counters of each family."""
+        with self.__counters_lock:
+            return {family: dict(counters) for family, counters in self.__counters.items()}
+
+    def reserve_call(self, family):
+        """
+        Count a call and reserve a token for it.
+
+        :return: The number of seconds to wait before making the call.
+        """
+        token_bucket = self.__token_buckets.get(family)
+        wait_seconds = token_bucket.reserve() if token_bucket else 0
+
+        self.__increment(family, 'calls')
+        if wait_seconds > 0:
+            self.__increment(family, 'throttled')
+        return wait_seconds
+
+    def set_call_options(self, family, kwargs, async_call=False, on_retry=None):
+        """
+        Add the retry and timeout options to the keyword arguments of a call, unless the
+        caller has set them.
+
+        :param on_retry: A function called with the error of each retried attempt.
+        """
+        if 'retry' not in kwargs and self.__retry_deadline:
+
+            def on_error(error):
+                self.__increment(family, 'retried')
+                if on_retry:
+                    on_retry(error)
+
+            retry_class = retry_async.AsyncRetry if async_call else retry.Retry
+            kwargs['retry'] = retry_class(
+                predicate=retry.if_exception_type(*_get_retryable_errors(family)),
+                initial=_RETRY_INITIAL_DELAY_SECONDS,
+                maximum=_RETRY_MAXIMUM_DELAY_SECONDS,
+                multiplier=_RETRY_DELAY_MULTIPLIER,
+                deadline=self.__retry_deadline,
+                on_error=on_error)
+        if 'timeout' not in kwargs and self.__timeout:
+            kwargs['timeout'] = self.__timeout
+
+    def log_counters(self):
+        for family, counters in self.counters.items():
+            if counters['calls']:
+                logging.info(f'===> API {family} calls: {counters["calls"]}'
+                             f' ({counters["throttled"]} throttled,'
+                             f' {counters["retried"]} retries)')
+
+    def __increment(self, family, counter_name):
+        with self.__counters_lock:
+            self.__counters[family][counter_name] += 1
+
+
+class ThrottledClient:
+    """
+    Wrap an API client so its calls go through an ApiCallPolicy and are recorded by the
+    process-wide api_instrumentation recorder, including the calls the returned pagers make to
+    fetch the next pages. Attributes other than the API methods are returned as they are.
+    """
+
+    def __init__(self, client, policy=None):
+        """
+        :param policy: The ApiCallPolicy to be used, or None to use the process-wide policy
+            set by configure() at the time each call is made.
+        """
+        self.__client = client
+        self.__policy = policy
+
+    def __getattr__(self, name):
+        attribute = getattr(self.__client, name)
+        family = get_method_family(name)
+        if not (family and callable(attribute)):
+            return attribute
+
+        def call(*args, **kwargs):
+            caller_options = _get_caller_options(kwargs)
+            response = self.__call(name, family, attribute, args, kwargs)
+            _throttle_pages(response, functools.partial(self.__call, name, family), caller_options)
+            return response
+
+        return call
+
+    def __call(self, name, family, method, args, kwargs):
+        policy = self.__policy or get_default_policy()
+        wait_seconds = policy.reserve_call(family)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        recorder = api_instrumentation.get_default_recorder()
+        with recorder.start_call(name, *args, *kwargs.values()) as api_call:
+            policy.set_call_options(family, kwargs, on_retry=api_call.add_retry)
+            api_call.response = method(*args, **kwargs)
+        return api_call.response
+
+
+class AsyncThrottledClient:
+    """
+    Same as ThrottledClient, for the async API clients: the API methods are coroutines that
+    wait for the rate limits without blocking the event loop.
+    """
+
+    def __init__(self, client, policy=None):
+        self.__client = client
+        self.__policy = policy
+
+    def __getattr__(self, name):
+        attribute = getattr(self.__client, name)
+        family = get_method_family(name)
+        if not (family and callable(attribute)):
+            return attribute
+
+        async def call(*args, **kwargs):
+            caller_options = _get_caller_options(kwargs)
+            response = await self.__call(name, family, attribute, args, kwargs)
+            _throttle_pages(response, functools.partial(self.__call, name, family), caller_options)
+            return response
+
+        return call
+
+    async def __call(self, name, family, method, args, kwargs):
+        policy = self.__policy or get_default_policy()
+        wait_seconds = policy.reserve_call(family)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+        recorder = api_instrumentation.get_default_recorder()
+        with recorder.start_call(name, *args, *kwargs.values()) as api_call:
+            policy.set_call_options(family, kwargs, async_call=True, on_retry=api_call.add_retry)
+            api_call.response = await method(*args, **kwargs)
+        return api_call.response
+
+
+class ClientPool:
+    """
+    API clients of the same class, each with a channel of its own. Their API methods are handed
+    out in turn, so concurrent calls are spread across the channels. Other attributes are taken
+    from the first client, and the path helpers from the client class.
+    """
+
+    def __init__(self, client_class, make_client, size=1, lazy=False):
+        """
+        :param make_client: A function that creates a client, called with the client's index.
+        :param lazy: Create the clients on first use instead of right away.
+        """
+        self.__client_class = client_class
+        self.__make_client = make_client
+        self.__size = size
+        self.__clients = None
+        self.__next_index = 0
+        self.__lock = threading.Lock()
+
+        if not lazy:
+            self.__get_clients()
+
+    def __getattr__(self, name):
+        # Path helpers are static methods, which do not require the clients to be created.
+        if isinstance(inspect.getattr_static(self.__client_class, name, None), staticmethod):
+            return getattr(self.__client_class, name)
+
+        clients = self.__get_clients()
+        if not get_method_family(name):
+            return getattr(clients[0], name)
+
+        with self.__lock:
+            client = clients[self.__next_index]
+            self.__next_index = (self.__next_index + 1) % self.__size
+        return getattr(client, name)
+
+    def __get_clients(self):
+        with self.__lock:
+            if self.__clients is None:
+                self.__clients = [self.__make_client(index) for index in range(self.__size)]
+            return self.__clients
+
+
+def get_client(client_class):
+    """
+    Get the process-wide client of an API client class, connected to the configured API
+    endpoint if any, and backed by the configured number of channels.
+
+    :return: A ThrottledClient wrapping the ClientPool shared by all the callers.
+    """
+    pool_key = (client_class, _api_endpoint, _api_endpoint_insecure, _channels_count)
+    with _client_pools_lock:
+        client_pool = _client_pools.get(pool_key)
+        if not client_pool:
+            make_client = functools.partial(_make_client, client_class, _api_endpoint,
+                                            _api_endpoint_insecure, _channels_count > 1)
+            client_pool = _client_pools[pool_key] = ClientPool(client_class, make_client,
+                                                               _channels_count, _lazy_clients)
+    return ThrottledClient(client_pool)
+
+
+def create_async_client(client_class):
+    """
+    Create an async API client, connected to the configured API endpoint if any. Async clients'
+    channels are bound to the event loop they are created in, so they are not shared.
+
+    :return: An AsyncThrottledClient wrapping the client.
+    """
+    client_kwargs = _make_client_kwargs(client_class, 'grpc_asyncio', grpc.aio.insecure_channel,
+                                        _api_endpoint, _api_endpoint_insecure)
+    return AsyncThrottledClient(client_class(**client_kwargs))
+
+
+def _make_client(client_class, api_endpoint, insecure, pooled, index=0):
+    client_kwargs = _make_client_kwargs(client_class, 'grpc', grpc.insecure_channel, api_endpoint,
+                                        insecure, pooled)
+    return client_class(**client_kwargs)
+
+
+def _make_client_kwargs(client_class,
+                        transport_name,
+                        make_insecure_channel,
+                        api_endpoint,
+                        insecure,
+                        pooled=False):
+
+    client_kwargs = {}
+    if api_endpoint:
+        client_kwargs['client_options'] = {'api_endpoint': api_endpoint}
+
+    # Insecure channels need no credentials and pooled channels need their own options, so
+    # their transports are created here. Only custom endpoints may be insecure.
+    insecure = insecure and bool(api_endpoint)
+    if not (insecure or pooled):
+        return client_kwargs
+
+    host = api_endpoint or client_class.DEFAULT_ENDPOINT
+    transport_class = client_class.get_transport_class(transport_name)
+    channel_options = _POOLED_CHANNEL_OPTIONS if pooled else _CHANNEL_OPTIONS
+    if insecure:
+        channel = make_insecure_channel(host, options=channel_options)
+    else:
+        channel = transport_class.create_channel(host, options=channel_options)
+    client_kwargs['transport'] = transport_class(host=host, channel=channel)
+    return client_kwargs
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, refilled at a constant rate. Callers reserve tokens in advance,
+    so concurrent callers wait for their turn instead of competing for the same token.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, i.e., the calls allowed in a burst after an
+            idle period. Defaults to one second worth of tokens.
+        """
+        self.__rate = rate
+        self.__capacity = capacity or max(rate, 1)
+        self.__tokens = self.__capacity
+        self.__last_refill_time = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token, even if it has not been added yet.
+
+        :return: The number of seconds until the token is available.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__capacity,
+                                self.__tokens + (now - self.__last_refill_time) * self.__rate)
+            self.__last_refill_time = now
+
+            self.__tokens -= 1
+            return -self.__tokens / self.__rate if self.__tokens < 0 else 0
+
+
+def _get_caller_options(kwargs):
+    return {option: kwargs[option] for option in ['retry', 'timeout'] if option in kwargs}
+
+
+def _throttle_pages(response, call_page, caller_options):
+    """
+    Make a pager, as returned by the list and search methods, fetch its next pages with
+    call_page, so they are throttled, retried, and recorded as the first one. Pagers fetch the
+    next pages with their _method attribute, bypassing the client.
+
+    :param call_page: A function called with the pager's method, args, and kwargs.
+    :param caller_options: The retry and timeout options set by the caller of the first page.
+    """
+    page_method = getattr(response, '_method', None)
+    if not (callable(page_method) and hasattr(response, 'pages')):
+        return
+
+    def call_next_page(*args, **kwargs):
+        # Pagers pass the first page's options on, which were set for that call only.
+        for option in ['retry', 'timeout']:
+            kwargs.pop(option, None)
+        kwargs.update(caller_options)
+        return call_page(page_method, args, kwargs)
+
+    response._method = call_next_page
+
+
+def _get_retryable_errors(family):
+    # Write calls that timed out or failed on the server side may have been applied, e.g.
+    # create_tag sends no ID, so retrying them could create duplicates. They are only retried
+    # when the API rejected them before processing them.
+    if family == 'write':
+        return exceptions.ResourceExhausted, exceptions.ServiceUnavailable
+    return (exceptions.DeadlineExceeded, exceptions.InternalServerError,
+            exceptions.ResourceExhausted, exceptions.ServiceUnavailable)
+
+
+def get_method_family(method_name):
+    """:return: The family of an API method, or None if the name is not an API method's."""
+    return next(
+        (family
+         for prefix, family in _METHODS_FAMILIES_PREFIXES if method_name.startswith(prefix)), None)
+
+
+_default_policy = ApiCallPolicy()
+
+
+def get_default_policy():
+    return _default_policy
+
+
+def configure(policy):
+    """Set the ApiCallPolicy used by the clients created with no policy."""
+    global _default_policy
+    _default_policy = policy
+
+
+_api_endpoint = None
+_api_endpoint_insecure = False
+
+
+def configure_api_endpoint(api_endpoint, insecure=False):
+    """
+    Set the API endpoint the clients got from now on connect to.
+
+    :param api_endpoint: A host:port address, or None for the default endpoint.
+    :param insecure: Connect with no TLS and no credentials, e.g. to a local fake server.
+    """
+    global _api_endpoint, _api_endpoint_insecure
+    _api_endpoint = api_endpoint
+    _api_endpoint_insecure = insecure
+
+
+_client_pools = {}
+_client_pools_lock = threading.Lock()
+_channels_count = 1
+_lazy_clients = False
+
+
+def configure_clients(channels_count=1, lazy=False):
+    """
+    Set how the clients got from now on are created.
+
+    :param channels_count: The number of gRPC channels each client is backed by.
+    :param lazy: Create the clients on their first call, so getting them is free until then.
+    """
+    global _channels_count, _lazy_clients
+    _channels_count = channels_count
+    _lazy_clients = lazy
+
+
+def clear_clients():
+    """Forget the shared clients, so the next ones are created from scratch."""
+    with _client_pools_lock:
+        _client_pools.clear()
+
+
+"""
+Command-line interface
+========================================
+"""
+
+
+def add_arguments(parser):
+    """Add the throttling and retries arguments to an argparse parser."""
+    for family in METHODS_FAMILIES:
+        parser.add_argument(f'--max-{family}-rate',
+                            type=float,
+                            help=f'maximum number of API {family} calls per second'
+                            ' (default: unlimited)')
+    parser.add_argument('--api-timeout',
+                        type=float,
+                        default=_DEFAULT_TIMEOUT_SECONDS,
+                        help='timeout of each API call, in seconds'
+                        f' (default: {_DEFAULT_TIMEOUT_SECONDS})')
+    parser.add_argument('--api-retry-deadline',
+                        type=float,
+                        default=_DEFAULT_RETRY_DEADLINE_SECONDS,
+                        help='number of seconds API calls that failed because of quota or'
+                        ' transient errors are retried for; 0 disables retries'
+                        f' (default: {_DEFAULT_RETRY_DEADLINE_SECONDS})')
+    parser.add_argument('--api-endpoint',
+                        help='host:port of the API, e.g. a regional endpoint or a local fake'
+                        ' server (default: the global endpoint)')
+    parser.add_argument('--api-insecure',
+                        action='store_true',
+                        help='connect to --api-endpoint with no TLS and no credentials')
+    parser.add_argument('--api-channels',
+                        type=int,
+                        default=1,
+                        help='number of gRPC channels the calls of each API client are spread'
+                        ' across (default: 1)')
+    parser.add_argument('--api-lazy-clients',
+                        action='store_true',
+                        help='create the API clients on their first call')
+
+
+def configure_from_args(args):
+    """
+    Set the process-wide ApiCallPolicy, API endpoint, and clients settings from the arguments
+    added by add_arguments().
+    """
+    max_rates = {family: getattr(args, f'max_{family}_rate') for family in METHODS_FAMILIES}
+    policy = ApiCallPolicy(max_rates, args.api_timeout, args.api_retry_deadline)
+    configure(policy)
+    configure_api_endpoint(args.api_endpoint, args.api_insecure)
+    configure_clients(args.api_channels, args.api_lazy_clients)
+    return policy
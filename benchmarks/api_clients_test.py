@@ -0,0 +1,36 @@
+from google.cloud import datacatalog
+import pytest
+
+import api_throttling
+import quickstart
+from tests import fake_server
+
+_FACADES_COUNT = 100
+
+
+@pytest.fixture
+def api_endpoint():
+    with fake_server.FakeDataCatalogServer() as server:
+        api_throttling.configure_api_endpoint(server.api_endpoint, insecure=True)
+        yield server.api_endpoint
+
+    api_throttling.configure_api_endpoint(None)
+    api_throttling.clear_clients()
+
+
+def make_new_client():
+    """How each facade used to create its client, kept as the comparison baseline."""
+    client_kwargs = api_throttling._make_client_kwargs(datacatalog.DataCatalogClient, 'grpc',
+                                                       api_throttling.grpc.insecure_channel,
+                                                       api_throttling._api_endpoint, True)
+    return api_throttling.ThrottledClient(datacatalog.DataCatalogClient(**client_kwargs))
+
+
+@pytest.mark.benchmark(group='api_clients-facades-construction')
+def test_make_new_clients(benchmark, api_endpoint):
+    benchmark(lambda: [make_new_client() for _ in range(_FACADES_COUNT)])
+
+
+@pytest.mark.benchmark(group='api_clients-facades-construction')
+def test_get_shared_client(benchmark, api_endpoint):
+    benchmark(lambda: [quickstart.DataCatalogFacade() for _ in range(_FACADES_COUNT)])
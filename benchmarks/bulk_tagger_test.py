@@ -0,0 +1,44 @@
+from unittest import mock
+
+import pytest
+
+from benchmarks import fakes
+import bulk_tagger
+
+_RECORDS_COUNT = 200
+_TEMPLATE_NAME = 'projects/test-project/locations/us-central1/tagTemplates/template_abc'
+
+
+@pytest.fixture
+def datacatalog_client():
+    tag_template = bulk_tagger.quickstart.DataCatalogEntityFactory.make_tag_template(
+        'Template ABC', [{
+            'id': 'has_pii',
+            'display_name': 'Has PII',
+            'primitive_type': 'BOOL'
+        }])
+
+    client = fakes.FakeDataCatalogClient()
+    client.create_tag_template(parent='projects/test-project/locations/us-central1',
+                               tag_template_id='template_abc',
+                               tag_template=tag_template)
+    return client
+
+
+@pytest.mark.benchmark(group='bulk_tagger-create-tags')
+@pytest.mark.parametrize('max_workers', [1, 8, 32])
+def test_bulk_tagger_run(benchmark, datacatalog_client, max_workers):
+    records = [{
+        'linked_resource': f'//bigquery.googleapis.com/projects/p/datasets/d/tables/t{index}',
+        'template': _TEMPLATE_NAME,
+        'fields': {
+            'has_pii': 'true'
+        }
+    } for index in range(_RECORDS_COUNT)]
+
+    def run():
+        with mock.patch('quickstart.datacatalog.DataCatalogClient', lambda: datacatalog_client):
+            return bulk_tagger.BulkTagger(max_workers).run(records)
+
+    report = benchmark.pedantic(run, rounds=1)
+    assert _RECORDS_COUNT == report.created_count
@@ -0,0 +1,54 @@
+import csv
+
+import pytest
+
+import load_template_csv
+
+_VALUES_COUNT = 50000
+
+
+def read_into_list(folder, file_id, values_per_line=1):
+    """The list-based reader CSVFilesReader used to be, kept as the comparison baseline."""
+    data = []
+
+    with open(f'{folder}/{file_id}.csv', mode='r') as csv_file:
+        for row in csv.reader(csv_file):
+            row_data = []
+            for counter in range(values_per_line):
+                row_data.append(row[counter].strip())
+            data.append(row_data)
+
+    del (data[0])
+    return data
+
+
+@pytest.fixture(scope='module')
+def files_folder(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('csv-files')
+    helper_lines = ['value, unused column']
+    helper_lines.extend(f'Enum Value {value}, unused' for value in range(_VALUES_COUNT))
+    (folder / 'enum-field-xyz.csv').write_text('\n'.join(helper_lines))
+    return str(folder)
+
+
+@pytest.mark.benchmark(group='csv_files_reader-read-helper')
+def test_read_into_list(benchmark, files_folder):
+    data = benchmark(read_into_list, files_folder, 'enum-field-xyz')
+    assert _VALUES_COUNT == len(data)
+
+
+@pytest.mark.benchmark(group='csv_files_reader-read-helper')
+def test_read_helper(benchmark, files_folder):
+    data = benchmark(load_template_csv.CSVFilesReader.read_helper, files_folder, 'enum-field-xyz')
+    assert _VALUES_COUNT == len(data)
+
+
+@pytest.mark.benchmark(group='csv_files_reader-read-helper')
+def test_iter_helper(benchmark, files_folder):
+
+    def consume():
+        # Rows are handled one at a time, with no list holding all of them.
+        rows = load_template_csv.CSVFilesReader.iter_helper(files_folder, 'enum-field-xyz')
+        return sum(1 for _ in rows)
+
+    assert _VALUES_COUNT == benchmark(consume)
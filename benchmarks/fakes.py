@@ -0,0 +1,160 @@
+import threading
+import time
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+
+
+class FakeDataCatalogClient:
+    """
+    Stand-in for datacatalog.DataCatalogClient that keeps Tag Templates and Tags in memory and
+    sleeps for a fixed amount of time on each call to simulate the network round trip.
+
+    Like the real client, the API methods accept the retry and timeout options, which are
+    ignored.
+
+    Search responses are replayed from search_responses, which maps queries to lists of
+    SearchCatalogResponse pages; fetching each page is a round trip.
+    """
+    common_location_path = staticmethod(datacatalog.DataCatalogClient.common_location_path)
+    tag_template_path = staticmethod(datacatalog.DataCatalogClient.tag_template_path)
+
+    def __init__(self, latency=0.01):
+        self.__latency = latency
+        self.__lock = threading.Lock()
+        self.tag_templates = {}
+        self.tags = []
+        self.search_responses = {}
+        self.calls_count = 0
+
+    def search_catalog(self, request, retry=None, timeout=None):
+        return FakeSearchCatalogPager(self.search_responses.get(request.query, []),
+                                      self.__simulate_round_trip)
+
+    def create_tag_template(self, parent, tag_template_id, tag_template, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        name = f'{parent}/tagTemplates/{tag_template_id}'
+        with self.__lock:
+            if name in self.tag_templates:
+                raise exceptions.AlreadyExists(message=name)
+            tag_template.name = name
+            self.tag_templates[name] = tag_template
+        return tag_template
+
+    def delete_tag_template(self, name, force, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        with self.__lock:
+            if name not in self.tag_templates:
+                raise exceptions.PermissionDenied(message=name)
+            del self.tag_templates[name]
+
+    def get_tag_template(self, name, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        with self.__lock:
+            if name not in self.tag_templates:
+                raise exceptions.PermissionDenied(message=name)
+            return self.tag_templates[name]
+
+    def lookup_entry(self, request, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        entry = datacatalog.Entry()
+        entry.name = f'projects/fake/locations/us/entryGroups/@bigquery/entries/' \
+                     f'{abs(hash(request.linked_resource))}'
+        entry.linked_resource = request.linked_resource
+        return entry
+
+    def create_tag(self, parent, tag, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        with self.__lock:
+            self.tags.append((parent, tag))
+        return tag
+
+    def __simulate_round_trip(self):
+        with self.__lock:
+            self.calls_count += 1
+        time.sleep(self.__latency)
+
+
+class FakePolicyTagManagerClient:
+    """
+    Stand-in for datacatalog.PolicyTagManagerClient that keeps Taxonomies and Policy Tags in
+    memory, with the same simulated round trip as FakeDataCatalogClient.
+    """
+
+    def __init__(self, latency=0.01):
+        self.__latency = latency
+        self.__lock = threading.Lock()
+        self.policy_tags = {}
+        self.calls_count = 0
+
+    def create_taxonomy(self, parent, taxonomy, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        taxonomy.name = f'{parent}/taxonomies/{abs(hash(taxonomy.display_name))}'
+        return taxonomy
+
+    def create_policy_tag(self, parent, policy_tag, retry=None, timeout=None):
+        self.__simulate_round_trip()
+        with self.__lock:
+            if policy_tag.parent_policy_tag \
+                    and policy_tag.parent_policy_tag not in self.policy_tags:
+                raise exceptions.InvalidArgument(message=policy_tag.parent_policy_tag)
+            policy_tag.name = f'{parent}/policyTags/{len(self.policy_tags)}'
+            self.policy_tags[policy_tag.name] = policy_tag
+        return policy_tag
+
+    def __simulate_round_trip(self):
+        with self.__lock:
+            self.calls_count += 1
+        time.sleep(self.__latency)
+
+
+class FakeSearchCatalogPager:
+
+    def __init__(self, responses, fetch_page):
+        self.__responses = responses
+        self.__fetch_page = fetch_page
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page.results
+
+    @property
+    def pages(self):
+        for response in self.__responses:
+            self.__fetch_page()
+            yield response
+
+
+class FakeGoogleSheetsFacade:
+    """
+    Stand-in for load_template_google_sheets.GoogleSheetsFacade that reads the sheets from
+    memory, with the same simulated round trip as FakeDataCatalogClient.
+
+    Sheets are provided as a dict mapping their names to lists of rows, headers included.
+    """
+
+    def __init__(self, sheets, latency=0.01):
+        self.__sheets = sheets
+        self.__latency = latency
+        self.__lock = threading.Lock()
+        self.calls_count = 0
+
+    def get_sheets_titles(self, spreadsheet_id):
+        self.__simulate_round_trip()
+        return list(self.__sheets)
+
+    def read_sheet(self, spreadsheet_id, sheet_name, values_per_line):
+        return self.read_sheets(spreadsheet_id, [sheet_name], values_per_line)
+
+    def read_sheets(self, spreadsheet_id, sheets_names, values_per_line):
+        self.__simulate_round_trip()
+        return {
+            'valueRanges': [{
+                'values': [row[:values_per_line] for row in self.__sheets[sheet_name]]
+            } for sheet_name in sheets_names]
+        }
+
+    def __simulate_round_trip(self):
+        with self.__lock:
+            self.calls_count += 1
+        time.sleep(self.__latency)
@@ -0,0 +1,72 @@
+"""
+Start-up benchmarks of the scripts, which print their help or fail on invalid inputs before
+using any API, so they should not load the heavy SDKs deferred by lazy_imports.
+
+Each case runs the script with `python -X importtime` and records the cumulative time of its
+top-level imports, in microseconds, in the benchmark's extra info.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Maps each case to a script's command-line arguments.
+_CASES = {
+    'bulk_tagger-help': ['bulk_tagger.py', '--help'],
+    'bulk_tagger-records-not-found': ['bulk_tagger.py', '--records-file', 'not-found.csv'],
+    'export_catalog_snapshot-help': ['export_catalog_snapshot.py', '--help'],
+    'load_template_csv-help': ['load_template_csv.py', '--help'],
+    'load_template_csv-master-not-found': [
+        'load_template_csv.py', '--template-id', 'not_found', '--display-name', 'Not found',
+        '--project-id', 'test-project', '--files-folder', 'not-found'
+    ],
+    'load_template_google_sheets-help': ['load_template_google_sheets.py', '--help'],
+    'policy_tags_manager-help': ['policy_tags_manager.py', '--help'],
+    'query_catalog_snapshot-help': ['query_catalog_snapshot.py', '--help'],
+    'quickstart-help': ['quickstart.py', '--help'],
+}
+
+# Modules that take most of the start-up time and are only needed to call the APIs.
+_HEAVY_MODULES = [
+    'grpc', 'google.cloud.datacatalog', 'googleapiclient.discovery', 'oauth2client.service_account'
+]
+
+
+@pytest.mark.benchmark(group='scripts-start-up')
+@pytest.mark.parametrize('case', list(_CASES))
+def test_script_start_up(benchmark, case):
+    imports_times = benchmark.pedantic(run_with_import_time, args=(_CASES[case], ), rounds=3)
+
+    # Nested imports are included in the cumulative time of the top-level ones.
+    benchmark.extra_info['imports_us'] = sum(cumulative
+                                             for cumulative, top_level in imports_times.values()
+                                             if top_level)
+    benchmark.extra_info['modules_count'] = len(imports_times)
+    loaded_heavy_modules = [name for name in _HEAVY_MODULES if name in imports_times]
+    assert not loaded_heavy_modules, f'{case} loaded {", ".join(loaded_heavy_modules)}'
+
+
+def run_with_import_time(args):
+    """
+    :return: A dict mapping the names of the modules imported by the script to their
+        cumulative import time, in microseconds, and whether they are top-level imports.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime'] + args,
+                             cwd=_ROOT_DIR,
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True)
+
+    imports_times = {}
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, module_name = line.split('|')
+        # Nested imports' names are indented below the module importing them.
+        top_level = not module_name[1:].startswith(' ')
+        imports_times[module_name.strip()] = (int(cumulative), top_level)
+    return imports_times
@@ -0,0 +1,36 @@
+from unittest import mock
+
+import pytest
+
+from benchmarks import fakes
+import load_template_csv
+
+_MULTIVALUED_FIELDS_COUNT = 60
+
+
+@pytest.fixture
+def files_folder(tmp_path):
+    master_lines = ['id,display name,type', 'string_field,String Field,STRING']
+    for counter in range(_MULTIVALUED_FIELDS_COUNT):
+        master_lines.append(f'multivalued_field_{counter},Multivalued Field {counter},MULTI')
+        helper_lines = ['value'] + [f'Value {value}' for value in range(10)]
+        (tmp_path / f'multivalued-field-{counter}.csv').write_text('\n'.join(helper_lines))
+
+    (tmp_path / 'template-abc.csv').write_text('\n'.join(master_lines))
+    return str(tmp_path)
+
+
+@pytest.mark.benchmark(group='load_template_csv-multivalued-fields')
+@pytest.mark.parametrize('max_workers', [1, 4, 16])
+def test_template_maker_run(benchmark, files_folder, max_workers):
+
+    def run():
+        with mock.patch('load_template_csv.datacatalog.DataCatalogClient',
+                        fakes.FakeDataCatalogClient):
+            load_template_csv.TemplateMaker(max_workers).run(files_folder=files_folder,
+                                                             project_id='test-project',
+                                                             template_id='template_abc',
+                                                             display_name='Template ABC',
+                                                             delete_existing=True)
+
+    benchmark.pedantic(run, rounds=3)
@@ -0,0 +1,37 @@
+from unittest import mock
+
+from google.cloud import datacatalog
+import pytest
+
+from benchmarks import fakes
+import policy_tags_manager
+
+# 10 root Policy Tags with 10 children each, which have 3 children each: 410 Policy Tags.
+_TREE_WIDTHS = [10, 10, 3]
+
+
+def make_tree(widths, prefix=''):
+    if not widths:
+        return []
+    return [{
+        'display_name': f'{prefix}{index}',
+        'description': None,
+        'children': make_tree(widths[1:], f'{prefix}{index}.')
+    } for index in range(widths[0])]
+
+
+@pytest.mark.benchmark(group='policy_tags_manager-import-taxonomy')
+@pytest.mark.parametrize('max_workers', [1, 10, 50])
+def test_import_taxonomy(benchmark, max_workers):
+    policy_tags_tree = make_tree(_TREE_WIDTHS)
+    policy_tag_manager_client = fakes.FakePolicyTagManagerClient()
+    client_class = mock.MagicMock(return_value=policy_tag_manager_client)
+    client_class.common_location_path = datacatalog.PolicyTagManagerClient.common_location_path
+
+    def run():
+        with mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerClient', client_class):
+            return policy_tags_manager.TaxonomyManager(max_workers).import_taxonomy(
+                'test-project', 'Test Taxonomy', policy_tags_tree)
+
+    benchmark.pedantic(run, rounds=1)
+    assert 410 == len(policy_tag_manager_client.policy_tags)
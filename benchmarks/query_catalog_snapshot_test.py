@@ -0,0 +1,127 @@
+from unittest import mock
+
+from google.cloud import datacatalog
+import pytest
+
+from benchmarks import fakes
+import export_catalog_snapshot
+import query_catalog_snapshot
+import quickstart
+
+_ENTRIES_COUNT = 5000
+_PROJECTS_COUNT = 10
+_SEARCH_PAGE_SIZE = 500
+
+_QUERIES = [
+    'system=bigquery type=table', 'column:email', 'tag:pii_template',
+    'tag:pii_template.has_pii=true'
+]
+
+
+def make_catalog():
+    """Synthetic catalog: every 10th table has an email column, every 5th one is tagged."""
+    catalog = []
+    for index in range(_ENTRIES_COUNT):
+        project_id = f'project-{index % _PROJECTS_COUNT}'
+        catalog.append({
+            'name': f'projects/{project_id}/locations/us/entryGroups/@bigquery/entries/t{index}',
+            'project': project_id,
+            'columns': ['id', 'email'] if index % 10 == 0 else ['id'],
+            'has_pii': (index % 10 == 0) if index % 5 == 0 else None
+        })
+    return catalog
+
+
+def matches(entry, query):
+    """The matching rules of the recorded search responses, independent from the indexes."""
+    return {
+        'system=bigquery type=table': True,
+        'column:email': 'email' in entry['columns'],
+        'tag:pii_template': entry['has_pii'] is not None,
+        'tag:pii_template.has_pii=true': entry['has_pii'] is True
+    }[query]
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return make_catalog()
+
+
+@pytest.fixture(scope='module')
+def snapshot_folder(tmp_path_factory, catalog):
+    folder = str(tmp_path_factory.mktemp('snapshot'))
+    writers = {
+        table_name:
+        export_catalog_snapshot.PartitionedTableWriter(folder, table_name, schema, 'parquet',
+                                                       'export-1', _ENTRIES_COUNT)
+        for table_name, schema in export_catalog_snapshot._TABLES_SCHEMAS.items()
+    }
+
+    for entry in catalog:
+        partition = ('bigquery', entry['project'])
+        writers['entries'].add_rows(partition, [{'name': entry['name'], 'type': 'TABLE'}])
+        writers['columns'].add_rows(partition, [{
+            'entry_name': entry['name'],
+            'column': column
+        } for column in entry['columns']])
+        if entry['has_pii'] is not None:
+            writers['tags'].add_rows(partition, [{
+                'entry_name': entry['name'],
+                'template': 'projects/p/locations/us/tagTemplates/pii_template',
+                'field_id': 'has_pii',
+                'bool_value': entry['has_pii']
+            }])
+
+    for writer in writers.values():
+        writer.close()
+
+    return folder
+
+
+@pytest.fixture(scope='module')
+def datacatalog_client(catalog):
+    """Fake client replaying the responses the API returns for the benchmarked queries."""
+    client = fakes.FakeDataCatalogClient()
+    for query in _QUERIES:
+        names = [entry['name'] for entry in catalog if matches(entry, query)]
+        pages = []
+        for index in range(0, len(names), _SEARCH_PAGE_SIZE):
+            page = datacatalog.SearchCatalogResponse()
+            for name in names[index:index + _SEARCH_PAGE_SIZE]:
+                page.results.append(datacatalog.SearchCatalogResult(relative_resource_name=name))
+            pages.append(page)
+        client.search_responses[query] = pages
+    return client
+
+
+@pytest.fixture(scope='module')
+def snapshot_index(snapshot_folder):
+    return query_catalog_snapshot.SnapshotIndex.build(snapshot_folder)
+
+
+@pytest.mark.benchmark(group='query_catalog_snapshot-build')
+def test_snapshot_index_build(benchmark, snapshot_folder):
+    benchmark.pedantic(query_catalog_snapshot.SnapshotIndex.build, (snapshot_folder, ), rounds=3)
+
+
+@pytest.mark.benchmark(group='query_catalog_snapshot-search')
+@pytest.mark.parametrize('query', _QUERIES)
+def test_search_catalog(benchmark, datacatalog_client, query):
+    with mock.patch('quickstart.datacatalog.DataCatalogClient', lambda: datacatalog_client):
+        datacatalog_facade = quickstart.DataCatalogFacade()
+
+    results = benchmark.pedantic(datacatalog_facade.search_catalog, ('test-org', query), rounds=3)
+    assert results
+
+
+@pytest.mark.benchmark(group='query_catalog_snapshot-search')
+@pytest.mark.parametrize('query', _QUERIES)
+def test_snapshot_index_search(benchmark, datacatalog_client, snapshot_index, query):
+    results = benchmark(snapshot_index.search, query)
+
+    # Same results as the live search.
+    expected_pages = datacatalog_client.search_responses[query]
+    expected_names = [
+        result.relative_resource_name for page in expected_pages for result in page.results
+    ]
+    assert sorted(expected_names) == [result['name'] for result in results]
@@ -0,0 +1,62 @@
+import random
+import re
+import unicodedata
+
+import pytest
+import stringcase
+
+import tag_templates
+
+_CORPUS_SIZE = 20000
+_DISTINCT_STRINGS_COUNT = 2000
+
+
+def format_to_snakecase(string):
+    """The StringFormatter.format_to_snakecase implementation with no memoization."""
+    normalized_str = unicodedata.normalize('NFKD', string).encode('ASCII', 'ignore').decode()
+    normalized_str = re.sub(r'[^a-zA-Z0-9]+', ' ', normalized_str)
+    normalized_str = normalized_str.strip()
+    normalized_str = normalized_str.lower() \
+        if (' ' in normalized_str) or (normalized_str.isupper()) \
+        else stringcase.camelcase(normalized_str)
+
+    return stringcase.snakecase(normalized_str)
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    """Field IDs and multivalued fields' values, with repetitions as in real templates."""
+    words = [
+        'field', 'Value', 'UPPER', 'camelCase', 'PascalCase', 'åäß', 'éöü', '1st', 'a-b', 'x.y',
+        'snake_case', 'special!#@', '  spaced  ', '\tTab\n', 'ID', 'abc123'
+    ]
+    generator = random.Random(0)
+    distinct_strings = []
+    for _ in range(_DISTINCT_STRINGS_COUNT):
+        separator = generator.choice([' ', '', '-', '_'])
+        distinct_strings.append(separator.join(generator.sample(words, generator.randint(1, 4))))
+    return [generator.choice(distinct_strings) for _ in range(_CORPUS_SIZE)]
+
+
+def test_format_many_should_match_unmemoized_implementation(corpus):
+    expected = [format_to_snakecase(string) for string in corpus]
+    assert expected == tag_templates.StringFormatter.format_many(corpus)
+    assert expected == [
+        tag_templates.StringFormatter.format_to_snakecase(string) for string in corpus
+    ]
+
+
+@pytest.mark.benchmark(group='string_formatter-format-corpus')
+def test_unmemoized_format_to_snakecase(benchmark, corpus):
+    benchmark(lambda: [format_to_snakecase(string) for string in corpus])
+
+
+@pytest.mark.benchmark(group='string_formatter-format-corpus')
+def test_format_to_snakecase(benchmark, corpus):
+    benchmark(
+        lambda: [tag_templates.StringFormatter.format_to_snakecase(string) for string in corpus])
+
+
+@pytest.mark.benchmark(group='string_formatter-format-corpus')
+def test_format_many(benchmark, corpus):
+    benchmark(tag_templates.StringFormatter.format_many, corpus)
@@ -0,0 +1,170 @@
+"""
+End-to-end benchmarks of the TemplateMaker implementations, which load synthetic master and
+helper inputs into the in-process fake Data Catalog server.
+
+Besides the wall time measured by pytest-benchmark, each case records the number of Data
+Catalog RPCs, the CPU time (of the whole process, fake server included), and the peak memory
+allocated by Python during a run in the benchmark's extra info.
+
+Each case fails if its number of RPCs or Google Sheets calls exceeds its threshold in
+template_makers_thresholds.json, which are the measured counts. Unlike the times, the calls
+counts do not depend on the machine the benchmarks run on, so they can gate releases.
+"""
+import json
+import os
+import time
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+import api_throttling
+from benchmarks import fakes
+import load_template_csv
+import load_template_google_sheets
+from tests import fake_server
+
+_THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'template_makers_thresholds.json')
+
+# Latency of each Data Catalog and Google Sheets API call.
+_LATENCY = 0.005
+
+# Master fields' types, repeated until the requested number of fields is reached: 1 out of 10
+# fields is an ENUM and 1 out of 10 is a MULTI, which gets a Template of its own.
+_FIELDS_TYPES = [
+    'STRING', 'DOUBLE', 'BOOL', 'TIMESTAMP', 'ENUM', 'MULTI', 'STRING', 'DOUBLE', 'BOOL',
+    'TIMESTAMP'
+]
+_HELPER_VALUES_COUNT = 10
+
+# Maps each case to the number of master fields and the number of values of the ENUM and MULTI
+# fields' helpers.
+_CASES = {
+    '10-fields': (10, _HELPER_VALUES_COUNT),
+    '100-fields': (100, _HELPER_VALUES_COUNT),
+    '1000-fields': (1000, _HELPER_VALUES_COUNT),
+    '10000-enum-values': (1, 10000),
+}
+
+_TEMPLATE_ID = 'template_abc'
+
+
+def make_inputs(fields_count, values_count):
+    """
+    :return: A dict mapping the master and helpers' names, as the TemplateMakers look for them,
+        to their rows, headers included.
+    """
+    master_rows = [['id', 'display name', 'type']]
+    inputs = {'template-abc': master_rows}
+    for index in range(fields_count):
+        # A single field is an ENUM, so the 10000-enum-values case has a single helper.
+        field_type = _FIELDS_TYPES[index % len(_FIELDS_TYPES)] if fields_count > 1 else 'ENUM'
+        master_rows.append([f'field_{index}', f'Field {index}', field_type])
+        if field_type in ['ENUM', 'MULTI']:
+            inputs[f'field-{index}'] = [['value']] + [[f'Value {value}']
+                                                      for value in range(values_count)]
+    return inputs
+
+
+@pytest.fixture(scope='module')
+def datacatalog_server():
+    default_policy = api_throttling.get_default_policy()
+    with fake_server.FakeDataCatalogServer(latency=_LATENCY) as server:
+        api_throttling.configure(api_throttling.ApiCallPolicy())
+        api_throttling.configure_api_endpoint(server.api_endpoint, insecure=True)
+        yield server
+
+    api_throttling.configure_api_endpoint(None)
+    api_throttling.clear_clients()
+    api_throttling.configure(default_policy)
+
+
+@pytest.fixture(scope='module')
+def thresholds():
+    with open(_THRESHOLDS_FILE) as thresholds_file:
+        return json.load(thresholds_file)
+
+
+@pytest.mark.benchmark(group='template_makers-end-to-end')
+@pytest.mark.parametrize('case', list(_CASES))
+def test_csv_template_maker(benchmark, datacatalog_server, thresholds, tmp_path, case):
+    for file_id, rows in make_inputs(*_CASES[case]).items():
+        (tmp_path / f'{file_id}.csv').write_text('\n'.join(','.join(row) for row in rows))
+
+    def run():
+        load_template_csv.TemplateMaker(max_workers=8).run(files_folder=str(tmp_path),
+                                                           project_id='test-project',
+                                                           template_id=_TEMPLATE_ID,
+                                                           display_name='Template ABC',
+                                                           delete_existing=True)
+
+    metrics = measure(benchmark, datacatalog_server, run)
+    check_thresholds(thresholds, f'load_template_csv/{case}', metrics)
+
+
+@pytest.mark.benchmark(group='template_makers-end-to-end')
+@pytest.mark.parametrize('case', list(_CASES))
+def test_google_sheets_template_maker(benchmark, datacatalog_server, thresholds, case):
+    sheets_facade = fakes.FakeGoogleSheetsFacade(make_inputs(*_CASES[case]), latency=_LATENCY)
+    facade_class = mock.MagicMock(return_value=sheets_facade)
+    facade_class.make_range = load_template_google_sheets.GoogleSheetsFacade.make_range
+
+    def run():
+        with mock.patch('load_template_google_sheets.GoogleSheetsFacade', facade_class):
+            load_template_google_sheets.TemplateMaker().run(spreadsheet_id='test-spreadsheet',
+                                                            project_id='test-project',
+                                                            template_id=_TEMPLATE_ID,
+                                                            display_name='Template ABC',
+                                                            delete_existing=True)
+
+    metrics = measure(benchmark, datacatalog_server, run)
+    metrics['sheets_calls'] = sheets_facade.calls_count // metrics['runs']
+    benchmark.extra_info['sheets_calls'] = metrics['sheets_calls']
+    check_thresholds(thresholds, f'load_template_google_sheets/{case}', metrics)
+
+
+def measure(benchmark, datacatalog_server, run, rounds=3):
+    """
+    Benchmark a run, recording the worst round's metrics in the benchmark's extra info.
+
+    :return: A dict with the rpc_calls, wall_seconds, cpu_seconds, peak_memory_mb, and runs
+        metrics, runs being the number of times the run was called.
+    """
+    rounds_metrics = []
+
+    def measured_run():
+        calls_count = sum(datacatalog_server.calls_count.values())
+        wall_time = time.perf_counter()
+        cpu_time = time.process_time()
+        run()
+        rounds_metrics.append({
+            'rpc_calls': sum(datacatalog_server.calls_count.values()) - calls_count,
+            'wall_seconds': time.perf_counter() - wall_time,
+            'cpu_seconds': time.process_time() - cpu_time,
+        })
+
+    benchmark.pedantic(measured_run, rounds=rounds)
+
+    metrics = {
+        name: max(round_metrics[name] for round_metrics in rounds_metrics)
+        for name in rounds_metrics[0]
+    }
+    # Measured by an extra round, as tracing the allocations slows the run down. Unlike the
+    # process' peak RSS, it does not depend on the cases that ran before.
+    tracemalloc.start()
+    try:
+        run()
+        metrics['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+    metrics['runs'] = len(rounds_metrics) + 1
+    benchmark.extra_info.update(metrics)
+    return metrics
+
+
+def check_thresholds(thresholds, case_id, metrics):
+    exceeded = [
+        f'{name} {metrics[name]:g} > {threshold:g}'
+        for name, threshold in thresholds.get(case_id, {}).items() if metrics[name] > threshold
+    ]
+    assert not exceeded, f'{case_id} regressed: {", ".join(exceeded)}'
@@ -0,0 +1,280 @@
+"""
+This application demonstrates how to create Tags in bulk with the Data Catalog API, reading
+the Tags to be created from a JSON lines or a CSV file.
+
+Each record describes a Tag: the linked resource (e.g., a BigQuery table) of the Entry it will be
+attached to, the Tag Template name, an optional column, and the fields' values. Example:
+{"linked_resource": "//bigquery.googleapis.com/projects/p/datasets/d/tables/t",
+ "template": "projects/p/locations/us-central1/tagTemplates/t", "column": "email",
+ "fields": {"has_pii": true, "pii_type": "EMAIL"}}
+"""
+import argparse
+from concurrent import futures
+import csv
+import json
+import logging
+import os
+import threading
+import time
+
+import api_instrumentation
+import api_throttling
+import lazy_imports
+import quickstart
+
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
+
+_DEFAULT_MAX_WORKERS = 10
+
+_JSON_LINES_FILE_EXTENSIONS = ['.json', '.jsonl']
+_RECORD_RESERVED_FIELDS = ['linked_resource', 'template', 'column']
+
+_FAILURES_LOGGED_IN_SUMMARY = 10
+
+
+class BulkTagger:
+
+    def __init__(self, max_workers=_DEFAULT_MAX_WORKERS, entry_cache=None):
+        # Records often share linked resources, so resolving their Entries benefits from
+        # an EntryCache.
+        self.__datacatalog_facade = quickstart.DataCatalogFacade(entry_cache)
+        self.__entry_cache = entry_cache
+        # Maximum number of records processed concurrently. The rate Tags are created at is
+        # limited by the write calls throttling, set up by api_throttling.
+        self.__max_workers = max_workers
+
+        # Tag Templates are fetched once and shared by all records: the first record that
+        # needs a Template fetches it, and the others wait for its future, failures included.
+        self.__tag_templates = {}
+        self.__tag_templates_lock = threading.Lock()
+
+    def run(self, records):
+        """
+        Create a Tag for each record.
+
+        :param records: An iterable of Tag records, as yielded by TagRecordsReader.
+        :return: A BulkTaggingReport with the number of created Tags, the failures and
+            the throughput.
+        """
+        report = BulkTaggingReport()
+
+        # Records are submitted as the workers become available, so a large input stream is
+        # never fully loaded into memory.
+        pending_slots = threading.BoundedSemaphore(self.__max_workers * 2)
+
+        with futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            for record_number, record in enumerate(records, start=1):
+                pending_slots.acquire()
+                executor.submit(self.__process_record, record_number, record, report,
+                                pending_slots)
+
+        report.finish()
+        report.log_summary()
+        if self.__entry_cache:
+            logging.info(f'===> Entry cache hits: {self.__entry_cache.hits},'
+                         f' misses: {self.__entry_cache.misses}')
+        return report
+
+    def __process_record(self, record_number, record, report, pending_slots):
+        try:
+            tag_template = self.__get_tag_template(record['template'])
+            fields_descriptors = self.__make_fields_descriptors(tag_template, record['fields'])
+            entry = self.__datacatalog_facade.lookup_entry(record['linked_resource'])
+            self.__datacatalog_facade.create_tag(entry, tag_template, fields_descriptors,
+                                                 record.get('column'))
+            report.add_success()
+        except Exception as e:
+            logging.error(f'Failed to process record {record_number}: {e}')
+            report.add_failure(record_number, record, e)
+        finally:
+            pending_slots.release()
+
+    def __get_tag_template(self, name):
+        # The lock is not held while fetching, so other Templates are not waited for.
+        with self.__tag_templates_lock:
+            tag_template_future = self.__tag_templates.get(name)
+            fetch = tag_template_future is None
+            if fetch:
+                tag_template_future = self.__tag_templates[name] = futures.Future()
+
+        if fetch:
+            try:
+                tag_template_future.set_result(self.__datacatalog_facade.get_tag_template(name))
+            except Exception as e:
+                tag_template_future.set_exception(e)
+
+        return tag_template_future.result()
+
+    @classmethod
+    def __make_fields_descriptors(cls, tag_template, fields_values):
+        fields_descriptors = []
+        for field_id, value in fields_values.items():
+            if field_id not in tag_template.fields:
+                raise ValueError(f'{tag_template.name} has no field {field_id}')
+
+            # The primitive type is not set for ENUM fields.
+            primitive_type = tag_template.fields[field_id].type_.primitive_type or None
+            fields_descriptors.append({
+                'id': field_id,
+                'primitive_type': primitive_type,
+                'value': cls.__convert_value(value, primitive_type)
+            })
+
+        return fields_descriptors
+
+    @classmethod
+    def __convert_value(cls, value, primitive_type):
+        """Convert values read from text files to the field types."""
+        if primitive_type == datacatalog.FieldType.PrimitiveType.BOOL:
+            if isinstance(value, bool):
+                return value
+            if str(value).strip().lower() not in ['true', 'false']:
+                raise ValueError(f'Invalid BOOL value: {value}')
+            return str(value).strip().lower() == 'true'
+
+        if primitive_type == datacatalog.FieldType.PrimitiveType.DOUBLE:
+            return float(value)
+
+        return str(value)
+
+
+"""
+Input reader
+========================================
+"""
+
+
+class TagRecordsReader:
+
+    @classmethod
+    def iter_records(cls, file_path):
+        """
+        Lazily read the Tag records from a JSON lines (.json or .jsonl) file or a CSV file with
+        a header line. CSV files have linked_resource, template, and column (optional) columns;
+        the remaining ones are the fields' values, named after the fields' IDs.
+
+        :return: A generator of dicts with linked_resource, template, column and fields.
+        """
+        logging.info(f'Reading file {file_path}...')
+
+        with open(file_path, mode='r') as records_file:
+            if os.path.splitext(file_path)[1].lower() in _JSON_LINES_FILE_EXTENSIONS:
+                for line in records_file:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                for row in csv.DictReader(records_file):
+                    yield cls.__make_record_from_csv_row(row)
+
+        logging.info('DONE')
+
+    @classmethod
+    def __make_record_from_csv_row(cls, row):
+        record = {field: row.get(field) for field in _RECORD_RESERVED_FIELDS}
+        # Empty cells mean no value for the given field.
+        record['fields'] = {
+            field_id: value
+            for field_id, value in row.items()
+            if field_id not in _RECORD_RESERVED_FIELDS and value not in [None, '']
+        }
+        return record
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+class BulkTaggingReport:
+    """
+    Thread-safe counters of the Tags created by BulkTagger and the records that failed. Only the
+    first failures are kept, so memory usage does not grow with the number of records.
+    """
+
+    def __init__(self):
+        self.created_count = 0
+        self.failures_count = 0
+        # The first failures, as (record number, record, error) tuples.
+        self.failures = []
+        self.elapsed_seconds = None
+        self.__start_time = time.perf_counter()
+        self.__lock = threading.Lock()
+
+    def add_success(self):
+        with self.__lock:
+            self.created_count += 1
+
+    def add_failure(self, record_number, record, error):
+        with self.__lock:
+            self.failures_count += 1
+            if len(self.failures) < _FAILURES_LOGGED_IN_SUMMARY:
+                self.failures.append((record_number, record, error))
+
+    def finish(self):
+        self.elapsed_seconds = time.perf_counter() - self.__start_time
+
+    @property
+    def throughput(self):
+        """Created Tags per second."""
+        return self.created_count / self.elapsed_seconds if self.elapsed_seconds else 0
+
+    def log_summary(self):
+        logging.info('')
+        logging.info('==== SUMMARY ====')
+        logging.info(f'===> Tags created: {self.created_count}')
+        logging.info(f'===> Records failed: {self.failures_count}')
+        logging.info(f'===> Elapsed time: {self.elapsed_seconds:.2f}s')
+        logging.info(f'===> Throughput: {self.throughput:.2f} tags/s')
+
+        # Failures are added as records are processed, so they are sorted by record number.
+        for record_number, record, error in sorted(self.failures, key=lambda failure: failure[0]):
+            logging.info(f'===> Record {record_number} ({record.get("linked_resource")}): {error}')
+
+
+"""
+Main program entry point
+========================================
+"""
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Create Tags in bulk')
+
+    parser.add_argument('--records-file',
+                        help='JSON lines (.json or .jsonl) or CSV file describing the Tags',
+                        required=True)
+    parser.add_argument('--max-workers',
+                        type=int,
+                        default=_DEFAULT_MAX_WORKERS,
+                        help='maximum number of Tags created concurrently'
+                        f' (default: {_DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--entry-cache-file',
+                        help='SQLite file that keeps the resolved Entries between runs')
+    parser.add_argument('--entry-errors-ttl',
+                        type=int,
+                        help='number of seconds the resources that were not found or not'
+                        ' accessible are not looked up again (default: always looked up)')
+    api_throttling.add_arguments(parser)
+    api_instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    # Checked before the API clients are created, which loads the Google Cloud SDK.
+    if not os.path.isfile(args.records_file):
+        parser.error(f'records file not found: {args.records_file}')
+
+    api_throttling.configure_from_args(args)
+    api_instrumentation.configure_from_args(args)
+
+    entry_cache = quickstart.EntryCache(error_ttl_seconds=args.entry_errors_ttl,
+                                        db_path=args.entry_cache_file)
+    tagger = BulkTagger(args.max_workers, entry_cache)
+
+    tagging_report = tagger.run(TagRecordsReader.iter_records(args.records_file))
+    entry_cache.close()
+    api_throttling.get_default_policy().log_counters()
+    api_instrumentation.report_from_args(args)
+
+    if tagging_report.failures_count:
+        raise SystemExit(1)
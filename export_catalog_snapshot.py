@@ -0,0 +1,555 @@
+"""
+This application demonstrates how to export a snapshot of Data Catalog -- Entries, their
+columns, and their Tags -- to local Parquet or Arrow IPC files, so reports and analytics can run
+against the snapshot instead of sending thousands of API calls.
+
+The files are written to one folder per table (entries, columns, and tags), partitioned by
+system and project, e.g. entries/system=bigquery/project=my-project/part-<export ID>-0.parquet.
+Each export only adds new files, so snapshots can be appended incrementally. Attaching,
+updating, or deleting Tags does not change the modify time of their Entries, so incremental
+exports still list the Tags of the unmodified Entries, and export again the Entries whose Tags
+changed since their latest export.
+"""
+import argparse
+from concurrent import futures
+import datetime
+import itertools
+import json
+import logging
+import os
+import uuid
+
+import pyarrow
+from pyarrow import compute
+from pyarrow import dataset
+from pyarrow import fs
+from pyarrow import ipc
+from pyarrow import parquet
+
+import api_instrumentation
+import api_throttling
+import lazy_imports
+import quickstart
+
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
+exceptions = lazy_imports.lazy_import('google.api_core.exceptions')
+
+_DEFAULT_MAX_WORKERS = 10
+_DEFAULT_ROWS_PER_FILE = 50000
+
+# Number of search results whose Entries are fetched before the next results page is read.
+_SEARCH_RESULTS_CHUNK_SIZE = 1000
+
+_FILE_FORMATS_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+_DATASET_FORMATS = {'parquet': 'parquet', 'arrow': 'ipc'}
+
+_WATERMARKS_FILE_NAME = '_watermarks.json'
+
+_TIMESTAMP_TYPE = pyarrow.timestamp('us', tz='UTC')
+
+_PARTITIONING_SCHEMA = pyarrow.schema([('system', pyarrow.string()),
+                                       ('project', pyarrow.string())])
+
+_ENTRIES_SCHEMA = pyarrow.schema([
+    ('name', pyarrow.string()),
+    ('linked_resource', pyarrow.string()),
+    ('fully_qualified_name', pyarrow.string()),
+    ('type', pyarrow.string()),
+    ('display_name', pyarrow.string()),
+    ('description', pyarrow.string()),
+    ('create_time', _TIMESTAMP_TYPE),
+    ('update_time', _TIMESTAMP_TYPE),
+    ('export_id', pyarrow.string()),
+])
+
+_COLUMNS_SCHEMA = pyarrow.schema([
+    ('entry_name', pyarrow.string()),
+    ('column', pyarrow.string()),
+    ('type', pyarrow.string()),
+    ('mode', pyarrow.string()),
+    ('description', pyarrow.string()),
+    ('export_id', pyarrow.string()),
+])
+
+_TAGS_SCHEMA = pyarrow.schema([
+    ('entry_name', pyarrow.string()),
+    ('tag_name', pyarrow.string()),
+    ('template', pyarrow.string()),
+    ('template_display_name', pyarrow.string()),
+    ('column', pyarrow.string()),
+    ('field_id', pyarrow.string()),
+    ('bool_value', pyarrow.bool_()),
+    ('double_value', pyarrow.float64()),
+    ('string_value', pyarrow.string()),
+    ('enum_value', pyarrow.string()),
+    ('timestamp_value', _TIMESTAMP_TYPE),
+    ('export_id', pyarrow.string()),
+])
+
+_TABLES_SCHEMAS = {'entries': _ENTRIES_SCHEMA, 'columns': _COLUMNS_SCHEMA, 'tags': _TAGS_SCHEMA}
+
+# The Tags columns compared by incremental exports, i.e., all of them but the export ID.
+_TAGS_KEY_SCHEMA = _TAGS_SCHEMA.remove(_TAGS_SCHEMA.get_field_index('export_id'))
+
+
+class CatalogSnapshotExporter:
+
+    def __init__(self,
+                 output_folder,
+                 file_format='parquet',
+                 max_workers=_DEFAULT_MAX_WORKERS,
+                 rows_per_file=_DEFAULT_ROWS_PER_FILE):
+
+        self.__datacatalog_facade = quickstart.DataCatalogFacade()
+        self.__output_folder = output_folder
+        self.__file_format = file_format
+        # Maximum number of Entries fetched concurrently.
+        self.__max_workers = max_workers
+        self.__rows_per_file = rows_per_file
+
+    def run(self, organization_id, query, project_ids=None, incremental=False):
+        """
+        Export the Entries returned by a search, along with their columns and Tags.
+
+        :param incremental: Skip the Entries that were not modified since the previous export
+            of the same search, unless their Tags changed since their latest export.
+        :return: A dict with the number of exported rows of each table, plus the number of
+            skipped Entries, and of the Entries not found when fetched.
+        """
+        # Unique, so files written by concurrent or quick successive exports never collide, and
+        # sorted by time down to the microsecond, so the latest export of each Entry is known.
+        export_time = datetime.datetime.now(datetime.timezone.utc)
+        export_id = f'{export_time.strftime("%Y%m%dT%H%M%S%f")}-{uuid.uuid4().hex[:8]}'
+        writers = {}
+        for table_name, schema in _TABLES_SCHEMAS.items():
+            writers[table_name] = PartitionedTableWriter(self.__output_folder, table_name, schema,
+                                                         self.__file_format, export_id,
+                                                         self.__rows_per_file)
+
+        watermarks = WatermarksFile(os.path.join(self.__output_folder, _WATERMARKS_FILE_NAME))
+        search_key = json.dumps([organization_id, project_ids, query])
+        watermark = watermarks.get(search_key) if incremental else None
+        latest_modify_time = watermark
+        # Tags are compared with the ones last exported, as changing them does not change the
+        # modify time of their Entries.
+        exported_tags_keys = SnapshotReader.read_latest_tags_keys(
+            self.__output_folder, self.__file_format) if watermark else {}
+
+        counts = {table_name: 0 for table_name in _TABLES_SCHEMAS}
+        counts['skipped'] = 0
+        counts['not_found'] = 0
+
+        search_results = self.__datacatalog_facade.iter_search_catalog(organization_id,
+                                                                       query,
+                                                                       project_ids=project_ids)
+
+        with futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            # Results are processed in chunks, so memory usage does not grow with the number of
+            # Entries: only a chunk of Entries and the unflushed rows are held at a time.
+            for chunk in self.__chunk(search_results, _SEARCH_RESULTS_CHUNK_SIZE):
+                entries_names = []
+                unmodified_entries_names = []
+                for result in chunk:
+                    modify_time = self.__get_modify_time(result)
+                    latest_modify_time = max(latest_modify_time or modify_time, modify_time)
+                    if watermark and modify_time <= watermark:
+                        unmodified_entries_names.append(result.relative_resource_name)
+                    else:
+                        entries_names.append(result.relative_resource_name)
+
+                entries_tags = {}
+                for entry_name, tags in zip(
+                        unmodified_entries_names,
+                        executor.map(self.__list_tags, unmodified_entries_names)):
+                    if tags is None:
+                        counts['not_found'] += 1
+                        continue
+                    tags_key = SnapshotRowsFactory.make_tags_key(
+                        SnapshotRowsFactory.make_tags_rows(entry_name, tags))
+                    if tags_key == exported_tags_keys.get(entry_name):
+                        counts['skipped'] += 1
+                    else:
+                        entries_names.append(entry_name)
+                        entries_tags[entry_name] = tags
+
+                for rows in executor.map(self.__fetch_rows, entries_names,
+                                         [entries_tags.get(name) for name in entries_names]):
+                    if rows is None:
+                        counts['not_found'] += 1
+                        continue
+                    partition = rows.pop('partition')
+                    for table_name, table_rows in rows.items():
+                        writers[table_name].add_rows(partition, table_rows)
+                        counts[table_name] += len(table_rows)
+
+        for writer in writers.values():
+            writer.close()
+
+        # Only moved forward once all the files were written, so a failed export is retried.
+        if latest_modify_time:
+            watermarks.set(search_key, latest_modify_time)
+
+        for name, count in counts.items():
+            logging.info(f'===> {name}: {count}')
+
+        return counts
+
+    def __fetch_rows(self, entry_name, tags=None):
+        """:return: The rows of an Entry, or None if it was not found."""
+        try:
+            entry = self.__datacatalog_facade.get_entry(entry_name)
+            if tags is None:
+                tags = self.__datacatalog_facade.list_tags(entry_name)
+        except _get_not_found_errors() as e:
+            self.__log_not_found(entry_name, e)
+            return None
+
+        return {
+            'partition': SnapshotRowsFactory.make_partition(entry),
+            'entries': [SnapshotRowsFactory.make_entry_row(entry)],
+            'columns': SnapshotRowsFactory.make_columns_rows(entry),
+            'tags': SnapshotRowsFactory.make_tags_rows(entry.name, tags)
+        }
+
+    def __list_tags(self, entry_name):
+        """:return: The Tags of an Entry, or None if it was not found."""
+        try:
+            return self.__datacatalog_facade.list_tags(entry_name)
+        except _get_not_found_errors() as e:
+            self.__log_not_found(entry_name, e)
+            return None
+
+    @classmethod
+    def __log_not_found(cls, entry_name, error):
+        # Entries may be deleted between the search and their fetch, so they are skipped rather
+        # than failing the whole export.
+        logging.warning(f'Entry not found, skipped: {entry_name} ({error})')
+
+    @classmethod
+    def __chunk(cls, iterable, chunk_size):
+        iterator = iter(iterable)
+        chunk = list(itertools.islice(iterator, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(itertools.islice(iterator, chunk_size))
+
+    @classmethod
+    def __get_modify_time(cls, search_result):
+        modify_time = search_result.modify_time
+        return modify_time.timestamp() if modify_time else 0
+
+
+class SnapshotRowsFactory:
+    """
+    Convert the Data Catalog entities to the rows of the snapshot tables.
+    """
+
+    @classmethod
+    def make_partition(cls, entry):
+        if entry.integrated_system:
+            system = entry.integrated_system.name
+        else:
+            system = entry.user_specified_system or 'unknown'
+
+        # Entry names look like projects/<PROJECT-ID>/locations/<LOCATION>/...
+        return system.lower(), entry.name.split('/')[1]
+
+    @classmethod
+    def make_entry_row(cls, entry):
+        timestamps = entry.source_system_timestamps
+        return {
+            'name': entry.name,
+            'linked_resource': entry.linked_resource,
+            'fully_qualified_name': entry.fully_qualified_name,
+            'type': entry.type_.name if entry.type_ else entry.user_specified_type,
+            'display_name': entry.display_name,
+            'description': entry.description,
+            'create_time': timestamps.create_time,
+            'update_time': timestamps.update_time
+        }
+
+    @classmethod
+    def make_columns_rows(cls, entry):
+        rows = []
+        cls.__add_columns_rows(entry.name, entry.schema.columns, '', rows)
+        return rows
+
+    @classmethod
+    def __add_columns_rows(cls, entry_name, columns, parent_path, rows):
+        # Nested columns are named after their parents, e.g. address.city.
+        for column in columns:
+            path = f'{parent_path}{column.column}'
+            rows.append({
+                'entry_name': entry_name,
+                'column': path,
+                'type': column.type_,
+                'mode': column.mode,
+                'description': column.description
+            })
+            cls.__add_columns_rows(entry_name, column.subcolumns, f'{path}.', rows)
+
+    @classmethod
+    def make_tags_rows(cls, entry_name, tags):
+        rows = []
+        for tag in tags:
+            for field_id, field in tag.fields.items():
+                row = {
+                    'entry_name': entry_name,
+                    'tag_name': tag.name,
+                    'template': tag.template,
+                    'template_display_name': tag.template_display_name,
+                    'column': tag.column,
+                    'field_id': field_id
+                }
+                row.update(cls.__make_tag_field_values(field))
+                rows.append(row)
+
+        return rows
+
+    @classmethod
+    def make_tags_key(cls, rows):
+        """
+        :return: A key that is equal for the same Tags rows, regardless of their order and of
+            the export they belong to.
+        """
+        # Converted to the snapshot types, so rows read from the snapshot compare equal.
+        columns = pyarrow.Table.from_pydict(
+            {
+                field.name: [row.get(field.name) for row in rows]
+                for field in _TAGS_KEY_SCHEMA
+            },
+            schema=_TAGS_KEY_SCHEMA).to_pydict()
+        return frozenset(zip(*columns.values()))
+
+    @classmethod
+    def __make_tag_field_values(cls, field):
+        value_kind = datacatalog.TagField.pb(field).WhichOneof('kind')
+        if value_kind == 'enum_value':
+            return {'enum_value': field.enum_value.display_name}
+        if value_kind == 'richtext_value':
+            return {'string_value': field.richtext_value}
+        return {value_kind: getattr(field, value_kind)} if value_kind else {}
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+class PartitionedTableWriter:
+    """
+    Write the rows of a snapshot table to Parquet or Arrow IPC files, one folder per partition.
+
+    Rows are buffered by partition and written to a new part file whenever a partition
+    accumulates rows_per_file rows, so existing files are never rewritten.
+    """
+
+    def __init__(self, output_folder, table_name, schema, file_format, export_id, rows_per_file):
+        self.__table_folder = os.path.join(output_folder, table_name)
+        self.__schema = schema
+        self.__file_format = file_format
+        self.__export_id = export_id
+        self.__rows_per_file = rows_per_file
+
+        self.__buffers = {}
+        self.__files_count = 0
+
+    def add_rows(self, partition, rows):
+        buffer = self.__buffers.setdefault(partition, [])
+        for row in rows:
+            row['export_id'] = self.__export_id
+            buffer.append(row)
+
+        if len(buffer) >= self.__rows_per_file:
+            self.__flush(partition)
+
+    def close(self):
+        for partition in list(self.__buffers):
+            self.__flush(partition)
+
+    def __flush(self, partition):
+        rows = self.__buffers.pop(partition)
+        if not rows:
+            return
+
+        system, project = partition
+        folder = os.path.join(self.__table_folder, f'system={system}', f'project={project}')
+        os.makedirs(folder, exist_ok=True)
+
+        file_path = os.path.join(
+            folder, f'part-{self.__export_id}-{self.__files_count}'
+            f'{_FILE_FORMATS_EXTENSIONS[self.__file_format]}')
+        self.__files_count += 1
+
+        columns = {field.name: [row.get(field.name) for row in rows] for field in self.__schema}
+        table = pyarrow.Table.from_pydict(columns, schema=self.__schema)
+
+        if self.__file_format == 'parquet':
+            parquet.write_table(table, file_path)
+        else:
+            with ipc.new_file(file_path, self.__schema) as writer:
+                writer.write_table(table)
+
+
+class SnapshotReader:
+
+    @classmethod
+    def read_table(cls, snapshot_folder, table_name, file_format='parquet', columns=None):
+        """
+        Read a snapshot table, including the system and project partition columns. Arrow IPC
+        files are memory-mapped rather than loaded into memory.
+
+        :param columns: The names of the columns to be read, defaults to all of them.
+        :return: A pyarrow.Table.
+        """
+        table_dataset = dataset.dataset(os.path.join(snapshot_folder, table_name),
+                                        format=_DATASET_FORMATS[file_format],
+                                        partitioning=dataset.partitioning(_PARTITIONING_SCHEMA,
+                                                                          flavor='hive'),
+                                        filesystem=fs.LocalFileSystem(use_mmap=True))
+        return table_dataset.to_table(columns=columns)
+
+    @classmethod
+    def read_latest_tags_keys(cls, snapshot_folder, file_format='parquet'):
+        """
+        Read the Tags of the latest export of each Entry in a snapshot. Only the needed columns
+        are read, and the rows of the previous exports are filtered out by Arrow.
+
+        :return: A dict mapping the Entries names to their SnapshotRowsFactory.make_tags_key().
+        """
+        if not os.path.isdir(os.path.join(snapshot_folder, 'entries')):
+            return {}
+
+        # Entries are exported along with all their Tags, so only their latest export counts.
+        entries = cls.read_table(snapshot_folder,
+                                 'entries',
+                                 file_format,
+                                 columns=['name', 'export_id'])
+        latest_entries = cls.__get_latest_exports(entries)
+        tags_keys = {name: [] for name in latest_entries['name'].to_pylist()}
+
+        if tags_keys and os.path.isdir(os.path.join(snapshot_folder, 'tags')):
+            tags = cls.read_table(snapshot_folder,
+                                  'tags',
+                                  file_format,
+                                  columns=_TAGS_KEY_SCHEMA.names + ['export_id'])
+            latest_exports_ids = cls.__make_exports_ids(latest_entries['name'],
+                                                        latest_entries['export_id'])
+            latest_tags = tags.filter(
+                compute.is_in(cls.__make_exports_ids(tags['entry_name'], tags['export_id']),
+                              value_set=latest_exports_ids.combine_chunks()))
+
+            columns = latest_tags.to_pydict()
+            for values in zip(*(columns[name] for name in _TAGS_KEY_SCHEMA.names)):
+                # The entry_name column comes first.
+                tags_keys[values[0]].append(values)
+
+        return {name: frozenset(values) for name, values in tags_keys.items()}
+
+    @classmethod
+    def __get_latest_exports(cls, entries):
+        """:return: The rows of the entries table with the latest export ID of each Entry."""
+        if not entries.num_rows:
+            return entries
+
+        entries = entries.take(
+            compute.sort_indices(entries,
+                                 sort_keys=[('name', 'ascending'), ('export_id', 'descending')]))
+        # Each Entry's first row, once sorted, is its latest export.
+        names = entries['name']
+        is_first_row = pyarrow.concat_arrays([
+            pyarrow.array([True]),
+            compute.not_equal(names.slice(1), names.slice(0,
+                                                          len(names) - 1)).combine_chunks()
+        ])
+        return entries.filter(is_first_row)
+
+    @classmethod
+    def __make_exports_ids(cls, entries_names, exports_ids):
+        """:return: The exports of the Entries, as '<ENTRY-NAME> <EXPORT-ID>' strings."""
+        return compute.binary_join_element_wise(entries_names, exports_ids, ' ')
+
+
+class WatermarksFile:
+    """
+    Keep track of the latest modification time of the Entries exported by each search in a
+    local JSON file.
+    """
+
+    def __init__(self, file_path):
+        self.__file_path = file_path
+
+    def get(self, search_key):
+        return self.__read().get(search_key)
+
+    def set(self, search_key, modify_time):
+        watermarks = self.__read()
+        watermarks[search_key] = modify_time
+
+        os.makedirs(os.path.dirname(self.__file_path) or '.', exist_ok=True)
+        # The file is written to a temporary one first, so it is never left half-written.
+        temp_file_path = f'{self.__file_path}.tmp'
+        with open(temp_file_path, mode='w') as watermarks_file:
+            json.dump(watermarks, watermarks_file)
+        os.replace(temp_file_path, self.__file_path)
+
+    def __read(self):
+        if not os.path.isfile(self.__file_path):
+            return {}
+
+        with open(self.__file_path, mode='r') as watermarks_file:
+            return json.load(watermarks_file)
+
+
+def _get_not_found_errors():
+    # Data Catalog reports the Entries that do not exist as PermissionDenied.
+    return exceptions.NotFound, exceptions.PermissionDenied
+
+
+"""
+Main program entry point
+========================================
+"""
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument('--organization-id', help='Google Cloud Organization ID')
+    parser.add_argument('--project-ids',
+                        nargs='+',
+                        help='Google Cloud Project IDs, searched in addition to the Organization')
+    parser.add_argument('--query', help='Data Catalog search query', required=True)
+    parser.add_argument('--output-folder', help='Snapshot folder', required=True)
+    parser.add_argument('--format',
+                        choices=sorted(_FILE_FORMATS_EXTENSIONS),
+                        default='parquet',
+                        help='snapshot files format (default: parquet)')
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help='skip the Entries not modified since the previous export;'
+                        ' their Tags are still listed, and the Entries whose Tags changed'
+                        ' are exported again')
+    parser.add_argument('--max-workers',
+                        type=int,
+                        default=_DEFAULT_MAX_WORKERS,
+                        help='maximum number of Entries fetched concurrently'
+                        f' (default: {_DEFAULT_MAX_WORKERS})')
+    api_throttling.add_arguments(parser)
+    api_instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    if not (args.organization_id or args.project_ids):
+        parser.error('at least one of --organization-id and --project-ids is required')
+
+    api_throttling.configure_from_args(args)
+    api_instrumentation.configure_from_args(args)
+
+    CatalogSnapshotExporter(args.output_folder, args.format,
+                            args.max_workers).run(args.organization_id, args.query,
+                                                  args.project_ids, args.incremental)
+    api_throttling.get_default_policy().log_counters()
+    api_instrumentation.report_from_args(args)
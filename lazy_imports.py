@@ -0,0 +1,59 @@
+"""
+Deferred imports of the heavy SDK modules, e.g. google.cloud.datacatalog, grpc, and
+googleapiclient.discovery, which take most of the scripts' start-up time.
+
+A module imported with lazy_import() is only loaded when one of its attributes is first used,
+so parsing and validating the command-line arguments of a script, or printing its help, do not
+load the SDKs.
+"""
+import importlib
+from importlib import util
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module, which is imported on first attribute access. The module's attributes
+    are then copied to the stand-in, so later accesses cost the same as the module's own.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__lock = threading.RLock()
+        self.__module = None
+
+    def __getattr__(self, name):
+        # Only called for the attributes that have not been copied, e.g. those set on the module
+        # after it was loaded. Special attributes, such as __file__, are looked up by repr() and
+        # introspection tools, which must not load the module.
+        if not self.__module and name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+
+        with self.__lock:
+            if not self.__module:
+                module = importlib.import_module(self.__name__)
+                for attribute_name, value in vars(module).items():
+                    self.__dict__.setdefault(attribute_name, value)
+                self.__module = module
+
+        return getattr(self.__module, name)
+
+
+def lazy_import(module_name):
+    """
+    Import a module on first use.
+
+    :return: The module, if it has already been imported, or a LazyModule.
+    :raises ModuleNotFoundError: If the module is not installed, as the import statement does.
+    """
+    module = sys.modules.get(module_name)
+    if module:
+        return module
+
+    # Finding a submodule imports its parent packages, which are lightweight for the SDKs.
+    if not util.find_spec(module_name):
+        raise ModuleNotFoundError(f'No module named {module_name!r}', name=module_name)
+
+    return LazyModule(module_name)
@@ -3,46 +3,101 @@ This application demonstrates how to create a Tag Template in Data Catalog,
 loading its information from a CSV file.
 """
 import argparse
+import asyncio
+from concurrent import futures
 import csv
+import hashlib
+import json
 import logging
+import os
 import re
 import stringcase
-import unicodedata
+import threading
+import time
 
-from google.api_core import exceptions
-from google.cloud import datacatalog
+import api_instrumentation
+import api_throttling
+import lazy_imports
+import tag_templates
 
-_CLOUD_PLATFORM_REGION = 'us-central1'
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
 
 _CUSTOM_MULTIVALUED_TYPE = 'MULTI'
 _DATA_CATALOG_BOOL_TYPE = 'BOOL'
 _DATA_CATALOG_ENUM_TYPE = 'ENUM'
 _DATA_CATALOG_NATIVE_TYPES = ['BOOL', 'DOUBLE', 'ENUM', 'STRING', 'TIMESTAMP']
 
+_TEMPLATE_CREATED = 'created'
+_TEMPLATE_SKIPPED = 'skipped'
+_TEMPLATE_UPDATED = 'updated'
+_TEMPLATE_UNCHANGED = 'unchanged'
+
+_MANIFEST_FIELDS = ['template_id', 'display_name', 'folder', 'project_id']
+_JSON_LINES_FILE_EXTENSIONS = ['.json', '.jsonl']
+
 _FOLDER_PLUS_CSV_FILENAME_FORMAT = '{}/{}.csv'
 _LOOKING_FOR_FILE_LOG_FORMAT = 'Looking for {} file {}...'
 
 
 class TemplateMaker:
 
-    def __init__(self):
-        self.__datacatalog_facade = DataCatalogFacade()
+    def __init__(self,
+                 max_workers=1,
+                 optimistic=False,
+                 state_file=None,
+                 force=False,
+                 enum_values_renames=None):
+        self.__datacatalog_facade = tag_templates.DataCatalogFacade()
+        # Maximum number of multivalued fields' Templates processed concurrently.
+        self.__max_workers = max_workers
+        # Create the Templates straight away instead of checking whether they exist first.
+        self.__optimistic = optimistic
+        # Skip the Templates whose metadata did not change since they were last applied.
+        self.__templates_state = TemplatesStateFile(state_file) if state_file else None
+        # Process the Templates even if their metadata did not change.
+        self.__force = force
+        # Enum values renamed when syncing the existing Templates, by field ID.
+        self.__enum_values_renames = enum_values_renames
+
+    def run(self,
+            files_folder,
+            project_id,
+            template_id,
+            display_name,
+            delete_existing=False,
+            sync_existing=False):
+        """
+        Create the master and the multivalued fields' Templates.
 
-    def run(self, files_folder, project_id, template_id, display_name, delete_existing=False):
+        :param sync_existing: Update the existing Templates to match the provided metadata
+            instead of skipping them. Their Tags are kept.
+        :return: A dict mapping each Template ID to 'created', 'updated', 'skipped' (it already
+            existed or was up to date) or 'unchanged' (its metadata did not change since it was
+            last applied), in the order they were processed.
+        """
         master_template_fields = CSVFilesReader.read_master(files_folder,
                                                             stringcase.spinalcase(template_id))
-        self.__process_native_fields(files_folder, project_id, template_id, display_name,
-                                     master_template_fields, delete_existing)
-        self.__process_custom_multivalued_fields(files_folder, project_id, template_id,
-                                                 display_name, master_template_fields,
-                                                 delete_existing)
+        results = {}
+        results[template_id] = self.__process_native_fields(files_folder, project_id, template_id,
+                                                            display_name, master_template_fields,
+                                                            delete_existing, sync_existing)
+        results.update(
+            self.__process_custom_multivalued_fields(files_folder, project_id, template_id,
+                                                     display_name, master_template_fields,
+                                                     delete_existing, sync_existing))
+
+        for processed_template_id, status in results.items():
+            logging.info(f'===> {processed_template_id}: {status}')
+
+        return results
 
     def __process_native_fields(self, files_folder, project_id, template_id, display_name,
-                                master_template_fields, delete_existing_template):
+                                master_template_fields, delete_existing_template,
+                                sync_existing_template):
 
         native_fields = self.__filter_fields_by_types(master_template_fields,
                                                       _DATA_CATALOG_NATIVE_TYPES)
-        StringFormatter.format_elements_to_snakecase(native_fields, 0)
+        tag_templates.StringFormatter.format_elements_to_snakecase(native_fields, 0)
 
         enums_names = {}
         for field in native_fields:
@@ -53,52 +108,400 @@ class TemplateMaker:
                                                          stringcase.spinalcase(field[0]))
             enums_names[field[0]] = [name[0] for name in names_from_file]
 
+        return self.__process_template(project_id, template_id, display_name, native_fields,
+                                       enums_names, delete_existing_template,
+                                       sync_existing_template)
+
+    def __process_custom_multivalued_fields(self, files_folder, project_id, template_id,
+                                            display_name, master_template_fields,
+                                            delete_existing_template, sync_existing_template):
+
+        multivalued_fields = self.__filter_fields_by_types(master_template_fields,
+                                                           [_CUSTOM_MULTIVALUED_TYPE])
+        tag_templates.StringFormatter.format_elements_to_snakecase(multivalued_fields, 0)
+
+        # Helper files are read sequentially, so the file system is not hit concurrently.
+        templates_descriptors = []
+        for field in multivalued_fields:
+            try:
+                values_from_file = CSVFilesReader.read_helper(files_folder,
+                                                              stringcase.spinalcase(field[0]))
+                fields = [(tag_templates.StringFormatter.format_to_snakecase(value[0]), value[0],
+                           _DATA_CATALOG_BOOL_TYPE) for value in values_from_file]
+            except FileNotFoundError:
+                logging.info('NOT FOUND. Ignoring...')
+                continue  # Ignore creating a new template representing the multivalued field
+
+            templates_descriptors.append(
+                (f'{template_id}_{field[0]}', f'{display_name} - {field[1]}', fields))
+
+        # Each multivalued field is represented by a Template of its own, so the API calls
+        # required to create them are independent from each other and run concurrently. The
+        # records logged while processing each Template are held back until all of them are done.
+        templates_logs = [[] for _ in templates_descriptors]
+        with BufferedLogs() as buffered_logs, \
+                futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            pending_results = [
+                executor.submit(buffered_logs.call, template_logs, self.__process_template,
+                                project_id, descriptor[0], descriptor[1], descriptor[2], None,
+                                delete_existing_template, sync_existing_template)
+                for descriptor, template_logs in zip(templates_descriptors, templates_logs)
+            ]
+
+        # The results and logs are handled in the same order as the fields appear in the master
+        # file, regardless of which Template was finished first. A failure does not prevent the
+        # other Templates from being processed, but the first one is raised after all of them
+        # are done.
+        results = {}
+        first_error = None
+        for descriptor, template_logs, pending_result in zip(templates_descriptors, templates_logs,
+                                                             pending_results):
+            BufferedLogs.emit(template_logs)
+            try:
+                results[descriptor[0]] = pending_result.result()
+            except Exception as e:
+                logging.error(f'Failed to process the Template {descriptor[0]}: {e}')
+                first_error = first_error or e
+
+        if first_error:
+            raise first_error
+
+        return results
+
+    def __process_template(self, project_id, template_id, display_name, fields_descriptors,
+                           enums_names, delete_existing_template, sync_existing_template):
+
         template_name = datacatalog.DataCatalogClient.tag_template_path(
-            project_id, _CLOUD_PLATFORM_REGION, template_id)
+            project_id, tag_templates.CLOUD_PLATFORM_REGION, template_id)
+
+        if not self.__templates_state:
+            return self.__apply_template(project_id, template_id, template_name, display_name,
+                                         fields_descriptors, enums_names, delete_existing_template,
+                                         sync_existing_template)
+
+        content_hash = TemplatesStateFile.make_content_hash(display_name, fields_descriptors,
+                                                            enums_names)
+        # Deleting the existing Templates is an explicit request, so it is always fulfilled.
+        if not (self.__force or delete_existing_template) \
+                and self.__templates_state.get_hash(template_name) == content_hash:
+            return _TEMPLATE_UNCHANGED
+
+        status = self.__apply_template(project_id, template_id, template_name, display_name,
+                                       fields_descriptors, enums_names, delete_existing_template,
+                                       sync_existing_template)
+
+        # Existing Templates are not compared to the provided metadata unless they are synced.
+        if status == _TEMPLATE_CREATED or sync_existing_template:
+            self.__templates_state.set_hash(template_name, content_hash)
+
+        return status
+
+    def __apply_template(self, project_id, template_id, template_name, display_name,
+                         fields_descriptors, enums_names, delete_existing_template,
+                         sync_existing_template):
+
+        if sync_existing_template:
+            tag_template = self.__datacatalog_facade.get_tag_template(template_name)
+            if tag_template:
+                changes_count = self.__datacatalog_facade.sync_tag_template(
+                    tag_template, display_name, fields_descriptors, enums_names,
+                    self.__enum_values_renames)
+                return _TEMPLATE_UPDATED if changes_count else _TEMPLATE_SKIPPED
+
+            self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
+                                                          fields_descriptors, enums_names)
+            return _TEMPLATE_CREATED
 
         if delete_existing_template:
             self.__datacatalog_facade.delete_tag_template(template_name)
 
-        if not self.__datacatalog_facade.tag_template_exists(template_name):
-            self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
-                                                          native_fields, enums_names)
+        if self.__optimistic:
+            created = self.__datacatalog_facade.create_tag_template_if_not_exists(
+                project_id, template_id, display_name, fields_descriptors, enums_names)
+            return _TEMPLATE_CREATED if created else _TEMPLATE_SKIPPED
 
-    def __process_custom_multivalued_fields(self, files_folder, project_id, template_id,
-                                            display_name, master_template_fields,
-                                            delete_existing_template):
+        if self.__datacatalog_facade.tag_template_exists(template_name):
+            return _TEMPLATE_SKIPPED
+
+        self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
+                                                      fields_descriptors, enums_names)
+        return _TEMPLATE_CREATED
+
+    @classmethod
+    def get_templates_ids(cls, files_folder, template_id):
+        """
+        :return: The IDs of the master Template and its multivalued fields' Templates, as
+            described by the master file.
+        """
+        master_template_fields = CSVFilesReader.read_master(files_folder,
+                                                            stringcase.spinalcase(template_id))
+        multivalued_fields = cls.__filter_fields_by_types(master_template_fields,
+                                                          [_CUSTOM_MULTIVALUED_TYPE])
+        fields_ids = tag_templates.StringFormatter.format_many(field[0]
+                                                               for field in multivalued_fields)
+
+        return [template_id] + [f'{template_id}_{field_id}' for field_id in fields_ids]
+
+    @classmethod
+    def __filter_fields_by_types(cls, fields, valid_types):
+        return [field for field in fields if field[2] in valid_types]
+
+
+class AsyncTemplateMaker:
+    """
+    Same as TemplateMaker, but the API calls required to create the master and all the
+    multivalued fields' Templates overlap in a single event loop.
+    """
+
+    def __init__(self,
+                 max_concurrency=tag_templates.DEFAULT_MAX_CONCURRENCY,
+                 optimistic=False,
+                 state_file=None,
+                 force=False,
+                 enum_values_renames=None):
+        self.__datacatalog_facade = tag_templates.AsyncDataCatalogFacade(max_concurrency)
+        # Create the Templates straight away instead of checking whether they exist first.
+        self.__optimistic = optimistic
+        # Skip the Templates whose metadata did not change since they were last applied.
+        self.__templates_state = TemplatesStateFile(state_file) if state_file else None
+        # Process the Templates even if their metadata did not change.
+        self.__force = force
+        # Enum values renamed when syncing the existing Templates, by field ID.
+        self.__enum_values_renames = enum_values_renames
+
+    async def run(self,
+                  files_folder,
+                  project_id,
+                  template_id,
+                  display_name,
+                  delete_existing=False,
+                  sync_existing=False):
+        """
+        Create the master and the multivalued fields' Templates.
+
+        :param sync_existing: Update the existing Templates to match the provided metadata
+            instead of skipping them. Their Tags are kept.
+        :return: A dict mapping each Template ID to 'created', 'updated', 'skipped' (it already
+            existed or was up to date) or 'unchanged' (its metadata did not change since it was
+            last applied), in the order they were described.
+        """
+        master_template_fields = CSVFilesReader.read_master(files_folder,
+                                                            stringcase.spinalcase(template_id))
+
+        native_fields = self.__filter_fields_by_types(master_template_fields,
+                                                      _DATA_CATALOG_NATIVE_TYPES)
+        tag_templates.StringFormatter.format_elements_to_snakecase(native_fields, 0)
+
+        enums_names = {}
+        for field in native_fields:
+            if not field[2] == _DATA_CATALOG_ENUM_TYPE:
+                continue
+
+            names_from_file = CSVFilesReader.read_helper(files_folder,
+                                                         stringcase.spinalcase(field[0]))
+            enums_names[field[0]] = [name[0] for name in names_from_file]
 
         multivalued_fields = self.__filter_fields_by_types(master_template_fields,
                                                            [_CUSTOM_MULTIVALUED_TYPE])
-        StringFormatter.format_elements_to_snakecase(multivalued_fields, 0)
+        tag_templates.StringFormatter.format_elements_to_snakecase(multivalued_fields, 0)
 
+        templates_descriptors = [(template_id, display_name, native_fields, enums_names)]
         for field in multivalued_fields:
             try:
                 values_from_file = CSVFilesReader.read_helper(files_folder,
                                                               stringcase.spinalcase(field[0]))
-                fields = [(StringFormatter.format_to_snakecase(value[0]), value[0],
+                fields = [(tag_templates.StringFormatter.format_to_snakecase(value[0]), value[0],
                            _DATA_CATALOG_BOOL_TYPE) for value in values_from_file]
             except FileNotFoundError:
                 logging.info('NOT FOUND. Ignoring...')
                 continue  # Ignore creating a new template representing the multivalued field
 
-            custom_template_id = f'{template_id}_{field[0]}'
-            custom_display_name = f'{display_name} - {field[1]}'
+            templates_descriptors.append(
+                (f'{template_id}_{field[0]}', f'{display_name} - {field[1]}', fields, None))
+
+        # The records logged while processing each Template are held back until all of them
+        # are done.
+        templates_logs = [[] for _ in templates_descriptors]
+        with BufferedLogs() as buffered_logs:
+            pending_results = [
+                buffered_logs.call_async(
+                    template_logs,
+                    self.__process_template(project_id, descriptor[0], descriptor[1],
+                                            descriptor[2], descriptor[3], delete_existing,
+                                            sync_existing))
+                for descriptor, template_logs in zip(templates_descriptors, templates_logs)
+            ]
+            results = await asyncio.gather(*pending_results, return_exceptions=True)
+
+        # Results and logs are handled in the same order as the Templates were described. A
+        # failure does not prevent the other Templates from being processed, but the first one is
+        # raised after all of them are done.
+        statuses = {}
+        first_error = None
+        for descriptor, template_logs, result in zip(templates_descriptors, templates_logs,
+                                                     results):
+            BufferedLogs.emit(template_logs)
+            if isinstance(result, Exception):
+                logging.error(f'Failed to process the Template {descriptor[0]}: {result}')
+                first_error = first_error or result
+            else:
+                statuses[descriptor[0]] = result
 
-            template_name = datacatalog.DataCatalogClient.tag_template_path(
-                project_id, _CLOUD_PLATFORM_REGION, custom_template_id)
+        if first_error:
+            raise first_error
 
-            if delete_existing_template:
-                self.__datacatalog_facade.delete_tag_template(template_name)
+        for processed_template_id, status in statuses.items():
+            logging.info(f'===> {processed_template_id}: {status}')
 
-            if not self.__datacatalog_facade.tag_template_exists(template_name):
-                self.__datacatalog_facade.create_tag_template(project_id, custom_template_id,
-                                                              custom_display_name, fields)
+        return statuses
+
+    async def __process_template(self, project_id, template_id, display_name, fields_descriptors,
+                                 enums_names, delete_existing_template, sync_existing_template):
+
+        template_name = datacatalog.DataCatalogClient.tag_template_path(
+            project_id, tag_templates.CLOUD_PLATFORM_REGION, template_id)
+
+        if not self.__templates_state:
+            return await self.__apply_template(project_id, template_id, template_name,
+                                               display_name, fields_descriptors, enums_names,
+                                               delete_existing_template, sync_existing_template)
+
+        content_hash = TemplatesStateFile.make_content_hash(display_name, fields_descriptors,
+                                                            enums_names)
+        # Deleting the existing Templates is an explicit request, so it is always fulfilled.
+        if not (self.__force or delete_existing_template) \
+                and self.__templates_state.get_hash(template_name) == content_hash:
+            return _TEMPLATE_UNCHANGED
+
+        status = await self.__apply_template(project_id, template_id, template_name, display_name,
+                                             fields_descriptors, enums_names,
+                                             delete_existing_template, sync_existing_template)
+
+        # Existing Templates are not compared to the provided metadata unless they are synced.
+        if status == _TEMPLATE_CREATED or sync_existing_template:
+            self.__templates_state.set_hash(template_name, content_hash)
+
+        return status
+
+    async def __apply_template(self, project_id, template_id, template_name, display_name,
+                               fields_descriptors, enums_names, delete_existing_template,
+                               sync_existing_template):
+
+        if sync_existing_template:
+            tag_template = await self.__datacatalog_facade.get_tag_template(template_name)
+            if tag_template:
+                changes_count = await self.__datacatalog_facade.sync_tag_template(
+                    tag_template, display_name, fields_descriptors, enums_names,
+                    self.__enum_values_renames)
+                return _TEMPLATE_UPDATED if changes_count else _TEMPLATE_SKIPPED
+
+            await self.__datacatalog_facade.create_tag_template(project_id, template_id,
+                                                                display_name, fields_descriptors,
+                                                                enums_names)
+            return _TEMPLATE_CREATED
+
+        if delete_existing_template:
+            await self.__datacatalog_facade.delete_tag_template(template_name)
+
+        if self.__optimistic:
+            created = await self.__datacatalog_facade.create_tag_template_if_not_exists(
+                project_id, template_id, display_name, fields_descriptors, enums_names)
+            return _TEMPLATE_CREATED if created else _TEMPLATE_SKIPPED
+
+        if await self.__datacatalog_facade.tag_template_exists(template_name):
+            return _TEMPLATE_SKIPPED
+
+        await self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
+                                                            fields_descriptors, enums_names)
+        return _TEMPLATE_CREATED
 
     @classmethod
     def __filter_fields_by_types(cls, fields, valid_types):
         return [field for field in fields if field[2] in valid_types]
 
 
+class BatchTemplateMaker:
+    """
+    Process the Templates described in a manifest in a single process, so the credentials and
+    the API client -- hence its gRPC channel -- are set up only once for all of them.
+    """
+
+    def __init__(self,
+                 max_workers=1,
+                 max_fields_workers=1,
+                 optimistic=False,
+                 state_file=None,
+                 force=False):
+        # A single TemplateMaker, which owns the API client, is shared by all workers.
+        self.__template_maker = TemplateMaker(max_fields_workers, optimistic, state_file, force)
+        # Maximum number of manifest Templates processed concurrently.
+        self.__max_workers = max_workers
+
+    def run(self, manifest_entries, delete_existing=False, sync_existing=False):
+        """
+        Create the Templates described in the manifest entries, as returned by
+        ManifestReader.read().
+
+        :return: A list of dicts with the Template ID, the statuses returned by TemplateMaker,
+            the elapsed time in seconds and the error (if any) of each manifest entry.
+        """
+        start_time = time.perf_counter()
+
+        with futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            pending_results = [
+                executor.submit(self.__process_entry, entry, delete_existing, sync_existing)
+                for entry in manifest_entries
+            ]
+
+        # A failure does not prevent the other Templates from being processed, but the first one
+        # is raised after the summary is logged.
+        summary = [pending_result.result() for pending_result in pending_results]
+        self.__log_summary(summary, time.perf_counter() - start_time)
+
+        first_error = next((result['error'] for result in summary if result['error']), None)
+        if first_error:
+            raise first_error
+
+        return summary
+
+    def __process_entry(self, entry, delete_existing, sync_existing):
+        start_time = time.perf_counter()
+        statuses = None
+        error = None
+        try:
+            statuses = self.__template_maker.run(entry['folder'], entry['project_id'],
+                                                 entry['template_id'], entry['display_name'],
+                                                 delete_existing, sync_existing)
+        except Exception as e:
+            logging.error(f'Failed to process the Template {entry["template_id"]}: {e}')
+            error = e
+
+        return {
+            'template_id': entry['template_id'],
+            'statuses': statuses,
+            'elapsed_seconds': time.perf_counter() - start_time,
+            'error': error
+        }
+
+    @classmethod
+    def __log_summary(cls, summary, elapsed_seconds):
+        logging.info('')
+        logging.info('==== SUMMARY ====')
+        for result in summary:
+            if result['error']:
+                outcome = f'FAILED ({result["error"]})'
+            else:
+                statuses = list(result['statuses'].values())
+                outcome = ', '.join(f'{status}: {statuses.count(status)}'
+                                    for status in sorted(set(statuses)))
+            logging.info(f'===> {result["template_id"]}: {outcome}'
+                         f' [{result["elapsed_seconds"]:.2f}s]')
+
+        failed_count = len([result for result in summary if result['error']])
+        logging.info(f'===> {len(summary)} manifest entries processed in {elapsed_seconds:.2f}s,'
+                     f' {failed_count} failed')
+
+
 """
 Input reader
 ========================================
@@ -109,16 +512,25 @@ class CSVFilesReader:
 
     @classmethod
     def read_master(cls, folder, file_id, values_per_line=3):
-        return cls.__read(folder, file_id, 'master', values_per_line)
+        return list(cls.iter_master(folder, file_id, values_per_line))
 
     @classmethod
     def read_helper(cls, folder, file_id, values_per_line=1):
+        return list(cls.iter_helper(folder, file_id, values_per_line))
+
+    @classmethod
+    def iter_master(cls, folder, file_id, values_per_line=3):
+        return cls.__read(folder, file_id, 'master', values_per_line)
+
+    @classmethod
+    def iter_helper(cls, folder, file_id, values_per_line=1):
         return cls.__read(folder, file_id, 'helper', values_per_line)
 
     @classmethod
     def __read(cls, folder, file_id, file_type, values_per_line):
         """
-        Read the requested values from each line and store them into a list.
+        Lazily read the requested values from each line, in a single pass and without keeping
+        the whole file in memory.
         Example: CSV name,display name,type => Python list ['name','display name','type'].
 
         :param folder: CSV file container folder.
@@ -130,124 +542,204 @@ class CSVFilesReader:
 
         logging.info(_LOOKING_FOR_FILE_LOG_FORMAT.format(file_type, file_path))
 
-        data = []
-
         with open(file_path, mode='r') as csv_file:
             logging.info(f'Reading file {file_path}...')
-            for row in csv.reader(csv_file):
-                row_data = []
-                for counter in range(values_per_line):
-                    row_data.append(row[counter].strip())
-                data.append(row_data)
+            csv_reader = csv.reader(csv_file)
+
+            # The first line is usually used for headers, so it's discarded.
+            next(csv_reader, None)
 
-        # The first line is usually used for headers, so it's discarded.
-        del (data[0])
+            for row in csv_reader:
+                row_data = row[:values_per_line]
+                if len(row_data) < values_per_line:
+                    raise IndexError(f'{file_path} line {csv_reader.line_num} has less than'
+                                     f' {values_per_line} values')
+                yield [value.strip() for value in row_data]
 
         logging.info('DONE')
-        return data
 
     @classmethod
     def __normalize_path(cls, path):
         return re.sub(r'/+', '/', path)
 
 
+class ManifestReader:
+
+    @classmethod
+    def read(cls, file_path, default_project_id=None):
+        """
+        Read the Templates described in a manifest file, which is either a JSON lines file
+        (.json or .jsonl) or a CSV file with a header line. Each entry has a template_id,
+        display_name, folder and, optionally, project_id. Relative folders are resolved against
+        the manifest's location.
+
+        :param default_project_id: Project used by the entries that have no project_id.
+        :return: A list of dicts, one per Template.
+        """
+        logging.info(_LOOKING_FOR_FILE_LOG_FORMAT.format('manifest', file_path))
+
+        with open(file_path, mode='r') as manifest_file:
+            logging.info(f'Reading file {file_path}...')
+            if os.path.splitext(file_path)[1].lower() in _JSON_LINES_FILE_EXTENSIONS:
+                raw_entries = [json.loads(line) for line in manifest_file if line.strip()]
+            else:
+                raw_entries = list(csv.DictReader(manifest_file))
+
+        manifest_folder = os.path.dirname(file_path)
+        entries = []
+        for line_number, raw_entry in enumerate(raw_entries, start=1):
+            entry = {
+                field: str(raw_entry.get(field) or '').strip() or None
+                for field in _MANIFEST_FIELDS
+            }
+            entry['project_id'] = entry['project_id'] or default_project_id
+
+            missing_fields = [field for field in _MANIFEST_FIELDS if not entry[field]]
+            if missing_fields:
+                raise ValueError(f'Manifest entry {line_number} has no'
+                                 f' {", ".join(missing_fields)}')
+
+            entry['folder'] = os.path.join(manifest_folder, entry['folder'])
+            entries.append(entry)
+
+        logging.info('DONE')
+        return entries
+
+
 """
-API communication classes
+Tools & utilities
 ========================================
 """
 
 
-class DataCatalogFacade:
+class BufferedLogs(logging.Filter):
     """
-    Manage Templates by communicating to Data Catalog's API.
+    Holds back the records logged through the root logger by the functions processing each
+    Template concurrently, so they can be emitted in the Templates' order instead of the order
+    the worker threads or asyncio tasks happened to log them.
     """
 
     def __init__(self):
-        # Initialize the API client.
-        self.__datacatalog = datacatalog.DataCatalogClient()
-
-    def create_tag_template(self,
-                            project_id,
-                            template_id,
-                            display_name,
-                            fields_descriptors,
-                            enums_names=None):
-        """Create a Tag Template."""
-
-        location = datacatalog.DataCatalogClient.common_location_path(
-            project_id, _CLOUD_PLATFORM_REGION)
-
-        tag_template = datacatalog.TagTemplate()
-        tag_template.display_name = display_name
-
-        for descriptor in fields_descriptors:
-            field = datacatalog.TagTemplateField()
-            field.display_name = descriptor[1]
-
-            field_id = descriptor[0]
-            field_type = descriptor[2]
-            if not field_type == _DATA_CATALOG_ENUM_TYPE:
-                field.type_.primitive_type = datacatalog.FieldType.PrimitiveType[field_type]
-            else:
-                for enum_name in enums_names[field_id]:
-                    enum_value = datacatalog.FieldType.EnumType.EnumValue()
-                    enum_value.display_name = enum_name
-                    field.type_.enum_type.allowed_values.append(enum_value)
+        super().__init__()
+        # Maps each worker thread or asyncio task to the list its records are held back in.
+        self.__records_lists = {}
 
-            tag_template.fields[field_id] = field
+    def __enter__(self):
+        logging.getLogger().addFilter(self)
+        return self
 
-        created_tag_template = self.__datacatalog.create_tag_template(parent=location,
-                                                                      tag_template_id=template_id,
-                                                                      tag_template=tag_template)
+    def __exit__(self, exc_type, exc_value, traceback):
+        logging.getLogger().removeFilter(self)
 
-        logging.info(f'===> Template created: {created_tag_template.name}')
+    def filter(self, record):
+        records = self.__records_lists.get(self.__get_worker_id())
+        if records is None:
+            return True
 
-    def delete_tag_template(self, name):
-        """Delete a Tag Template."""
+        records.append(record)
+        return False
 
+    def call(self, records, function, *args):
+        """Call a function, holding back the records it logs in the provided list."""
+        worker_id = self.__get_worker_id()
+        self.__records_lists[worker_id] = records
         try:
-            self.__datacatalog.delete_tag_template(name=name, force=True)
-            logging.info(f'===> Template deleted: {name}')
-        except exceptions.PermissionDenied:
-            pass
+            return function(*args)
+        finally:
+            del self.__records_lists[worker_id]
+
+    async def call_async(self, records, coroutine):
+        """Await a coroutine, holding back the records it logs in the provided list."""
+        worker_id = self.__get_worker_id()
+        self.__records_lists[worker_id] = records
+        try:
+            return await coroutine
+        finally:
+            del self.__records_lists[worker_id]
 
-    def tag_template_exists(self, name):
-        """Check if a Tag Template with the provided name already exists."""
+    @classmethod
+    def emit(cls, records):
+        root_logger = logging.getLogger()
+        for record in records:
+            root_logger.handle(record)
 
+    @classmethod
+    def __get_worker_id(cls):
+        # asyncio.current_task() was added in Python 3.7.
+        current_task = getattr(asyncio, 'current_task', None) or asyncio.Task.current_task
         try:
-            self.__datacatalog.get_tag_template(name=name)
-            return True
-        except exceptions.PermissionDenied:
-            return False
+            task = current_task()
+        except RuntimeError:  # No event loop in the current thread.
+            task = None
+        return task or threading.get_ident()
 
 
-"""
-Tools & utilities
-========================================
-"""
+class TemplatesStateFile:
+    """
+    Keep track of the metadata applied to each Template in a local JSON lines file, so the
+    Templates that did not change since they were last applied can be skipped with no API calls.
 
+    Each line maps a Template name to a hash of its metadata, and the latest line wins. Changes
+    are appended to the file, which is only rewritten when entries are invalidated.
+    """
 
-class StringFormatter:
+    def __init__(self, file_path):
+        self.__file_path = file_path
+        self.__hashes = self.__read()
+        # Templates are processed concurrently, hence the lock.
+        self.__lock = threading.Lock()
 
-    @classmethod
-    def format_elements_to_snakecase(cls, a_list, internal_index=None):
-        if internal_index is None:
-            for counter in range(len(a_list)):
-                a_list[counter] = cls.format_to_snakecase(a_list[counter])
-        else:
-            for element in a_list:
-                element[internal_index] = cls.format_to_snakecase(element[internal_index])
+    def get_hash(self, template_name):
+        return self.__hashes.get(template_name)
+
+    def set_hash(self, template_name, content_hash):
+        with self.__lock:
+            self.__hashes[template_name] = content_hash
+            with open(self.__file_path, mode='a') as state_file:
+                state_file.write(json.dumps({'name': template_name, 'hash': content_hash}) + '\n')
+
+    def invalidate(self, templates_names):
+        """
+        Remove the entries of the provided Templates, e.g. a master Template and its multivalued
+        fields' Templates as returned by TemplateMaker.get_templates_ids().
+
+        :return: The number of removed entries.
+        """
+        with self.__lock:
+            invalidated_names = [name for name in templates_names if name in self.__hashes]
+            for name in invalidated_names:
+                del self.__hashes[name]
+
+            # The file is written to a temporary one first, so it is never left half-written.
+            temp_file_path = f'{self.__file_path}.tmp'
+            with open(temp_file_path, mode='w') as state_file:
+                for name, content_hash in self.__hashes.items():
+                    state_file.write(json.dumps({'name': name, 'hash': content_hash}) + '\n')
+            os.replace(temp_file_path, self.__file_path)
+
+        logging.info(f'===> State entries invalidated: {len(invalidated_names)}')
+        return len(invalidated_names)
 
     @classmethod
-    def format_to_snakecase(cls, string):
-        normalized_str = unicodedata.normalize('NFKD', string).encode('ASCII', 'ignore').decode()
-        normalized_str = re.sub(r'[^a-zA-Z0-9]+', ' ', normalized_str)
-        normalized_str = normalized_str.strip()
-        normalized_str = normalized_str.lower() \
-            if (' ' in normalized_str) or (normalized_str.isupper()) \
-            else stringcase.camelcase(normalized_str)  # FooBarBaz => fooBarBaz
+    def make_content_hash(cls, display_name, fields_descriptors, enums_names=None):
+        content = json.dumps([display_name, fields_descriptors, enums_names], sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def __read(self):
+        hashes = {}
+        if not os.path.isfile(self.__file_path):
+            return hashes
+
+        logging.info(f'Reading state file {self.__file_path}...')
+        with open(self.__file_path, mode='r') as state_file:
+            for line in state_file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                hashes[entry['name']] = entry['hash']
 
-        return stringcase.snakecase(normalized_str)  # foo-bar-baz => foo_bar_baz
+        logging.info('DONE')
+        return hashes
 
 
 """
@@ -259,18 +751,124 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Load Tag Template from CSV')
 
-    parser.add_argument('--template-id', help='the template ID', required=True)
-    parser.add_argument('--display-name', help='template\'s Display Name', required=True)
-    parser.add_argument('--project-id',
-                        help='GCP Project in which the Template will be created',
-                        required=True)
-    parser.add_argument('--files-folder', help='path to CSV files container folder', required=True)
-    parser.add_argument(
+    templates_group = parser.add_mutually_exclusive_group(required=True)
+    templates_group.add_argument('--template-id', help='the template ID')
+    templates_group.add_argument(
+        '--manifest',
+        help='CSV or JSON lines file describing multiple Templates: template_id, display_name,'
+        ' folder, and project_id (defaults to --project-id)')
+    parser.add_argument('--display-name', help='template\'s Display Name')
+    parser.add_argument('--project-id', help='GCP Project in which the Template will be created')
+    parser.add_argument('--files-folder', help='path to CSV files container folder')
+    existing_templates_group = parser.add_mutually_exclusive_group()
+    existing_templates_group.add_argument(
         '--delete-existing',
         action='store_true',
         help='delete existing Templates and recreate them with the provided metadata')
+    existing_templates_group.add_argument(
+        '--sync',
+        action='store_true',
+        dest='sync_existing',
+        help='update existing Templates to match the provided metadata, keeping their Tags')
+    parser.add_argument(
+        '--optimistic',
+        action='store_true',
+        help='create Templates with no previous existence check and skip the existing ones')
+    parser.add_argument('--async',
+                        action='store_true',
+                        dest='run_async',
+                        help='use the async Data Catalog client to overlap all API calls')
+    parser.add_argument('--max-concurrency',
+                        type=int,
+                        default=tag_templates.DEFAULT_MAX_CONCURRENCY,
+                        help='maximum number of concurrent API calls when running with --async'
+                        f' (default: {tag_templates.DEFAULT_MAX_CONCURRENCY})')
+    parser.add_argument('--max-workers',
+                        type=int,
+                        default=1,
+                        help='maximum number of multivalued fields\' Templates processed'
+                        ' concurrently (default: 1)')
+    parser.add_argument('--max-batch-workers',
+                        type=int,
+                        default=1,
+                        help='maximum number of manifest Templates processed concurrently'
+                        ' (default: 1)')
+    parser.add_argument('--state-file',
+                        help='JSON lines file used to skip the Templates whose metadata did not'
+                        ' change since they were last applied')
+    parser.add_argument('--force',
+                        action='store_true',
+                        help='process the Templates even if their metadata did not change')
+    parser.add_argument('--invalidate-state',
+                        action='store_true',
+                        help='remove the Templates described by the master files, and their'
+                        ' multivalued fields\' Templates, from the state file and exit')
+    tag_templates.add_arguments(parser)
+    api_throttling.add_arguments(parser)
+    api_instrumentation.add_arguments(parser)
 
     args = parser.parse_args()
 
-    TemplateMaker().run(args.files_folder, args.project_id, args.template_id, args.display_name,
-                        args.delete_existing)
+    if args.template_id and not (args.display_name and args.project_id and args.files_folder):
+        parser.error('--display-name, --project-id and --files-folder are required'
+                     ' with --template-id')
+
+    if args.manifest and args.run_async:
+        parser.error('--async is not supported with --manifest')
+
+    if (args.force or args.invalidate_state) and not args.state_file:
+        parser.error('--force and --invalidate-state require --state-file')
+
+    if args.enum_values_renames and not (args.sync_existing and args.template_id):
+        parser.error('--rename-enum-value requires --sync and --template-id')
+
+    # The master file is looked for before the API clients load gRPC, so typos fail fast.
+    if args.template_id:
+        master_file_path = _FOLDER_PLUS_CSV_FILENAME_FORMAT.format(
+            args.files_folder, stringcase.spinalcase(args.template_id))
+        if not os.path.isfile(master_file_path):
+            parser.error(f'master file not found: {master_file_path}')
+
+    api_throttling.configure_from_args(args)
+    api_instrumentation.configure_from_args(args)
+
+    if args.manifest:
+        manifest_entries = ManifestReader.read(args.manifest, args.project_id)
+    else:
+        manifest_entries = [{
+            'template_id': args.template_id,
+            'display_name': args.display_name,
+            'folder': args.files_folder,
+            'project_id': args.project_id
+        }]
+
+    if args.invalidate_state:
+        # The multivalued fields' Templates are read from the master files, so other Templates
+        # whose IDs start with the same prefix keep their entries.
+        templates_names = [
+            datacatalog.DataCatalogClient.tag_template_path(entry['project_id'],
+                                                            tag_templates.CLOUD_PLATFORM_REGION,
+                                                            template_id)
+            for entry in manifest_entries for template_id in TemplateMaker.get_templates_ids(
+                entry['folder'], entry['template_id'])
+        ]
+        TemplatesStateFile(args.state_file).invalidate(templates_names)
+    elif args.manifest:
+        template_maker = BatchTemplateMaker(args.max_batch_workers, args.max_workers,
+                                            args.optimistic, args.state_file, args.force)
+        template_maker.run(manifest_entries, args.delete_existing, args.sync_existing)
+    elif args.run_async:
+        template_maker = AsyncTemplateMaker(args.max_concurrency, args.optimistic,
+                                            args.state_file, args.force,
+                                            tag_templates.get_enum_values_renames(args))
+        asyncio.new_event_loop().run_until_complete(
+            template_maker.run(args.files_folder, args.project_id, args.template_id,
+                               args.display_name, args.delete_existing, args.sync_existing))
+    else:
+        template_maker = TemplateMaker(args.max_workers, args.optimistic, args.state_file,
+                                       args.force, tag_templates.get_enum_values_renames(args))
+        template_maker.run(args.files_folder, args.project_id, args.template_id, args.display_name,
+                           args.delete_existing, args.sync_existing)
+
+    api_throttling.get_default_policy().log_counters()
+    api_instrumentation.report_from_args(args)
@@ -3,106 +3,340 @@ This application demonstrates how to create a Tag Template in Data Catalog,
 loading its information from Google Sheets.
 """
 import argparse
+import asyncio
 import logging
-import re
 import stringcase
-import unicodedata
+from urllib import parse
 
-from google.api_core import exceptions
-from google.cloud import datacatalog
-from googleapiclient import discovery
-from googleapiclient import errors
-from oauth2client import service_account
+import api_instrumentation
+import api_throttling
+import lazy_imports
+import tag_templates
 
-_CLOUD_PLATFORM_REGION = 'us-central1'
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
+discovery = lazy_imports.lazy_import('googleapiclient.discovery')
+errors = lazy_imports.lazy_import('googleapiclient.errors')
+service_account = lazy_imports.lazy_import('oauth2client.service_account')
 
 _CUSTOM_MULTIVALUED_TYPE = 'MULTI'
 _DATA_CATALOG_BOOL_TYPE = 'BOOL'
 _DATA_CATALOG_ENUM_TYPE = 'ENUM'
 _DATA_CATALOG_NATIVE_TYPES = ['BOOL', 'DOUBLE', 'ENUM', 'STRING', 'TIMESTAMP']
 
+_TEMPLATE_CREATED = 'created'
+_TEMPLATE_SKIPPED = 'skipped'
+_TEMPLATE_UPDATED = 'updated'
+
+# The ranges are sent as query parameters by batchGet requests, so their total length is limited
+# to keep the request URLs under the size accepted by Google APIs.
+_BATCH_GET_MAX_RANGES_LENGTH = 1800
+_RANGES_QUERY_PARAMETER = '&ranges='
+
 _LOOKING_FOR_SHEET_LOG_FORMAT = 'Looking for {} sheet {} | {}...'
 
 
 class TemplateMaker:
 
-    def __init__(self):
+    def __init__(self, optimistic=False, enum_values_renames=None):
         self.__sheets_reader = GoogleSheetsReader()
-        self.__datacatalog_facade = DataCatalogFacade()
+        self.__datacatalog_facade = tag_templates.DataCatalogFacade()
+        # Create the Templates straight away instead of checking whether they exist first.
+        self.__optimistic = optimistic
+        # Enum values renamed when syncing the existing Templates, by field ID.
+        self.__enum_values_renames = enum_values_renames
+
+    def run(self,
+            spreadsheet_id,
+            project_id,
+            template_id,
+            display_name,
+            delete_existing=False,
+            sync_existing=False):
+        """
+        Create the master and the multivalued fields' Templates.
 
-    def run(self, spreadsheet_id, project_id, template_id, display_name, delete_existing=False):
+        :param sync_existing: Update the existing Templates to match the provided metadata
+            instead of skipping them. Their Tags are kept.
+        :return: A dict mapping each Template ID to 'created', 'updated' or 'skipped' (it already
+            existed or was up to date), in the order they were processed.
+        """
         master_template_fields = self.__sheets_reader.read_master(
             spreadsheet_id, stringcase.spinalcase(template_id))
-        self.__process_native_fields(spreadsheet_id, project_id, template_id, display_name,
-                                     master_template_fields, delete_existing)
-        self.__process_custom_multivalued_fields(spreadsheet_id, project_id, template_id,
-                                                 display_name, master_template_fields,
-                                                 delete_existing)
+        helpers_data = self.__sheets_reader.read_helpers(
+            spreadsheet_id, self.__get_helpers_sheets_names(master_template_fields))
 
-    def __process_native_fields(self, spreadsheet_id, project_id, template_id, display_name,
-                                master_template_fields, delete_existing_template):
+        results = {}
+        results[template_id] = self.__process_native_fields(project_id, template_id, display_name,
+                                                            master_template_fields, helpers_data,
+                                                            delete_existing, sync_existing)
+        results.update(
+            self.__process_custom_multivalued_fields(project_id, template_id, display_name,
+                                                     master_template_fields, helpers_data,
+                                                     delete_existing, sync_existing))
+
+        for processed_template_id, status in results.items():
+            logging.info(f'===> {processed_template_id}: {status}')
+
+        return results
+
+    def __process_native_fields(self, project_id, template_id, display_name,
+                                master_template_fields, helpers_data, delete_existing_template,
+                                sync_existing_template):
 
         native_fields = self.__filter_fields_by_types(master_template_fields,
                                                       _DATA_CATALOG_NATIVE_TYPES)
-        StringFormatter.format_elements_to_snakecase(native_fields, 0)
+        tag_templates.StringFormatter.format_elements_to_snakecase(native_fields, 0)
 
         enums_names = {}
         for field in native_fields:
             if not field[2] == _DATA_CATALOG_ENUM_TYPE:
                 continue
 
-            names_from_sheet = self.__sheets_reader.read_helper(spreadsheet_id,
-                                                                stringcase.spinalcase(field[0]))
+            names_from_sheet = self.__get_helper_data(helpers_data, field)
             enums_names[field[0]] = [name[0] for name in names_from_sheet]
 
+        return self.__process_template(project_id, template_id, display_name, native_fields,
+                                       enums_names, delete_existing_template,
+                                       sync_existing_template)
+
+    def __process_custom_multivalued_fields(self, project_id, template_id, display_name,
+                                            master_template_fields, helpers_data,
+                                            delete_existing_template, sync_existing_template):
+
+        multivalued_fields = self.__filter_fields_by_types(master_template_fields,
+                                                           [_CUSTOM_MULTIVALUED_TYPE])
+        tag_templates.StringFormatter.format_elements_to_snakecase(multivalued_fields, 0)
+
+        results = {}
+        for field in multivalued_fields:
+            values_from_sheet = self.__get_helper_data(helpers_data, field, required=False)
+            if values_from_sheet is None:
+                continue  # Ignore creating a new template representing the multivalued field
+
+            fields = [(tag_templates.StringFormatter.format_to_snakecase(value[0]), value[0],
+                       _DATA_CATALOG_BOOL_TYPE) for value in values_from_sheet]
+
+            custom_template_id = f'{template_id}_{field[0]}'
+            custom_display_name = f'{display_name} - {field[1]}'
+
+            results[custom_template_id] = self.__process_template(project_id, custom_template_id,
+                                                                  custom_display_name, fields,
+                                                                  None, delete_existing_template,
+                                                                  sync_existing_template)
+
+        return results
+
+    def __process_template(self, project_id, template_id, display_name, fields_descriptors,
+                           enums_names, delete_existing_template, sync_existing_template):
+
         template_name = datacatalog.DataCatalogClient.tag_template_path(
-            project_id, _CLOUD_PLATFORM_REGION, template_id)
+            project_id, tag_templates.CLOUD_PLATFORM_REGION, template_id)
+
+        if sync_existing_template:
+            tag_template = self.__datacatalog_facade.get_tag_template(template_name)
+            if tag_template:
+                changes_count = self.__datacatalog_facade.sync_tag_template(
+                    tag_template, display_name, fields_descriptors, enums_names,
+                    self.__enum_values_renames)
+                return _TEMPLATE_UPDATED if changes_count else _TEMPLATE_SKIPPED
+
+            self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
+                                                          fields_descriptors, enums_names)
+            return _TEMPLATE_CREATED
 
         if delete_existing_template:
             self.__datacatalog_facade.delete_tag_template(template_name)
 
-        if not self.__datacatalog_facade.tag_template_exists(template_name):
-            self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
-                                                          native_fields, enums_names)
+        if self.__optimistic:
+            created = self.__datacatalog_facade.create_tag_template_if_not_exists(
+                project_id, template_id, display_name, fields_descriptors, enums_names)
+            return _TEMPLATE_CREATED if created else _TEMPLATE_SKIPPED
 
-    def __process_custom_multivalued_fields(self, spreadsheet_id, project_id, template_id,
-                                            display_name, master_template_fields,
-                                            delete_existing_template):
+        if self.__datacatalog_facade.tag_template_exists(template_name):
+            return _TEMPLATE_SKIPPED
+
+        self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
+                                                      fields_descriptors, enums_names)
+        return _TEMPLATE_CREATED
+
+    @classmethod
+    def __filter_fields_by_types(cls, fields, valid_types):
+        return [field for field in fields if field[2] in valid_types]
+
+    @classmethod
+    def __get_helpers_sheets_names(cls, master_template_fields):
+        return [
+            cls.__get_helper_sheet_name(field) for field in master_template_fields
+            if field[2] in [_DATA_CATALOG_ENUM_TYPE, _CUSTOM_MULTIVALUED_TYPE]
+        ]
+
+    @classmethod
+    def __get_helper_data(cls, helpers_data, field, required=True):
+        helper_data = helpers_data.get(cls.__get_helper_sheet_name(field))
+        if helper_data is None:
+            if required:
+                raise ValueError(f'Helper sheet not found for the {field[2]} field {field[0]}')
+            logging.info(
+                f'Helper sheet not found for the {field[2]} field {field[0]}. Ignoring...')
+        return helper_data
+
+    @classmethod
+    def __get_helper_sheet_name(cls, field):
+        return stringcase.spinalcase(tag_templates.StringFormatter.format_to_snakecase(field[0]))
+
+
+class AsyncTemplateMaker:
+    """
+    Same as TemplateMaker, but the API calls required to create the master and all the
+    multivalued fields' Templates overlap in a single event loop. Google Sheets are read before
+    any Data Catalog API call is made.
+    """
+
+    def __init__(self,
+                 max_concurrency=tag_templates.DEFAULT_MAX_CONCURRENCY,
+                 optimistic=False,
+                 enum_values_renames=None):
+        self.__sheets_reader = GoogleSheetsReader()
+        self.__datacatalog_facade = tag_templates.AsyncDataCatalogFacade(max_concurrency)
+        # Create the Templates straight away instead of checking whether they exist first.
+        self.__optimistic = optimistic
+        # Enum values renamed when syncing the existing Templates, by field ID.
+        self.__enum_values_renames = enum_values_renames
+
+    async def run(self,
+                  spreadsheet_id,
+                  project_id,
+                  template_id,
+                  display_name,
+                  delete_existing=False,
+                  sync_existing=False):
+        """
+        Create the master and the multivalued fields' Templates.
+
+        :param sync_existing: Update the existing Templates to match the provided metadata
+            instead of skipping them. Their Tags are kept.
+        :return: A dict mapping each Template ID to 'created', 'updated' or 'skipped' (it already
+            existed or was up to date), in the order they were described.
+        """
+        master_template_fields = self.__sheets_reader.read_master(
+            spreadsheet_id, stringcase.spinalcase(template_id))
+        helpers_data = self.__sheets_reader.read_helpers(
+            spreadsheet_id, self.__get_helpers_sheets_names(master_template_fields))
+
+        native_fields = self.__filter_fields_by_types(master_template_fields,
+                                                      _DATA_CATALOG_NATIVE_TYPES)
+        tag_templates.StringFormatter.format_elements_to_snakecase(native_fields, 0)
+
+        enums_names = {}
+        for field in native_fields:
+            if not field[2] == _DATA_CATALOG_ENUM_TYPE:
+                continue
+
+            names_from_sheet = self.__get_helper_data(helpers_data, field)
+            enums_names[field[0]] = [name[0] for name in names_from_sheet]
 
         multivalued_fields = self.__filter_fields_by_types(master_template_fields,
                                                            [_CUSTOM_MULTIVALUED_TYPE])
-        StringFormatter.format_elements_to_snakecase(multivalued_fields, 0)
+        tag_templates.StringFormatter.format_elements_to_snakecase(multivalued_fields, 0)
 
+        templates_descriptors = [(template_id, display_name, native_fields, enums_names)]
         for field in multivalued_fields:
-            try:
-                values_from_sheet = self.__sheets_reader.read_helper(
-                    spreadsheet_id, stringcase.spinalcase(field[0]))
-                fields = [(StringFormatter.format_to_snakecase(value[0]), value[0],
-                           _DATA_CATALOG_BOOL_TYPE) for value in values_from_sheet]
-            except errors.HttpError as err:
-                if err.resp.status in [400]:
-                    logging.info('NOT FOUND. Ignoring...')
-                    continue  # Ignore creating a new template representing the multivalued field
-                else:
-                    raise
+            values_from_sheet = self.__get_helper_data(helpers_data, field, required=False)
+            if values_from_sheet is None:
+                continue  # Ignore creating a new template representing the multivalued field
+
+            fields = [(tag_templates.StringFormatter.format_to_snakecase(value[0]), value[0],
+                       _DATA_CATALOG_BOOL_TYPE) for value in values_from_sheet]
+
+            templates_descriptors.append(
+                (f'{template_id}_{field[0]}', f'{display_name} - {field[1]}', fields, None))
+
+        pending_results = [
+            self.__process_template(project_id, descriptor[0], descriptor[1], descriptor[2],
+                                    descriptor[3], delete_existing, sync_existing)
+            for descriptor in templates_descriptors
+        ]
+        results = await asyncio.gather(*pending_results, return_exceptions=True)
+
+        # Results are handled in the same order as the Templates were described. A failure does
+        # not prevent the other Templates from being processed, but the first one is raised after
+        # all of them are done.
+        statuses = {}
+        first_error = None
+        for descriptor, result in zip(templates_descriptors, results):
+            if isinstance(result, Exception):
+                logging.error(f'Failed to process the Template {descriptor[0]}: {result}')
+                first_error = first_error or result
+            else:
+                statuses[descriptor[0]] = result
 
-            custom_template_id = f'{template_id}_{field[0]}'
-            custom_display_name = f'{display_name} - {field[1]}'
+        if first_error:
+            raise first_error
+
+        for processed_template_id, status in statuses.items():
+            logging.info(f'===> {processed_template_id}: {status}')
+
+        return statuses
+
+    async def __process_template(self, project_id, template_id, display_name, fields_descriptors,
+                                 enums_names, delete_existing_template, sync_existing_template):
+
+        template_name = datacatalog.DataCatalogClient.tag_template_path(
+            project_id, tag_templates.CLOUD_PLATFORM_REGION, template_id)
+
+        if sync_existing_template:
+            tag_template = await self.__datacatalog_facade.get_tag_template(template_name)
+            if tag_template:
+                changes_count = await self.__datacatalog_facade.sync_tag_template(
+                    tag_template, display_name, fields_descriptors, enums_names,
+                    self.__enum_values_renames)
+                return _TEMPLATE_UPDATED if changes_count else _TEMPLATE_SKIPPED
 
-            template_name = datacatalog.DataCatalogClient.tag_template_path(
-                project_id, _CLOUD_PLATFORM_REGION, custom_template_id)
+            await self.__datacatalog_facade.create_tag_template(project_id, template_id,
+                                                                display_name, fields_descriptors,
+                                                                enums_names)
+            return _TEMPLATE_CREATED
 
-            if delete_existing_template:
-                self.__datacatalog_facade.delete_tag_template(template_name)
+        if delete_existing_template:
+            await self.__datacatalog_facade.delete_tag_template(template_name)
+
+        if self.__optimistic:
+            created = await self.__datacatalog_facade.create_tag_template_if_not_exists(
+                project_id, template_id, display_name, fields_descriptors, enums_names)
+            return _TEMPLATE_CREATED if created else _TEMPLATE_SKIPPED
+
+        if await self.__datacatalog_facade.tag_template_exists(template_name):
+            return _TEMPLATE_SKIPPED
 
-            if not self.__datacatalog_facade.tag_template_exists(template_name):
-                self.__datacatalog_facade.create_tag_template(project_id, custom_template_id,
-                                                              custom_display_name, fields)
+        await self.__datacatalog_facade.create_tag_template(project_id, template_id, display_name,
+                                                            fields_descriptors, enums_names)
+        return _TEMPLATE_CREATED
 
     @classmethod
     def __filter_fields_by_types(cls, fields, valid_types):
         return [field for field in fields if field[2] in valid_types]
 
+    @classmethod
+    def __get_helpers_sheets_names(cls, master_template_fields):
+        return [
+            cls.__get_helper_sheet_name(field) for field in master_template_fields
+            if field[2] in [_DATA_CATALOG_ENUM_TYPE, _CUSTOM_MULTIVALUED_TYPE]
+        ]
+
+    @classmethod
+    def __get_helper_data(cls, helpers_data, field, required=True):
+        helper_data = helpers_data.get(cls.__get_helper_sheet_name(field))
+        if helper_data is None:
+            if required:
+                raise ValueError(f'Helper sheet not found for the {field[2]} field {field[0]}')
+            logging.info(
+                f'Helper sheet not found for the {field[2]} field {field[0]}. Ignoring...')
+        return helper_data
+
+    @classmethod
+    def __get_helper_sheet_name(cls, field):
+        return stringcase.spinalcase(tag_templates.StringFormatter.format_to_snakecase(field[0]))
+
 
 """
 Input reader
@@ -114,6 +348,8 @@ class GoogleSheetsReader:
 
     def __init__(self):
         self.__sheets_facade = GoogleSheetsFacade()
+        # Sheets titles, by spreadsheet ID, cached for the life of the reader.
+        self.__sheets_titles = {}
 
     def read_master(self, spreadsheet_id, sheet_name, values_per_line=3):
         return self.__read(spreadsheet_id, sheet_name, 'master', values_per_line)
@@ -121,6 +357,41 @@ class GoogleSheetsReader:
     def read_helper(self, spreadsheet_id, sheet_name, values_per_line=1):
         return self.__read(spreadsheet_id, sheet_name, 'helper', values_per_line)
 
+    def read_helpers(self, spreadsheet_id, sheets_names, values_per_line=1):
+        """
+        Read many helper sheets using as few API calls as possible: the sheets are split into
+        chunks that fit a single batchGet request URL.
+
+        :param spreadsheet_id: Spreadsheet ID.
+        :param sheets_names: Sheets names.
+        :param values_per_line: Number of consecutive values to be read from each line.
+        :return: A dict mapping each sheet name to its content, or to None if there is no sheet
+            with such name in the spreadsheet.
+        """
+        # Sheets not listed in the spreadsheet metadata are known to be missing, so they are not
+        # requested at all.
+        sheets_titles = self.__get_sheets_titles(spreadsheet_id)
+        helpers_data = {}
+        existing_sheets_names = []
+        for sheet_name in sheets_names:
+            if sheet_name in sheets_titles:
+                existing_sheets_names.append(sheet_name)
+            else:
+                logging.info(f'{sheet_name} NOT FOUND')
+                helpers_data[sheet_name] = None
+
+        for chunk in self.__split_into_chunks(existing_sheets_names, values_per_line):
+            helpers_data.update(self.__read_chunk(spreadsheet_id, chunk, values_per_line))
+
+        return {sheet_name: helpers_data[sheet_name] for sheet_name in sheets_names}
+
+    def __get_sheets_titles(self, spreadsheet_id):
+        if spreadsheet_id not in self.__sheets_titles:
+            self.__sheets_titles[spreadsheet_id] = \
+                set(self.__sheets_facade.get_sheets_titles(spreadsheet_id))
+
+        return self.__sheets_titles[spreadsheet_id]
+
     def __read(self, spreadsheet_id, sheet_name, sheet_type, values_per_line):
         """
         Read the requested values from each line and store them into a list.
@@ -133,90 +404,84 @@ class GoogleSheetsReader:
         logging.info(_LOOKING_FOR_SHEET_LOG_FORMAT.format(sheet_type, spreadsheet_id, sheet_name))
         sheet_data = self.__sheets_facade.read_sheet(spreadsheet_id, sheet_name, values_per_line)
 
-        data = []
-
         logging.info(f'Reading spreadsheet {spreadsheet_id} | {sheet_name}...')
-        for row in sheet_data.get('valueRanges')[0].get('values'):
-            row_data = []
-            for counter in range(values_per_line):
-                row_data.append(row[counter].strip())
-            data.append(row_data)
-
-        # The first line is usually used for headers, so it's discarded.
-        del (data[0])
+        data = self.__parse_values(sheet_data.get('valueRanges')[0].get('values'), values_per_line)
 
         logging.info('DONE')
         return data
 
+    def __read_chunk(self, spreadsheet_id, sheets_names, values_per_line):
+        logging.info(
+            _LOOKING_FOR_SHEET_LOG_FORMAT.format('helper', spreadsheet_id,
+                                                 ', '.join(sheets_names)))
+        try:
+            sheets_data = self.__sheets_facade.read_sheets(spreadsheet_id, sheets_names,
+                                                           values_per_line)
+        except errors.HttpError as err:
+            if err.resp.status not in [400]:
+                raise
+
+            # A single missing sheet makes the whole request fail, so the chunk is split in halves
+            # until the missing sheets are isolated. It only happens if a sheet is deleted after
+            # the spreadsheet metadata is read.
+            if len(sheets_names) == 1:
+                logging.info(f'{sheets_names[0]} NOT FOUND')
+                return {sheets_names[0]: None}
+
+            middle = len(sheets_names) // 2
+            chunk_data = self.__read_chunk(spreadsheet_id, sheets_names[:middle], values_per_line)
+            chunk_data.update(
+                self.__read_chunk(spreadsheet_id, sheets_names[middle:], values_per_line))
+            return chunk_data
 
-"""
-API communication classes
-========================================
-"""
+        logging.info('DONE')
+        # Value ranges are returned in the same order as they were requested.
+        return {
+            sheet_name: self.__parse_values(value_range.get('values'), values_per_line)
+            for sheet_name, value_range in zip(sheets_names, sheets_data.get('valueRanges'))
+        }
 
+    @classmethod
+    def __parse_values(cls, values, values_per_line):
+        data = []
 
-class DataCatalogFacade:
-    """
-    Manage Templates by communicating to Data Catalog's API.
-    """
+        for row in values or []:
+            row_data = []
+            for counter in range(values_per_line):
+                row_data.append(row[counter].strip())
+            data.append(row_data)
 
-    def __init__(self):
-        # Initialize the API client.
-        self.__datacatalog = datacatalog.DataCatalogClient()
-
-    def create_tag_template(self,
-                            project_id,
-                            template_id,
-                            display_name,
-                            fields_descriptors,
-                            enums_names=None):
-        """Create a Tag Template."""
-
-        location = datacatalog.DataCatalogClient.common_location_path(
-            project_id, _CLOUD_PLATFORM_REGION)
-
-        tag_template = datacatalog.TagTemplate()
-        tag_template.display_name = display_name
-
-        for descriptor in fields_descriptors:
-            field = datacatalog.TagTemplateField()
-            field.display_name = descriptor[1]
-
-            field_id = descriptor[0]
-            field_type = descriptor[2]
-            if not field_type == _DATA_CATALOG_ENUM_TYPE:
-                field.type_.primitive_type = datacatalog.FieldType.PrimitiveType[field_type]
-            else:
-                for enum_name in enums_names[field_id]:
-                    enum_value = datacatalog.FieldType.EnumType.EnumValue()
-                    enum_value.display_name = enum_name
-                    field.type_.enum_type.allowed_values.append(enum_value)
+        # The first line is usually used for headers, so it's discarded.
+        del (data[0:1])
 
-            tag_template.fields[field_id] = field
+        return data
 
-        created_tag_template = self.__datacatalog.create_tag_template(parent=location,
-                                                                      tag_template_id=template_id,
-                                                                      tag_template=tag_template)
+    @classmethod
+    def __split_into_chunks(cls, sheets_names, values_per_line):
+        chunks = []
+        chunk = []
+        chunk_length = 0
+        for sheet_name in sheets_names:
+            sheet_range = GoogleSheetsFacade.make_range(sheet_name, values_per_line)
+            range_length = len(_RANGES_QUERY_PARAMETER) + len(parse.quote(sheet_range))
+            if chunk and chunk_length + range_length > _BATCH_GET_MAX_RANGES_LENGTH:
+                chunks.append(chunk)
+                chunk = []
+                chunk_length = 0
 
-        logging.info(f'===> Template created: {created_tag_template.name}')
+            chunk.append(sheet_name)
+            chunk_length += range_length
 
-    def delete_tag_template(self, name):
-        """Delete a Tag Template."""
+        if chunk:
+            chunks.append(chunk)
 
-        try:
-            self.__datacatalog.delete_tag_template(name=name, force=True)
-            logging.info(f'===> Template deleted: {name}')
-        except exceptions.PermissionDenied:
-            pass
+        return chunks
 
-    def tag_template_exists(self, name):
-        """Check if a Tag Template with the provided name already exists."""
 
-        try:
-            self.__datacatalog.get_tag_template(name=name)
-            return True
-        except exceptions.PermissionDenied:
-            return False
+"""
+API communication classes
+========================================
+"""
 
 
 class GoogleSheetsFacade:
@@ -232,39 +497,41 @@ class GoogleSheetsFacade:
             credentials=service_account.ServiceAccountCredentials.get_application_default(),
             cache_discovery=False)
 
-    def read_sheet(self, spreadsheet_id, sheet_name, values_per_line):
-        return self.__service.spreadsheets().values().batchGet(
-            spreadsheetId=spreadsheet_id,
-            ranges=f'{sheet_name}!A:{chr(ord("@") + values_per_line)}').execute()
-
-
-"""
-Tools & utilities
-========================================
-"""
+    def get_sheets_titles(self, spreadsheet_id):
+        spreadsheet = self.__execute(
+            'sheets.spreadsheets.get',
+            self.__service.spreadsheets().get(spreadsheetId=spreadsheet_id,
+                                              fields='sheets.properties.title'))
 
+        return [sheet['properties']['title'] for sheet in spreadsheet.get('sheets', [])]
 
-class StringFormatter:
+    def read_sheet(self, spreadsheet_id, sheet_name, values_per_line):
+        return self.__execute(
+            'sheets.spreadsheets.values.batchGet',
+            self.__service.spreadsheets().values().batchGet(spreadsheetId=spreadsheet_id,
+                                                            ranges=self.make_range(
+                                                                sheet_name, values_per_line)))
+
+    def read_sheets(self, spreadsheet_id, sheets_names, values_per_line):
+        return self.__execute(
+            'sheets.spreadsheets.values.batchGet',
+            self.__service.spreadsheets().values().batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=[
+                    self.make_range(sheet_name, values_per_line) for sheet_name in sheets_names
+                ]))
 
     @classmethod
-    def format_elements_to_snakecase(cls, a_list, internal_index=None):
-        if internal_index is None:
-            for counter in range(len(a_list)):
-                a_list[counter] = cls.format_to_snakecase(a_list[counter])
-        else:
-            for element in a_list:
-                element[internal_index] = cls.format_to_snakecase(element[internal_index])
+    def make_range(cls, sheet_name, values_per_line):
+        return f'{sheet_name}!A:{chr(ord("@") + values_per_line)}'
 
     @classmethod
-    def format_to_snakecase(cls, string):
-        normalized_str = unicodedata.normalize('NFKD', string).encode('ASCII', 'ignore').decode()
-        normalized_str = re.sub(r'[^a-zA-Z0-9]+', ' ', normalized_str)
-        normalized_str = normalized_str.strip()
-        normalized_str = normalized_str.lower() \
-            if (' ' in normalized_str) or (normalized_str.isupper()) \
-            else stringcase.camelcase(normalized_str)  # FooBarBaz => fooBarBaz
-
-        return stringcase.snakecase(normalized_str)  # foo-bar-baz => foo_bar_baz
+    def __execute(cls, method_name, request):
+        # The request's size is the size of its URI, which holds all the parameters.
+        with api_instrumentation.get_default_recorder().start_call(method_name,
+                                                                   request.uri) as api_call:
+            api_call.response = request.execute()
+        return api_call.response
 
 
 """
@@ -285,12 +552,54 @@ if __name__ == "__main__":
                         help='GCP Project in which the Template will be created',
                         required=True)
     parser.add_argument('--spreadsheet-id', help='Google Spreadsheet ID', required=True)
-    parser.add_argument(
+    existing_templates_group = parser.add_mutually_exclusive_group()
+    existing_templates_group.add_argument(
         '--delete-existing',
         action='store_true',
         help='delete existing Templates and recreate them with the provided metadata')
+    existing_templates_group.add_argument(
+        '--sync',
+        action='store_true',
+        dest='sync_existing',
+        help='update existing Templates to match the provided metadata, keeping their Tags')
+
+    parser.add_argument('--async',
+                        action='store_true',
+                        dest='run_async',
+                        help='use the async Data Catalog client to overlap all API calls')
+    parser.add_argument('--max-concurrency',
+                        type=int,
+                        default=tag_templates.DEFAULT_MAX_CONCURRENCY,
+                        help='maximum number of concurrent API calls when running with --async'
+                        f' (default: {tag_templates.DEFAULT_MAX_CONCURRENCY})')
+
+    parser.add_argument(
+        '--optimistic',
+        action='store_true',
+        help='create Templates with no previous existence check and skip the existing ones')
+    tag_templates.add_arguments(parser)
+    api_throttling.add_arguments(parser)
+    api_instrumentation.add_arguments(parser)
 
     args = parser.parse_args()
 
-    TemplateMaker().run(args.spreadsheet_id, args.project_id, args.template_id, args.display_name,
-                        args.delete_existing)
+    if args.enum_values_renames and not args.sync_existing:
+        parser.error('--rename-enum-value requires --sync')
+
+    api_throttling.configure_from_args(args)
+    api_instrumentation.configure_from_args(args)
+
+    if args.run_async:
+        template_maker = AsyncTemplateMaker(args.max_concurrency, args.optimistic,
+                                            tag_templates.get_enum_values_renames(args))
+        asyncio.new_event_loop().run_until_complete(
+            template_maker.run(args.spreadsheet_id, args.project_id, args.template_id,
+                               args.display_name, args.delete_existing, args.sync_existing))
+    else:
+        template_maker = TemplateMaker(args.optimistic,
+                                       tag_templates.get_enum_values_renames(args))
+        template_maker.run(args.spreadsheet_id, args.project_id, args.template_id,
+                           args.display_name, args.delete_existing, args.sync_existing)
+
+    api_throttling.get_default_policy().log_counters()
+    api_instrumentation.report_from_args(args)
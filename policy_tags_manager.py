@@ -3,22 +3,301 @@ This application demonstrates how to manage Taxonomy and Policy Tags
 in Google Cloud Data Catalog.
 """
 import argparse
+from concurrent import futures
+import csv
+import itertools
+import json
 import logging
+import os
 import sys
+import time
 
-from google.cloud import datacatalog
+import api_instrumentation
+import api_throttling
+import lazy_imports
+
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
 
 _CLOUD_PLATFORM_LOCATION = 'us'
 
+_DEFAULT_MAX_WORKERS = 10
+
+# Number of Taxonomies sent in each import request.
+_IMPORT_TAXONOMIES_BATCH_SIZE = 10
+
+# The largest page size supported by the API, so a Taxonomy is listed in few calls.
+_LIST_POLICY_TAGS_PAGE_SIZE = 1000
+
+# Separates the display names of a Policy Tag and its ancestors in CSV files.
+_POLICY_TAG_PATH_SEPARATOR = '/'
+
 
 class TaxonomyManager:
 
-    def __init__(self):
+    def __init__(self, max_workers=_DEFAULT_MAX_WORKERS):
         self.__datacatalog_facade = DataCatalogFacade()
+        # Maximum number of sibling Policy Tags created concurrently.
+        self.__max_workers = max_workers
 
     def create_taxonomy(self, project_id, display_name, description=None):
         return self.__datacatalog_facade.create_taxonomy(project_id, display_name, description)
 
+    def import_taxonomy(self, project_id, display_name, policy_tags_tree, description=None):
+        """
+        Create a Taxonomy and its Policy Tags. Parents must exist before their children are
+        created, so the tree is created level by level, with the Policy Tags of each level
+        created concurrently.
+
+        :param policy_tags_tree: A list of root Policy Tags, as returned by PolicyTagsTreeReader.
+        :return: The created Taxonomy.
+        """
+        taxonomy = self.__datacatalog_facade.create_taxonomy(project_id, display_name, description)
+
+        total_count = self.__count_nodes(policy_tags_tree)
+        created_count = 0
+        errors = []
+        start_time = time.perf_counter()
+
+        # Each level is a list of (node, parent Policy Tag name) tuples.
+        level = [(node, None) for node in policy_tags_tree]
+        level_number = 1
+        with futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            while level:
+                pending_results = [
+                    executor.submit(self.__create_policy_tag, taxonomy.name, node, parent_name)
+                    for node, parent_name in level
+                ]
+
+                next_level = []
+                for (node, _), pending_result in zip(level, pending_results):
+                    policy_tag, error = pending_result.result()
+                    if error:
+                        # The descendants of a Policy Tag that was not created are skipped.
+                        errors.append(error)
+                        continue
+                    created_count += 1
+                    next_level.extend((child, policy_tag.name) for child in node['children'])
+
+                logging.info(f'===> Level {level_number}: {created_count}/{total_count}'
+                             f' Policy Tags created [{time.perf_counter() - start_time:.2f}s]')
+                level = next_level
+                level_number += 1
+
+        logging.info(f'===> {created_count} Policy Tags created,'
+                     f' {total_count - created_count} failed or skipped')
+
+        if errors:
+            raise errors[0]
+
+        return taxonomy
+
+    def sync_taxonomy(self, project_id, taxonomy, policy_tags_tree, dry_run=False):
+        """
+        Make the Policy Tags of an existing Taxonomy match the given tree. The existing Policy
+        Tags are listed once, matched to the tree by their display names' paths, and only the
+        needed create, update (description), and delete calls are made. Moved or renamed Policy
+        Tags are deleted and created again.
+
+        :param taxonomy: The Taxonomy ID or name.
+        :param dry_run: Only compute and log the changes.
+        :return: A dict with the lists of changes, as returned by PolicyTagsTreeDiffer.diff().
+        """
+        taxonomy_name = self.__make_taxonomy_name(project_id, taxonomy)
+        existing_policy_tags = self.__datacatalog_facade.list_policy_tags(taxonomy_name)
+
+        changes = PolicyTagsTreeDiffer.diff(existing_policy_tags, policy_tags_tree)
+        self.__log_changes(changes)
+
+        if dry_run:
+            return changes
+
+        # Maps the display names' paths to the Policy Tags' names, including the created ones,
+        # so the parents of the Policy Tags being created are found. Root Policy Tags have the
+        # empty path as their parent's.
+        names_by_path = PolicyTagsTreeDiffer.map_names_by_path(existing_policy_tags)
+        names_by_path[()] = None
+        with futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            # Policy Tags are deleted first: display names are unique in a Taxonomy, and moved
+            # Policy Tags are created again with the same display names.
+            errors = self.__get_errors([
+                executor.submit(self.__datacatalog_facade.delete_policy_tag, change['name'])
+                for change in changes['delete']
+            ])
+
+            pending_updates = [
+                executor.submit(self.__datacatalog_facade.update_policy_tag, change['name'],
+                                change['description']) for change in changes['update']
+            ]
+
+            # The Policy Tags to be created are sorted by depth, so they are created level by
+            # level, after their parents.
+            for _, level in itertools.groupby(changes['create'],
+                                              key=lambda change: len(change['path'])):
+                # The descendants of Policy Tags that were not created are skipped.
+                level = [change for change in level if change['path'][:-1] in names_by_path]
+                pending_results = [
+                    executor.submit(self.__create_policy_tag, taxonomy_name, change,
+                                    names_by_path.get(change['path'][:-1])) for change in level
+                ]
+                for change, pending_result in zip(level, pending_results):
+                    policy_tag, error = pending_result.result()
+                    if error:
+                        errors.append(error)
+                    else:
+                        names_by_path[change['path']] = policy_tag.name
+
+            errors.extend(self.__get_errors(pending_updates))
+
+        if errors:
+            raise errors[0]
+
+        return changes
+
+    def export_taxonomies(self, project_id, taxonomies):
+        """
+        Export Taxonomies and their Policy Tags in a single API call.
+
+        :param taxonomies: Taxonomy IDs or names.
+        :return: A list of SerializedTaxonomy objects.
+        """
+        taxonomies_names = [
+            self.__make_taxonomy_name(project_id, taxonomy) for taxonomy in taxonomies
+        ]
+        return self.__datacatalog_facade.export_taxonomies(project_id, taxonomies_names)
+
+    def import_taxonomies(self, project_id, serialized_taxonomies):
+        """
+        Create whole Taxonomies, including their Policy Tags, with one API call per batch of
+        Taxonomies.
+
+        :return: A list with the created Taxonomies.
+        """
+        taxonomies = []
+        for index in range(0, len(serialized_taxonomies), _IMPORT_TAXONOMIES_BATCH_SIZE):
+            batch = serialized_taxonomies[index:index + _IMPORT_TAXONOMIES_BATCH_SIZE]
+            taxonomies.extend(self.__datacatalog_facade.import_taxonomies(project_id, batch))
+            logging.info(f'===> {len(taxonomies)}/{len(serialized_taxonomies)}'
+                         f' Taxonomies imported')
+
+        return taxonomies
+
+    def __create_policy_tag(self, taxonomy_name, node, parent_name):
+        try:
+            policy_tag = self.__datacatalog_facade.create_policy_tag(taxonomy_name,
+                                                                     node['display_name'],
+                                                                     node.get('description'),
+                                                                     parent_name)
+            return policy_tag, None
+        except Exception as e:
+            logging.error(f'Failed to create the Policy Tag {node["display_name"]}: {e}')
+            return None, e
+
+    @classmethod
+    def __count_nodes(cls, nodes):
+        return sum(1 + cls.__count_nodes(node['children']) for node in nodes)
+
+    @classmethod
+    def __get_errors(cls, pending_results):
+        return [
+            pending_result.exception() for pending_result in pending_results
+            if pending_result.exception()
+        ]
+
+    @classmethod
+    def __log_changes(cls, changes):
+        for operation, operation_changes in changes.items():
+            for change in operation_changes:
+                path = _POLICY_TAG_PATH_SEPARATOR.join(change['path'])
+                logging.info(f'===> {operation}: {path}')
+
+        counts = [f'{len(changes[operation])} {operation}' for operation in changes]
+        logging.info(f'===> Changes: {", ".join(counts)}')
+
+    @classmethod
+    def __make_taxonomy_name(cls, project_id, taxonomy):
+        if '/' in taxonomy:
+            return taxonomy
+        return datacatalog.PolicyTagManagerClient.taxonomy_path(project_id,
+                                                                _CLOUD_PLATFORM_LOCATION, taxonomy)
+
+
+class PolicyTagsTreeDiffer:
+    """
+    Compare the existing Policy Tags of a Taxonomy to a Policy Tags tree, matching them by the
+    paths of their display names, e.g. ('PII', 'Contact', 'Email').
+    """
+
+    @classmethod
+    def diff(cls, existing_policy_tags, policy_tags_tree):
+        """
+        :param existing_policy_tags: A list of PolicyTag objects.
+        :param policy_tags_tree: A list of root Policy Tags, as returned by PolicyTagsTreeReader.
+        :return: A dict with lists of create (path, display_name, and description, sorted by
+            depth), update (path, name, and description), and delete (path and name) changes.
+            Only the topmost Policy Tags are deleted, since their descendants are deleted
+            along with them.
+        """
+        existing_by_path = cls.__map_by_path(existing_policy_tags)
+
+        desired_by_path = {}
+        cls.__map_nodes_by_path(policy_tags_tree, (), desired_by_path)
+
+        changes = {'create': [], 'update': [], 'delete': []}
+        for path, node in desired_by_path.items():
+            existing_policy_tag = existing_by_path.get(path)
+            description = node.get('description') or ''
+            if not existing_policy_tag:
+                changes['create'].append({
+                    'path': path,
+                    'display_name': node['display_name'],
+                    'description': description
+                })
+            elif existing_policy_tag.description != description:
+                changes['update'].append({
+                    'path': path,
+                    'name': existing_policy_tag.name,
+                    'description': description
+                })
+
+        for path, policy_tag in existing_by_path.items():
+            if path in desired_by_path:
+                continue
+            # Policy Tags whose parents are deleted as well are skipped.
+            if len(path) == 1 or path[:-1] in desired_by_path:
+                changes['delete'].append({'path': path, 'name': policy_tag.name})
+
+        changes['create'].sort(key=lambda change: len(change['path']))
+        return changes
+
+    @classmethod
+    def map_names_by_path(cls, policy_tags):
+        return {
+            path: policy_tag.name
+            for path, policy_tag in cls.__map_by_path(policy_tags).items()
+        }
+
+    @classmethod
+    def __map_by_path(cls, policy_tags):
+        policy_tags_by_name = {policy_tag.name: policy_tag for policy_tag in policy_tags}
+
+        paths_by_name = {}
+
+        def get_path(policy_tag):
+            if policy_tag.name not in paths_by_name:
+                parent = policy_tags_by_name.get(policy_tag.parent_policy_tag)
+                parent_path = get_path(parent) if parent else ()
+                paths_by_name[policy_tag.name] = parent_path + (policy_tag.display_name, )
+            return paths_by_name[policy_tag.name]
+
+        return {get_path(policy_tag): policy_tag for policy_tag in policy_tags}
+
+    @classmethod
+    def __map_nodes_by_path(cls, nodes, parent_path, nodes_by_path):
+        for node in nodes:
+            path = parent_path + (node['display_name'], )
+            nodes_by_path[path] = node
+            cls.__map_nodes_by_path(node['children'], path, nodes_by_path)
+
 
 """
 API communication classes
@@ -33,7 +312,10 @@ class DataCatalogFacade:
 
     def __init__(self):
         # Initialize the API client.
-        self.__datacatalog = datacatalog.PolicyTagManagerClient()
+        self.__datacatalog = api_throttling.get_client(datacatalog.PolicyTagManagerClient)
+        # The serialization API client is only used by a few commands, so it is initialized
+        # when the first call is made.
+        self.__datacatalog_serialization = None
 
     def create_taxonomy(self, project_id, display_name, description=None):
         """Create a Taxonomy."""
@@ -48,6 +330,201 @@ class DataCatalogFacade:
         created_taxonomy = self.__datacatalog.create_taxonomy(parent=location, taxonomy=taxonomy)
 
         logging.info(f'===> Taxonomy created: {created_taxonomy.name}')
+        return created_taxonomy
+
+    def create_policy_tag(self, taxonomy_name, display_name, description=None, parent_name=None):
+        """Create a Policy Tag, child of the given Policy Tag if any."""
+
+        policy_tag = datacatalog.PolicyTag()
+        policy_tag.display_name = display_name
+        if description:
+            policy_tag.description = description
+        if parent_name:
+            policy_tag.parent_policy_tag = parent_name
+
+        return self.__datacatalog.create_policy_tag(parent=taxonomy_name, policy_tag=policy_tag)
+
+    def list_policy_tags(self, taxonomy_name):
+        """List all the Policy Tags of a Taxonomy."""
+
+        request = datacatalog.ListPolicyTagsRequest()
+        request.parent = taxonomy_name
+        request.page_size = _LIST_POLICY_TAGS_PAGE_SIZE
+
+        return [policy_tag for policy_tag in self.__datacatalog.list_policy_tags(request=request)]
+
+    def update_policy_tag(self, name, description):
+        """Update the description of a Policy Tag."""
+
+        request = datacatalog.UpdatePolicyTagRequest()
+        request.policy_tag.name = name
+        request.policy_tag.description = description
+        # The update mask is not a flattened argument of the API method.
+        request.update_mask = {'paths': ['description']}
+
+        return self.__datacatalog.update_policy_tag(request=request)
+
+    def delete_policy_tag(self, name):
+        """Delete a Policy Tag and its descendants."""
+
+        self.__datacatalog.delete_policy_tag(name=name)
+        logging.info(f'===> Policy Tag deleted: {name}')
+
+    def export_taxonomies(self, project_id, taxonomies_names):
+        """Export Taxonomies, including their Policy Tags."""
+
+        request = datacatalog.ExportTaxonomiesRequest()
+        request.parent = datacatalog.PolicyTagManagerSerializationClient.common_location_path(
+            project_id, _CLOUD_PLATFORM_LOCATION)
+        request.taxonomies.extend(taxonomies_names)
+        request.serialized_taxonomies = True
+
+        response = self.__get_serialization_client().export_taxonomies(request=request)
+        return list(response.taxonomies)
+
+    def import_taxonomies(self, project_id, serialized_taxonomies):
+        """Create Taxonomies, including their Policy Tags."""
+
+        request = datacatalog.ImportTaxonomiesRequest()
+        request.parent = datacatalog.PolicyTagManagerSerializationClient.common_location_path(
+            project_id, _CLOUD_PLATFORM_LOCATION)
+        request.inline_source.taxonomies.extend(serialized_taxonomies)
+
+        # Not retried: a request that timed out may have created the Taxonomies.
+        response = self.__get_serialization_client().import_taxonomies(request=request, retry=None)
+
+        for taxonomy in response.taxonomies:
+            logging.info(f'===> Taxonomy imported: {taxonomy.name}')
+        return list(response.taxonomies)
+
+    def __get_serialization_client(self):
+        if not self.__datacatalog_serialization:
+            self.__datacatalog_serialization = api_throttling.get_client(
+                datacatalog.PolicyTagManagerSerializationClient)
+        return self.__datacatalog_serialization
+
+
+"""
+Input reader
+========================================
+"""
+
+
+class PolicyTagsTreeReader:
+
+    @classmethod
+    def read(cls, file_path):
+        """
+        Read a Policy Tags tree from a JSON or a CSV file.
+
+        JSON files have a list of root Policy Tags, each with display_name, description
+        (optional), and children (optional, a list of Policy Tags). CSV files have a header line
+        and path and description (optional) columns; each path has the display names of a
+        Policy Tag and its ancestors separated by slashes, e.g. PII/Contact/Email. Ancestors
+        missing from CSV files are created with no description.
+
+        :return: A list of dicts with display_name, description, and children.
+        """
+        logging.info(f'Reading file {file_path}...')
+
+        with open(file_path, mode='r') as tree_file:
+            if os.path.splitext(file_path)[1].lower() == '.json':
+                tree = cls.__normalize_nodes(json.load(tree_file))
+            else:
+                tree = cls.__make_tree_from_csv_rows(csv.DictReader(tree_file))
+
+        logging.info('DONE')
+        return tree
+
+    @classmethod
+    def __normalize_nodes(cls, nodes):
+        return [{
+            'display_name': node['display_name'],
+            'description': node.get('description'),
+            'children': cls.__normalize_nodes(node.get('children', []))
+        } for node in nodes]
+
+    @classmethod
+    def __make_tree_from_csv_rows(cls, rows):
+        tree = []
+        # Maps the paths to the nodes, so the parents are found in constant time.
+        nodes_by_path = {}
+        for row in rows:
+            display_names = [
+                display_name.strip()
+                for display_name in row['path'].split(_POLICY_TAG_PATH_SEPARATOR)
+            ]
+            siblings = tree
+            for depth, display_name in enumerate(display_names, start=1):
+                path = tuple(display_names[:depth])
+                if path not in nodes_by_path:
+                    nodes_by_path[path] = {
+                        'display_name': display_name,
+                        'description': None,
+                        'children': []
+                    }
+                    siblings.append(nodes_by_path[path])
+                siblings = nodes_by_path[path]['children']
+
+            nodes_by_path[tuple(display_names)]['description'] = row.get('description') or None
+
+        return tree
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+class SerializedTaxonomiesFile:
+    """
+    Read and write the Taxonomies handled by the serialization API as a JSON file.
+    """
+
+    @classmethod
+    def read(cls, file_path):
+        with open(file_path, mode='r') as taxonomies_file:
+            return [
+                datacatalog.SerializedTaxonomy(taxonomy) for taxonomy in json.load(taxonomies_file)
+            ]
+
+    @classmethod
+    def write(cls, file_path, serialized_taxonomies):
+        taxonomies = [
+            datacatalog.SerializedTaxonomy.to_dict(taxonomy) for taxonomy in serialized_taxonomies
+        ]
+        with open(file_path, mode='w') as taxonomies_file:
+            json.dump(taxonomies, taxonomies_file, indent=2)
+
+
+class SerializedTaxonomyFactory:
+    """
+    Convert Policy Tags trees, as read by PolicyTagsTreeReader, to the Taxonomies handled by
+    the serialization API, so they are created in a single API call.
+    """
+
+    @classmethod
+    def make_serialized_taxonomy(cls, display_name, policy_tags_tree, description=None):
+        taxonomy = datacatalog.SerializedTaxonomy()
+        taxonomy.display_name = display_name
+        if description:
+            taxonomy.description = description
+        taxonomy.policy_tags.extend(cls.__make_serialized_policy_tags(policy_tags_tree))
+        return taxonomy
+
+    @classmethod
+    def __make_serialized_policy_tags(cls, nodes):
+        serialized_policy_tags = []
+        for node in nodes:
+            policy_tag = datacatalog.SerializedPolicyTag()
+            policy_tag.display_name = node['display_name']
+            if node.get('description'):
+                policy_tag.description = node['description']
+            policy_tag.child_policy_tags.extend(cls.__make_serialized_policy_tags(
+                node['children']))
+            serialized_policy_tags.append(policy_tag)
+        return serialized_policy_tags
 
 
 """
@@ -63,7 +540,11 @@ class PolicyTagsManagerCLI:
         cls.__setup_logging()
 
         args = cls._parse_args(argv)
+        api_throttling.configure_from_args(args)
+        api_instrumentation.configure_from_args(args)
         args.func(args)
+        api_throttling.get_default_policy().log_counters()
+        api_instrumentation.report_from_args(args)
 
     @classmethod
     def __setup_logging(cls):
@@ -72,6 +553,8 @@ class PolicyTagsManagerCLI:
     @classmethod
     def _parse_args(cls, argv):
         parser = argparse.ArgumentParser(description='Manage Taxonomy and Policy Tags')
+        api_throttling.add_arguments(parser)
+        api_instrumentation.add_arguments(parser)
 
         subparsers = parser.add_subparsers()
 
@@ -83,7 +566,85 @@ class PolicyTagsManagerCLI:
                                             required=True)
         create_taxonomy_parser.set_defaults(func=cls.__create_taxonomy)
 
-        return parser.parse_args(argv)
+        import_taxonomy_parser = subparsers.add_parser(
+            'import-taxonomy', help='Create Taxonomy and Policy Tags from a JSON or CSV file')
+        import_taxonomy_parser.add_argument('--display-name', help='Display name', required=True)
+        import_taxonomy_parser.add_argument('--description', help='Description')
+        import_taxonomy_parser.add_argument('--project-id',
+                                            help='GCP Project to create the Taxonomy into',
+                                            required=True)
+        import_taxonomy_parser.add_argument('--policy-tags-file',
+                                            help='JSON or CSV file describing the Policy Tags',
+                                            required=True)
+        import_taxonomy_parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=_DEFAULT_MAX_WORKERS,
+            help='maximum number of sibling Policy Tags created concurrently'
+            f' (default: {_DEFAULT_MAX_WORKERS})')
+        import_taxonomy_parser.set_defaults(func=cls.__import_taxonomy)
+
+        export_taxonomies_parser = subparsers.add_parser(
+            'export-taxonomies', help='Export Taxonomies and Policy Tags to a JSON file')
+        export_taxonomies_parser.add_argument('--project-id',
+                                              help='GCP Project the Taxonomies belong to',
+                                              required=True)
+        export_taxonomies_parser.add_argument('--taxonomies',
+                                              nargs='+',
+                                              help='Taxonomy IDs or names',
+                                              required=True)
+        export_taxonomies_parser.add_argument('--output-file',
+                                              help='JSON file to write the Taxonomies to',
+                                              required=True)
+        export_taxonomies_parser.set_defaults(func=cls.__export_taxonomies)
+
+        import_taxonomies_parser = subparsers.add_parser(
+            'import-taxonomies',
+            help='Create Taxonomies and Policy Tags, one API call per batch of Taxonomies')
+        import_taxonomies_parser.add_argument('--project-id',
+                                              help='GCP Project to create the Taxonomies into',
+                                              required=True)
+        import_source_group = import_taxonomies_parser.add_mutually_exclusive_group(required=True)
+        import_source_group.add_argument('--taxonomies-file',
+                                         help='JSON file written by export-taxonomies')
+        import_source_group.add_argument('--policy-tags-file',
+                                         help='JSON or CSV file describing the Policy Tags of a'
+                                         ' single Taxonomy, as used by import-taxonomy')
+        import_taxonomies_parser.add_argument('--display-name',
+                                              help='Display name, required with'
+                                              ' --policy-tags-file')
+        import_taxonomies_parser.add_argument('--description', help='Description')
+        import_taxonomies_parser.set_defaults(func=cls.__import_taxonomies)
+
+        sync_taxonomy_parser = subparsers.add_parser(
+            'sync-taxonomy',
+            help='Create, update, and delete the Policy Tags of a Taxonomy to match a JSON or'
+            ' CSV file')
+        sync_taxonomy_parser.add_argument('--project-id',
+                                          help='GCP Project the Taxonomy belongs to',
+                                          required=True)
+        sync_taxonomy_parser.add_argument('--taxonomy', help='Taxonomy ID or name', required=True)
+        sync_taxonomy_parser.add_argument('--policy-tags-file',
+                                          help='JSON or CSV file describing the Policy Tags',
+                                          required=True)
+        sync_taxonomy_parser.add_argument('--dry-run',
+                                          action='store_true',
+                                          help='only log the changes, with no API calls other'
+                                          ' than listing the existing Policy Tags')
+        sync_taxonomy_parser.add_argument('--max-workers',
+                                          type=int,
+                                          default=_DEFAULT_MAX_WORKERS,
+                                          help='maximum number of Policy Tags changed concurrently'
+                                          f' (default: {_DEFAULT_MAX_WORKERS})')
+        sync_taxonomy_parser.set_defaults(func=cls.__sync_taxonomy)
+
+        args = parser.parse_args(argv)
+
+        if getattr(args, 'func', None) == cls.__import_taxonomies \
+                and args.policy_tags_file and not args.display_name:
+            parser.error('--display-name is required with --policy-tags-file')
+
+        return args
 
     @classmethod
     def __create_taxonomy(cls, args):
@@ -91,6 +652,43 @@ class PolicyTagsManagerCLI:
                                           display_name=args.display_name,
                                           description=args.description)
 
+    @classmethod
+    def __import_taxonomy(cls, args):
+        # The file is read before the API client is created, so invalid trees fail fast.
+        policy_tags_tree = PolicyTagsTreeReader.read(args.policy_tags_file)
+        TaxonomyManager(args.max_workers).import_taxonomy(project_id=args.project_id,
+                                                          display_name=args.display_name,
+                                                          policy_tags_tree=policy_tags_tree,
+                                                          description=args.description)
+
+    @classmethod
+    def __export_taxonomies(cls, args):
+        serialized_taxonomies = TaxonomyManager().export_taxonomies(project_id=args.project_id,
+                                                                    taxonomies=args.taxonomies)
+        SerializedTaxonomiesFile.write(args.output_file, serialized_taxonomies)
+
+    @classmethod
+    def __import_taxonomies(cls, args):
+        if args.taxonomies_file:
+            serialized_taxonomies = SerializedTaxonomiesFile.read(args.taxonomies_file)
+        else:
+            serialized_taxonomies = [
+                SerializedTaxonomyFactory.make_serialized_taxonomy(
+                    args.display_name, PolicyTagsTreeReader.read(args.policy_tags_file),
+                    args.description)
+            ]
+
+        TaxonomyManager().import_taxonomies(project_id=args.project_id,
+                                            serialized_taxonomies=serialized_taxonomies)
+
+    @classmethod
+    def __sync_taxonomy(cls, args):
+        policy_tags_tree = PolicyTagsTreeReader.read(args.policy_tags_file)
+        TaxonomyManager(args.max_workers).sync_taxonomy(project_id=args.project_id,
+                                                        taxonomy=args.taxonomy,
+                                                        policy_tags_tree=policy_tags_tree,
+                                                        dry_run=args.dry_run)
+
 
 """
 Main program entry point
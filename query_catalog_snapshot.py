@@ -0,0 +1,262 @@
+"""
+This application demonstrates how to answer Data Catalog search queries locally, against a
+snapshot written by export_catalog_snapshot.py, with no API calls.
+
+The snapshot is loaded into inverted indexes that map column names, Tag Template IDs, Tag field
+values, systems, types, projects, and keywords to the Entries they belong to, so each query is
+answered by intersecting a few sets. Supported query predicates, combined with AND:
+- system=<SYSTEM>, type=<TYPE>, projectid=<PROJECT-ID>
+- column:<COLUMN-NAME>
+- tag:<TEMPLATE-ID> and tag:<TEMPLATE-ID>.<FIELD-ID>=<VALUE>
+- keywords, matching whole words of the Entries' names, display names, and descriptions
+"""
+import argparse
+import logging
+import pickle
+import re
+import time
+
+import export_catalog_snapshot
+
+_QUALIFIED_PREDICATE_REGEX = re.compile(r'^(system|type|projectid)=(.+)$')
+_COLUMN_PREDICATE_REGEX = re.compile(r'^column:(.+)$')
+_TAG_PREDICATE_REGEX = re.compile(r'^tag:([^.=:]+)(?:\.([^=:]+)[=:](.+))?$')
+
+_NON_ALPHANUMERIC_CHARS_REGEX = re.compile(r'[^a-zA-Z0-9]+')
+
+_TAG_VALUE_COLUMNS = [
+    'bool_value', 'double_value', 'string_value', 'enum_value', 'timestamp_value'
+]
+
+
+class SnapshotIndex:
+    """
+    Inverted indexes over a catalog snapshot. Keys are case-insensitive.
+    """
+
+    def __init__(self):
+        # Maps the Entries' names to their rows, as returned by search().
+        self.__entries = {}
+        # Maps each index name to a dict of keys to sets of Entries' names.
+        self.__indexes = {
+            'system': {},
+            'type': {},
+            'projectid': {},
+            'column': {},
+            'tag': {},
+            'tag_value': {},
+            # DOUBLE Tag field values are indexed apart, as numbers rather than as text.
+            'tag_double_value': {},
+            'keyword': {}
+        }
+
+    @classmethod
+    def build(cls, snapshot_folder, file_format='parquet'):
+        """
+        Build the indexes from the entries, columns, and tags tables of a snapshot. When an
+        Entry was exported more than once, only its latest export is indexed.
+        """
+        start_time = time.perf_counter()
+
+        index = cls()
+        read_table = export_catalog_snapshot.SnapshotReader.read_table
+
+        latest_exports = index.__add_entries(read_table(snapshot_folder, 'entries', file_format))
+        index.__add_columns(read_table(snapshot_folder, 'columns', file_format), latest_exports)
+        index.__add_tags(read_table(snapshot_folder, 'tags', file_format), latest_exports)
+
+        logging.info(f'===> {len(index.__entries)} Entries indexed in'
+                     f' {time.perf_counter() - start_time:.2f}s')
+        return index
+
+    def search(self, query):
+        """
+        :return: A list of the matching Entries' rows, sorted by name.
+        :raises ValueError: If the query is empty or has unsupported predicates.
+        """
+        keys = SnapshotQueryParser.parse(query)
+
+        matches = [self.__get_matches(index_name, key) for index_name, key in keys]
+        # Starting from the smallest set makes the intersection cheaper.
+        matches.sort(key=len)
+        names = set(matches[0]).intersection(*matches[1:])
+
+        return [self.__entries[name] for name in sorted(names)]
+
+    def save(self, file_path):
+        """Save the indexes, so they are not rebuilt by the next runs."""
+        with open(file_path, mode='wb') as index_file:
+            pickle.dump((self.__entries, self.__indexes), index_file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path):
+        index = cls()
+        with open(file_path, mode='rb') as index_file:
+            index.__entries, index.__indexes = pickle.load(index_file)
+        return index
+
+    def __get_matches(self, index_name, key):
+        matches = self.__indexes[index_name].get(key, set())
+        if index_name != 'tag_value':
+            return matches
+
+        # Query values are not typed, so numbers also match the DOUBLE fields of the same value.
+        template_id, field_id, value = key
+        try:
+            double_key = (template_id, field_id, normalize_tag_value(value, is_double=True))
+        except ValueError:
+            return matches
+        return matches | self.__indexes['tag_double_value'].get(double_key, set())
+
+    def __add_entries(self, entries_table):
+        for row in self.__iter_rows(entries_table):
+            current_row = self.__entries.get(row['name'])
+            # Export IDs start with the export time, so the latest export of each Entry wins.
+            if not current_row or row['export_id'] > current_row['export_id']:
+                self.__entries[row['name']] = row
+
+        latest_exports = {}
+        for name, row in self.__entries.items():
+            latest_exports[name] = row['export_id']
+            self.__add_key('system', row['system'], name)
+            self.__add_key('type', row['type'], name)
+            self.__add_key('projectid', row['project'], name)
+            for text in [name.split('/')[-1], row['display_name'], row['description']]:
+                for keyword in _NON_ALPHANUMERIC_CHARS_REGEX.split(text or ''):
+                    self.__add_key('keyword', keyword, name)
+
+        return latest_exports
+
+    def __add_columns(self, columns_table, latest_exports):
+        for row in self.__iter_rows(columns_table):
+            name = row['entry_name']
+            if latest_exports.get(name) != row['export_id']:
+                continue
+            # Nested columns are indexed by their full path and by their own name.
+            self.__add_key('column', row['column'], name)
+            self.__add_key('column', row['column'].split('.')[-1], name)
+
+    def __add_tags(self, tags_table, latest_exports):
+        for row in self.__iter_rows(tags_table):
+            name = row['entry_name']
+            if latest_exports.get(name) != row['export_id']:
+                continue
+            template_id = row['template'].split('/')[-1]
+            self.__add_key('tag', template_id, name)
+
+            column = next((column for column in _TAG_VALUE_COLUMNS if row[column] is not None),
+                          None)
+            if column:
+                is_double = column == 'double_value'
+                key = (template_id.lower(), row['field_id'].lower(),
+                       normalize_tag_value(row[column], is_double))
+                index_name = 'tag_double_value' if is_double else 'tag_value'
+                self.__indexes[index_name].setdefault(key, set()).add(name)
+
+    def __add_key(self, index_name, key, entry_name):
+        if key:
+            self.__indexes[index_name].setdefault(key.lower(), set()).add(entry_name)
+
+    @classmethod
+    def __iter_rows(cls, table):
+        columns = [table.column(column_name).to_pylist() for column_name in table.column_names]
+        for values in zip(*columns):
+            yield dict(zip(table.column_names, values))
+
+
+class SnapshotQueryParser:
+
+    @classmethod
+    def parse(cls, query):
+        """
+        Parse a search query into index keys.
+
+        :return: A list of (index name, key) tuples, one for each predicate.
+        :raises ValueError: If the query is empty or has unsupported predicates.
+        """
+        keys = [cls.__parse_predicate(predicate) for predicate in query.split()]
+        if not keys:
+            raise ValueError('The query is empty')
+        return keys
+
+    @classmethod
+    def __parse_predicate(cls, predicate):
+        match = _QUALIFIED_PREDICATE_REGEX.match(predicate)
+        if match:
+            return match.group(1), match.group(2).lower()
+
+        match = _COLUMN_PREDICATE_REGEX.match(predicate)
+        if match:
+            return 'column', match.group(1).lower()
+
+        match = _TAG_PREDICATE_REGEX.match(predicate)
+        if match:
+            template_id, field_id, value = match.groups()
+            if not field_id:
+                return 'tag', template_id.lower()
+            return 'tag_value', (template_id.lower(), field_id.lower(), normalize_tag_value(value))
+
+        if any(operator in predicate for operator in ':=<>'):
+            raise ValueError(f'Unsupported predicate: {predicate}')
+
+        return 'keyword', predicate.lower()
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+def normalize_tag_value(value, is_double=False):
+    """
+    Convert Tag field values, either read from the snapshot or from queries, to comparable
+    strings: DOUBLE values are formatted the same way, with no loss of precision, and other
+    values are lowercased text, so e.g. '007' does not match '7'.
+
+    :raises ValueError: If a DOUBLE value is not a number.
+    """
+    if is_double:
+        return repr(float(value))
+    return str(value).lower()
+
+
+"""
+Main program entry point
+========================================
+"""
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument('--snapshot-folder', help='Snapshot folder')
+    parser.add_argument('--format',
+                        choices=['arrow', 'parquet'],
+                        default='parquet',
+                        help='snapshot files format (default: parquet)')
+    parser.add_argument('--index-file',
+                        help='file the indexes are saved to, or loaded from if it exists and'
+                        ' no snapshot folder is provided')
+    parser.add_argument('--query', help='Data Catalog search query', required=True)
+
+    args = parser.parse_args()
+
+    if not (args.snapshot_folder or args.index_file):
+        parser.error('at least one of --snapshot-folder and --index-file is required')
+
+    if args.snapshot_folder:
+        snapshot_index = SnapshotIndex.build(args.snapshot_folder, args.format)
+        if args.index_file:
+            snapshot_index.save(args.index_file)
+    else:
+        snapshot_index = SnapshotIndex.load(args.index_file)
+
+    query_start_time = time.perf_counter()
+    search_results = snapshot_index.search(args.query)
+    query_elapsed_milliseconds = (time.perf_counter() - query_start_time) * 1000
+
+    for result in search_results:
+        print(result['name'])
+    logging.info(f'===> {len(search_results)} results in {query_elapsed_milliseconds:.2f}ms')
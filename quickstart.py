@@ -13,36 +13,109 @@ medium.com/google-cloud/data-catalog-hands-on-guide-search-get-lookup-with-pytho
 for further details.
 """
 import argparse
+import asyncio
+import collections
+from concurrent import futures
 from datetime import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
 
-from google.api_core import exceptions
-from google.cloud import datacatalog
-from google.protobuf import timestamp_pb2
+import api_instrumentation
+import api_throttling
+import lazy_imports
+
+exceptions = lazy_imports.lazy_import('google.api_core.exceptions')
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
+timestamp_pb2 = lazy_imports.lazy_import('google.protobuf.timestamp_pb2')
+
+_DEFAULT_SEARCH_SHARDS_WORKERS = 8
+_DEFAULT_SEARCH_SHARD_PROJECTS_COUNT = 20
+
+_DEFAULT_ENTRY_CACHE_SIZE = 10000
+_DEFAULT_ENTRY_CACHE_TTL_SECONDS = 3600
+
+
+def _get_entry_cacheable_errors():
+    """Errors that mean an Entry cannot be resolved, rather than a transient failure."""
+    return exceptions.NotFound, exceptions.PermissionDenied
 
 
 class DataCatalogFacade:
 
-    def __init__(self):
+    def __init__(self, entry_cache=None):
         # Initialize the API client.
-        self.__datacatalog = datacatalog.DataCatalogClient()
+        self.__datacatalog = api_throttling.get_client(datacatalog.DataCatalogClient)
+        # Optional EntryCache, used by get_entry and lookup_entry.
+        self.__entry_cache = entry_cache
 
     def search_catalog(self, organization_id, query):
         """Search Data Catalog for a given organization."""
 
-        scope = datacatalog.SearchCatalogRequest.Scope()
-        scope.include_org_ids.append(organization_id)
-
-        return self.__fetch_search_results(
-            self.__datacatalog.search_catalog(scope=scope, query=query))
-
-    @classmethod
-    def __fetch_search_results(cls, results_pages_iterator):
-        return [result for result in results_pages_iterator]
+        return [result for result in self.iter_search_catalog(organization_id, query)]
+
+    def iter_search_catalog(self,
+                            organization_id,
+                            query,
+                            page_size=None,
+                            order_by=None,
+                            page_token=None,
+                            checkpoint_file=None,
+                            project_ids=None):
+        """
+        Search Data Catalog for a given organization, fetching the results pages as they are
+        consumed, so memory usage does not grow with the number of results.
+
+        :param organization_id: The organization to search, which may be None if project_ids
+            are provided.
+        :param page_token: Token of the first page to be fetched, to resume a previous search.
+        :param checkpoint_file: JSON file where the token of the next page is saved after each
+            page is consumed. If it exists, the search is resumed from the saved page; it is
+            deleted when the search completes.
+        :param project_ids: Projects to search, in addition to the organization.
+        :return: A generator of SearchCatalogResult objects.
+        """
+        checkpoint = None
+        if checkpoint_file:
+            checkpoint = SearchCheckpointFile(
+                checkpoint_file, {
+                    'organization_id': organization_id,
+                    'project_ids': project_ids,
+                    'query': query,
+                    'order_by': order_by
+                })
+            page_token = checkpoint.read_page_token() or page_token
+
+        request = datacatalog.SearchCatalogRequest()
+        if organization_id:
+            request.scope.include_org_ids.append(organization_id)
+        if project_ids:
+            request.scope.include_project_ids.extend(project_ids)
+        request.query = query
+        if page_size:
+            request.page_size = page_size
+        if order_by:
+            request.order_by = order_by
+        if page_token:
+            request.page_token = page_token
+
+        for page in self.__datacatalog.search_catalog(request=request).pages:
+            yield from page.results
+            # Reached only when the caller asks for the next page's results, so the saved
+            # token always points to a page that was not consumed yet.
+            if checkpoint and page.next_page_token:
+                checkpoint.save(page.next_page_token, len(page.results))
+
+        if checkpoint:
+            checkpoint.delete()
 
     def get_entry(self, name):
         """Get the Data Catalog Entry for a given name."""
 
-        return self.__datacatalog.get_entry(name=name)
+        return self.__resolve_entry(name, lambda: self.__datacatalog.get_entry(name=name))
 
     def lookup_entry(self, linked_resource):
         """Lookup the Data Catalog Entry for a given resource."""
@@ -50,7 +123,25 @@ class DataCatalogFacade:
         request = datacatalog.LookupEntryRequest()
         request.linked_resource = linked_resource
 
-        return self.__datacatalog.lookup_entry(request=request)
+        return self.__resolve_entry(linked_resource,
+                                    lambda: self.__datacatalog.lookup_entry(request=request))
+
+    def __resolve_entry(self, cache_key, fetch_entry):
+        if not self.__entry_cache:
+            return fetch_entry()
+
+        entry = self.__entry_cache.get(cache_key)
+        if entry:
+            return entry
+
+        try:
+            entry = fetch_entry()
+        except _get_entry_cacheable_errors() as e:
+            self.__entry_cache.put_error(cache_key, e)
+            raise
+
+        self.__entry_cache.put(cache_key, entry)
+        return entry
 
     def create_tag_template(self, project_id, template_id, display_name,
                             primitive_fields_descriptors):
@@ -58,15 +149,8 @@ class DataCatalogFacade:
 
         location = self.__datacatalog.common_location_path(project_id, 'us-central1')
 
-        tag_template = datacatalog.TagTemplate()
-        tag_template.display_name = display_name
-
-        for descriptor in primitive_fields_descriptors:
-            field = datacatalog.TagTemplateField()
-            field.display_name = descriptor['display_name']
-            field.type_.primitive_type = descriptor['primitive_type']
-
-            tag_template.fields[descriptor['id']] = field
+        tag_template = DataCatalogEntityFactory.make_tag_template(display_name,
+                                                                  primitive_fields_descriptors)
 
         return self.__datacatalog.create_tag_template(parent=location,
                                                       tag_template_id=template_id,
@@ -75,14 +159,7 @@ class DataCatalogFacade:
     def create_tag_template_field(self, template_name, field_id, display_name, enum_values):
         """Add field to a Tag Template."""
 
-        field = datacatalog.TagTemplateField()
-        field.display_name = display_name
-
-        for enum_value in enum_values:
-            value = datacatalog.FieldType.EnumType.EnumValue()
-            value.display_name = enum_value['display_name']
-
-            field.type_.enum_type.allowed_values.append(value)
+        field = DataCatalogEntityFactory.make_enum_tag_template_field(display_name, enum_values)
 
         return self.__datacatalog.create_tag_template_field(parent=template_name,
                                                             tag_template_field_id=field_id,
@@ -103,61 +180,548 @@ class DataCatalogFacade:
 
         self.__datacatalog.delete_tag_template(name=name, force=True)
 
-    def create_tag(self, entry, tag_template, fields_descriptors):
-        """Create a Tag."""
+    def create_tag(self, entry, tag_template, fields_descriptors, column=None):
+        """Create a Tag, attached to the given column if any."""
+
+        tag = DataCatalogEntityFactory.make_tag(tag_template, fields_descriptors, column)
+
+        return self.__datacatalog.create_tag(parent=entry.name, tag=tag)
+
+    def list_tags(self, parent):
+        """List the Tags attached to a given Entry, including its columns' Tags."""
+
+        return [tag for tag in self.__datacatalog.list_tags(parent=parent)]
+
+    def delete_tag(self, name):
+        """Delete a Tag."""
+
+        self.__datacatalog.delete_tag(name=name)
+
+
+class AsyncDataCatalogFacade:
+    """
+    Same as DataCatalogFacade, but built on top of the async Data Catalog client. Methods are
+    coroutines, so many API calls can overlap in a single event loop. The number of concurrent
+    calls is limited by max_concurrency.
+    """
+
+    def __init__(self, max_concurrency=10, entry_cache=None):
+        self.__max_concurrency = max_concurrency
+        # Optional EntryCache, used by get_entry and lookup_entry.
+        self.__entry_cache = entry_cache
+        # Both the API client and the semaphore are bound to the running event loop, so they
+        # are initialized when the first call is made.
+        self.__datacatalog = None
+        self.__semaphore = None
+
+    async def search_catalog(self, organization_id, query):
+        """Search Data Catalog for a given organization."""
+
+        scope = datacatalog.SearchCatalogRequest.Scope()
+        scope.include_org_ids.append(organization_id)
+
+        async with self.__get_semaphore():
+            results_pages_iterator = await self.__get_client().search_catalog(scope=scope,
+                                                                              query=query)
+            # Fetching the next pages also hits the API, so it's done while holding the semaphore.
+            return [result async for result in results_pages_iterator]
+
+    async def get_entry(self, name):
+        """Get the Data Catalog Entry for a given name."""
+
+        return await self.__resolve_entry(name, lambda: self.__call_api('get_entry', name=name))
+
+    async def lookup_entry(self, linked_resource):
+        """Lookup the Data Catalog Entry for a given resource."""
+
+        request = datacatalog.LookupEntryRequest()
+        request.linked_resource = linked_resource
+
+        return await self.__resolve_entry(linked_resource,
+                                          lambda: self.__call_api('lookup_entry', request=request))
+
+    async def __resolve_entry(self, cache_key, fetch_entry):
+        if not self.__entry_cache:
+            return await fetch_entry()
+
+        entry = self.__entry_cache.get(cache_key)
+        if entry:
+            return entry
+
+        try:
+            entry = await fetch_entry()
+        except _get_entry_cacheable_errors() as e:
+            self.__entry_cache.put_error(cache_key, e)
+            raise
+
+        self.__entry_cache.put(cache_key, entry)
+        return entry
+
+    async def create_tag_template(self, project_id, template_id, display_name,
+                                  primitive_fields_descriptors):
+        """Create a Tag Template."""
+
+        location = datacatalog.DataCatalogClient.common_location_path(project_id, 'us-central1')
+
+        tag_template = DataCatalogEntityFactory.make_tag_template(display_name,
+                                                                  primitive_fields_descriptors)
+
+        return await self.__call_api('create_tag_template',
+                                     parent=location,
+                                     tag_template_id=template_id,
+                                     tag_template=tag_template)
+
+    async def create_tag_template_field(self, template_name, field_id, display_name, enum_values):
+        """Add field to a Tag Template."""
+
+        field = DataCatalogEntityFactory.make_enum_tag_template_field(display_name, enum_values)
+
+        return await self.__call_api('create_tag_template_field',
+                                     parent=template_name,
+                                     tag_template_field_id=field_id,
+                                     tag_template_field=field)
+
+    async def delete_tag_template_field(self, name):
+        """Delete a Tag Template field."""
+
+        await self.__call_api('delete_tag_template_field', name=name, force=True)
+
+    async def get_tag_template(self, name):
+        """Get the Tag Template for a given name."""
+
+        return await self.__call_api('get_tag_template', name=name)
+
+    async def delete_tag_template(self, name):
+        """Delete a Tag Template."""
+
+        await self.__call_api('delete_tag_template', name=name, force=True)
+
+    async def create_tag(self, entry, tag_template, fields_descriptors, column=None):
+        """Create a Tag, attached to the given column if any."""
+
+        tag = DataCatalogEntityFactory.make_tag(tag_template, fields_descriptors, column)
+
+        return await self.__call_api('create_tag', parent=entry.name, tag=tag)
+
+    async def list_tags(self, parent):
+        """List the Tags attached to a given Entry, including its columns' Tags."""
+
+        async with self.__get_semaphore():
+            tags_pages_iterator = await self.__get_client().list_tags(parent=parent)
+            return [tag async for tag in tags_pages_iterator]
+
+    async def delete_tag(self, name):
+        """Delete a Tag."""
+
+        await self.__call_api('delete_tag', name=name)
+
+    async def __call_api(self, method_name, **kwargs):
+        async with self.__get_semaphore():
+            return await getattr(self.__get_client(), method_name)(**kwargs)
+
+    def __get_client(self):
+        if not self.__datacatalog:
+            self.__datacatalog = api_throttling.create_async_client(
+                datacatalog.DataCatalogAsyncClient)
+        return self.__datacatalog
+
+    def __get_semaphore(self):
+        if not self.__semaphore:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+        return self.__semaphore
+
+
+class DataCatalogEntityFactory:
+    """
+    Build the Data Catalog entities sent to the API by both sync and async facades.
+    """
+
+    @classmethod
+    def make_tag_template(cls, display_name, primitive_fields_descriptors):
+        tag_template = datacatalog.TagTemplate()
+        tag_template.display_name = display_name
+
+        for descriptor in primitive_fields_descriptors:
+            field = datacatalog.TagTemplateField()
+            field.display_name = descriptor['display_name']
+            field.type_.primitive_type = descriptor['primitive_type']
+
+            tag_template.fields[descriptor['id']] = field
+
+        return tag_template
+
+    @classmethod
+    def make_enum_tag_template_field(cls, display_name, enum_values):
+        field = datacatalog.TagTemplateField()
+        field.display_name = display_name
+
+        for enum_value in enum_values:
+            value = datacatalog.FieldType.EnumType.EnumValue()
+            value.display_name = enum_value['display_name']
+
+            field.type_.enum_type.allowed_values.append(value)
+
+        return field
 
+    @classmethod
+    def make_tag(cls, tag_template, fields_descriptors, column=None):
         tag = datacatalog.Tag()
         tag.template = tag_template.name
+        if column:
+            tag.column = column
 
         for descriptor in fields_descriptors:
             field = datacatalog.TagField()
-            self.__set_tag_field_value(field, descriptor['value'], descriptor['primitive_type'])
+            cls.__set_tag_field_value(field, descriptor['value'], descriptor['primitive_type'])
             tag.fields[descriptor['id']] = field
 
-        return self.__datacatalog.create_tag(parent=entry.name, tag=tag)
+        return tag
 
     @classmethod
     def __set_tag_field_value(cls, field, value, primitive_type=None):
-        set_primitive_field_value_functions = {
-            datacatalog.FieldType.PrimitiveType.BOOL: cls.__set_bool_field_value,
-            datacatalog.FieldType.PrimitiveType.DOUBLE: cls.__set_double_field_value,
-            datacatalog.FieldType.PrimitiveType.STRING: cls.__set_string_field_value,
-            datacatalog.FieldType.PrimitiveType.TIMESTAMP: cls.__set_timestamp_field_value
-        }
-
         if primitive_type:
-            set_primitive_field_value = set_primitive_field_value_functions[primitive_type]
+            set_primitive_field_value = cls.__SET_PRIMITIVE_FIELD_VALUE_FUNCTIONS[
+                datacatalog.FieldType.PrimitiveType(primitive_type).name]
             set_primitive_field_value(field, value)
         else:
             cls.__set_enum_field_value(field, value)
 
-    @classmethod
-    def __set_bool_field_value(cls, field, value):
+    @staticmethod
+    def __set_bool_field_value(field, value):
         field.bool_value = value
 
-    @classmethod
-    def __set_double_field_value(cls, field, value):
+    @staticmethod
+    def __set_double_field_value(field, value):
         field.double_value = value
 
-    @classmethod
-    def __set_enum_field_value(cls, field, value):
+    @staticmethod
+    def __set_enum_field_value(field, value):
         field.enum_value.display_name = value
 
-    @classmethod
-    def __set_string_field_value(cls, field, value):
+    @staticmethod
+    def __set_string_field_value(field, value):
         field.string_value = value
 
-    @classmethod
-    def __set_timestamp_field_value(cls, field, value_as_string):
+    @staticmethod
+    def __set_timestamp_field_value(field, value_as_string):
         dt = datetime.strptime(value_as_string, '%Y-%m-%dT%H:%M:%SZ')
         timestamp = timestamp_pb2.Timestamp()
         timestamp.FromDatetime(dt)
         field.timestamp_value = timestamp
 
-    def delete_tag(self, name):
-        """Delete a Tag."""
+    # Built once instead of on every field value set, which matters when creating Tags in bulk.
+    # Staticmethod objects are not callable in the class body, hence the __func__ references.
+    # Primitive types are referred to by name, so datacatalog is not loaded by the class body.
+    __SET_PRIMITIVE_FIELD_VALUE_FUNCTIONS = {
+        'BOOL': __set_bool_field_value.__func__,
+        'DOUBLE': __set_double_field_value.__func__,
+        'STRING': __set_string_field_value.__func__,
+        'TIMESTAMP': __set_timestamp_field_value.__func__
+    }
 
-        self.__datacatalog.delete_tag(name=name)
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+class EntryCache:
+    """
+    Cache the Entries resolved by the facades, keyed by linked resource and by name, to save
+    API calls when the same resources are looked up over and over.
+
+    Entries expire after ttl_seconds, and the least recently used ones are evicted when there
+    are more than max_size of them. NotFound and PermissionDenied errors are cached as well if
+    error_ttl_seconds is provided. If db_path is provided, the cached items are also stored in a
+    SQLite database, so they survive between runs.
+
+    Cached Entries are shared by all callers and must not be changed.
+    """
+
+    def __init__(self,
+                 max_size=_DEFAULT_ENTRY_CACHE_SIZE,
+                 ttl_seconds=_DEFAULT_ENTRY_CACHE_TTL_SECONDS,
+                 error_ttl_seconds=None,
+                 db_path=None):
+
+        self.__max_size = max_size
+        self.__ttl_seconds = ttl_seconds
+        self.__error_ttl_seconds = error_ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Maps the keys to (expires_at, entry, error) tuples, from the least to the most
+        # recently used. Errors are stored as (class name, message) tuples.
+        self.__items = collections.OrderedDict()
+        # Entries are resolved by concurrent threads, hence the lock.
+        self.__lock = threading.Lock()
+        self.__db = self.__open_db(db_path) if db_path else None
+
+    def get(self, key):
+        """
+        Get the Entry cached for a linked resource or an Entry name.
+
+        :return: The Entry, or None if there is no valid item for the given key.
+        :raises: The cached error, if resolving the Entry failed.
+        """
+        with self.__lock:
+            item = self.__get_item(key)
+            if not item:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        _, entry, error = item
+        if error:
+            error_class_name, message = error
+            raise getattr(exceptions, error_class_name)(message)
+        return entry
+
+    def put(self, key, entry):
+        """Cache an Entry for the given key and for its name."""
+        expires_at = time.time() + self.__ttl_seconds
+        # The given key is set last, so it is the most recently used.
+        entry_keys = [key] if key == entry.name else [entry.name, key]
+        with self.__lock:
+            for entry_key in entry_keys:
+                self.__set_item(entry_key, (expires_at, entry, None), persist=True)
+
+    def put_error(self, key, error):
+        """Cache an error raised when resolving the Entry, if errors caching is enabled."""
+        if self.__error_ttl_seconds is None or not isinstance(error,
+                                                              _get_entry_cacheable_errors()):
+            return
+
+        expires_at = time.time() + self.__error_ttl_seconds
+        item = (expires_at, None, (type(error).__name__, error.message))
+        with self.__lock:
+            self.__set_item(key, item, persist=True)
+
+    def close(self):
+        if self.__db:
+            self.__db.close()
+            self.__db = None
+
+    def __get_item(self, key):
+        item = self.__items.get(key)
+        if item:
+            self.__items.move_to_end(key)
+        elif self.__db:
+            item = self.__read_db_item(key)
+            if item:
+                self.__set_item(key, item)
+
+        if item and item[0] <= time.time():
+            del self.__items[key]
+            if self.__db:
+                self.__db.execute('DELETE FROM entries WHERE key = ?', (key, ))
+            return None
+
+        return item
+
+    def __set_item(self, key, item, persist=False):
+        self.__items[key] = item
+        self.__items.move_to_end(key)
+        if len(self.__items) > self.__max_size:
+            self.__items.popitem(last=False)
+            self.evictions += 1
+
+        if persist and self.__db:
+            expires_at, entry, error = item
+            serialized_entry = datacatalog.Entry.serialize(entry) if entry else None
+            error_class_name, message = error or (None, None)
+            self.__db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                              (key, expires_at, serialized_entry, error_class_name, message))
+
+    def __read_db_item(self, key):
+        row = self.__db.execute(
+            'SELECT expires_at, entry, error_class_name, error_message FROM entries'
+            ' WHERE key = ?', (key, )).fetchone()
+        if not row:
+            return None
+
+        expires_at, serialized_entry, error_class_name, message = row
+        entry = datacatalog.Entry.deserialize(serialized_entry) if serialized_entry else None
+        error = (error_class_name, message) if error_class_name else None
+        return expires_at, entry, error
+
+    @classmethod
+    def __open_db(cls, db_path):
+        # Autocommit mode: the database is a cache, so each change is written right away but
+        # not synced to the disk, which would slow down large runs.
+        db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        db.execute('PRAGMA synchronous = OFF')
+        db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, expires_at REAL,'
+                   ' entry BLOB, error_class_name TEXT, error_message TEXT)')
+        db.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(), ))
+        return db
+
+
+class ShardedCatalogSearch:
+    """
+    Split a search into shards that run concurrently, either one per chunk of projects or one
+    per query predicate, and merge their results.
+
+    The shards may overlap, so the merged results are de-duplicated by relative resource name.
+    """
+
+    def __init__(self, datacatalog_facade, max_workers=_DEFAULT_SEARCH_SHARDS_WORKERS):
+        self.__datacatalog_facade = datacatalog_facade
+        # Maximum number of shards searched concurrently.
+        self.__max_workers = max_workers
+
+    def search_projects(self,
+                        project_ids,
+                        query,
+                        projects_per_shard=_DEFAULT_SEARCH_SHARD_PROJECTS_COUNT,
+                        page_size=None):
+        """
+        Search the given projects, in shards of projects_per_shard projects.
+
+        :return: A tuple with the merged results and a list of dicts with the metrics of each
+            shard: its name, the number of results, the elapsed time in seconds and the error.
+        """
+        shards = []
+        for index in range(0, len(project_ids), projects_per_shard):
+            shard_project_ids = project_ids[index:index + projects_per_shard]
+            shards.append((f'projects[{index}:{index + len(shard_project_ids)}]', {
+                'organization_id': None,
+                'project_ids': shard_project_ids,
+                'query': query,
+                'page_size': page_size
+            }))
+
+        return self.__run(shards)
+
+    def search_predicates(self, organization_id, query, predicates, page_size=None):
+        """
+        Search the given organization once for each predicate, which is appended to the query.
+        Predicates such as type=table and type=view make the shards disjoint.
+
+        :return: Same as search_projects.
+        """
+        shards = [(predicate, {
+            'organization_id': organization_id,
+            'query': f'{query} {predicate}',
+            'page_size': page_size
+        }) for predicate in predicates]
+
+        return self.__run(shards)
+
+    def __run(self, shards):
+        start_time = time.perf_counter()
+
+        with futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            pending_results = [
+                executor.submit(self.__search_shard, shard_name, search_kwargs)
+                for shard_name, search_kwargs in shards
+            ]
+
+        # Shards are merged in the order they were defined, regardless of when they finished.
+        results = []
+        seen_names = set()
+        shards_metrics = []
+        for pending_result in pending_results:
+            shard_results, shard_metrics = pending_result.result()
+            shards_metrics.append(shard_metrics)
+            for result in shard_results:
+                if result.relative_resource_name not in seen_names:
+                    seen_names.add(result.relative_resource_name)
+                    results.append(result)
+
+        self.__log_summary(shards_metrics, len(results), time.perf_counter() - start_time)
+
+        # A failure does not prevent the other shards from being searched, but the first one is
+        # raised after the summary is logged, since the merged results are incomplete.
+        first_error = next((metrics['error'] for metrics in shards_metrics if metrics['error']),
+                           None)
+        if first_error:
+            raise first_error
+
+        return results, shards_metrics
+
+    def __search_shard(self, shard_name, search_kwargs):
+        start_time = time.perf_counter()
+        results = []
+        error = None
+        try:
+            results = list(self.__datacatalog_facade.iter_search_catalog(**search_kwargs))
+        except Exception as e:
+            logging.error(f'Failed to search the shard {shard_name}: {e}')
+            error = e
+
+        return results, {
+            'shard': shard_name,
+            'results_count': len(results),
+            'elapsed_seconds': time.perf_counter() - start_time,
+            'error': error
+        }
+
+    @classmethod
+    def __log_summary(cls, shards_metrics, results_count, elapsed_seconds):
+        logging.info('')
+        logging.info('==== SUMMARY ====')
+        for metrics in shards_metrics:
+            outcome = f'FAILED ({metrics["error"]})' if metrics['error'] \
+                else f'{metrics["results_count"]} results'
+            logging.info(f'===> {metrics["shard"]}: {outcome}'
+                         f' [{metrics["elapsed_seconds"]:.2f}s]')
+
+        logging.info(f'===> {len(shards_metrics)} shards searched in {elapsed_seconds:.2f}s,'
+                     f' {results_count} unique results')
+
+
+class SearchCheckpointFile:
+    """
+    Keep track of the next results page of a search in a local JSON file, so an interrupted
+    search can be resumed from the last consumed page.
+    """
+
+    def __init__(self, file_path, search_params):
+        self.__file_path = file_path
+        # Identify the search, since page tokens are only valid for the search they came from.
+        self.__search_params = search_params
+        self.__results_count = 0
+
+    def read_page_token(self):
+        """
+        :return: The token of the next page, or None if there is no checkpoint.
+        :raises ValueError: If the checkpoint belongs to a different search.
+        """
+        if not os.path.isfile(self.__file_path):
+            return None
+
+        with open(self.__file_path, mode='r') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+
+        if checkpoint['search'] != self.__search_params:
+            raise ValueError(f'{self.__file_path} belongs to a different search:'
+                             f' {checkpoint["search"]}')
+
+        self.__results_count = checkpoint['results_count']
+        logging.info(f'===> Resuming search after {self.__results_count} results...')
+        return checkpoint['page_token']
+
+    def save(self, page_token, page_results_count):
+        self.__results_count += page_results_count
+
+        # The file is written to a temporary one first, so it is never left half-written.
+        temp_file_path = f'{self.__file_path}.tmp'
+        with open(temp_file_path, mode='w') as checkpoint_file:
+            json.dump(
+                {
+                    'search': self.__search_params,
+                    'page_token': page_token,
+                    'results_count': self.__results_count
+                }, checkpoint_file)
+        os.replace(temp_file_path, self.__file_path)
+
+    def delete(self):
+        if os.path.isfile(self.__file_path):
+            os.remove(self.__file_path)
 
 
 def __show_datacatalog_api_core_features(organization_id, project_id):
@@ -301,7 +865,13 @@ if __name__ == '__main__':
 
     parser.add_argument('--organization-id', help='Google Cloud Organization ID', required=True)
     parser.add_argument('--project-id', help='Google Cloud Project ID', required=True)
+    api_throttling.add_arguments(parser)
+    api_instrumentation.add_arguments(parser)
 
     args = parser.parse_args()
 
+    api_throttling.configure_from_args(args)
+    api_instrumentation.configure_from_args(args)
     __show_datacatalog_api_core_features(args.organization_id, args.project_id)
+    api_throttling.get_default_policy().log_counters()
+    api_instrumentation.report_from_args(args)
@@ -0,0 +1,527 @@
+"""
+Data Catalog Tag Templates' facades, entities factory and differ, and the string formatting of
+their IDs, shared by the load_template_csv and load_template_google_sheets scripts.
+"""
+import asyncio
+import functools
+import logging
+import re
+import stringcase
+import unicodedata
+
+import api_throttling
+import lazy_imports
+
+exceptions = lazy_imports.lazy_import('google.api_core.exceptions')
+datacatalog = lazy_imports.lazy_import('google.cloud.datacatalog')
+
+CLOUD_PLATFORM_REGION = 'us-central1'
+
+_DATA_CATALOG_ENUM_TYPE = 'ENUM'
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+_NON_ALPHANUMERIC_CHARS_REGEX = re.compile(r'[^a-zA-Z0-9]+')
+_STRING_FORMATTER_CACHE_SIZE = 8192
+"""
+API communication classes
+========================================
+"""
+
+
+class DataCatalogFacade:
+    """
+    Manage Templates by communicating to Data Catalog's API.
+    """
+
+    def __init__(self):
+        # Initialize the API client.
+        self.__datacatalog = api_throttling.get_client(datacatalog.DataCatalogClient)
+
+    def create_tag_template(self,
+                            project_id,
+                            template_id,
+                            display_name,
+                            fields_descriptors,
+                            enums_names=None):
+        """Create a Tag Template."""
+
+        location = datacatalog.DataCatalogClient.common_location_path(
+            project_id, CLOUD_PLATFORM_REGION)
+
+        tag_template = DataCatalogEntityFactory.make_tag_template(display_name, fields_descriptors,
+                                                                  enums_names)
+
+        created_tag_template = self.__datacatalog.create_tag_template(parent=location,
+                                                                      tag_template_id=template_id,
+                                                                      tag_template=tag_template)
+
+        logging.info(f'===> Template created: {created_tag_template.name}')
+
+    def create_tag_template_if_not_exists(self,
+                                          project_id,
+                                          template_id,
+                                          display_name,
+                                          fields_descriptors,
+                                          enums_names=None):
+        """
+        Create a Tag Template with no previous existence check, which saves an API call.
+
+        :return: True if the Template was created; False if it already existed.
+        """
+
+        try:
+            self.create_tag_template(project_id, template_id, display_name, fields_descriptors,
+                                     enums_names)
+            return True
+        except exceptions.AlreadyExists:
+            logging.info(f'===> Template already exists: {template_id}')
+            return False
+
+    def delete_tag_template(self, name):
+        """Delete a Tag Template."""
+
+        try:
+            self.__datacatalog.delete_tag_template(name=name, force=True)
+            logging.info(f'===> Template deleted: {name}')
+        except exceptions.PermissionDenied:
+            pass
+
+    def get_tag_template(self, name):
+        """Get a Tag Template, or None if it does not exist."""
+
+        try:
+            return self.__datacatalog.get_tag_template(name=name)
+        except exceptions.PermissionDenied:
+            return None
+
+    def sync_tag_template(self,
+                          tag_template,
+                          display_name,
+                          fields_descriptors,
+                          enums_names=None,
+                          enum_values_renames=None):
+        """
+        Update an existing Tag Template to match the provided metadata. Only the changes are sent
+        to the API, so the Tags attached to the Template are kept.
+
+        :param enum_values_renames: A dict mapping field IDs to dicts that map the enum values to
+            be renamed to their new names, as described by TagTemplateDiffer.diff().
+        :return: The number of API calls made to apply the changes.
+        """
+
+        expected_tag_template = DataCatalogEntityFactory.make_tag_template(
+            display_name, fields_descriptors, enums_names)
+
+        requests = TagTemplateDiffer.diff(tag_template, expected_tag_template, enum_values_renames)
+        for method_name, kwargs in requests:
+            getattr(self.__datacatalog, method_name)(**kwargs)
+
+        logging.info(f'===> Template synced: {tag_template.name} ({len(requests)} changes)')
+        return len(requests)
+
+    def tag_template_exists(self, name):
+        """Check if a Tag Template with the provided name already exists."""
+
+        try:
+            self.__datacatalog.get_tag_template(name=name)
+            return True
+        except exceptions.PermissionDenied:
+            return False
+
+
+class AsyncDataCatalogFacade:
+    """
+    Same as DataCatalogFacade, but built on top of the async Data Catalog client. Methods are
+    coroutines and the number of concurrent API calls is limited by max_concurrency.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.__max_concurrency = max_concurrency
+        # Both the API client and the semaphore are bound to the running event loop, so they
+        # are initialized when the first call is made.
+        self.__datacatalog = None
+        self.__semaphore = None
+
+    async def create_tag_template(self,
+                                  project_id,
+                                  template_id,
+                                  display_name,
+                                  fields_descriptors,
+                                  enums_names=None):
+        """Create a Tag Template."""
+
+        location = datacatalog.DataCatalogClient.common_location_path(
+            project_id, CLOUD_PLATFORM_REGION)
+
+        tag_template = DataCatalogEntityFactory.make_tag_template(display_name, fields_descriptors,
+                                                                  enums_names)
+
+        created_tag_template = await self.__call_api('create_tag_template',
+                                                     parent=location,
+                                                     tag_template_id=template_id,
+                                                     tag_template=tag_template)
+
+        logging.info(f'===> Template created: {created_tag_template.name}')
+
+    async def create_tag_template_if_not_exists(self,
+                                                project_id,
+                                                template_id,
+                                                display_name,
+                                                fields_descriptors,
+                                                enums_names=None):
+        """
+        Create a Tag Template with no previous existence check, which saves an API call.
+
+        :return: True if the Template was created; False if it already existed.
+        """
+
+        try:
+            await self.create_tag_template(project_id, template_id, display_name,
+                                           fields_descriptors, enums_names)
+            return True
+        except exceptions.AlreadyExists:
+            logging.info(f'===> Template already exists: {template_id}')
+            return False
+
+    async def delete_tag_template(self, name):
+        """Delete a Tag Template."""
+
+        try:
+            await self.__call_api('delete_tag_template', name=name, force=True)
+            logging.info(f'===> Template deleted: {name}')
+        except exceptions.PermissionDenied:
+            pass
+
+    async def get_tag_template(self, name):
+        """Get a Tag Template, or None if it does not exist."""
+
+        try:
+            return await self.__call_api('get_tag_template', name=name)
+        except exceptions.PermissionDenied:
+            return None
+
+    async def sync_tag_template(self,
+                                tag_template,
+                                display_name,
+                                fields_descriptors,
+                                enums_names=None,
+                                enum_values_renames=None):
+        """
+        Update an existing Tag Template to match the provided metadata. Only the changes are sent
+        to the API, so the Tags attached to the Template are kept.
+
+        :param enum_values_renames: A dict mapping field IDs to dicts that map the enum values to
+            be renamed to their new names, as described by TagTemplateDiffer.diff().
+        :return: The number of API calls made to apply the changes.
+        """
+
+        expected_tag_template = DataCatalogEntityFactory.make_tag_template(
+            display_name, fields_descriptors, enums_names)
+
+        # The requests are sent one at a time, as some of them depend on the previous ones
+        # (e.g., a field is renamed before its display name is updated).
+        requests = TagTemplateDiffer.diff(tag_template, expected_tag_template, enum_values_renames)
+        for method_name, kwargs in requests:
+            await self.__call_api(method_name, **kwargs)
+
+        logging.info(f'===> Template synced: {tag_template.name} ({len(requests)} changes)')
+        return len(requests)
+
+    async def tag_template_exists(self, name):
+        """Check if a Tag Template with the provided name already exists."""
+
+        try:
+            await self.__call_api('get_tag_template', name=name)
+            return True
+        except exceptions.PermissionDenied:
+            return False
+
+    async def __call_api(self, method_name, **kwargs):
+        if not self.__datacatalog:
+            self.__datacatalog = api_throttling.create_async_client(
+                datacatalog.DataCatalogAsyncClient)
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+
+        async with self.__semaphore:
+            return await getattr(self.__datacatalog, method_name)(**kwargs)
+
+
+class DataCatalogEntityFactory:
+    """
+    Build the Data Catalog entities sent to the API by both sync and async facades.
+    """
+
+    @classmethod
+    def make_tag_template(cls, display_name, fields_descriptors, enums_names=None):
+        tag_template = datacatalog.TagTemplate()
+        tag_template.display_name = display_name
+
+        for descriptor in fields_descriptors:
+            field = datacatalog.TagTemplateField()
+            field.display_name = descriptor[1]
+
+            field_id = descriptor[0]
+            field_type = descriptor[2]
+            if not field_type == _DATA_CATALOG_ENUM_TYPE:
+                field.type_.primitive_type = datacatalog.FieldType.PrimitiveType[field_type]
+            else:
+                for enum_name in enums_names[field_id]:
+                    enum_value = datacatalog.FieldType.EnumType.EnumValue()
+                    enum_value.display_name = enum_name
+                    field.type_.enum_type.allowed_values.append(enum_value)
+
+            tag_template.fields[field_id] = field
+
+        return tag_template
+
+
+class TagTemplateDiffer:
+    """
+    Compute the API requests required to make an existing Tag Template match the expected one,
+    changing the existing fields in place whenever possible so their values are not lost.
+    """
+
+    @classmethod
+    def diff(cls, current_tag_template, expected_tag_template, enum_values_renames=None):
+        """
+        :param enum_values_renames: A dict mapping field IDs to dicts that map the enum values to
+            be renamed to their new names. Enum values cannot be deleted, so the removed values
+            that are not renamed are kept and the added ones are appended.
+        :return: A list of (DataCatalogClient method name, keyword arguments) tuples, in the order
+            the methods must be called.
+        """
+        template_name = current_tag_template.name
+        enum_values_renames = enum_values_renames or {}
+        requests = []
+
+        if not current_tag_template.display_name == expected_tag_template.display_name:
+            tag_template = datacatalog.TagTemplate()
+            tag_template.name = template_name
+            tag_template.display_name = expected_tag_template.display_name
+            requests.append(('update_tag_template', {
+                'tag_template': tag_template,
+                'update_mask': {
+                    'paths': ['display_name']
+                }
+            }))
+
+        current_fields = dict(current_tag_template.fields.items())
+        expected_fields = dict(expected_tag_template.fields.items())
+
+        removed_fields_ids = [
+            field_id for field_id in current_fields if field_id not in expected_fields
+        ]
+        added_fields_ids = [
+            field_id for field_id in expected_fields if field_id not in current_fields
+        ]
+
+        # A removed field is renamed instead of deleted if an added one has the same display name
+        # and type, which keeps the values already assigned to it.
+        for field_id in list(added_fields_ids):
+            expected_field = expected_fields[field_id]
+            renamed_field_id = next(
+                (removed_field_id for removed_field_id in removed_fields_ids
+                 if cls.__is_renamed_field(current_fields[removed_field_id], expected_field)),
+                None)
+            if not renamed_field_id:
+                continue
+
+            requests.append(('rename_tag_template_field', {
+                'name': cls.__make_field_name(template_name, renamed_field_id),
+                'new_tag_template_field_id': field_id
+            }))
+            current_fields[field_id] = current_fields.pop(renamed_field_id)
+            removed_fields_ids.remove(renamed_field_id)
+            added_fields_ids.remove(field_id)
+
+        recreated_fields_ids = []
+        for field_id, current_field in current_fields.items():
+            if field_id not in expected_fields:
+                continue
+
+            expected_field = expected_fields[field_id]
+            # The type of a field cannot be changed, so it is deleted and created again.
+            if not cls.__get_field_type(current_field) == cls.__get_field_type(expected_field):
+                recreated_fields_ids.append(field_id)
+                continue
+
+            requests.extend(
+                cls.__diff_fields(cls.__make_field_name(template_name, field_id), current_field,
+                                  expected_field, enum_values_renames.get(field_id, {})))
+
+        # Fields are created before the removed ones are deleted, as a Template must have at
+        # least one field.
+        for field_id in added_fields_ids:
+            requests.append(
+                cls.__make_create_field_request(template_name, field_id,
+                                                expected_fields[field_id]))
+
+        for field_id in removed_fields_ids:
+            requests.append(cls.__make_delete_field_request(template_name, field_id))
+
+        for field_id in recreated_fields_ids:
+            requests.append(cls.__make_delete_field_request(template_name, field_id))
+            requests.append(
+                cls.__make_create_field_request(template_name, field_id,
+                                                expected_fields[field_id]))
+
+        return requests
+
+    @classmethod
+    def __diff_fields(cls, field_name, current_field, expected_field, enum_values_renames):
+        requests = []
+
+        tag_template_field = datacatalog.TagTemplateField()
+        update_mask_paths = []
+
+        if not current_field.display_name == expected_field.display_name:
+            tag_template_field.display_name = expected_field.display_name
+            update_mask_paths.append('display_name')
+
+        current_values = cls.__get_enum_values(current_field)
+        expected_values = cls.__get_enum_values(expected_field)
+        removed_values = [value for value in current_values if value not in expected_values]
+        added_values = [value for value in expected_values if value not in current_values]
+
+        # A removed value is only renamed to an added one if requested, as renaming it changes
+        # the value of the Tags it is already assigned to.
+        for removed_value in list(removed_values):
+            added_value = enum_values_renames.get(removed_value)
+            if added_value not in added_values:
+                continue
+
+            requests.append(('rename_tag_template_field_enum_value', {
+                'name': f'{field_name}/enumValues/{removed_value}',
+                'new_enum_value_display_name': added_value
+            }))
+            removed_values.remove(removed_value)
+            added_values.remove(added_value)
+
+        for removed_value in removed_values:
+            logging.warning(f'Enum values cannot be deleted. Keeping {removed_value} in'
+                            f' {field_name}...')
+
+        # Enum values sent in an update request are merged with the existing ones.
+        for added_value in added_values:
+            enum_value = datacatalog.FieldType.EnumType.EnumValue()
+            enum_value.display_name = added_value
+            tag_template_field.type_.enum_type.allowed_values.append(enum_value)
+        if added_values:
+            update_mask_paths.append('type.enum_type')
+
+        if update_mask_paths:
+            requests.append(('update_tag_template_field', {
+                'name': field_name,
+                'tag_template_field': tag_template_field,
+                'update_mask': {
+                    'paths': update_mask_paths
+                }
+            }))
+
+        return requests
+
+    @classmethod
+    def __make_create_field_request(cls, template_name, field_id, tag_template_field):
+        return ('create_tag_template_field', {
+            'parent': template_name,
+            'tag_template_field_id': field_id,
+            'tag_template_field': tag_template_field
+        })
+
+    @classmethod
+    def __make_delete_field_request(cls, template_name, field_id):
+        return ('delete_tag_template_field', {
+            'name': cls.__make_field_name(template_name, field_id),
+            'force': True
+        })
+
+    @classmethod
+    def __is_renamed_field(cls, current_field, expected_field):
+        return current_field.display_name == expected_field.display_name \
+            and cls.__get_field_type(current_field) == cls.__get_field_type(expected_field)
+
+    @classmethod
+    def __get_field_type(cls, field):
+        primitive_type = field.type_.primitive_type
+        return primitive_type.name if primitive_type else _DATA_CATALOG_ENUM_TYPE
+
+    @classmethod
+    def __get_enum_values(cls, field):
+        return [enum_value.display_name for enum_value in field.type_.enum_type.allowed_values]
+
+    @classmethod
+    def __make_field_name(cls, template_name, field_id):
+        return f'{template_name}/fields/{field_id}'
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+class StringFormatter:
+
+    @classmethod
+    def format_elements_to_snakecase(cls, a_list, internal_index=None):
+        if internal_index is None:
+            a_list[:] = cls.format_many(a_list)
+        else:
+            formatted_strings = cls.format_many(element[internal_index] for element in a_list)
+            for element, formatted_string in zip(a_list, formatted_strings):
+                element[internal_index] = formatted_string
+
+    @classmethod
+    def format_many(cls, strings):
+        """Format a whole column of strings to snake case in a single call."""
+        format_to_snakecase = cls.__format_to_snakecase
+        return [format_to_snakecase(string) for string in strings]
+
+    @classmethod
+    def format_to_snakecase(cls, string):
+        return cls.__format_to_snakecase(string)
+
+    # The same field IDs and values are usually formatted many times in a single run, so the
+    # results are memoized.
+    @staticmethod
+    @functools.lru_cache(maxsize=_STRING_FORMATTER_CACHE_SIZE)
+    def __format_to_snakecase(string):
+        normalized_str = unicodedata.normalize('NFKD', string).encode('ASCII', 'ignore').decode()
+        normalized_str = _NON_ALPHANUMERIC_CHARS_REGEX.sub(' ', normalized_str)
+        normalized_str = normalized_str.strip()
+        normalized_str = normalized_str.lower() \
+            if (' ' in normalized_str) or (normalized_str.isupper()) \
+            else stringcase.camelcase(normalized_str)  # FooBarBaz => fooBarBaz
+
+        return stringcase.snakecase(normalized_str)  # foo-bar-baz => foo_bar_baz
+
+
+"""
+Command-line interface
+========================================
+"""
+
+
+def add_arguments(parser):
+    """Add the Templates sync arguments to an argparse parser."""
+    parser.add_argument('--rename-enum-value',
+                        nargs=3,
+                        action='append',
+                        dest='enum_values_renames',
+                        metavar=('FIELD_ID', 'OLD_VALUE', 'NEW_VALUE'),
+                        help='rename an enum value of an existing Template when running with'
+                        ' --sync, so the Tags it is assigned to get the new value; removed values'
+                        ' are kept otherwise, as enum values cannot be deleted (may be repeated)')
+
+
+def get_enum_values_renames(args):
+    """
+    :return: A dict mapping field IDs to dicts that map the enum values to be renamed to their
+        new names, from the arguments added by add_arguments().
+    """
+    enum_values_renames = {}
+    for field_id, old_value, new_value in args.enum_values_renames or []:
+        field_id = StringFormatter.format_to_snakecase(field_id)
+        enum_values_renames.setdefault(field_id, {})[old_value] = new_value
+    return enum_values_renames
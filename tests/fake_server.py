@@ -0,0 +1,624 @@
+"""
+In-process fake of the Data Catalog gRPC API, for benchmarks and offline tests.
+
+FakeDataCatalogServer serves the DataCatalog, PolicyTagManager, and
+PolicyTagManagerSerialization services on a local port, so the scripts run their real API
+clients and gRPC stack against it. Tag Templates, Entries, Tags, Taxonomies, and Policy Tags
+are kept in memory by FakeDataCatalogServicer. Each call's latency, errors, and quotas are
+simulated by the server.
+
+The scripts connect to a started server with their --api-endpoint and --api-insecure arguments,
+or with api_throttling.configure_api_endpoint(server.api_endpoint, insecure=True).
+"""
+import collections
+from concurrent import futures
+import datetime
+import itertools
+import re
+import threading
+import time
+
+from google.cloud import datacatalog
+from google.protobuf import empty_pb2
+import grpc
+
+import api_throttling
+
+_DEFAULT_MAX_WORKERS = 64
+_DEFAULT_PAGE_SIZE = 10
+
+_DATA_CATALOG_SERVICE = 'google.cloud.datacatalog.v1.DataCatalog'
+_POLICY_TAG_MANAGER_SERVICE = 'google.cloud.datacatalog.v1.PolicyTagManager'
+_POLICY_TAG_MANAGER_SERIALIZATION_SERVICE = \
+    'google.cloud.datacatalog.v1.PolicyTagManagerSerialization'
+
+# Maps the services to their supported methods, with the methods' request and response types.
+_SERVICES_METHODS = {
+    _DATA_CATALOG_SERVICE: [
+        ('search_catalog', datacatalog.SearchCatalogRequest, datacatalog.SearchCatalogResponse),
+        ('get_entry', datacatalog.GetEntryRequest, datacatalog.Entry),
+        ('lookup_entry', datacatalog.LookupEntryRequest, datacatalog.Entry),
+        ('create_tag_template', datacatalog.CreateTagTemplateRequest, datacatalog.TagTemplate),
+        ('get_tag_template', datacatalog.GetTagTemplateRequest, datacatalog.TagTemplate),
+        ('update_tag_template', datacatalog.UpdateTagTemplateRequest, datacatalog.TagTemplate),
+        ('delete_tag_template', datacatalog.DeleteTagTemplateRequest, empty_pb2.Empty),
+        ('create_tag_template_field', datacatalog.CreateTagTemplateFieldRequest,
+         datacatalog.TagTemplateField),
+        ('update_tag_template_field', datacatalog.UpdateTagTemplateFieldRequest,
+         datacatalog.TagTemplateField),
+        ('rename_tag_template_field', datacatalog.RenameTagTemplateFieldRequest,
+         datacatalog.TagTemplateField),
+        ('rename_tag_template_field_enum_value',
+         datacatalog.RenameTagTemplateFieldEnumValueRequest, datacatalog.TagTemplateField),
+        ('delete_tag_template_field', datacatalog.DeleteTagTemplateFieldRequest, empty_pb2.Empty),
+        ('create_tag', datacatalog.CreateTagRequest, datacatalog.Tag),
+        ('list_tags', datacatalog.ListTagsRequest, datacatalog.ListTagsResponse),
+        ('delete_tag', datacatalog.DeleteTagRequest, empty_pb2.Empty),
+    ],
+    _POLICY_TAG_MANAGER_SERVICE: [
+        ('create_taxonomy', datacatalog.CreateTaxonomyRequest, datacatalog.Taxonomy),
+        ('get_taxonomy', datacatalog.GetTaxonomyRequest, datacatalog.Taxonomy),
+        ('delete_taxonomy', datacatalog.DeleteTaxonomyRequest, empty_pb2.Empty),
+        ('create_policy_tag', datacatalog.CreatePolicyTagRequest, datacatalog.PolicyTag),
+        ('list_policy_tags', datacatalog.ListPolicyTagsRequest,
+         datacatalog.ListPolicyTagsResponse),
+        ('update_policy_tag', datacatalog.UpdatePolicyTagRequest, datacatalog.PolicyTag),
+        ('delete_policy_tag', datacatalog.DeletePolicyTagRequest, empty_pb2.Empty),
+    ],
+    _POLICY_TAG_MANAGER_SERIALIZATION_SERVICE: [
+        ('import_taxonomies', datacatalog.ImportTaxonomiesRequest,
+         datacatalog.ImportTaxonomiesResponse),
+        ('export_taxonomies', datacatalog.ExportTaxonomiesRequest,
+         datacatalog.ExportTaxonomiesResponse),
+    ],
+}
+
+_SEARCH_PREDICATE_REGEX = re.compile(r'^(system|type|projectid)=(.+)$')
+_SEARCH_TAG_PREDICATE_REGEX = re.compile(r'^tag:([^.=:]+)(?:\.([^=:]+)[=:](.+))?$')
+
+
+class FakeDataCatalogServer:
+    """
+    Serve a FakeDataCatalogServicer on a local port, simulating the API latency, errors, and
+    quotas. Can be used as a context manager, which starts and stops the server.
+    """
+
+    def __init__(self, latency=0, latencies=None, quotas=None, max_workers=_DEFAULT_MAX_WORKERS):
+        """
+        :param latency: The number of seconds each call takes.
+        :param latencies: A dict with the latency of specific methods, e.g. {'create_tag': 0.1}.
+        :param quotas: A dict with the maximum number of calls per second of each method family
+            (read, search, or write); exceeding calls fail with RESOURCE_EXHAUSTED.
+        :param max_workers: The number of calls served concurrently.
+        """
+        self.servicer = FakeDataCatalogServicer()
+        self.api_endpoint = None
+
+        self.__latency = latency
+        self.__latencies = latencies or {}
+        self.__quotas = quotas or {}
+        self.__max_workers = max_workers
+        self.__server = None
+
+        self.__lock = threading.Lock()
+        self.__calls_count = collections.Counter()
+        self.__injected_errors = collections.defaultdict(collections.deque)
+        # Times of the calls made in the last second, by method family.
+        self.__recent_calls_times = collections.defaultdict(collections.deque)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def calls_count(self):
+        """A dict with the number of calls made to each method."""
+        with self.__lock:
+            return dict(self.__calls_count)
+
+    def start(self):
+        """
+        :return: The host:port address the server listens to.
+        """
+        self.__server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.__max_workers))
+        self.__server.add_generic_rpc_handlers([
+            grpc.method_handlers_generic_handler(
+                service_name, {
+                    self.__make_rpc_name(method_name):
+                    self.__make_rpc_method_handler(method_name, request_class, response_class)
+                    for method_name, request_class, response_class in methods
+                }) for service_name, methods in _SERVICES_METHODS.items()
+        ])
+        port = self.__server.add_insecure_port('localhost:0')
+        self.__server.start()
+
+        self.api_endpoint = f'localhost:{port}'
+        return self.api_endpoint
+
+    def stop(self):
+        self.__server.stop(grace=None)
+
+    def inject_error(self, method_name, status_code, count=1, applied=False):
+        """
+        Make the next calls to a method fail with the given grpc.StatusCode.
+
+        :param applied: Whether the calls are applied before failing, as when a call times out
+            after the server processed it.
+        """
+        with self.__lock:
+            self.__injected_errors[method_name].extend([(status_code, applied)] * count)
+
+    def __make_rpc_method_handler(self, method_name, request_class, response_class):
+
+        def handle(request, context):
+            try:
+                return self.__call(method_name, request)
+            except FakeApiError as e:
+                context.abort(e.status_code, e.message)
+
+        # Empty responses are protobuf messages rather than proto-plus ones.
+        serialize = response_class.SerializeToString if response_class is empty_pb2.Empty \
+            else response_class.serialize
+        return grpc.unary_unary_rpc_method_handler(handle,
+                                                   request_deserializer=request_class.deserialize,
+                                                   response_serializer=serialize)
+
+    def __call(self, method_name, request):
+        family = api_throttling.get_method_family(method_name)
+        with self.__lock:
+            self.__calls_count[method_name] += 1
+            quota_exceeded = self.__is_quota_exceeded(family)
+            injected_errors = self.__injected_errors[method_name]
+            injected_error = injected_errors.popleft() if injected_errors else None
+
+        time.sleep(self.__latencies.get(method_name, self.__latency))
+
+        if quota_exceeded:
+            raise FakeApiError(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                               f'Quota exceeded for {family} requests per second')
+        if not injected_error:
+            return getattr(self.servicer, method_name)(request)
+
+        status_code, applied = injected_error
+        if applied:
+            getattr(self.servicer, method_name)(request)
+        raise FakeApiError(status_code, f'Injected error for {method_name}')
+
+    def __is_quota_exceeded(self, family):
+        quota = self.__quotas.get(family)
+        if not quota:
+            return False
+
+        now = time.monotonic()
+        recent_calls_times = self.__recent_calls_times[family]
+        while recent_calls_times and recent_calls_times[0] <= now - 1:
+            recent_calls_times.popleft()
+
+        if len(recent_calls_times) >= quota:
+            return True
+        recent_calls_times.append(now)
+        return False
+
+    @classmethod
+    def __make_rpc_name(cls, method_name):
+        return ''.join(word.capitalize() for word in method_name.split('_'))
+
+
+class FakeDataCatalogServicer:
+    """
+    In-memory implementation of the supported API methods. Each method takes a request and
+    returns a response, or raises a FakeApiError. Like Data Catalog, resources that do not exist
+    are reported as PERMISSION_DENIED.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.tag_templates = {}
+        self.tags = {}
+        self.taxonomies = {}
+        self.policy_tags = {}
+
+        self.__lock = threading.RLock()
+        self.__ids = itertools.count(1)
+
+    def add_entry(self, entry):
+        """Add an Entry, as if it were synced from its source system."""
+        with self.__lock:
+            self.entries[entry.name] = entry
+
+    # Entries and search.
+
+    def search_catalog(self, request):
+        with self.__lock:
+            predicates = request.query.split()
+            project_ids = set(request.scope.include_project_ids)
+            results = [
+                self.__make_search_result(entry) for name, entry in sorted(self.entries.items())
+                if (not project_ids or self.__get_project_id(name) in project_ids) and all(
+                    self.__match_search_predicate(entry, predicate) for predicate in predicates)
+            ]
+
+        page, next_page_token = self.__get_page(results, request)
+        return datacatalog.SearchCatalogResponse(results=page, next_page_token=next_page_token)
+
+    def get_entry(self, request):
+        with self.__lock:
+            return self.__get_resource(self.entries, request.name)
+
+    def lookup_entry(self, request):
+        with self.__lock:
+            entry = next((entry for entry in self.entries.values()
+                          if entry.linked_resource == request.linked_resource), None)
+        if not entry:
+            raise FakeApiError(grpc.StatusCode.PERMISSION_DENIED, request.linked_resource)
+        return entry
+
+    # Tag Templates.
+
+    def create_tag_template(self, request):
+        name = f'{request.parent}/tagTemplates/{request.tag_template_id}'
+        with self.__lock:
+            self.__check_not_exists(self.tag_templates, name)
+            tag_template = request.tag_template
+            tag_template.name = name
+            for field_id, field in tag_template.fields.items():
+                field.name = f'{name}/fields/{field_id}'
+                tag_template.fields[field_id] = field
+            self.tag_templates[name] = tag_template
+            return tag_template
+
+    def get_tag_template(self, request):
+        with self.__lock:
+            return self.__get_resource(self.tag_templates, request.name)
+
+    def update_tag_template(self, request):
+        with self.__lock:
+            tag_template = self.__get_resource(self.tag_templates, request.tag_template.name)
+            for path in request.update_mask.paths or ['display_name']:
+                setattr(tag_template, path, getattr(request.tag_template, path))
+            return tag_template
+
+    def delete_tag_template(self, request):
+        with self.__lock:
+            self.__get_resource(self.tag_templates, request.name)
+            self.__delete_tags(lambda tag: tag.template == request.name, request.force)
+            del self.tag_templates[request.name]
+        return empty_pb2.Empty()
+
+    def create_tag_template_field(self, request):
+        with self.__lock:
+            tag_template = self.__get_resource(self.tag_templates, request.parent)
+            field_id = request.tag_template_field_id
+            if field_id in tag_template.fields:
+                raise FakeApiError(grpc.StatusCode.ALREADY_EXISTS, field_id)
+            field = request.tag_template_field
+            field.name = f'{request.parent}/fields/{field_id}'
+            tag_template.fields[field_id] = field
+            return field
+
+    def update_tag_template_field(self, request):
+        with self.__lock:
+            tag_template, field_id, field = self.__get_tag_template_field(request.name)
+            update = request.tag_template_field
+            for path in request.update_mask.paths or ['display_name']:
+                if path == 'type.enum_type':
+                    # Enum values sent in an update request are merged with the existing ones.
+                    field.type_.enum_type.allowed_values.extend(
+                        update.type_.enum_type.allowed_values)
+                else:
+                    setattr(field, path, getattr(update, path))
+            tag_template.fields[field_id] = field
+            return field
+
+    def rename_tag_template_field(self, request):
+        with self.__lock:
+            tag_template, field_id, field = self.__get_tag_template_field(request.name)
+            new_field_id = request.new_tag_template_field_id
+            if new_field_id in tag_template.fields:
+                raise FakeApiError(grpc.StatusCode.ALREADY_EXISTS, new_field_id)
+            del tag_template.fields[field_id]
+            field.name = f'{tag_template.name}/fields/{new_field_id}'
+            tag_template.fields[new_field_id] = field
+            return field
+
+    def rename_tag_template_field_enum_value(self, request):
+        field_name, _, display_name = request.name.partition('/enumValues/')
+        with self.__lock:
+            tag_template, field_id, field = self.__get_tag_template_field(field_name)
+            enum_value = next((enum_value for enum_value in field.type_.enum_type.allowed_values
+                               if enum_value.display_name == display_name), None)
+            if not enum_value:
+                raise FakeApiError(grpc.StatusCode.NOT_FOUND, request.name)
+            enum_value.display_name = request.new_enum_value_display_name
+            tag_template.fields[field_id] = field
+            return field
+
+    def delete_tag_template_field(self, request):
+        with self.__lock:
+            tag_template, field_id, _ = self.__get_tag_template_field(request.name)
+            del tag_template.fields[field_id]
+        return empty_pb2.Empty()
+
+    # Tags.
+
+    def create_tag(self, request):
+        tag = request.tag
+        with self.__lock:
+            self.__get_resource(self.entries, request.parent)
+            self.__get_resource(self.tag_templates, tag.template)
+            if any(existing_tag.template == tag.template and existing_tag.column == tag.column
+                   and self.__get_parent_name(existing_tag.name, 'tags') == request.parent
+                   for existing_tag in self.tags.values()):
+                raise FakeApiError(grpc.StatusCode.ALREADY_EXISTS, tag.template)
+            tag.name = f'{request.parent}/tags/{next(self.__ids)}'
+            self.tags[tag.name] = tag
+            return tag
+
+    def list_tags(self, request):
+        with self.__lock:
+            tags = [
+                tag for name, tag in self.tags.items()
+                if self.__get_parent_name(name, 'tags') == request.parent
+            ]
+
+        page, next_page_token = self.__get_page(tags, request)
+        return datacatalog.ListTagsResponse(tags=page, next_page_token=next_page_token)
+
+    def delete_tag(self, request):
+        with self.__lock:
+            self.__get_resource(self.tags, request.name)
+            del self.tags[request.name]
+        return empty_pb2.Empty()
+
+    # Taxonomies and Policy Tags.
+
+    def create_taxonomy(self, request):
+        with self.__lock:
+            return self.__add_taxonomy(request.parent, request.taxonomy)
+
+    def get_taxonomy(self, request):
+        with self.__lock:
+            return self.__get_resource(self.taxonomies, request.name)
+
+    def delete_taxonomy(self, request):
+        with self.__lock:
+            self.__get_resource(self.taxonomies, request.name)
+            for policy_tag in self.__list_taxonomy_policy_tags(request.name):
+                del self.policy_tags[policy_tag.name]
+            del self.taxonomies[request.name]
+        return empty_pb2.Empty()
+
+    def create_policy_tag(self, request):
+        with self.__lock:
+            return self.__add_policy_tag(request.parent, request.policy_tag)
+
+    def list_policy_tags(self, request):
+        with self.__lock:
+            self.__get_resource(self.taxonomies, request.parent)
+            policy_tags = self.__list_taxonomy_policy_tags(request.parent)
+
+        page, next_page_token = self.__get_page(policy_tags, request)
+        return datacatalog.ListPolicyTagsResponse(policy_tags=page,
+                                                  next_page_token=next_page_token)
+
+    def update_policy_tag(self, request):
+        with self.__lock:
+            policy_tag = self.__get_resource(self.policy_tags, request.policy_tag.name)
+            for path in request.update_mask.paths or ['display_name', 'description']:
+                setattr(policy_tag, path, getattr(request.policy_tag, path))
+            return policy_tag
+
+    def delete_policy_tag(self, request):
+        with self.__lock:
+            self.__get_resource(self.policy_tags, request.name)
+            # Deleting a Policy Tag also deletes its descendants.
+            deleted_names = {request.name}
+            for policy_tag in self.__list_taxonomy_policy_tags(
+                    self.__get_parent_name(request.name, 'policyTags')):
+                if policy_tag.parent_policy_tag in deleted_names:
+                    deleted_names.add(policy_tag.name)
+            for name in deleted_names:
+                del self.policy_tags[name]
+        return empty_pb2.Empty()
+
+    def import_taxonomies(self, request):
+        with self.__lock:
+            taxonomies = []
+            for serialized_taxonomy in request.inline_source.taxonomies:
+                taxonomy = datacatalog.Taxonomy(display_name=serialized_taxonomy.display_name,
+                                                description=serialized_taxonomy.description)
+                taxonomy = self.__add_taxonomy(request.parent, taxonomy)
+                self.__import_policy_tags(taxonomy.name, serialized_taxonomy.policy_tags, None)
+                taxonomies.append(taxonomy)
+            return datacatalog.ImportTaxonomiesResponse(taxonomies=taxonomies)
+
+    def export_taxonomies(self, request):
+        if not request.serialized_taxonomies:
+            raise FakeApiError(grpc.StatusCode.INVALID_ARGUMENT, 'serialized_taxonomies')
+
+        with self.__lock:
+            serialized_taxonomies = []
+            for name in request.taxonomies:
+                taxonomy = self.__get_resource(self.taxonomies, name)
+                serialized_taxonomies.append(
+                    datacatalog.SerializedTaxonomy(display_name=taxonomy.display_name,
+                                                   description=taxonomy.description,
+                                                   policy_tags=self.__export_policy_tags(
+                                                       self.__list_taxonomy_policy_tags(name),
+                                                       '')))
+            return datacatalog.ExportTaxonomiesResponse(taxonomies=serialized_taxonomies)
+
+    def __add_taxonomy(self, parent, taxonomy):
+        if any(existing_taxonomy.display_name == taxonomy.display_name
+               for existing_taxonomy in self.taxonomies.values()
+               if self.__get_parent_name(existing_taxonomy.name, 'taxonomies') == parent):
+            raise FakeApiError(grpc.StatusCode.ALREADY_EXISTS, taxonomy.display_name)
+        taxonomy.name = f'{parent}/taxonomies/{next(self.__ids)}'
+        self.taxonomies[taxonomy.name] = taxonomy
+        return taxonomy
+
+    def __add_policy_tag(self, taxonomy_name, policy_tag):
+        self.__get_resource(self.taxonomies, taxonomy_name)
+        if policy_tag.parent_policy_tag and policy_tag.parent_policy_tag not in self.policy_tags:
+            raise FakeApiError(grpc.StatusCode.INVALID_ARGUMENT, policy_tag.parent_policy_tag)
+        # Display names are unique in a Taxonomy.
+        if any(existing_policy_tag.display_name == policy_tag.display_name
+               for existing_policy_tag in self.__list_taxonomy_policy_tags(taxonomy_name)):
+            raise FakeApiError(grpc.StatusCode.ALREADY_EXISTS, policy_tag.display_name)
+        policy_tag.name = f'{taxonomy_name}/policyTags/{next(self.__ids)}'
+        self.policy_tags[policy_tag.name] = policy_tag
+        return policy_tag
+
+    def __import_policy_tags(self, taxonomy_name, serialized_policy_tags, parent_name):
+        for serialized_policy_tag in serialized_policy_tags:
+            policy_tag = datacatalog.PolicyTag(display_name=serialized_policy_tag.display_name,
+                                               description=serialized_policy_tag.description,
+                                               parent_policy_tag=parent_name or '')
+            policy_tag = self.__add_policy_tag(taxonomy_name, policy_tag)
+            self.__import_policy_tags(taxonomy_name, serialized_policy_tag.child_policy_tags,
+                                      policy_tag.name)
+
+    def __export_policy_tags(self, policy_tags, parent_name):
+        return [
+            datacatalog.SerializedPolicyTag(display_name=policy_tag.display_name,
+                                            description=policy_tag.description,
+                                            child_policy_tags=self.__export_policy_tags(
+                                                policy_tags, policy_tag.name))
+            for policy_tag in policy_tags if policy_tag.parent_policy_tag == parent_name
+        ]
+
+    def __list_taxonomy_policy_tags(self, taxonomy_name):
+        return [
+            policy_tag for name, policy_tag in self.policy_tags.items()
+            if self.__get_parent_name(name, 'policyTags') == taxonomy_name
+        ]
+
+    def __get_tag_template_field(self, field_name):
+        template_name = self.__get_parent_name(field_name, 'fields')
+        tag_template = self.__get_resource(self.tag_templates, template_name)
+        field_id = field_name.split('/')[-1]
+        if field_id not in tag_template.fields:
+            raise FakeApiError(grpc.StatusCode.PERMISSION_DENIED, field_name)
+        return tag_template, field_id, tag_template.fields[field_id]
+
+    def __delete_tags(self, predicate, force):
+        names = [name for name, tag in self.tags.items() if predicate(tag)]
+        if names and not force:
+            raise FakeApiError(grpc.StatusCode.FAILED_PRECONDITION, 'Tags exist, use force')
+        for name in names:
+            del self.tags[name]
+
+    def __match_search_predicate(self, entry, predicate):
+        match = _SEARCH_PREDICATE_REGEX.match(predicate)
+        if match:
+            qualifier, value = match.groups()
+            entry_value = {
+                'system': entry.integrated_system.name,
+                'type': entry.type_.name,
+                'projectid': self.__get_project_id(entry.name)
+            }[qualifier]
+            return entry_value.lower() == value.lower()
+
+        match = _SEARCH_TAG_PREDICATE_REGEX.match(predicate)
+        if match:
+            template_id, field_id, value = match.groups()
+            return any(
+                tag.template.split('/')[-1] == template_id and (
+                    not field_id or field_id in tag.fields
+                    and self.__format_tag_field_value(tag.fields[field_id]) == value.lower())
+                for name, tag in self.tags.items()
+                if self.__get_parent_name(name, 'tags') == entry.name)
+
+        if any(operator in predicate for operator in ':=<>'):
+            raise FakeApiError(grpc.StatusCode.INVALID_ARGUMENT,
+                               f'Predicate not supported by the fake server: {predicate}')
+
+        texts = [entry.name, entry.linked_resource, entry.display_name, entry.description]
+        return any(predicate.lower() in text.lower() for text in texts)
+
+    @classmethod
+    def __make_search_result(cls, entry):
+        result = datacatalog.SearchCatalogResult()
+        result.search_result_type = datacatalog.SearchResultType.ENTRY
+        result.relative_resource_name = entry.name
+        result.linked_resource = entry.linked_resource
+        result.integrated_system = entry.integrated_system
+        if entry.source_system_timestamps.update_time:
+            result.modify_time = entry.source_system_timestamps.update_time
+        return result
+
+    @classmethod
+    def __format_tag_field_value(cls, tag_field):
+        kind = datacatalog.TagField.pb(tag_field).WhichOneof('kind')
+        value = tag_field.enum_value.display_name if kind == 'enum_value' \
+            else getattr(tag_field, kind)
+        return str(value).lower()
+
+    @classmethod
+    def __get_page(cls, resources, request):
+        start = int(request.page_token or 0)
+        end = start + (request.page_size or _DEFAULT_PAGE_SIZE)
+        return resources[start:end], str(end) if end < len(resources) else ''
+
+    @classmethod
+    def __get_resource(cls, resources, name):
+        if name not in resources:
+            raise FakeApiError(grpc.StatusCode.PERMISSION_DENIED, name)
+        return resources[name]
+
+    @classmethod
+    def __check_not_exists(cls, resources, name):
+        if name in resources:
+            raise FakeApiError(grpc.StatusCode.ALREADY_EXISTS, name)
+
+    @classmethod
+    def __get_parent_name(cls, name, collection_id):
+        return name.rsplit(f'/{collection_id}/', 1)[0]
+
+    @classmethod
+    def __get_project_id(cls, name):
+        return name.split('/')[1]
+
+
+class FakeApiError(Exception):
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+"""
+Tools & utilities
+========================================
+"""
+
+
+def make_bigquery_table_entry(project_id, dataset_id, table_id, columns=None, update_time=None):
+    """
+    Make an Entry like the ones Data Catalog syncs from BigQuery tables.
+
+    :param columns: A list of STRING columns' names.
+    :param update_time: A timezone-aware datetime, defaults to now.
+    """
+    entry = datacatalog.Entry()
+    entry.name = f'projects/{project_id}/locations/us/entryGroups/@bigquery/entries/' \
+                 f'{dataset_id}_{table_id}'
+    entry.linked_resource = f'//bigquery.googleapis.com/projects/{project_id}' \
+                            f'/datasets/{dataset_id}/tables/{table_id}'
+    entry.display_name = table_id
+    entry.type_ = datacatalog.EntryType.TABLE
+    entry.integrated_system = datacatalog.IntegratedSystem.BIGQUERY
+    entry.source_system_timestamps.update_time = \
+        update_time or datetime.datetime.now(datetime.timezone.utc)
+
+    for column_name in columns or []:
+        column = datacatalog.ColumnSchema()
+        column.column = column_name
+        column.type_ = 'STRING'
+        entry.schema.columns.append(column)
+
+    return entry
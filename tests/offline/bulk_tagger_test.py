@@ -0,0 +1,46 @@
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+import grpc
+
+import bulk_tagger
+import quickstart
+from tests import fake_server
+
+TEST_PROJECT_ID = 'test-project'
+
+
+@mock.patch('time.sleep')
+def test_bulk_tagger_should_not_duplicate_tags_of_timed_out_calls(mock_sleep, datacatalog_server):
+    entries = [
+        fake_server.make_bigquery_table_entry(TEST_PROJECT_ID, 'dataset', f'table_{index}')
+        for index in range(3)
+    ]
+    for entry in entries:
+        datacatalog_server.servicer.add_entry(entry)
+    tag_template = quickstart.DataCatalogFacade().create_tag_template(
+        TEST_PROJECT_ID, 'test_template', 'Test Template',
+        [{
+            'id': 'has_pii',
+            'display_name': 'Has PII',
+            'primitive_type': datacatalog.FieldType.PrimitiveType.BOOL
+        }])
+    # The Tag is created, but the call times out.
+    datacatalog_server.inject_error('create_tag', grpc.StatusCode.DEADLINE_EXCEEDED, applied=True)
+
+    records = [{
+        'linked_resource': entry.linked_resource,
+        'template': tag_template.name,
+        'fields': {
+            'has_pii': 'true'
+        }
+    } for entry in entries]
+    report = bulk_tagger.BulkTagger(max_workers=2).run(records)
+
+    assert 2 == report.created_count
+    assert [exceptions.DeadlineExceeded] == [type(failure[2]) for failure in report.failures]
+    assert 3 == datacatalog_server.calls_count['create_tag']
+    tags_parents = sorted(
+        tag_name.split('/tags/')[0] for tag_name in datacatalog_server.servicer.tags)
+    assert [entry.name for entry in entries] == tags_parents
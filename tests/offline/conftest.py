@@ -0,0 +1,21 @@
+import pytest
+
+import api_throttling
+from tests import fake_server
+
+
+@pytest.fixture
+def datacatalog_server():
+    """
+    Start a fake Data Catalog server and make the API clients created by the test connect to it.
+    """
+    default_policy = api_throttling.get_default_policy()
+    with fake_server.FakeDataCatalogServer() as server:
+        api_throttling.configure(api_throttling.ApiCallPolicy())
+        api_throttling.configure_api_endpoint(server.api_endpoint, insecure=True)
+        yield server
+
+    api_throttling.configure_api_endpoint(None)
+    api_throttling.configure_clients()
+    api_throttling.clear_clients()
+    api_throttling.configure(default_policy)
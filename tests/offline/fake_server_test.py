@@ -0,0 +1,147 @@
+import asyncio
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+import grpc
+import pytest
+
+import api_instrumentation
+import api_throttling
+import quickstart
+from tests import fake_server
+
+TEST_TEMPLATE_NAME = 'projects/test-project/locations/us-central1/tagTemplates/test_template'
+
+
+def test_fake_server_should_report_missing_resources_as_permission_denied(datacatalog_server):
+    datacatalog_client = api_throttling.get_client(datacatalog.DataCatalogClient)
+
+    with pytest.raises(exceptions.PermissionDenied):
+        datacatalog_client.get_tag_template(name=TEST_TEMPLATE_NAME)
+
+
+def test_fake_server_should_raise_injected_errors(datacatalog_server):
+    datacatalog_server.inject_error('create_taxonomy', grpc.StatusCode.ALREADY_EXISTS)
+    policy_tag_manager_client = api_throttling.get_client(datacatalog.PolicyTagManagerClient)
+
+    taxonomy = datacatalog.Taxonomy(display_name='Test Taxonomy')
+    with pytest.raises(exceptions.AlreadyExists):
+        policy_tag_manager_client.create_taxonomy(parent='projects/p/locations/us',
+                                                  taxonomy=taxonomy)
+    # Injected errors are raised only once by default.
+    assert policy_tag_manager_client.create_taxonomy(parent='projects/p/locations/us',
+                                                     taxonomy=taxonomy).name
+
+
+def test_pooled_api_clients_should_spread_calls_across_channels(datacatalog_server):
+    api_throttling.configure_clients(channels_count=3, lazy=True)
+    datacatalog_client = api_throttling.get_client(datacatalog.DataCatalogClient)
+
+    for _ in range(6):
+        with pytest.raises(exceptions.PermissionDenied):
+            datacatalog_client.get_tag_template(name=TEST_TEMPLATE_NAME)
+
+    assert 6 == datacatalog_server.calls_count['get_tag_template']
+
+
+@mock.patch('time.sleep')
+def test_api_clients_should_retry_injected_quota_errors(mock_sleep, datacatalog_server):
+    datacatalog_server.servicer.add_entry(
+        fake_server.make_bigquery_table_entry('test-project', 'dataset', 'table'))
+    datacatalog_server.inject_error('lookup_entry', grpc.StatusCode.RESOURCE_EXHAUSTED, count=2)
+    datacatalog_client = api_throttling.get_client(datacatalog.DataCatalogClient)
+
+    entry = datacatalog_client.lookup_entry(
+        request={
+            'linked_resource':
+            '//bigquery.googleapis.com/projects/test-project/datasets/dataset/tables/table'
+        })
+
+    assert 'table' == entry.display_name
+    assert 3 == datacatalog_server.calls_count['lookup_entry']
+    assert 2 == api_throttling.get_default_policy().counters['read']['retried']
+
+
+@mock.patch('time.sleep')
+def test_api_clients_should_throttle_and_retry_every_page(mock_sleep, datacatalog_server):
+    for index in range(50):
+        datacatalog_server.servicer.add_entry(
+            fake_server.make_bigquery_table_entry('test-project', 'dataset', f'table_{index}'))
+    api_throttling.configure(api_throttling.ApiCallPolicy({'search': 1}))
+    datacatalog_client = api_throttling.get_client(datacatalog.DataCatalogClient)
+
+    request = {
+        'scope': {
+            'include_project_ids': ['test-project']
+        },
+        'query': 'system=bigquery',
+        'page_size': 5
+    }
+    pager = datacatalog_client.search_catalog(request=request)
+    datacatalog_server.inject_error('search_catalog', grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+    assert 50 == len(list(pager))
+    assert 11 == datacatalog_server.calls_count['search_catalog']
+    # The pages are fetched at once, so all of them but the first are throttled.
+    assert {
+        'calls': 10,
+        'throttled': 9,
+        'retried': 1
+    } == api_throttling.get_default_policy().counters['search']
+
+
+def test_api_clients_should_record_every_page(datacatalog_server):
+    for index in range(50):
+        datacatalog_server.servicer.add_entry(
+            fake_server.make_bigquery_table_entry('test-project', 'dataset', f'table_{index}'))
+    default_recorder = api_instrumentation.get_default_recorder()
+    recorder = api_instrumentation.ApiCallsRecorder()
+    api_instrumentation.configure(recorder)
+
+    try:
+        results = list(quickstart.DataCatalogFacade().iter_search_catalog(
+            'test-org', 'system=bigquery', project_ids=['test-project'], page_size=5))
+    finally:
+        api_instrumentation.configure(default_recorder)
+
+    assert 50 == len(results)
+    stats = recorder.methods_stats['search_catalog']
+    assert 10 == stats['calls']
+    assert 10 == sum(stats['latency_buckets'].values())
+    # Each page's results are counted once, the first one included.
+    single_page_bytes = datacatalog.SearchCatalogResponse.pb(
+        datacatalog.SearchCatalogResponse(results=[results[0]])).ByteSize()
+    assert 50 * single_page_bytes <= stats['response_bytes']
+
+
+def test_async_api_clients_should_count_every_page(datacatalog_server):
+    table_entry = fake_server.make_bigquery_table_entry('test-project', 'dataset', 'table')
+    datacatalog_server.servicer.add_entry(table_entry)
+    for index in range(25):
+        tag = datacatalog.Tag(name=f'{table_entry.name}/tags/{index}', template=TEST_TEMPLATE_NAME)
+        datacatalog_server.servicer.tags[tag.name] = tag
+
+    loop = asyncio.new_event_loop()
+    try:
+        tags = loop.run_until_complete(quickstart.AsyncDataCatalogFacade().list_tags(
+            table_entry.name))
+    finally:
+        loop.close()
+
+    assert 25 == len(tags)
+    assert 3 == datacatalog_server.calls_count['list_tags']
+    assert 3 == api_throttling.get_default_policy().counters['read']['calls']
+
+
+def test_fake_server_should_enforce_quotas():
+    with fake_server.FakeDataCatalogServer(quotas={'search': 2}) as server:
+        api_throttling.configure_api_endpoint(server.api_endpoint, insecure=True)
+        datacatalog_client = api_throttling.get_client(datacatalog.DataCatalogClient)
+        api_throttling.configure_api_endpoint(None)
+
+        request = {'scope': {'include_project_ids': ['test-project']}, 'query': 'test'}
+        datacatalog_client.search_catalog(request=request, retry=None)
+        datacatalog_client.search_catalog(request=request, retry=None)
+        with pytest.raises(exceptions.ResourceExhausted):
+            datacatalog_client.search_catalog(request=request, retry=None)
@@ -0,0 +1,47 @@
+import policy_tags_manager
+
+TEST_PROJECT_ID = 'test-project'
+
+
+def test_taxonomy_manager_import_and_sync_taxonomy(datacatalog_server):
+    taxonomy_manager = policy_tags_manager.TaxonomyManager()
+    taxonomy = taxonomy_manager.import_taxonomy(TEST_PROJECT_ID, 'Test Taxonomy', make_tree())
+
+    policy_tags_tree = make_tree()
+    policy_tags_tree[0]['children'][0]['description'] = 'Emails'
+    # Moves Phone from PII to Contact.
+    policy_tags_tree[1]['children'].append(policy_tags_tree[0]['children'].pop())
+    changes = taxonomy_manager.sync_taxonomy(TEST_PROJECT_ID, taxonomy.name, policy_tags_tree)
+
+    assert [('Contact', 'Phone')] == [change['path'] for change in changes['create']]
+    assert [('PII', 'Email')] == [change['path'] for change in changes['update']]
+    assert [('PII', 'Phone')] == [change['path'] for change in changes['delete']]
+
+    # A clean re-run only lists the existing Policy Tags.
+    list_calls_count = datacatalog_server.calls_count['list_policy_tags']
+    changes = taxonomy_manager.sync_taxonomy(TEST_PROJECT_ID, taxonomy.name, policy_tags_tree)
+    assert {'create': [], 'update': [], 'delete': []} == changes
+    assert list_calls_count + 1 == datacatalog_server.calls_count['list_policy_tags']
+
+
+def test_taxonomy_manager_export_and_import_taxonomies(datacatalog_server):
+    taxonomy_manager = policy_tags_manager.TaxonomyManager()
+    taxonomy = taxonomy_manager.import_taxonomy(TEST_PROJECT_ID, 'Test Taxonomy', make_tree())
+
+    serialized_taxonomies = taxonomy_manager.export_taxonomies(TEST_PROJECT_ID, [taxonomy.name])
+    serialized_taxonomies[0].display_name = 'Test Taxonomy Copy'
+    taxonomies = taxonomy_manager.import_taxonomies(TEST_PROJECT_ID, serialized_taxonomies)
+
+    assert ['Test Taxonomy Copy'] == [taxonomy.display_name for taxonomy in taxonomies]
+    assert 10 == len(datacatalog_server.servicer.policy_tags)
+
+
+def make_tree():
+    return [
+        make_node('PII', [make_node('Email'), make_node('Phone')]),
+        make_node('Contact', [make_node('Address')])
+    ]
+
+
+def make_node(display_name, children=None):
+    return {'display_name': display_name, 'description': None, 'children': children or []}
@@ -0,0 +1,71 @@
+import asyncio
+
+from google.cloud import datacatalog
+
+import quickstart
+from tests import fake_server
+
+TEST_PROJECT_ID = 'test-project'
+
+
+def test_datacatalog_facade_create_tags_and_search_them(datacatalog_server):
+    table_entry = fake_server.make_bigquery_table_entry(TEST_PROJECT_ID, 'dataset', 'table',
+                                                        ['email'])
+    datacatalog_server.servicer.add_entry(table_entry)
+    datacatalog_facade = quickstart.DataCatalogFacade()
+
+    tag_template = datacatalog_facade.create_tag_template(
+        TEST_PROJECT_ID, 'test_template', 'Test Template',
+        [{
+            'id': 'has_pii',
+            'display_name': 'Has PII',
+            'primitive_type': datacatalog.FieldType.PrimitiveType.BOOL
+        }])
+    datacatalog_facade.create_tag_template_field(tag_template.name, 'pii_type', 'PII Type',
+                                                 [{
+                                                     'display_name': 'EMAIL'
+                                                 }])
+    tag_template = datacatalog_facade.get_tag_template(tag_template.name)
+
+    entry = datacatalog_facade.lookup_entry(table_entry.linked_resource)
+    datacatalog_facade.create_tag(entry, tag_template,
+                                  [{
+                                      'id': 'has_pii',
+                                      'primitive_type': datacatalog.FieldType.PrimitiveType.BOOL,
+                                      'value': True
+                                  }, {
+                                      'id': 'pii_type',
+                                      'primitive_type': None,
+                                      'value': 'EMAIL'
+                                  }], 'email')
+
+    assert ['email'] == [tag.column for tag in datacatalog_facade.list_tags(entry.name)]
+    results = datacatalog_facade.search_catalog('test-org', 'tag:test_template.has_pii=true')
+    assert [entry.name] == [result.relative_resource_name for result in results]
+
+
+def test_datacatalog_facade_iter_search_catalog_should_fetch_all_pages(datacatalog_server):
+    for index in range(25):
+        datacatalog_server.servicer.add_entry(
+            fake_server.make_bigquery_table_entry(TEST_PROJECT_ID, 'dataset', f'table_{index}'))
+
+    results = list(quickstart.DataCatalogFacade().iter_search_catalog('test-org',
+                                                                      'system=bigquery type=table',
+                                                                      page_size=10))
+
+    assert 25 == len(results)
+    assert 3 == datacatalog_server.calls_count['search_catalog']
+
+
+def test_async_datacatalog_facade_get_entry(datacatalog_server):
+    table_entry = fake_server.make_bigquery_table_entry(TEST_PROJECT_ID, 'dataset', 'table')
+    datacatalog_server.servicer.add_entry(table_entry)
+
+    loop = asyncio.new_event_loop()
+    try:
+        entry = loop.run_until_complete(quickstart.AsyncDataCatalogFacade().get_entry(
+            table_entry.name))
+    finally:
+        loop.close()
+
+    assert table_entry.linked_resource == entry.linked_resource
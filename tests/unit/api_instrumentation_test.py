@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+from googleapiclient import errors
+
+import api_instrumentation
+import api_throttling
+
+
+class ApiCallsRecorderTest(unittest.TestCase):
+
+    def test_start_call_should_record_latency_and_payload_sizes(self):
+        recorder = api_instrumentation.ApiCallsRecorder()
+        tag_template = datacatalog.TagTemplate(display_name='Template ABC')
+
+        with mock.patch('api_instrumentation.time.perf_counter', side_effect=[10.0, 10.02]):
+            with recorder.start_call('create_tag_template', 'parent', tag_template) as api_call:
+                api_call.response = tag_template
+
+        stats = recorder.methods_stats['create_tag_template']
+        self.assertEqual(1, stats['calls'])
+        self.assertAlmostEqual(0.02, stats['seconds_sum'])
+        self.assertEqual(1, stats['latency_buckets'][0.025])
+        self.assertEqual(len('parent') + 14, stats['request_bytes'])
+        self.assertEqual(14, stats['response_bytes'])
+        self.assertEqual({}, stats['errors'])
+
+    def test_start_call_should_record_error_codes_and_retries(self):
+        recorder = api_instrumentation.ApiCallsRecorder()
+
+        with self.assertRaises(exceptions.PermissionDenied):
+            with recorder.start_call('get_tag_template', 'name') as api_call:
+                api_call.add_retry(exceptions.ServiceUnavailable(''))
+                raise exceptions.PermissionDenied('')
+
+        stats = recorder.methods_stats['get_tag_template']
+        self.assertEqual(1, stats['retries'])
+        self.assertEqual({'PERMISSION_DENIED': 1}, stats['errors'])
+
+    def test_start_call_should_trace_calls_if_tracer(self):
+        mock_tracer = mock.MagicMock()
+        recorder = api_instrumentation.ApiCallsRecorder(mock_tracer)
+
+        with recorder.start_call('delete_tag', 'name'):
+            pass
+
+        mock_tracer.start_span.assert_called_once_with('delete_tag')
+        mock_span = mock_tracer.start_span.return_value
+        self.assertEqual('OK', mock_span.set_attributes.call_args[0][0]['api.error_code'])
+        mock_span.end.assert_called_once()
+
+    def test_write_json_should_write_methods_stats(self):
+        recorder = api_instrumentation.ApiCallsRecorder()
+        recorder.record('get_entry', 0.3, request_bytes=10, response_bytes=100)
+        recorder.record('get_entry', 0.002, error_code='NOT_FOUND')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'metrics.json')
+            recorder.write_json(file_path)
+            with open(file_path) as json_file:
+                metrics = json.load(json_file)
+
+        self.assertEqual(2, metrics['get_entry']['calls'])
+        self.assertEqual(1, metrics['get_entry']['latency_buckets']['0.5'])
+        self.assertEqual({'NOT_FOUND': 1}, metrics['get_entry']['errors'])
+
+    def test_write_prometheus_should_write_cumulative_histograms(self):
+        recorder = api_instrumentation.ApiCallsRecorder()
+        recorder.record('get_entry', 0.003)
+        recorder.record('get_entry', 0.2, error_code='UNAVAILABLE', retries=2)
+        recorder.record('get_entry', 30)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'metrics.prom')
+            recorder.write_prometheus(file_path)
+            with open(file_path) as prometheus_file:
+                lines = prometheus_file.read().splitlines()
+
+        self.assertIn('api_call_duration_seconds_bucket{method="get_entry",le="0.005"} 1', lines)
+        self.assertIn('api_call_duration_seconds_bucket{method="get_entry",le="10"} 2', lines)
+        self.assertIn('api_call_duration_seconds_bucket{method="get_entry",le="+Inf"} 3', lines)
+        self.assertIn('api_call_duration_seconds_count{method="get_entry"} 3', lines)
+        self.assertIn('api_call_retries_total{method="get_entry"} 2', lines)
+        self.assertIn('api_call_errors_total{method="get_entry",code="UNAVAILABLE"} 1', lines)
+
+    def test_log_summary_should_log_a_row_per_method(self):
+        recorder = api_instrumentation.ApiCallsRecorder()
+        recorder.record('get_entry', 0.1)
+        recorder.record('search_catalog', 0.2, error_code='RESOURCE_EXHAUSTED')
+
+        with self.assertLogs(level='INFO') as logs:
+            recorder.log_summary()
+
+        # Title, headers, and a row per method.
+        self.assertEqual(4, len(logs.output))
+        self.assertIn('RESOURCE_EXHAUSTED: 1', logs.output[3])
+
+
+class ThrottledClientInstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__default_recorder = api_instrumentation.get_default_recorder()
+        self.recorder = api_instrumentation.ApiCallsRecorder()
+        api_instrumentation.configure(self.recorder)
+
+    def tearDown(self):
+        api_instrumentation.configure(self.__default_recorder)
+
+    @mock.patch('time.sleep')
+    def test_api_methods_should_be_recorded_with_their_retries(self, mock_sleep):
+        mock_client = mock.MagicMock()
+        results = iter([exceptions.ServiceUnavailable(''), datacatalog.Entry(name='entry')])
+
+        def get_entry(retry, timeout, **kwargs):
+
+            def attempt():
+                result = next(results)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+            return retry(attempt)()
+
+        mock_client.get_entry.side_effect = get_entry
+        throttled_client = api_throttling.ThrottledClient(mock_client,
+                                                          api_throttling.ApiCallPolicy())
+
+        throttled_client.get_entry(name='entry')
+
+        stats = self.recorder.methods_stats['get_entry']
+        self.assertEqual(1, stats['calls'])
+        self.assertEqual(1, stats['retries'])
+        self.assertEqual(len('entry'), stats['request_bytes'])
+        self.assertEqual(7, stats['response_bytes'])
+
+
+class GetErrorCodeTest(unittest.TestCase):
+
+    def test_get_error_code_should_support_api_and_http_errors(self):
+        http_error = errors.HttpError(mock.MagicMock(status=400), b'')
+
+        self.assertEqual('NOT_FOUND', api_instrumentation.get_error_code(exceptions.NotFound('')))
+        self.assertEqual('HTTP_400', api_instrumentation.get_error_code(http_error))
+        self.assertEqual('ValueError', api_instrumentation.get_error_code(ValueError()))
+
+
+class ApiInstrumentationCLITest(unittest.TestCase):
+
+    def setUp(self):
+        self.__default_recorder = api_instrumentation.get_default_recorder()
+
+    def tearDown(self):
+        api_instrumentation.configure(self.__default_recorder)
+
+    @mock.patch('api_instrumentation.trace')
+    def test_configure_from_args_should_set_tracer_if_tracing(self, mock_trace):
+        parser = argparse.ArgumentParser()
+        api_instrumentation.add_arguments(parser)
+        args = parser.parse_args(['--api-tracing'])
+
+        recorder = api_instrumentation.configure_from_args(args)
+
+        self.assertIs(recorder, api_instrumentation.get_default_recorder())
+        with recorder.start_call('get_entry'):
+            pass
+        mock_trace.get_tracer.return_value.start_span.assert_called_once_with('get_entry')
+
+    @mock.patch('api_instrumentation.trace', None)
+    def test_configure_from_args_should_raise_if_tracing_not_installed(self):
+        parser = argparse.ArgumentParser()
+        api_instrumentation.add_arguments(parser)
+        args = parser.parse_args(['--api-tracing'])
+
+        self.assertRaises(ValueError, api_instrumentation.configure_from_args, args)
+
+    @mock.patch('api_instrumentation.ApiCallsRecorder.write_prometheus')
+    def test_report_from_args_should_write_requested_format(self, mock_write_prometheus):
+        parser = argparse.ArgumentParser()
+        api_instrumentation.add_arguments(parser)
+        args = parser.parse_args(
+            ['--api-metrics-file', 'metrics.prom', '--api-metrics-format', 'prometheus'])
+        api_instrumentation.configure_from_args(args)
+
+        api_instrumentation.report_from_args(args)
+
+        mock_write_prometheus.assert_called_once_with('metrics.prom')
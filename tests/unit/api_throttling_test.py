@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.api_core import retry
+from google.api_core import retry_async
+from google.cloud import datacatalog
+
+import api_throttling
+
+
+class ApiCallPolicyTest(unittest.TestCase):
+
+    @mock.patch('api_throttling.TokenBucket')
+    def test_reserve_call_should_count_throttled_calls(self, mock_token_bucket):
+        mock_token_bucket.return_value.reserve.side_effect = [0, 0.5]
+        policy = api_throttling.ApiCallPolicy({'write': 10})
+
+        self.assertEqual(0, policy.reserve_call('write'))
+        self.assertEqual(0.5, policy.reserve_call('write'))
+        self.assertEqual(0, policy.reserve_call('read'))
+
+        mock_token_bucket.assert_called_once_with(10)
+        self.assertEqual({'calls': 2, 'throttled': 1, 'retried': 0}, policy.counters['write'])
+        self.assertEqual({'calls': 1, 'throttled': 0, 'retried': 0}, policy.counters['read'])
+
+    def test_set_call_options_should_keep_options_set_by_caller(self):
+        policy = api_throttling.ApiCallPolicy(timeout=30)
+
+        kwargs = {'retry': None}
+        policy.set_call_options('write', kwargs)
+
+        self.assertEqual({'retry': None, 'timeout': 30}, kwargs)
+
+    def test_set_call_options_should_use_async_retry_for_async_calls(self):
+        policy = api_throttling.ApiCallPolicy()
+
+        kwargs = {}
+        policy.set_call_options('read', kwargs)
+        async_kwargs = {}
+        policy.set_call_options('read', async_kwargs, async_call=True)
+
+        self.assertIsInstance(kwargs['retry'], retry.Retry)
+        self.assertIsInstance(async_kwargs['retry'], retry_async.AsyncRetry)
+
+    def test_set_call_options_should_not_retry_when_disabled(self):
+        policy = api_throttling.ApiCallPolicy(timeout=None, retry_deadline=0)
+
+        kwargs = {}
+        policy.set_call_options('read', kwargs)
+
+        self.assertEqual({}, kwargs)
+
+
+@mock.patch('time.sleep')
+class ThrottledClientTest(unittest.TestCase):
+
+    def test_api_methods_should_be_retried_on_transient_errors(self, mock_sleep):
+        mock_client = mock.MagicMock()
+        policy = api_throttling.ApiCallPolicy()
+        throttled_client = api_throttling.ThrottledClient(mock_client, policy)
+
+        # The mocked method applies the retry option it receives, as the API clients do.
+        results = iter([exceptions.ResourceExhausted(''), exceptions.ServiceUnavailable(''), 'ok'])
+
+        def get_entry(retry, timeout, **kwargs):
+            self.assertEqual(60, timeout)
+
+            def attempt():
+                result = next(results)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+            return retry(attempt)()
+
+        mock_client.get_entry.side_effect = get_entry
+
+        self.assertEqual('ok', throttled_client.get_entry(name='entry'))
+        self.assertEqual(2, policy.counters['read']['retried'])
+
+    def test_api_methods_should_not_retry_permanent_errors(self, mock_sleep):
+        mock_client = mock.MagicMock()
+        mock_client.get_entry.side_effect = lambda retry, **kwargs: retry(
+            mock.MagicMock(side_effect=exceptions.PermissionDenied('')))()
+        policy = api_throttling.ApiCallPolicy()
+
+        self.assertRaises(exceptions.PermissionDenied,
+                          api_throttling.ThrottledClient(mock_client, policy).get_entry)
+        self.assertEqual(0, policy.counters['read']['retried'])
+
+    def test_write_methods_should_not_retry_deadline_exceeded(self, mock_sleep):
+        mock_client = mock.MagicMock()
+        attempt = mock.MagicMock(side_effect=exceptions.DeadlineExceeded(''))
+        mock_client.create_tag.side_effect = lambda retry, **kwargs: retry(attempt)()
+        policy = api_throttling.ApiCallPolicy()
+
+        # The Tag may have been created, so a retry could create a duplicate.
+        self.assertRaises(exceptions.DeadlineExceeded,
+                          api_throttling.ThrottledClient(mock_client, policy).create_tag)
+        attempt.assert_called_once()
+        self.assertEqual(0, policy.counters['write']['retried'])
+
+    @mock.patch('api_throttling.TokenBucket')
+    def test_api_methods_should_wait_for_token_bucket(self, mock_token_bucket, mock_sleep):
+        mock_token_bucket.return_value.reserve.return_value = 0.25
+        mock_client = mock.MagicMock()
+        policy = api_throttling.ApiCallPolicy({'search': 4})
+
+        api_throttling.ThrottledClient(mock_client, policy).search_catalog(request='request')
+
+        mock_sleep.assert_called_once_with(0.25)
+        self.assertEqual('request', mock_client.search_catalog.call_args[1]['request'])
+
+    def test_other_attributes_should_be_returned_as_they_are(self, mock_sleep):
+        mock_client = mock.MagicMock()
+        throttled_client = api_throttling.ThrottledClient(mock_client)
+
+        self.assertIs(mock_client.common_location_path, throttled_client.common_location_path)
+
+    @mock.patch('api_throttling._default_policy')
+    def test_api_methods_should_use_default_policy_if_none(self, mock_default_policy, mock_sleep):
+        mock_default_policy.reserve_call.return_value = 0
+
+        api_throttling.ThrottledClient(mock.MagicMock()).delete_tag(name='tag')
+
+        mock_default_policy.reserve_call.assert_called_once_with('write')
+
+
+class GetClientTest(unittest.TestCase):
+
+    def tearDown(self):
+        api_throttling.configure_api_endpoint(None)
+        api_throttling.configure_clients()
+        api_throttling.clear_clients()
+
+    def test_get_client_should_use_default_endpoint_if_none(self):
+        mock_client_class = mock.MagicMock()
+
+        client = api_throttling.get_client(mock_client_class)
+
+        self.assertIsInstance(client, api_throttling.ThrottledClient)
+        mock_client_class.assert_called_once_with()
+
+    def test_get_client_should_share_clients(self):
+        mock_client_class = mock.MagicMock()
+
+        api_throttling.get_client(mock_client_class).get_entry(name='entry-1')
+        api_throttling.get_client(mock_client_class).get_entry(name='entry-2')
+
+        mock_client_class.assert_called_once_with()
+        self.assertEqual(2, mock_client_class.return_value.get_entry.call_count)
+
+    def test_get_client_should_use_configured_endpoint(self):
+        mock_client_class = mock.MagicMock()
+        api_throttling.configure_api_endpoint('datacatalog.example.com:443')
+
+        api_throttling.get_client(mock_client_class)
+
+        mock_client_class.assert_called_once_with(
+            client_options={'api_endpoint': 'datacatalog.example.com:443'})
+
+    @mock.patch('api_throttling.grpc.insecure_channel')
+    def test_get_client_should_use_insecure_transport_if_set(self, mock_insecure_channel):
+        mock_client_class = mock.MagicMock()
+        api_throttling.configure_api_endpoint('localhost:8080', insecure=True)
+
+        api_throttling.get_client(mock_client_class)
+
+        mock_client_class.get_transport_class.assert_called_once_with('grpc')
+        mock_insecure_channel.assert_called_once_with('localhost:8080',
+                                                      options=api_throttling._CHANNEL_OPTIONS)
+        transport_class = mock_client_class.get_transport_class.return_value
+        transport_class.assert_called_once_with(host='localhost:8080',
+                                                channel=mock_insecure_channel.return_value)
+        self.assertIs(transport_class.return_value, mock_client_class.call_args[1]['transport'])
+
+    def test_get_client_should_spread_calls_across_channels_pool(self):
+        mock_client_class = mock.MagicMock()
+        mock_clients = [mock.MagicMock(), mock.MagicMock()]
+        mock_client_class.side_effect = mock_clients
+        api_throttling.configure_clients(channels_count=2)
+
+        client = api_throttling.get_client(mock_client_class)
+        for _ in range(3):
+            client.get_entry(name='entry')
+
+        self.assertEqual(2, mock_clients[0].get_entry.call_count)
+        self.assertEqual(1, mock_clients[1].get_entry.call_count)
+        # Each client gets a channel of its own.
+        transport_class = mock_client_class.get_transport_class.return_value
+        self.assertEqual(2, transport_class.create_channel.call_count)
+        transport_class.create_channel.assert_called_with(
+            mock_client_class.DEFAULT_ENDPOINT, options=api_throttling._POOLED_CHANNEL_OPTIONS)
+
+    def test_get_client_should_create_clients_on_first_call_if_lazy(self):
+        mock_client_class = mock.MagicMock()
+        api_throttling.configure_clients(lazy=True)
+
+        client = api_throttling.get_client(mock_client_class)
+        mock_client_class.assert_not_called()
+
+        client.get_entry(name='entry')
+        mock_client_class.assert_called_once_with()
+
+    def test_get_client_should_not_create_clients_for_path_helpers(self):
+        api_throttling.configure_clients(lazy=True)
+        client = api_throttling.get_client(datacatalog.DataCatalogClient)
+
+        self.assertEqual('projects/test-project/locations/us',
+                         client.common_location_path('test-project', 'us'))
+        # No client was created, so the default credentials were not required.
+        self.assertIsNone(client._ThrottledClient__client._ClientPool__clients)
+
+
+class AsyncThrottledClientTest(unittest.TestCase):
+
+    @mock.patch('api_throttling.asyncio.sleep', new_callable=mock.MagicMock)
+    @mock.patch('api_throttling.TokenBucket')
+    def test_api_methods_should_wait_without_blocking(self, mock_token_bucket, mock_sleep):
+        mock_token_bucket.return_value.reserve.return_value = 0.5
+        mock_sleep.side_effect = lambda seconds: make_coroutine()
+
+        client = FakeAsyncClient()
+        policy = api_throttling.ApiCallPolicy({'read': 2})
+        result = run_until_complete(
+            api_throttling.AsyncThrottledClient(client, policy).get_tag_template(name='t'))
+
+        self.assertEqual('t', result)
+        mock_sleep.assert_called_once_with(0.5)
+        self.assertIsInstance(client.kwargs['retry'], retry_async.AsyncRetry)
+
+
+@mock.patch('api_throttling.time.monotonic')
+class TokenBucketTest(unittest.TestCase):
+
+    def test_reserve_should_allow_bursts_up_to_capacity(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+
+        token_bucket = api_throttling.TokenBucket(rate=2)
+
+        self.assertEqual([0, 0, 0.5, 1.0], [token_bucket.reserve() for _ in range(4)])
+
+    def test_reserve_should_refill_tokens_over_time(self, mock_monotonic):
+        mock_monotonic.side_effect = [100.0, 100.0, 100.0, 101.0]
+
+        token_bucket = api_throttling.TokenBucket(rate=1)
+
+        self.assertEqual(0, token_bucket.reserve())
+        self.assertEqual(1.0, token_bucket.reserve())
+        # One second later, the token reserved by the previous call has been added.
+        self.assertEqual(1.0, token_bucket.reserve())
+
+
+class ApiThrottlingCLITest(unittest.TestCase):
+
+    @mock.patch('api_throttling._default_policy')
+    def test_configure_from_args_should_set_default_policy(self, mock_default_policy):
+        parser = argparse.ArgumentParser()
+        api_throttling.add_arguments(parser)
+        args = parser.parse_args(['--max-write-rate', '5', '--api-retry-deadline', '0'])
+
+        policy = api_throttling.configure_from_args(args)
+
+        self.assertIs(policy, api_throttling.get_default_policy())
+        self.assertEqual(5.0, args.max_write_rate)
+        self.assertIsNone(args.max_read_rate)
+        # Retries are disabled, so only the default timeout is set.
+        kwargs = {}
+        policy.set_call_options('write', kwargs)
+        self.assertEqual({'timeout': 60}, kwargs)
+
+
+class FakeAsyncClient:
+
+    async def get_tag_template(self, name, **kwargs):
+        self.kwargs = kwargs
+        return name
+
+
+async def make_coroutine():
+    pass
+
+
+def run_until_complete(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,216 @@
+import io
+import threading
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+
+import bulk_tagger
+
+_TEST_TEMPLATE_NAME = 'projects/test-project/locations/us-central1/tagTemplates/test_template'
+
+
+class BulkTaggerTest(unittest.TestCase):
+
+    @mock.patch('bulk_tagger.quickstart.DataCatalogFacade')
+    def setUp(self, mock_datacatalog_facade):
+        self.__bulk_tagger = bulk_tagger.BulkTagger(max_workers=2)
+        # Shortcut for the object assigned to self.__bulk_tagger.__datacatalog_facade
+        self.__datacatalog_facade = mock_datacatalog_facade.return_value
+        self.__datacatalog_facade.get_tag_template.return_value = make_tag_template()
+
+    def test_constructor_should_set_instance_attributes(self):
+        self.assertIsNotNone(self.__bulk_tagger.__dict__['_BulkTagger__datacatalog_facade'])
+
+    def test_run_should_create_tag_for_each_record(self):
+        report = self.__bulk_tagger.run(make_records(5))
+
+        datacatalog_facade = self.__datacatalog_facade
+        self.assertEqual(5, report.created_count)
+        self.assertEqual([], report.failures)
+        self.assertEqual(5, datacatalog_facade.lookup_entry.call_count)
+        self.assertEqual(5, datacatalog_facade.create_tag.call_count)
+        # The Tag Template is fetched only once.
+        datacatalog_facade.get_tag_template.assert_called_once_with(_TEST_TEMPLATE_NAME)
+
+    def test_run_should_convert_fields_values(self):
+        records = [{
+            'linked_resource': '//bigquery.googleapis.com/projects/p/datasets/d/tables/t',
+            'template': _TEST_TEMPLATE_NAME,
+            'column': 'email',
+            'fields': {
+                'bool_field': 'TRUE',
+                'double_field': '1.5',
+                'enum_field': 'EMAIL'
+            }
+        }]
+
+        self.__bulk_tagger.run(records)
+
+        datacatalog_facade = self.__datacatalog_facade
+        _, tag_template, fields_descriptors, column = \
+            datacatalog_facade.create_tag.call_args[0]
+        self.assertEqual(_TEST_TEMPLATE_NAME, tag_template.name)
+        self.assertEqual('email', column)
+        self.assertEqual([{
+            'id': 'bool_field',
+            'primitive_type': datacatalog.FieldType.PrimitiveType.BOOL,
+            'value': True
+        }, {
+            'id': 'double_field',
+            'primitive_type': datacatalog.FieldType.PrimitiveType.DOUBLE,
+            'value': 1.5
+        }, {
+            'id': 'enum_field',
+            'primitive_type': None,
+            'value': 'EMAIL'
+        }], fields_descriptors)
+
+    def test_run_should_isolate_records_failures(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.lookup_entry.side_effect = [
+            exceptions.PermissionDenied(message=''),
+            mock.MagicMock(),
+            mock.MagicMock()
+        ]
+
+        records = make_records(3)
+        records[2]['fields'] = {'unknown_field': 'value'}
+
+        report = self.__bulk_tagger.run(records)
+
+        self.assertEqual(1, report.created_count)
+        self.assertEqual([1, 3], sorted(failure[0] for failure in report.failures))
+
+    def test_run_should_report_invalid_bool_values(self):
+        records = make_records(1)
+        records[0]['fields'] = {'bool_field': 'maybe'}
+
+        report = self.__bulk_tagger.run(records)
+
+        self.assertEqual(0, report.created_count)
+        self.assertIsInstance(report.failures[0][2], ValueError)
+        self.__datacatalog_facade.create_tag.assert_not_called()
+
+    def test_run_should_fetch_tag_templates_concurrently(self):
+        other_template_fetched = threading.Event()
+
+        def get_tag_template(name):
+            # Blocks until the other Template is fetched by the other worker.
+            if name == 'other_template':
+                other_template_fetched.set()
+            elif not other_template_fetched.wait(5):
+                raise TimeoutError()
+            return make_tag_template()
+
+        self.__datacatalog_facade.get_tag_template.side_effect = get_tag_template
+        records = make_records(2)
+        records[1]['template'] = 'other_template'
+
+        report = self.__bulk_tagger.run(records)
+
+        self.assertEqual([], report.failures)
+        self.assertEqual(2, report.created_count)
+
+    def test_run_should_fetch_failed_tag_templates_once(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template.side_effect = exceptions.PermissionDenied(message='')
+
+        report = self.__bulk_tagger.run(make_records(5))
+
+        self.assertEqual(5, report.failures_count)
+        datacatalog_facade.get_tag_template.assert_called_once_with(_TEST_TEMPLATE_NAME)
+        datacatalog_facade.lookup_entry.assert_not_called()
+
+
+@mock.patch('bulk_tagger.open', new_callable=mock.mock_open)
+class TagRecordsReaderTest(unittest.TestCase):
+
+    def test_iter_records_should_handle_json_lines_files(self, mock_open):
+        mock_open.return_value = io.StringIO(
+            '{"linked_resource": "resource", "template": "template", "fields": {"a": true}}\n'
+            '\n')
+
+        records = list(bulk_tagger.TagRecordsReader.iter_records('tags.jsonl'))
+
+        mock_open.assert_called_once_with('tags.jsonl', mode='r')
+        self.assertEqual([{
+            'linked_resource': 'resource',
+            'template': 'template',
+            'fields': {
+                'a': True
+            }
+        }], records)
+
+    def test_iter_records_should_handle_csv_files(self, mock_open):
+        mock_open.return_value = io.StringIO('linked_resource,template,column,a,b\n'
+                                             'resource,template,,true,\n')
+
+        records = list(bulk_tagger.TagRecordsReader.iter_records('tags.csv'))
+
+        self.assertEqual([{
+            'linked_resource': 'resource',
+            'template': 'template',
+            'column': '',
+            'fields': {
+                'a': 'true'
+            }
+        }], records)
+
+    def test_iter_records_should_read_lazily(self, mock_open):
+        records = bulk_tagger.TagRecordsReader.iter_records('tags.csv')
+
+        mock_open.assert_not_called()
+        self.assertEqual([], list(records))
+
+
+class BulkTaggingReportTest(unittest.TestCase):
+
+    @mock.patch('bulk_tagger.time.perf_counter')
+    def test_throughput_should_return_tags_per_second(self, mock_perf_counter):
+        mock_perf_counter.side_effect = [10.0, 12.0]
+
+        report = bulk_tagger.BulkTaggingReport()
+        for _ in range(5):
+            report.add_success()
+        report.add_failure(6, {}, ValueError())
+        report.finish()
+
+        self.assertEqual(2.5, report.throughput)
+
+    def test_add_failure_should_keep_first_failures_only(self):
+        report = bulk_tagger.BulkTaggingReport()
+        for record_number in range(1, 16):
+            report.add_failure(record_number, {}, ValueError())
+
+        self.assertEqual(15, report.failures_count)
+        self.assertEqual(list(range(1, 11)), [failure[0] for failure in report.failures])
+
+
+def make_tag_template():
+    tag_template = datacatalog.TagTemplate()
+    tag_template.name = _TEST_TEMPLATE_NAME
+
+    for field_id, primitive_type in [('bool_field', 'BOOL'), ('double_field', 'DOUBLE')]:
+        field = datacatalog.TagTemplateField()
+        field.type_.primitive_type = datacatalog.FieldType.PrimitiveType[primitive_type]
+        tag_template.fields[field_id] = field
+
+    enum_field = datacatalog.TagTemplateField()
+    enum_value = datacatalog.FieldType.EnumType.EnumValue()
+    enum_value.display_name = 'EMAIL'
+    enum_field.type_.enum_type.allowed_values.append(enum_value)
+    tag_template.fields['enum_field'] = enum_field
+
+    return tag_template
+
+
+def make_records(count):
+    return [{
+        'linked_resource': f'//bigquery.googleapis.com/projects/p/datasets/d/tables/t{index}',
+        'template': _TEST_TEMPLATE_NAME,
+        'fields': {
+            'bool_field': True
+        }
+    } for index in range(count)]
@@ -0,0 +1,292 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+
+import export_catalog_snapshot
+
+_TEST_NOW = datetime.datetime(2020, 1, 1, 12, tzinfo=datetime.timezone.utc)
+
+
+class CatalogSnapshotExporterTest(unittest.TestCase):
+
+    @mock.patch('export_catalog_snapshot.quickstart.DataCatalogFacade')
+    def setUp(self, mock_datacatalog_facade):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__output_folder = self.__temp_dir.name
+        self.__exporter = export_catalog_snapshot.CatalogSnapshotExporter(self.__output_folder,
+                                                                          max_workers=2)
+        # Shortcut for the object assigned to self.__exporter.__datacatalog_facade
+        self.__datacatalog_facade = mock_datacatalog_facade.return_value
+        self.__datacatalog_facade.get_entry.side_effect = make_entry
+        self.__datacatalog_facade.list_tags.return_value = [make_tag()]
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_run_should_export_entries_columns_and_tags(self):
+        self.__datacatalog_facade.iter_search_catalog.return_value = make_search_results(
+            ['project-1', 'project-2'])
+
+        counts = self.__exporter.run('test-org', 'system=bigquery')
+
+        self.assertEqual({
+            'entries': 2,
+            'columns': 4,
+            'tags': 4,
+            'skipped': 0,
+            'not_found': 0
+        }, counts)
+        self.assertTrue(
+            os.path.isdir(
+                os.path.join(self.__output_folder, 'entries', 'system=bigquery',
+                             'project=project-2')))
+
+        entries = export_catalog_snapshot.SnapshotReader.read_table(self.__output_folder,
+                                                                    'entries').to_pylist()
+        self.assertEqual(['project-1', 'project-2'], sorted(entry['project'] for entry in entries))
+        self.assertEqual('TABLE', entries[0]['type'])
+
+    def test_run_should_flatten_nested_columns(self):
+        self.__datacatalog_facade.iter_search_catalog.return_value = make_search_results(
+            ['project-1'])
+
+        self.__exporter.run('test-org', 'system=bigquery')
+
+        columns = export_catalog_snapshot.SnapshotReader.read_table(self.__output_folder,
+                                                                    'columns').to_pylist()
+        self.assertEqual(['address', 'address.city'], [column['column'] for column in columns])
+
+    def test_run_should_export_typed_tag_values(self):
+        self.__datacatalog_facade.iter_search_catalog.return_value = make_search_results(
+            ['project-1'])
+
+        self.__exporter.run('test-org', 'system=bigquery')
+
+        tags = export_catalog_snapshot.SnapshotReader.read_table(self.__output_folder,
+                                                                 'tags').to_pylist()
+        values = {tag['field_id']: tag for tag in tags}
+        self.assertTrue(values['has_pii']['bool_value'])
+        self.assertEqual('EMAIL', values['pii_type']['enum_value'])
+        self.assertIsNone(values['pii_type']['bool_value'])
+
+    def test_run_should_skip_entries_not_found(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(
+            ['project-1', 'project-2', 'project-3'])
+
+        def get_entry(name):
+            # Entries may be deleted between the search and their fetch.
+            if 'project-2' in name:
+                raise exceptions.PermissionDenied(name)
+            return make_entry(name)
+
+        datacatalog_facade.get_entry.side_effect = get_entry
+
+        counts = self.__exporter.run('test-org', 'system=bigquery')
+
+        self.assertEqual(2, counts['entries'])
+        self.assertEqual(1, counts['not_found'])
+        entries = export_catalog_snapshot.SnapshotReader.read_table(self.__output_folder,
+                                                                    'entries').to_pydict()
+        self.assertEqual(['project-1', 'project-3'], sorted(entries['project']))
+
+    @mock.patch('export_catalog_snapshot.quickstart.DataCatalogFacade')
+    def test_run_should_write_arrow_files(self, mock_datacatalog_facade):
+        exporter = export_catalog_snapshot.CatalogSnapshotExporter(self.__output_folder,
+                                                                   file_format='arrow')
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.get_entry.side_effect = make_entry
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(['project-1'])
+
+        exporter.run('test-org', 'system=bigquery')
+
+        entries = export_catalog_snapshot.SnapshotReader.read_table(self.__output_folder,
+                                                                    'entries',
+                                                                    file_format='arrow')
+        self.assertEqual(1, entries.num_rows)
+
+    def test_run_incremental_should_skip_unmodified_entries(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(['project-1'])
+        self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(
+            ['project-1', 'project-2'], modified_hours_ago=[2, 0])
+        counts = self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        self.assertEqual(1, counts['entries'])
+        self.assertEqual(1, counts['skipped'])
+        # Each export appends new files, so both the exported Entries are in the snapshot.
+        entries = export_catalog_snapshot.SnapshotReader.read_table(self.__output_folder,
+                                                                    'entries')
+        self.assertEqual(2, entries.num_rows)
+
+    def test_run_incremental_should_export_unmodified_entries_with_changed_tags(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(
+            ['project-1', 'project-2'])
+        self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        # Changing Tags does not change the modify time of their Entries.
+        changed_tag = make_tag()
+        changed_tag.fields['pii_type'].enum_value.display_name = 'PHONE'
+        datacatalog_facade.list_tags.side_effect = \
+            lambda entry_name: [changed_tag] if 'project-2' in entry_name else [make_tag()]
+        datacatalog_facade.get_entry.reset_mock()
+        counts = self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        self.assertEqual(1, counts['entries'])
+        self.assertEqual(1, counts['skipped'])
+        datacatalog_facade.get_entry.assert_called_once()
+        self.assertIn('project-2', datacatalog_facade.get_entry.call_args[0][0])
+
+        # The latest export of the Entry has its current Tags.
+        tags_keys = export_catalog_snapshot.SnapshotReader.read_latest_tags_keys(
+            self.__output_folder)
+        pii_types = {
+            name: {row[9]
+                   for row in tags_key if row[5] == 'pii_type'}
+            for name, tags_key in tags_keys.items()
+        }
+        self.assertEqual([{'EMAIL'}, {'PHONE'}], [pii_types[name] for name in sorted(pii_types)])
+
+    def test_run_incremental_should_skip_unmodified_entries_not_found(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(['project-1'])
+        self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        datacatalog_facade.list_tags.side_effect = exceptions.NotFound('')
+        counts = self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        self.assertEqual({
+            'entries': 0,
+            'columns': 0,
+            'tags': 0,
+            'skipped': 0,
+            'not_found': 1
+        }, counts)
+
+    def test_run_incremental_should_export_unmodified_entries_with_deleted_tags(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.return_value = make_search_results(['project-1'])
+        self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        datacatalog_facade.list_tags.return_value = []
+        counts = self.__exporter.run('test-org', 'system=bigquery', incremental=True)
+
+        self.assertEqual({
+            'entries': 1,
+            'columns': 2,
+            'tags': 0,
+            'skipped': 0,
+            'not_found': 0
+        }, counts)
+        tags_keys = export_catalog_snapshot.SnapshotReader.read_latest_tags_keys(
+            self.__output_folder)
+        self.assertEqual([frozenset()], list(tags_keys.values()))
+
+
+class PartitionedTableWriterTest(unittest.TestCase):
+
+    def test_add_rows_should_write_file_when_partition_is_full(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = export_catalog_snapshot.PartitionedTableWriter(
+                temp_dir, 'columns', export_catalog_snapshot._COLUMNS_SCHEMA, 'parquet',
+                'export-1', 2)
+
+            writer.add_rows(('bigquery', 'project-1'), [{'column': 'a'}, {'column': 'b'}])
+            writer.add_rows(('bigquery', 'project-1'), [{'column': 'c'}])
+
+            partition_folder = os.path.join(temp_dir, 'columns', 'system=bigquery',
+                                            'project=project-1')
+            files_before_close = os.listdir(partition_folder)
+            writer.close()
+            files_after_close = sorted(os.listdir(partition_folder))
+
+        self.assertEqual(['part-export-1-0.parquet'], files_before_close)
+        self.assertEqual(['part-export-1-0.parquet', 'part-export-1-1.parquet'], files_after_close)
+
+
+class SnapshotReaderTest(unittest.TestCase):
+
+    def test_read_latest_tags_keys_should_read_latest_export_of_each_entry(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for export_id, entries_names in [('export-1', ['a', 'b']), ('export-2', ['a'])]:
+                writers = {
+                    table_name:
+                    export_catalog_snapshot.PartitionedTableWriter(temp_dir, table_name, schema,
+                                                                   'parquet', export_id, 1000)
+                    for table_name, schema in export_catalog_snapshot._TABLES_SCHEMAS.items()
+                }
+                for name in entries_names:
+                    writers['entries'].add_rows(('bigquery', 'project-1'), [{'name': name}])
+                    writers['tags'].add_rows(('bigquery', 'project-1'), [{
+                        'entry_name': name,
+                        'field_id': 'field',
+                        'string_value': export_id
+                    }])
+                for writer in writers.values():
+                    writer.close()
+
+            tags_keys = export_catalog_snapshot.SnapshotReader.read_latest_tags_keys(temp_dir)
+
+        self.assertEqual(['a', 'b'], sorted(tags_keys))
+        self.assertEqual({
+            'a': ['export-2'],
+            'b': ['export-1']
+        }, {
+            name: [row[8] for row in tags_key]
+            for name, tags_key in tags_keys.items()
+        })
+
+
+def make_search_results(project_ids, modified_hours_ago=None):
+    results = []
+    for index, project_id in enumerate(project_ids):
+        result = datacatalog.SearchCatalogResult()
+        result.relative_resource_name = \
+            f'projects/{project_id}/locations/us/entryGroups/@bigquery/entries/table_{index}'
+        hours_ago = modified_hours_ago[index] if modified_hours_ago else 2
+        result.modify_time = _TEST_NOW - datetime.timedelta(hours=hours_ago)
+        results.append(result)
+    return results
+
+
+def make_entry(name):
+    entry = datacatalog.Entry()
+    entry.name = name
+    entry.linked_resource = f'//bigquery.googleapis.com/{name}'
+    entry.type_ = datacatalog.EntryType.TABLE
+    entry.integrated_system = datacatalog.IntegratedSystem.BIGQUERY
+
+    column = datacatalog.ColumnSchema()
+    column.column = 'address'
+    column.type_ = 'RECORD'
+    subcolumn = datacatalog.ColumnSchema()
+    subcolumn.column = 'city'
+    subcolumn.type_ = 'STRING'
+    column.subcolumns.append(subcolumn)
+    entry.schema.columns.append(column)
+
+    return entry
+
+
+def make_tag():
+    tag = datacatalog.Tag()
+    tag.name = 'test-tag'
+    tag.template = 'test-template'
+
+    bool_field = datacatalog.TagField()
+    bool_field.bool_value = True
+    tag.fields['has_pii'] = bool_field
+
+    enum_field = datacatalog.TagField()
+    enum_field.enum_value.display_name = 'EMAIL'
+    tag.fields['pii_type'] = enum_field
+
+    return tag
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import lazy_imports
+
+_TEST_MODULE_NAME = 'lazy_imports_test_module'
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.__temp_dir.name, f'{_TEST_MODULE_NAME}.py'), 'w') as module:
+            module.write('VERSION = "1.0"\n')
+        sys.path.insert(0, self.__temp_dir.name)
+
+    def tearDown(self):
+        sys.path.remove(self.__temp_dir.name)
+        sys.modules.pop(_TEST_MODULE_NAME, None)
+        self.__temp_dir.cleanup()
+
+    def test_lazy_import_should_import_module_on_first_use(self):
+        module = lazy_imports.lazy_import(_TEST_MODULE_NAME)
+        self.assertNotIn(_TEST_MODULE_NAME, sys.modules)
+
+        self.assertEqual('1.0', module.VERSION)
+        self.assertIn(_TEST_MODULE_NAME, sys.modules)
+        # The attributes are copied, so later accesses do not go through __getattr__.
+        self.assertEqual('1.0', module.__dict__['VERSION'])
+
+    def test_lazy_import_should_not_import_module_for_special_attributes(self):
+        module = lazy_imports.lazy_import(_TEST_MODULE_NAME)
+
+        self.assertIn(_TEST_MODULE_NAME, repr(module))
+        self.assertFalse(hasattr(module, '__file__'))
+        self.assertNotIn(_TEST_MODULE_NAME, sys.modules)
+
+    def test_lazy_import_should_keep_patched_attributes(self):
+        module = lazy_imports.lazy_import(_TEST_MODULE_NAME)
+
+        with mock.patch.object(module, 'VERSION', '2.0'):
+            self.assertEqual('2.0', module.VERSION)
+        self.assertEqual('1.0', module.VERSION)
+
+    def test_lazy_import_should_return_imported_modules(self):
+        self.assertIs(json, lazy_imports.lazy_import('json'))
+
+    def test_lazy_import_should_raise_if_module_not_installed(self):
+        self.assertRaises(ModuleNotFoundError, lazy_imports.lazy_import, 'not_installed_module')
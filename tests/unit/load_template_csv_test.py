@@ -1,4 +1,8 @@
+import asyncio
 import io
+import os
+import tempfile
+import time
 import unittest
 from unittest import mock
 
@@ -10,7 +14,7 @@ import load_template_csv
 @mock.patch('load_template_csv.CSVFilesReader')
 class TemplateMakerTest(unittest.TestCase):
 
-    @mock.patch('load_template_csv.DataCatalogFacade')
+    @mock.patch('tag_templates.DataCatalogFacade')
     def setUp(self, mock_datacatalog_facade):
         self.__template_maker = load_template_csv.TemplateMaker()
         # Shortcut for the object assigned to self.__template_maker.__datacatalog_facade
@@ -83,6 +87,119 @@ class TemplateMakerTest(unittest.TestCase):
         # Only the master Template is created.
         datacatalog_facade.create_tag_template.assert_called_once()
 
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_should_create_helper_templates_concurrently(self, mock_datacatalog_facade,
+                                                             mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'MULTI'],
+                                                          ['val3', 'val4', 'MULTI'],
+                                                          ['val5', 'val6', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.tag_template_exists.return_value = False
+
+        load_template_csv.TemplateMaker(max_workers=3).run(files_folder=None,
+                                                           project_id=None,
+                                                           template_id='test-template-id',
+                                                           display_name='Test Template')
+
+        self.assertEqual(3, mock_csv_files_reader.read_helper.call_count)
+        # The master and the three helper Templates are created.
+        self.assertEqual(4, datacatalog_facade.create_tag_template.call_count)
+
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_should_log_helper_templates_in_master_file_order(self, mock_datacatalog_facade,
+                                                                  mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'MULTI'],
+                                                          ['val3', 'val4', 'MULTI'],
+                                                          ['val5', 'val6', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        def create_tag_template(project_id, template_id, *args):
+            # The Templates are finished in the reverse order of the master file.
+            time.sleep({'val1': 0.1, 'val3': 0.05}.get(template_id[-4:], 0))
+            load_template_csv.logging.info(f'created {template_id}')
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.tag_template_exists.return_value = False
+        datacatalog_facade.create_tag_template.side_effect = create_tag_template
+
+        with self.assertLogs(level='INFO') as logs:
+            load_template_csv.TemplateMaker(max_workers=3).run(files_folder=None,
+                                                               project_id=None,
+                                                               template_id='tpl',
+                                                               display_name='Test Template')
+
+        created_logs = [output for output in logs.output if 'created tpl_' in output]
+        self.assertEqual([
+            'INFO:root:created tpl_val1', 'INFO:root:created tpl_val3',
+            'INFO:root:created tpl_val5'
+        ], created_logs)
+
+    def test_run_should_isolate_multivalued_fields_failures(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'MULTI'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.tag_template_exists.return_value = False
+        datacatalog_facade.create_tag_template.side_effect = \
+            [None, exceptions.InternalServerError(message=''), None]
+
+        with self.assertRaises(exceptions.InternalServerError):
+            self.__template_maker.run(files_folder=None,
+                                      project_id=None,
+                                      template_id='test-template-id',
+                                      display_name='Test Template')
+
+        # The second helper Template is created even though the first one has failed.
+        self.assertEqual(3, datacatalog_facade.create_tag_template.call_count)
+
+    def test_run_should_report_created_and_skipped_templates(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.tag_template_exists.side_effect = [True, False]
+
+        results = self.__template_maker.run(files_folder=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template')
+
+        self.assertDictEqual({
+            'test_template_id': 'skipped',
+            'test_template_id_val3': 'created'
+        }, results)
+        datacatalog_facade.create_tag_template.assert_called_once()
+
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_optimistic_should_not_check_existence(self, mock_datacatalog_facade,
+                                                       mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.create_tag_template_if_not_exists.side_effect = [False, True]
+
+        results = load_template_csv.TemplateMaker(optimistic=True).run(
+            files_folder=None,
+            project_id=None,
+            template_id='test_template_id',
+            display_name='Test Template')
+
+        self.assertDictEqual({
+            'test_template_id': 'skipped',
+            'test_template_id_val3': 'created'
+        }, results)
+        datacatalog_facade.tag_template_exists.assert_not_called()
+        self.assertEqual(2, datacatalog_facade.create_tag_template_if_not_exists.call_count)
+
     def test_run_should_not_delete_existing_template_by_default(self, mock_csv_files_reader):
         mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
 
@@ -110,6 +227,326 @@ class TemplateMakerTest(unittest.TestCase):
 
         datacatalog_facade.delete_tag_template.assert_called_once()
 
+    def test_run_sync_should_update_existing_template(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template.return_value = mock.MagicMock()
+        datacatalog_facade.sync_tag_template.return_value = 2
+
+        results = self.__template_maker.run(files_folder=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template',
+                                            sync_existing=True)
+
+        self.assertDictEqual({'test_template_id': 'updated'}, results)
+        datacatalog_facade.sync_tag_template.assert_called_once()
+        datacatalog_facade.delete_tag_template.assert_not_called()
+        datacatalog_facade.create_tag_template.assert_not_called()
+
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_sync_should_rename_requested_enum_values(self, mock_datacatalog_facade,
+                                                          mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'ENUM']]
+        mock_csv_files_reader.read_helper.return_value = [['VALUE_B']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.get_tag_template.return_value = mock.MagicMock()
+        datacatalog_facade.sync_tag_template.return_value = 1
+        enum_values_renames = {'val1': {'VALUE_A': 'VALUE_B'}}
+
+        load_template_csv.TemplateMaker(enum_values_renames=enum_values_renames).run(
+            files_folder=None,
+            project_id=None,
+            template_id='test_template_id',
+            display_name='Test Template',
+            sync_existing=True)
+
+        self.assertIs(enum_values_renames, datacatalog_facade.sync_tag_template.call_args[0][4])
+
+    def test_run_sync_should_skip_up_to_date_template(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template.return_value = mock.MagicMock()
+        datacatalog_facade.sync_tag_template.return_value = 0
+
+        results = self.__template_maker.run(files_folder=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template',
+                                            sync_existing=True)
+
+        self.assertDictEqual({'test_template_id': 'skipped'}, results)
+
+    def test_run_sync_should_create_nonexistent_template(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template.return_value = None
+
+        results = self.__template_maker.run(files_folder=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template',
+                                            sync_existing=True)
+
+        self.assertDictEqual({
+            'test_template_id': 'created',
+            'test_template_id_val3': 'created'
+        }, results)
+        datacatalog_facade.sync_tag_template.assert_not_called()
+        self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
+
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_should_skip_unchanged_templates_with_state_file(self, mock_datacatalog_facade,
+                                                                 mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.tag_template_exists.return_value = False
+
+        with tempfile.TemporaryDirectory() as state_folder:
+            state_file = os.path.join(state_folder, 'state.jsonl')
+            first_results = load_template_csv.TemplateMaker(state_file=state_file).run(
+                files_folder=None,
+                project_id='test-project',
+                template_id='test_template_id',
+                display_name='Test Template')
+            second_results = load_template_csv.TemplateMaker(state_file=state_file).run(
+                files_folder=None,
+                project_id='test-project',
+                template_id='test_template_id',
+                display_name='Test Template')
+
+        self.assertDictEqual({'test_template_id': 'created'}, first_results)
+        self.assertDictEqual({'test_template_id': 'unchanged'}, second_results)
+        datacatalog_facade.tag_template_exists.assert_called_once()
+        datacatalog_facade.create_tag_template.assert_called_once()
+
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_force_should_process_unchanged_templates(self, mock_datacatalog_facade,
+                                                          mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.get_tag_template.return_value = mock.MagicMock()
+        datacatalog_facade.sync_tag_template.return_value = 0
+
+        with tempfile.TemporaryDirectory() as state_folder:
+            state_file = os.path.join(state_folder, 'state.jsonl')
+            template_maker = load_template_csv.TemplateMaker(state_file=state_file, force=True)
+            for _ in range(2):
+                template_maker.run(files_folder=None,
+                                   project_id='test-project',
+                                   template_id='test_template_id',
+                                   display_name='Test Template',
+                                   sync_existing=True)
+
+        self.assertEqual(2, datacatalog_facade.sync_tag_template.call_count)
+
+    @mock.patch('tag_templates.DataCatalogFacade')
+    def test_run_should_not_record_skipped_templates_state(self, mock_datacatalog_facade,
+                                                           mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.tag_template_exists.return_value = True
+
+        with tempfile.TemporaryDirectory() as state_folder:
+            state_file = os.path.join(state_folder, 'state.jsonl')
+            for _ in range(2):
+                results = load_template_csv.TemplateMaker(state_file=state_file).run(
+                    files_folder=None,
+                    project_id='test-project',
+                    template_id='test_template_id',
+                    display_name='Test Template')
+
+        # Existing Templates are not compared to the provided metadata, so they are checked on
+        # every run.
+        self.assertDictEqual({'test_template_id': 'skipped'}, results)
+        self.assertEqual(2, datacatalog_facade.tag_template_exists.call_count)
+
+
+@mock.patch('load_template_csv.CSVFilesReader')
+class AsyncTemplateMakerTest(unittest.TestCase):
+
+    @mock.patch('tag_templates.AsyncDataCatalogFacade')
+    def setUp(self, mock_datacatalog_facade):
+        self.__template_maker = load_template_csv.AsyncTemplateMaker()
+        # Shortcut for the object assigned to self.__template_maker.__datacatalog_facade
+        self.__datacatalog_facade = mock_datacatalog_facade.return_value
+        self.__datacatalog_facade.tag_template_exists = make_coroutine_mock(False)
+        self.__datacatalog_facade.create_tag_template = make_coroutine_mock()
+        self.__datacatalog_facade.delete_tag_template = make_coroutine_mock()
+
+    def test_run_should_create_master_and_helper_templates(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'ENUM'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        run_until_complete(
+            self.__template_maker.run(files_folder=None,
+                                      project_id=None,
+                                      template_id='test-template-id',
+                                      display_name='Test Template',
+                                      delete_existing=True))
+
+        datacatalog_facade = self.__datacatalog_facade
+        self.assertEqual(2, mock_csv_files_reader.read_helper.call_count)
+        self.assertEqual(2, datacatalog_facade.delete_tag_template.call_count)
+        self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
+
+    def test_run_should_isolate_templates_failures(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.create_tag_template.side_effect = \
+            [make_coroutine(exception=exceptions.InternalServerError(message='')),
+             make_coroutine()]
+
+        with self.assertRaises(exceptions.InternalServerError):
+            run_until_complete(
+                self.__template_maker.run(files_folder=None,
+                                          project_id=None,
+                                          template_id='test-template-id',
+                                          display_name='Test Template'))
+
+        # The helper Template is created even though the master one has failed.
+        self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
+
+    def test_run_should_log_templates_in_described_order(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                          ['val3', 'val4', 'MULTI']]
+        mock_csv_files_reader.read_helper.return_value = [['helper_val1']]
+
+        async def create_tag_template(project_id, template_id, *args):
+            # The master Template is finished after the helper one.
+            await asyncio.sleep(0.05 if template_id == 'tpl' else 0)
+            load_template_csv.logging.info(f'created {template_id}')
+
+        self.__datacatalog_facade.create_tag_template = \
+            mock.MagicMock(side_effect=create_tag_template)
+
+        with self.assertLogs(level='INFO') as logs:
+            run_until_complete(
+                self.__template_maker.run(files_folder=None,
+                                          project_id=None,
+                                          template_id='tpl',
+                                          display_name='Test Template'))
+
+        created_logs = [output for output in logs.output if 'created tpl' in output]
+        self.assertEqual(['INFO:root:created tpl', 'INFO:root:created tpl_val3'], created_logs)
+
+    def test_run_should_not_create_existing_templates(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.tag_template_exists = make_coroutine_mock(True)
+
+        run_until_complete(
+            self.__template_maker.run(files_folder=None,
+                                      project_id=None,
+                                      template_id='test-template-id',
+                                      display_name='Test Template'))
+
+        datacatalog_facade.create_tag_template.assert_not_called()
+
+    @mock.patch('tag_templates.AsyncDataCatalogFacade')
+    def test_run_optimistic_should_not_check_existence(self, mock_datacatalog_facade,
+                                                       mock_csv_files_reader):
+
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.tag_template_exists = make_coroutine_mock(False)
+        datacatalog_facade.create_tag_template_if_not_exists = make_coroutine_mock(False)
+
+        results = run_until_complete(
+            load_template_csv.AsyncTemplateMaker(optimistic=True).run(
+                files_folder=None,
+                project_id=None,
+                template_id='test_template_id',
+                display_name='Test Template'))
+
+        self.assertDictEqual({'test_template_id': 'skipped'}, results)
+        datacatalog_facade.tag_template_exists.assert_not_called()
+
+    def test_run_sync_should_update_existing_template(self, mock_csv_files_reader):
+        mock_csv_files_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template = make_coroutine_mock(mock.MagicMock())
+        datacatalog_facade.sync_tag_template = make_coroutine_mock(1)
+
+        results = run_until_complete(
+            self.__template_maker.run(files_folder=None,
+                                      project_id=None,
+                                      template_id='test_template_id',
+                                      display_name='Test Template',
+                                      sync_existing=True))
+
+        self.assertDictEqual({'test_template_id': 'updated'}, results)
+        datacatalog_facade.delete_tag_template.assert_not_called()
+        datacatalog_facade.create_tag_template.assert_not_called()
+
+
+class BatchTemplateMakerTest(unittest.TestCase):
+
+    @mock.patch('load_template_csv.TemplateMaker')
+    def setUp(self, mock_template_maker):
+        self.__batch_template_maker = load_template_csv.BatchTemplateMaker(max_workers=4)
+        # Shortcut for the object assigned to self.__batch_template_maker.__template_maker
+        self.__template_maker = mock_template_maker.return_value
+        self.__mock_template_maker = mock_template_maker
+
+    def test_constructor_should_create_single_template_maker(self):
+        self.__mock_template_maker.assert_called_once()
+
+    def test_run_should_process_all_manifest_entries(self):
+        template_maker = self.__template_maker
+        template_maker.run.side_effect = lambda folder, project_id, template_id, *args: {
+            template_id: 'created'
+        }
+
+        summary = self.__batch_template_maker.run(make_manifest_entries(3))
+
+        self.assertEqual(3, template_maker.run.call_count)
+        self.assertEqual(['template_0', 'template_1', 'template_2'],
+                         [result['template_id'] for result in summary])
+        self.assertDictEqual({'template_1': 'created'}, summary[1]['statuses'])
+        self.assertIsNone(summary[1]['error'])
+        self.assertGreaterEqual(summary[1]['elapsed_seconds'], 0)
+
+    def test_run_should_isolate_templates_failures(self):
+        template_maker = self.__template_maker
+        template_maker.run.side_effect = [
+            exceptions.InternalServerError(message=''), {
+                'template_1': 'created'
+            }
+        ]
+
+        with self.assertRaises(exceptions.InternalServerError):
+            self.__batch_template_maker.run(make_manifest_entries(2))
+
+        # The second Template is processed even though the first one has failed.
+        self.assertEqual(2, template_maker.run.call_count)
+
+    def test_run_should_forward_existing_templates_flags(self):
+        self.__batch_template_maker.run(make_manifest_entries(1), sync_existing=True)
+
+        self.__template_maker.run.assert_called_once_with('folder_0', 'project-id', 'template_0',
+                                                          'Template 0', False, True)
+
 
 @mock.patch('load_template_csv.open', new_callable=mock.mock_open())
 class CSVFilesReaderTest(unittest.TestCase):
@@ -150,115 +587,171 @@ class CSVFilesReaderTest(unittest.TestCase):
 
         self.assertEqual('val2', load_template_csv.CSVFilesReader.read_master(None, None)[0][1])
 
+    def test_read_should_raise_error_on_missing_values(self, mock_open):
+        mock_open.return_value = io.StringIO('col1,col2,col3\n'
+                                             'val1,val2\n')
 
-class DataCatalogFacadeTest(unittest.TestCase):
+        with self.assertRaises(IndexError):
+            load_template_csv.CSVFilesReader.read_master(None, None)
 
-    @mock.patch('load_template_csv.datacatalog.DataCatalogClient')
-    def setUp(self, mock_datacatalog_client):
-        self.__datacatalog_facade = load_template_csv.DataCatalogFacade()
-        # Shortcut for the object assigned to self.__datacatalog_facade.__datacatalog
-        self.__datacatalog_client = mock_datacatalog_client.return_value
+    def test_read_should_handle_empty_file(self, mock_open):
+        mock_open.return_value = io.StringIO('')
 
-    def test_constructor_should_set_instance_attributes(self):
-        self.assertIsNotNone(self.__datacatalog_facade.__dict__['_DataCatalogFacade__datacatalog'])
+        self.assertEqual([], load_template_csv.CSVFilesReader.read_helper(None, None))
 
-    def test_create_tag_template_should_handle_described_fields(self):
-        self.__datacatalog_facade.create_tag_template(
-            project_id='project-id',
-            template_id='template_id',
-            display_name='Test Display Name',
-            fields_descriptors=[[
-                'test-string-field-id', 'Test String Field Display Name', 'STRING'
-            ], ['test-enum-field-id', 'Test ENUM Field Display Name', 'ENUM']],
-            enums_names={'test-enum-field-id': ['TEST_ENUM_VALUE']})
+    def test_iter_helper_should_read_lazily(self, mock_open):
+        mock_open.return_value = io.StringIO('col1\n'
+                                             'val1\n'
+                                             'val2\n')
 
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.create_tag_template.assert_called_once()
+        rows = load_template_csv.CSVFilesReader.iter_helper('test-folder', 'test-file-id')
 
-    def test_delete_tag_template_should_call_client_library_method(self):
-        self.__datacatalog_facade.delete_tag_template('template_name')
+        mock_open.assert_not_called()
+        self.assertEqual(['val1'], next(rows))
+        mock_open.assert_called_once_with('test-folder/test-file-id.csv', mode='r')
+        self.assertEqual([['val2']], list(rows))
 
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.delete_tag_template.assert_called_once()
 
-    def test_delete_tag_template_should_handle_nonexistent(self):
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.delete_tag_template.side_effect = \
-            exceptions.PermissionDenied(message='')
+@mock.patch('load_template_csv.open', new_callable=mock.mock_open())
+class ManifestReaderTest(unittest.TestCase):
 
-        self.__datacatalog_facade.delete_tag_template('template_name')
+    def test_read_should_handle_csv_files(self, mock_open):
+        mock_open.return_value = io.StringIO('template_id,display_name,folder,project_id\n'
+                                             'template_abc,Template ABC,abc,project-id\n')
 
-        datacatalog_client.delete_tag_template.assert_called_once()
+        entries = load_template_csv.ManifestReader.read('manifests/templates.csv')
 
-    def test_tag_template_exists_should_return_true_existing(self):
-        tag_template_exists = self.__datacatalog_facade.tag_template_exists('template_name')
+        mock_open.assert_called_with('manifests/templates.csv', mode='r')
+        self.assertEqual([{
+            'template_id': 'template_abc',
+            'display_name': 'Template ABC',
+            'folder': 'manifests/abc',
+            'project_id': 'project-id'
+        }], entries)
 
-        self.assertTrue(tag_template_exists)
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.get_tag_template.assert_called_once()
+    def test_read_should_handle_json_lines_files(self, mock_open):
+        mock_open.return_value = io.StringIO(
+            '{"template_id": "template_abc", "display_name": "Template ABC", "folder": "abc"}\n'
+            '\n'
+            '{"template_id": "template_xyz", "display_name": "Template XYZ", "folder": "/xyz"}\n')
 
-    def test_tag_template_exists_should_return_false_nonexistent(self):
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.get_tag_template.side_effect = exceptions.PermissionDenied(message='')
+        entries = load_template_csv.ManifestReader.read('manifests/templates.jsonl',
+                                                        default_project_id='project-id')
 
-        tag_template_exists = self.__datacatalog_facade.tag_template_exists('template_name')
+        self.assertEqual(2, len(entries))
+        self.assertEqual('project-id', entries[0]['project_id'])
+        self.assertEqual('manifests/abc', entries[0]['folder'])
+        # Absolute folders are kept as is.
+        self.assertEqual('/xyz', entries[1]['folder'])
 
-        self.assertFalse(tag_template_exists)
-        datacatalog_client.get_tag_template.assert_called_once()
+    def test_read_should_raise_error_on_missing_fields(self, mock_open):
+        mock_open.return_value = io.StringIO('template_id,display_name,folder\n'
+                                             'template_abc,,abc\n')
 
+        with self.assertRaises(ValueError):
+            load_template_csv.ManifestReader.read('templates.csv')
 
-class StringFormatterTest(unittest.TestCase):
 
-    def test_format_elements_snakecase_list(self):
-        test_list = ['AA-AA', 'BB-BB']
-        load_template_csv.StringFormatter.format_elements_to_snakecase(test_list)
-        self.assertListEqual(['aa_aa', 'bb_bb'], test_list)
+class TemplatesStateFileTest(unittest.TestCase):
 
-    def test_format_elements_snakecase_internal_index(self):
-        test_list = [['AA-AA', 'Test A'], ['BB-BB', 'Test B']]
-        load_template_csv.StringFormatter.format_elements_to_snakecase(test_list, internal_index=0)
-        self.assertListEqual([['aa_aa', 'Test A'], ['bb_bb', 'Test B']], test_list)
+    def setUp(self):
+        self.__state_folder = tempfile.TemporaryDirectory()
+        self.__state_file = os.path.join(self.__state_folder.name, 'state.jsonl')
 
-    def test_format_string_to_snakecase_abbreviation(self):
-        self.assertEqual('aaa', load_template_csv.StringFormatter.format_to_snakecase('AAA'))
-        self.assertEqual('aaa_aaa',
-                         load_template_csv.StringFormatter.format_to_snakecase('AAA-AAA'))
+    def tearDown(self):
+        self.__state_folder.cleanup()
 
-    def test_format_string_to_snakecase_camelcase(self):
-        self.assertEqual('camel_case',
-                         load_template_csv.StringFormatter.format_to_snakecase('camelCase'))
+    def test_constructor_should_handle_nonexistent_file(self):
+        templates_state = load_template_csv.TemplatesStateFile(self.__state_file)
 
-    def test_format_string_to_snakecase_leading_number(self):
-        self.assertEqual('1_number',
-                         load_template_csv.StringFormatter.format_to_snakecase('1 number'))
+        self.assertIsNone(templates_state.get_hash('template_name'))
 
-    def test_format_string_to_snakecase_repeated_special_chars(self):
-        self.assertEqual(
-            'repeated_special_chars',
-            load_template_csv.StringFormatter.format_to_snakecase('repeated   special___chars'))
+    def test_set_hash_should_persist_latest_hash(self):
+        templates_state = load_template_csv.TemplatesStateFile(self.__state_file)
+        templates_state.set_hash('template_name', 'hash-1')
+        templates_state.set_hash('template_name', 'hash-2')
 
-    def test_format_string_to_snakecase_whitespaces(self):
-        self.assertEqual(
-            'no_leading_and_trailing',
-            load_template_csv.StringFormatter.format_to_snakecase(' no leading and trailing '))
-        self.assertEqual(
-            'no_leading_and_trailing',
-            load_template_csv.StringFormatter.format_to_snakecase('\nno leading and trailing\t'))
+        reloaded_state = load_template_csv.TemplatesStateFile(self.__state_file)
+
+        self.assertEqual('hash-2', reloaded_state.get_hash('template_name'))
+
+    def test_invalidate_should_remove_master_and_multivalued_templates(self):
+        templates_state = load_template_csv.TemplatesStateFile(self.__state_file)
+        templates_state.set_hash('template_name', 'hash-1')
+        templates_state.set_hash('template_name_multivalued', 'hash-2')
+        templates_state.set_hash('other_template_name', 'hash-3')
+
+        invalidated_count = templates_state.invalidate(
+            ['template_name', 'template_name_multivalued'])
+
+        reloaded_state = load_template_csv.TemplatesStateFile(self.__state_file)
+        self.assertEqual(2, invalidated_count)
+        self.assertIsNone(reloaded_state.get_hash('template_name'))
+        self.assertIsNone(reloaded_state.get_hash('template_name_multivalued'))
+        self.assertEqual('hash-3', reloaded_state.get_hash('other_template_name'))
+
+    @mock.patch('load_template_csv.CSVFilesReader')
+    def test_invalidate_should_keep_templates_sharing_prefix(self, mock_csv_files_reader):
+        templates_state = load_template_csv.TemplatesStateFile(self.__state_file)
+        templates_state.set_hash('foo', 'hash-1')
+        templates_state.set_hash('foo_tags', 'hash-2')
+        templates_state.set_hash('foo_bar', 'hash-3')
+        templates_state.set_hash('foo_bar_tags', 'hash-4')
+        mock_csv_files_reader.read_master.return_value = [['tags', 'Tags', 'MULTI'],
+                                                          ['name', 'Name', 'STRING']]
+
+        invalidated_count = templates_state.invalidate(
+            load_template_csv.TemplateMaker.get_templates_ids('folder', 'foo'))
+
+        reloaded_state = load_template_csv.TemplatesStateFile(self.__state_file)
+        self.assertEqual(2, invalidated_count)
+        self.assertIsNone(reloaded_state.get_hash('foo'))
+        self.assertIsNone(reloaded_state.get_hash('foo_tags'))
+        self.assertEqual('hash-3', reloaded_state.get_hash('foo_bar'))
+        self.assertEqual('hash-4', reloaded_state.get_hash('foo_bar_tags'))
+
+    def test_make_content_hash_should_change_with_metadata(self):
+        make_content_hash = load_template_csv.TemplatesStateFile.make_content_hash
+        fields_descriptors = [['enum_field', 'ENUM Field', 'ENUM']]
+
+        content_hash = make_content_hash('Test Template', fields_descriptors,
+                                         {'enum_field': ['VALUE_1']})
 
-    def test_format_string_to_snakecase_special_chars(self):
-        self.assertEqual(
-            'special_chars',
-            load_template_csv.StringFormatter.format_to_snakecase('special!#@-_ chars'))
         self.assertEqual(
-            'special_chars',
-            load_template_csv.StringFormatter.format_to_snakecase('! special chars ?'))
-
-    def test_format_string_to_snakecase_unicode(self):
-        self.assertEqual('a_a_e_o_u',
-                         load_template_csv.StringFormatter.format_to_snakecase(u'å ä ß é ö ü'))
-
-    def test_format_string_to_snakecase_uppercase(self):
-        self.assertEqual('uppercase',
-                         load_template_csv.StringFormatter.format_to_snakecase('UPPERCASE'))
-        self.assertEqual('upper_case',
-                         load_template_csv.StringFormatter.format_to_snakecase('UPPER CASE'))
+            content_hash,
+            make_content_hash('Test Template', fields_descriptors, {'enum_field': ['VALUE_1']}))
+        self.assertNotEqual(
+            content_hash,
+            make_content_hash('Test Template', fields_descriptors, {'enum_field': ['VALUE_2']}))
+
+
+def make_manifest_entries(count):
+    return [{
+        'template_id': f'template_{index}',
+        'display_name': f'Template {index}',
+        'folder': f'folder_{index}',
+        'project_id': 'project-id'
+    } for index in range(count)]
+
+
+def make_coroutine(return_value=None, exception=None):
+
+    async def coroutine():
+        if exception:
+            raise exception
+        return return_value
+
+    return coroutine()
+
+
+def make_coroutine_mock(return_value=None, exception=None):
+    return mock.MagicMock(
+        side_effect=lambda *args, **kwargs: make_coroutine(return_value, exception))
+
+
+def run_until_complete(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -1,3 +1,4 @@
+import asyncio
 import httplib2
 import unittest
 from unittest import mock
@@ -10,7 +11,7 @@ import load_template_google_sheets
 
 class TemplateMakerTest(unittest.TestCase):
 
-    @mock.patch('load_template_google_sheets.DataCatalogFacade')
+    @mock.patch('tag_templates.DataCatalogFacade')
     @mock.patch('load_template_google_sheets.GoogleSheetsReader')
     def setUp(self, mock_sheets_reader, mock_datacatalog_facade):
         self.__template_maker = load_template_google_sheets.TemplateMaker()
@@ -42,7 +43,7 @@ class TemplateMakerTest(unittest.TestCase):
     def test_run_should_create_master_template_with_enum_fields(self):
         sheets_reader = self.__sheets_reader
         sheets_reader.read_master.return_value = [['val1', 'val2', 'ENUM']]
-        sheets_reader.read_helper.return_value = [['helper_val1']]
+        sheets_reader.read_helpers.return_value = {'val1': [['helper_val1']]}
 
         datacatalog_facade = self.__datacatalog_facade
         datacatalog_facade.tag_template_exists.return_value = False
@@ -52,12 +53,12 @@ class TemplateMakerTest(unittest.TestCase):
                                   template_id='test-template-id',
                                   display_name='Test Template')
 
-        sheets_reader.read_helper.assert_called_once()
+        sheets_reader.read_helpers.assert_called_once()
 
     def test_run_should_create_helper_template_for_multivalued_fields(self):
         sheets_reader = self.__sheets_reader
         sheets_reader.read_master.return_value = [['val1', 'val2', 'MULTI']]
-        sheets_reader.read_helper.return_value = [['helper_val1']]
+        sheets_reader.read_helpers.return_value = {'val1': [['helper_val1']]}
 
         datacatalog_facade = self.__datacatalog_facade
         datacatalog_facade.tag_template_exists.return_value = False
@@ -68,16 +69,14 @@ class TemplateMakerTest(unittest.TestCase):
                                   display_name='Test Template',
                                   delete_existing=True)
 
-        sheets_reader.read_helper.assert_called_once()
+        sheets_reader.read_helpers.assert_called_once()
         # Both master and helper Templates are created.
         self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
 
     def test_run_should_ignore_template_for_multivalued_fields_if_sheet_not_found(self):
         sheets_reader = self.__sheets_reader
         sheets_reader.read_master.return_value = [['val1', 'val2', 'MULTI']]
-        error_response = httplib2.Response({'status': 400, 'reason': 'Not Found'})
-        sheets_reader.read_helper.side_effect = \
-            errors.HttpError(resp=error_response, content=b'{}')
+        sheets_reader.read_helpers.return_value = {'val1': None}
 
         datacatalog_facade = self.__datacatalog_facade
         datacatalog_facade.tag_template_exists.return_value = False
@@ -87,30 +86,86 @@ class TemplateMakerTest(unittest.TestCase):
                                   template_id='test-template-id',
                                   display_name='Test Template')
 
-        sheets_reader.read_helper.assert_called_once()
+        sheets_reader.read_helpers.assert_called_once()
         # Only the master Template is created.
         datacatalog_facade.create_tag_template.assert_called_once()
 
-    def test_run_should_raise_exception_template_for_multivalued_fields_if_unknown_error(self):
+    def test_run_should_raise_exception_if_unknown_error(self):
         sheets_reader = self.__sheets_reader
         sheets_reader.read_master.return_value = [['val1', 'val2', 'MULTI']]
         error_response = httplib2.Response({'status': 500, 'reason': 'Internal Server Error'})
-        sheets_reader.read_helper.side_effect = \
+        sheets_reader.read_helpers.side_effect = \
             errors.HttpError(resp=error_response, content=b'{}')
 
-        datacatalog_facade = self.__datacatalog_facade
-        datacatalog_facade.tag_template_exists.return_value = False
-
         with self.assertRaises(errors.HttpError):
             self.__template_maker.run(spreadsheet_id=None,
                                       project_id=None,
                                       template_id='test-template-id',
                                       display_name='Test Template')
 
-        sheets_reader.read_helper.assert_called_once()
-        # Only the master Template is created.
+        sheets_reader.read_helpers.assert_called_once()
+        # Helper sheets are read before any Template is created.
+        self.__datacatalog_facade.create_tag_template.assert_not_called()
+
+    def test_run_should_raise_exception_if_enum_sheet_not_found(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'ENUM']]
+        sheets_reader.read_helpers.return_value = {'val1': None}
+
+        with self.assertRaises(ValueError):
+            self.__template_maker.run(spreadsheet_id=None,
+                                      project_id=None,
+                                      template_id='test-template-id',
+                                      display_name='Test Template')
+
+        self.__datacatalog_facade.create_tag_template.assert_not_called()
+
+    def test_run_should_report_created_and_skipped_templates(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                  ['val3', 'val4', 'MULTI']]
+        sheets_reader.read_helpers.return_value = {'val3': [['helper_val1']]}
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.tag_template_exists.side_effect = [True, False]
+
+        results = self.__template_maker.run(spreadsheet_id=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template')
+
+        self.assertDictEqual({
+            'test_template_id': 'skipped',
+            'test_template_id_val3': 'created'
+        }, results)
         datacatalog_facade.create_tag_template.assert_called_once()
 
+    @mock.patch('tag_templates.DataCatalogFacade')
+    @mock.patch('load_template_google_sheets.GoogleSheetsReader')
+    def test_run_optimistic_should_not_check_existence(self, mock_sheets_reader,
+                                                       mock_datacatalog_facade):
+
+        sheets_reader = mock_sheets_reader.return_value
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                  ['val3', 'val4', 'MULTI']]
+        sheets_reader.read_helpers.return_value = {'val3': [['helper_val1']]}
+
+        datacatalog_facade = mock_datacatalog_facade.return_value
+        datacatalog_facade.create_tag_template_if_not_exists.side_effect = [False, True]
+
+        results = load_template_google_sheets.TemplateMaker(optimistic=True).run(
+            spreadsheet_id=None,
+            project_id=None,
+            template_id='test_template_id',
+            display_name='Test Template')
+
+        self.assertDictEqual({
+            'test_template_id': 'skipped',
+            'test_template_id_val3': 'created'
+        }, results)
+        datacatalog_facade.tag_template_exists.assert_not_called()
+        self.assertEqual(2, datacatalog_facade.create_tag_template_if_not_exists.call_count)
+
     def test_run_should_not_delete_existing_template_by_default(self):
         sheets_reader = self.__sheets_reader
         sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
@@ -140,6 +195,137 @@ class TemplateMakerTest(unittest.TestCase):
 
         datacatalog_facade.delete_tag_template.assert_called_once()
 
+    def test_run_sync_should_update_existing_template(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template.return_value = mock.MagicMock()
+        datacatalog_facade.sync_tag_template.return_value = 2
+
+        results = self.__template_maker.run(spreadsheet_id=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template',
+                                            sync_existing=True)
+
+        self.assertDictEqual({'test_template_id': 'updated'}, results)
+        datacatalog_facade.sync_tag_template.assert_called_once()
+        datacatalog_facade.delete_tag_template.assert_not_called()
+        datacatalog_facade.create_tag_template.assert_not_called()
+
+    def test_run_sync_should_create_nonexistent_template(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                  ['val3', 'val4', 'MULTI']]
+        sheets_reader.read_helpers.return_value = {'val3': [['helper_val1']]}
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template.return_value = None
+
+        results = self.__template_maker.run(spreadsheet_id=None,
+                                            project_id=None,
+                                            template_id='test_template_id',
+                                            display_name='Test Template',
+                                            sync_existing=True)
+
+        self.assertDictEqual({
+            'test_template_id': 'created',
+            'test_template_id_val3': 'created'
+        }, results)
+        datacatalog_facade.sync_tag_template.assert_not_called()
+        self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
+
+
+class AsyncTemplateMakerTest(unittest.TestCase):
+
+    @mock.patch('tag_templates.AsyncDataCatalogFacade')
+    @mock.patch('load_template_google_sheets.GoogleSheetsReader')
+    def setUp(self, mock_sheets_reader, mock_datacatalog_facade):
+        self.__template_maker = load_template_google_sheets.AsyncTemplateMaker()
+        # Shortcut for the object assigned to self.__template_maker.__sheets_reader
+        self.__sheets_reader = mock_sheets_reader.return_value
+        # Shortcut for the object assigned to self.__template_maker.__datacatalog_facade
+        self.__datacatalog_facade = mock_datacatalog_facade.return_value
+        self.__datacatalog_facade.tag_template_exists = make_coroutine_mock(False)
+        self.__datacatalog_facade.create_tag_template = make_coroutine_mock()
+        self.__datacatalog_facade.delete_tag_template = make_coroutine_mock()
+
+    def test_run_should_create_master_and_helper_templates(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'ENUM'],
+                                                  ['val3', 'val4', 'MULTI']]
+        sheets_reader.read_helpers.return_value = {
+            'val1': [['helper_val1']],
+            'val3': [['helper_val1']]
+        }
+
+        run_until_complete(
+            self.__template_maker.run(spreadsheet_id=None,
+                                      project_id=None,
+                                      template_id='test-template-id',
+                                      display_name='Test Template',
+                                      delete_existing=True))
+
+        datacatalog_facade = self.__datacatalog_facade
+        sheets_reader.read_helpers.assert_called_once()
+        self.assertEqual(2, datacatalog_facade.delete_tag_template.call_count)
+        self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
+
+    def test_run_should_ignore_template_for_multivalued_fields_if_sheet_not_found(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'MULTI']]
+        sheets_reader.read_helpers.return_value = {'val1': None}
+
+        run_until_complete(
+            self.__template_maker.run(spreadsheet_id=None,
+                                      project_id=None,
+                                      template_id='test-template-id',
+                                      display_name='Test Template'))
+
+        # Only the master Template is created.
+        self.__datacatalog_facade.create_tag_template.assert_called_once()
+
+    def test_run_should_isolate_templates_failures(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL'],
+                                                  ['val3', 'val4', 'MULTI']]
+        sheets_reader.read_helpers.return_value = {'val3': [['helper_val1']]}
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.create_tag_template.side_effect = \
+            [make_coroutine(exception=exceptions.InternalServerError(message='')),
+             make_coroutine()]
+
+        with self.assertRaises(exceptions.InternalServerError):
+            run_until_complete(
+                self.__template_maker.run(spreadsheet_id=None,
+                                          project_id=None,
+                                          template_id='test-template-id',
+                                          display_name='Test Template'))
+
+        # The helper Template is created even though the master one has failed.
+        self.assertEqual(2, datacatalog_facade.create_tag_template.call_count)
+
+    def test_run_sync_should_update_existing_template(self):
+        sheets_reader = self.__sheets_reader
+        sheets_reader.read_master.return_value = [['val1', 'val2', 'BOOL']]
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.get_tag_template = make_coroutine_mock(mock.MagicMock())
+        datacatalog_facade.sync_tag_template = make_coroutine_mock(1)
+
+        results = run_until_complete(
+            self.__template_maker.run(spreadsheet_id=None,
+                                      project_id=None,
+                                      template_id='test_template_id',
+                                      display_name='Test Template',
+                                      sync_existing=True))
+
+        self.assertDictEqual({'test_template_id': 'updated'}, results)
+        datacatalog_facade.delete_tag_template.assert_not_called()
+        datacatalog_facade.create_tag_template.assert_not_called()
+
 
 class GoogleSheetsReaderTest(unittest.TestCase):
 
@@ -198,68 +384,121 @@ class GoogleSheetsReaderTest(unittest.TestCase):
 
         self.assertEqual('val2', self.__sheets_reader.read_master(None, None)[0][1])
 
+    def test_read_helpers_should_read_all_sheets_in_a_single_call(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.get_sheets_titles.return_value = ['test-name-1', 'test-name-2']
+        sheets_facade.read_sheets.return_value = {
+            'valueRanges': [{
+                'values': [['col1'], ['val1']]
+            }, {
+                'values': [['col1'], ['val2'], ['val3']]
+            }]
+        }
 
-class DataCatalogFacadeTest(unittest.TestCase):
+        content = self.__sheets_reader.read_helpers('test-id', ['test-name-1', 'test-name-2'])
 
-    @mock.patch('load_template_google_sheets.datacatalog.DataCatalogClient')
-    def setUp(self, mock_datacatalog_client):
-        self.__datacatalog_facade = load_template_google_sheets.DataCatalogFacade()
-        # Shortcut for the object assigned to self.__datacatalog_facade.__datacatalog
-        self.__datacatalog_client = mock_datacatalog_client.return_value
+        sheets_facade.read_sheets.assert_called_once_with('test-id',
+                                                          ['test-name-1', 'test-name-2'], 1)
+        self.assertDictEqual({
+            'test-name-1': [['val1']],
+            'test-name-2': [['val2'], ['val3']]
+        }, content)
 
-    def test_constructor_should_set_instance_attributes(self):
-        self.assertIsNotNone(self.__datacatalog_facade.__dict__['_DataCatalogFacade__datacatalog'])
+    def test_read_helpers_should_split_long_requests(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.read_sheets.side_effect = \
+            lambda spreadsheet_id, sheets_names, values_per_line: \
+            {'valueRanges': [{'values': [['col1'], ['val1']]} for _ in sheets_names]}
 
-    def test_create_tag_template_should_handle_described_fields(self):
-        self.__datacatalog_facade.create_tag_template(
-            project_id='project-id',
-            template_id='template_id',
-            display_name='Test Display Name',
-            fields_descriptors=[[
-                'test-string-field-id', 'Test String Field Display Name', 'STRING'
-            ], ['test-enum-field-id', 'Test ENUM Field Display Name', 'ENUM']],
-            enums_names={'test-enum-field-id': ['TEST_ENUM_VALUE']})
+        sheets_names = [f'test-name-{counter:03d}' for counter in range(300)]
+        sheets_facade.get_sheets_titles.return_value = sheets_names
+        content = self.__sheets_reader.read_helpers('test-id', sheets_names)
 
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.create_tag_template.assert_called_once()
+        self.assertLess(1, sheets_facade.read_sheets.call_count)
+        self.assertEqual(300, len(content))
 
-    def test_delete_tag_template_should_call_client_library_method(self):
-        self.__datacatalog_facade.delete_tag_template('template_name')
+    def test_read_helpers_should_skip_sheets_not_listed_in_metadata(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.get_sheets_titles.return_value = ['test-name-1', 'test-name-3']
+        sheets_facade.read_sheets.return_value = {
+            'valueRanges': [{
+                'values': [['col1'], ['val1']]
+            }, {
+                'values': [['col1'], ['val3']]
+            }]
+        }
 
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.delete_tag_template.assert_called_once()
+        content = self.__sheets_reader.read_helpers('test-id',
+                                                    ['test-name-1', 'test-name-2', 'test-name-3'])
 
-    def test_delete_tag_template_should_handle_nonexistent(self):
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.delete_tag_template.side_effect = \
-            exceptions.PermissionDenied(message='')
+        sheets_facade.read_sheets.assert_called_once_with('test-id',
+                                                          ['test-name-1', 'test-name-3'], 1)
+        self.assertDictEqual(
+            {
+                'test-name-1': [['val1']],
+                'test-name-2': None,
+                'test-name-3': [['val3']]
+            }, content)
 
-        self.__datacatalog_facade.delete_tag_template('template_name')
+    def test_read_helpers_should_not_call_api_if_no_sheet_listed_in_metadata(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.get_sheets_titles.return_value = ['test-name']
 
-        datacatalog_client.delete_tag_template.assert_called_once()
+        content = self.__sheets_reader.read_helpers('test-id', ['test-name-1', 'test-name-2'])
 
-    def test_tag_template_exists_should_return_true_existing(self):
-        tag_template_exists = self.__datacatalog_facade.tag_template_exists('template_name')
+        sheets_facade.read_sheets.assert_not_called()
+        self.assertDictEqual({'test-name-1': None, 'test-name-2': None}, content)
 
-        self.assertTrue(tag_template_exists)
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.get_tag_template.assert_called_once()
+    def test_read_helpers_should_cache_sheets_titles(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.get_sheets_titles.return_value = []
 
-    def test_tag_template_exists_should_return_false_nonexistent(self):
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.get_tag_template.side_effect = exceptions.PermissionDenied(message='')
+        self.__sheets_reader.read_helpers('test-id', ['test-name-1'])
+        self.__sheets_reader.read_helpers('test-id', ['test-name-2'])
 
-        tag_template_exists = self.__datacatalog_facade.tag_template_exists('template_name')
+        sheets_facade.get_sheets_titles.assert_called_once_with('test-id')
 
-        self.assertFalse(tag_template_exists)
-        datacatalog_client = self.__datacatalog_client
-        datacatalog_client.get_tag_template.assert_called_once()
+    def test_read_helpers_should_detect_sheets_deleted_after_reading_metadata(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.get_sheets_titles.return_value = [
+            'test-name-1', 'test-name-2', 'test-name-3', 'test-name-4'
+        ]
+
+        def read_sheets(spreadsheet_id, sheets_names, values_per_line):
+            if 'test-name-2' in sheets_names:
+                error_response = httplib2.Response({'status': 400, 'reason': 'Bad Request'})
+                raise errors.HttpError(resp=error_response, content=b'{}')
+            return {'valueRanges': [{'values': [['col1'], ['val1']]} for _ in sheets_names]}
+
+        sheets_facade.read_sheets.side_effect = read_sheets
+
+        content = self.__sheets_reader.read_helpers(
+            'test-id', ['test-name-1', 'test-name-2', 'test-name-3', 'test-name-4'])
+
+        self.assertDictEqual(
+            {
+                'test-name-1': [['val1']],
+                'test-name-2': None,
+                'test-name-3': [['val1']],
+                'test-name-4': [['val1']]
+            }, content)
+
+    def test_read_helpers_should_raise_unknown_errors(self):
+        sheets_facade = self.__sheets_facade
+        sheets_facade.get_sheets_titles.return_value = ['test-name-1', 'test-name-2']
+        error_response = httplib2.Response({'status': 500, 'reason': 'Internal Server Error'})
+        sheets_facade.read_sheets.side_effect = \
+            errors.HttpError(resp=error_response, content=b'{}')
+
+        with self.assertRaises(errors.HttpError):
+            self.__sheets_reader.read_helpers('test-id', ['test-name-1', 'test-name-2'])
 
 
 class GoogleSheetsFacadeTest(unittest.TestCase):
 
-    @mock.patch('load_template_google_sheets.service_account.ServiceAccountCredentials'
-                '.get_application_default', lambda: None)
+    @mock.patch(
+        'load_template_google_sheets.service_account.ServiceAccountCredentials'
+        '.get_application_default', lambda: None)
     @mock.patch('load_template_google_sheets.discovery.build')
     def setUp(self, mock_build):
         self.__sheets_facade = load_template_google_sheets.GoogleSheetsFacade()
@@ -287,69 +526,77 @@ class GoogleSheetsFacadeTest(unittest.TestCase):
             .values.return_value\
             .batchGet.assert_called_with(spreadsheetId='test-id', ranges='test-name!A:B')
 
+    def test_get_sheets_titles_should_request_only_titles(self):
+        self.__mock_build.return_value\
+            .spreadsheets.return_value\
+            .get.return_value\
+            .execute.return_value = {
+                'sheets': [{'properties': {'title': 'test-name-1'}},
+                           {'properties': {'title': 'test-name-2'}}]
+            }
+
+        sheets_titles = self.__sheets_facade.get_sheets_titles(spreadsheet_id='test-id')
+
+        self.assertListEqual(['test-name-1', 'test-name-2'], sheets_titles)
+
+        self.__mock_build.return_value\
+            .spreadsheets.return_value\
+            .get.assert_called_with(spreadsheetId='test-id', fields='sheets.properties.title')
+
+    def test_read_sheets_should_get_all_requested_ranges(self):
+        self.__mock_build.return_value\
+            .spreadsheets.return_value\
+            .values.return_value\
+            .batchGet.return_value\
+            .execute.return_value = {}
+
+        self.__sheets_facade.read_sheets(spreadsheet_id='test-id',
+                                         sheets_names=['test-name-1', 'test-name-2'],
+                                         values_per_line=1)
+
+        self.__mock_build.return_value\
+            .spreadsheets.return_value\
+            .values.return_value\
+            .batchGet.assert_called_with(spreadsheetId='test-id',
+                                         ranges=['test-name-1!A:A', 'test-name-2!A:A'])
+
+    @mock.patch('load_template_google_sheets.api_instrumentation.get_default_recorder')
+    def test_read_sheets_should_record_api_calls(self, mock_get_default_recorder):
+        batch_get_request = self.__mock_build.return_value\
+            .spreadsheets.return_value\
+            .values.return_value\
+            .batchGet.return_value
+        batch_get_request.execute.return_value = {'valueRanges': []}
+
+        self.__sheets_facade.read_sheets(spreadsheet_id='test-id',
+                                         sheets_names=['test-name-1'],
+                                         values_per_line=1)
+
+        mock_start_call = mock_get_default_recorder.return_value.start_call
+        mock_start_call.assert_called_once_with('sheets.spreadsheets.values.batchGet',
+                                                batch_get_request.uri)
+        self.assertEqual({'valueRanges': []},
+                         mock_start_call.return_value.__enter__.return_value.response)
+
+
+def make_coroutine(return_value=None, exception=None):
+
+    async def coroutine():
+        if exception:
+            raise exception
+        return return_value
+
+    return coroutine()
+
+
+def make_coroutine_mock(return_value=None, exception=None):
+    return mock.MagicMock(
+        side_effect=lambda *args, **kwargs: make_coroutine(return_value, exception))
+
 
-class StringFormatterTest(unittest.TestCase):
-
-    def test_format_elements_snakecase_list(self):
-        test_list = ['AA-AA', 'BB-BB']
-        load_template_google_sheets.StringFormatter.format_elements_to_snakecase(test_list)
-        self.assertListEqual(['aa_aa', 'bb_bb'], test_list)
-
-    def test_format_elements_snakecase_internal_index(self):
-        test_list = [['AA-AA', 'Test A'], ['BB-BB', 'Test B']]
-        load_template_google_sheets.StringFormatter.format_elements_to_snakecase(test_list,
-                                                                                 internal_index=0)
-        self.assertListEqual([['aa_aa', 'Test A'], ['bb_bb', 'Test B']], test_list)
-
-    def test_format_string_to_snakecase_abbreviation(self):
-        self.assertEqual('aaa',
-                         load_template_google_sheets.StringFormatter.format_to_snakecase('AAA'))
-        self.assertEqual(
-            'aaa_aaa', load_template_google_sheets.StringFormatter.format_to_snakecase('AAA-AAA'))
-
-    def test_format_string_to_snakecase_camelcase(self):
-        self.assertEqual(
-            'camel_case',
-            load_template_google_sheets.StringFormatter.format_to_snakecase('camelCase'))
-
-    def test_format_string_to_snakecase_leading_number(self):
-        self.assertEqual(
-            '1_number',
-            load_template_google_sheets.StringFormatter.format_to_snakecase('1 number'))
-
-    def test_format_string_to_snakecase_repeated_special_chars(self):
-        self.assertEqual(
-            'repeated_special_chars',
-            load_template_google_sheets.StringFormatter.format_to_snakecase(
-                'repeated   special___chars'))
-
-    def test_format_string_to_snakecase_whitespaces(self):
-        self.assertEqual(
-            'no_leading_and_trailing',
-            load_template_google_sheets.StringFormatter.format_to_snakecase(
-                ' no leading and trailing '))
-        self.assertEqual(
-            'no_leading_and_trailing',
-            load_template_google_sheets.StringFormatter.format_to_snakecase(
-                '\nno leading and trailing\t'))
-
-    def test_format_string_to_snakecase_special_chars(self):
-        self.assertEqual(
-            'special_chars',
-            load_template_google_sheets.StringFormatter.format_to_snakecase('special!#@-_ chars'))
-        self.assertEqual(
-            'special_chars',
-            load_template_google_sheets.StringFormatter.format_to_snakecase('! special chars ?'))
-
-    def test_format_string_to_snakecase_unicode(self):
-        self.assertEqual(
-            'a_a_e_o_u',
-            load_template_google_sheets.StringFormatter.format_to_snakecase(u'å ä ß é ö ü'))
-
-    def test_format_string_to_snakecase_uppercase(self):
-        self.assertEqual(
-            'uppercase',
-            load_template_google_sheets.StringFormatter.format_to_snakecase('UPPERCASE'))
-        self.assertEqual(
-            'upper_case',
-            load_template_google_sheets.StringFormatter.format_to_snakecase('UPPER CASE'))
+def run_until_complete(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,370 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+
+import policy_tags_manager
+
+_TEST_TAXONOMY_NAME = 'projects/test-project/locations/us/taxonomies/123'
+
+
+class TaxonomyManagerTest(unittest.TestCase):
+
+    @mock.patch('policy_tags_manager.DataCatalogFacade')
+    def setUp(self, mock_datacatalog_facade):
+        self.__taxonomy_manager = policy_tags_manager.TaxonomyManager(max_workers=2)
+        # Shortcut for the object assigned to self.__taxonomy_manager.__datacatalog_facade
+        self.__datacatalog_facade = mock_datacatalog_facade.return_value
+        self.__datacatalog_facade.create_taxonomy.return_value = make_taxonomy()
+        self.__datacatalog_facade.create_policy_tag.side_effect = make_policy_tag
+
+    def test_import_taxonomy_should_create_parents_before_children(self):
+        self.__taxonomy_manager.import_taxonomy('test-project', 'Test Taxonomy', make_tree())
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.create_taxonomy.assert_called_once_with('test-project', 'Test Taxonomy',
+                                                                   None)
+
+        # Maps the display names to the call order and the parent names.
+        calls = {
+            call[0][1]: (order, call[0][3])
+            for order, call in enumerate(datacatalog_facade.create_policy_tag.call_args_list)
+        }
+        self.assertEqual(4, len(calls))
+        self.assertLess(calls['PII'][0], calls['Contact'][0])
+        self.assertLess(calls['Contact'][0], calls['Email'][0])
+        self.assertEqual(f'{_TEST_TAXONOMY_NAME}/policyTags/PII', calls['Contact'][1])
+        self.assertEqual(f'{_TEST_TAXONOMY_NAME}/policyTags/Contact', calls['Email'][1])
+        self.assertIsNone(calls['Public'][1])
+
+    def test_import_taxonomy_should_skip_children_of_failed_policy_tags(self):
+
+        def create_policy_tag(taxonomy_name, display_name, *args):
+            if display_name == 'PII':
+                raise exceptions.PermissionDenied(message='')
+            return make_policy_tag(taxonomy_name, display_name)
+
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.create_policy_tag.side_effect = create_policy_tag
+
+        self.assertRaises(exceptions.PermissionDenied, self.__taxonomy_manager.import_taxonomy,
+                          'test-project', 'Test Taxonomy', make_tree())
+
+        self.assertEqual(2, datacatalog_facade.create_policy_tag.call_count)
+
+    def test_export_taxonomies_should_accept_ids_and_names(self):
+        self.__taxonomy_manager.export_taxonomies('test-project', ['456', _TEST_TAXONOMY_NAME])
+
+        self.__datacatalog_facade.export_taxonomies.assert_called_once_with(
+            'test-project',
+            ['projects/test-project/locations/us/taxonomies/456', _TEST_TAXONOMY_NAME])
+
+    @mock.patch('policy_tags_manager._IMPORT_TAXONOMIES_BATCH_SIZE', 2)
+    def test_import_taxonomies_should_send_batches(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.import_taxonomies.side_effect = \
+            lambda project_id, batch: [make_taxonomy() for _ in batch]
+
+        serialized_taxonomies = [datacatalog.SerializedTaxonomy() for _ in range(5)]
+        taxonomies = self.__taxonomy_manager.import_taxonomies('test-project',
+                                                               serialized_taxonomies)
+
+        self.assertEqual(5, len(taxonomies))
+        self.assertEqual(
+            [2, 2, 1],
+            [len(call[0][1]) for call in datacatalog_facade.import_taxonomies.call_args_list])
+
+    def test_sync_taxonomy_should_create_missing_policy_tags_under_existing_parents(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.list_policy_tags.return_value = make_existing_policy_tags(
+            ['PII', 'PII/Contact', 'Public'])
+
+        changes = self.__taxonomy_manager.sync_taxonomy('test-project', '123', make_tree())
+
+        datacatalog_facade.list_policy_tags.assert_called_once_with(_TEST_TAXONOMY_NAME)
+        datacatalog_facade.create_policy_tag.assert_called_once_with(
+            _TEST_TAXONOMY_NAME, 'Email', '', f'{_TEST_TAXONOMY_NAME}/policyTags/Contact')
+        datacatalog_facade.update_policy_tag.assert_not_called()
+        datacatalog_facade.delete_policy_tag.assert_not_called()
+        self.assertEqual([('PII', 'Contact', 'Email')],
+                         [change['path'] for change in changes['create']])
+
+    def test_sync_taxonomy_should_delete_moved_policy_tags_before_creating_them(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.list_policy_tags.return_value = make_existing_policy_tags(
+            ['PII', 'PII/Contact', 'PII/Contact/Email', 'Public', 'Public/Phone'])
+        calls = []
+        datacatalog_facade.delete_policy_tag.side_effect = \
+            lambda name: calls.append(('delete', name.split('/')[-1]))
+
+        def create_policy_tag(taxonomy_name, display_name, *args):
+            calls.append(('create', display_name))
+            return make_policy_tag(taxonomy_name, display_name)
+
+        datacatalog_facade.create_policy_tag.side_effect = create_policy_tag
+
+        policy_tags_tree = make_tree()
+        policy_tags_tree[0]['children'][0]['children'].append({
+            'display_name': 'Phone',
+            'description': None,
+            'children': []
+        })
+        self.__taxonomy_manager.sync_taxonomy('test-project', '123', policy_tags_tree)
+
+        self.assertEqual([('delete', 'Phone'), ('create', 'Phone')], calls)
+
+    def test_sync_taxonomy_should_make_no_changes_on_dry_run(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.list_policy_tags.return_value = make_existing_policy_tags(['Secret'])
+
+        changes = self.__taxonomy_manager.sync_taxonomy('test-project',
+                                                        _TEST_TAXONOMY_NAME,
+                                                        make_tree(),
+                                                        dry_run=True)
+
+        self.assertEqual(4, len(changes['create']))
+        self.assertEqual(1, len(changes['delete']))
+        datacatalog_facade.create_policy_tag.assert_not_called()
+        datacatalog_facade.delete_policy_tag.assert_not_called()
+
+
+class PolicyTagsTreeDifferTest(unittest.TestCase):
+
+    def test_diff_should_return_no_changes_for_matching_tree(self):
+        existing_policy_tags = make_existing_policy_tags(
+            ['PII', 'PII/Contact', 'PII/Contact/Email', 'Public'])
+
+        changes = policy_tags_manager.PolicyTagsTreeDiffer.diff(existing_policy_tags, make_tree())
+
+        self.assertEqual({'create': [], 'update': [], 'delete': []}, changes)
+
+    def test_diff_should_create_policy_tags_sorted_by_depth(self):
+        changes = policy_tags_manager.PolicyTagsTreeDiffer.diff([], make_tree())
+
+        self.assertEqual([1, 1, 2, 3], [len(change['path']) for change in changes['create']])
+
+    def test_diff_should_update_changed_descriptions(self):
+        existing_policy_tags = make_existing_policy_tags(
+            ['PII', 'PII/Contact', 'PII/Contact/Email', 'Public'])
+
+        changes = policy_tags_manager.PolicyTagsTreeDiffer.diff(existing_policy_tags,
+                                                                make_tree(descriptions=True))
+
+        self.assertEqual([{
+            'path': ('PII', ),
+            'name': f'{_TEST_TAXONOMY_NAME}/policyTags/PII',
+            'description': 'Personal data'
+        }, {
+            'path': ('PII', 'Contact', 'Email'),
+            'name': f'{_TEST_TAXONOMY_NAME}/policyTags/Email',
+            'description': 'Emails'
+        }], changes['update'])
+
+    def test_diff_should_delete_topmost_removed_policy_tags_only(self):
+        existing_policy_tags = make_existing_policy_tags([
+            'PII', 'PII/Contact', 'PII/Contact/Email', 'PII/Contact/Phone', 'Public', 'Secret',
+            'Secret/Key'
+        ])
+
+        changes = policy_tags_manager.PolicyTagsTreeDiffer.diff(existing_policy_tags, make_tree())
+
+        self.assertEqual([('PII', 'Contact', 'Phone'), ('Secret', )],
+                         sorted(change['path'] for change in changes['delete']))
+
+
+class DataCatalogFacadeTest(unittest.TestCase):
+
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerClient')
+    def test_create_policy_tag_should_set_parent_and_retry(self, mock_policy_tag_manager_client):
+        datacatalog_facade = policy_tags_manager.DataCatalogFacade()
+
+        datacatalog_facade.create_policy_tag(_TEST_TAXONOMY_NAME, 'Email', 'Emails',
+                                             f'{_TEST_TAXONOMY_NAME}/policyTags/1')
+
+        call_kwargs = mock_policy_tag_manager_client.return_value.create_policy_tag.call_args[1]
+        self.assertEqual(_TEST_TAXONOMY_NAME, call_kwargs['parent'])
+        self.assertEqual(f'{_TEST_TAXONOMY_NAME}/policyTags/1',
+                         call_kwargs['policy_tag'].parent_policy_tag)
+        self.assertTrue(call_kwargs['retry']._predicate(exceptions.ResourceExhausted('')))
+        self.assertFalse(call_kwargs['retry']._predicate(exceptions.PermissionDenied('')))
+
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerClient')
+    def test_list_policy_tags_should_request_large_pages(self, mock_policy_tag_manager_client):
+        datacatalog_facade = policy_tags_manager.DataCatalogFacade()
+        policy_tag_manager_client = mock_policy_tag_manager_client.return_value
+        policy_tag_manager_client.list_policy_tags.return_value = iter(
+            make_existing_policy_tags(['PII', 'Public']))
+
+        policy_tags = datacatalog_facade.list_policy_tags(_TEST_TAXONOMY_NAME)
+
+        request = policy_tag_manager_client.list_policy_tags.call_args[1]['request']
+        self.assertEqual(_TEST_TAXONOMY_NAME, request.parent)
+        self.assertEqual(1000, request.page_size)
+        self.assertEqual(2, len(policy_tags))
+
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerClient')
+    def test_update_policy_tag_should_update_description_only(self,
+                                                              mock_policy_tag_manager_client):
+        datacatalog_facade = policy_tags_manager.DataCatalogFacade()
+
+        datacatalog_facade.update_policy_tag(f'{_TEST_TAXONOMY_NAME}/policyTags/1', 'Emails')
+
+        request = mock_policy_tag_manager_client.return_value.update_policy_tag.call_args[1][
+            'request']
+        self.assertEqual('Emails', request.policy_tag.description)
+        self.assertEqual(['description'], list(request.update_mask.paths))
+
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerSerializationClient')
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerClient')
+    def test_import_taxonomies_should_use_inline_source(self, mock_policy_tag_manager_client,
+                                                        mock_serialization_client):
+        datacatalog_facade = policy_tags_manager.DataCatalogFacade()
+        mock_serialization_client.common_location_path.return_value = \
+            'projects/test-project/locations/us'
+        serialization_client = mock_serialization_client.return_value
+        serialization_client.import_taxonomies.return_value.taxonomies = [make_taxonomy()]
+
+        taxonomies = datacatalog_facade.import_taxonomies('test-project',
+                                                          [datacatalog.SerializedTaxonomy()])
+
+        request = serialization_client.import_taxonomies.call_args[1]['request']
+        self.assertEqual('projects/test-project/locations/us', request.parent)
+        self.assertEqual(1, len(request.inline_source.taxonomies))
+        self.assertEqual(_TEST_TAXONOMY_NAME, taxonomies[0].name)
+
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerSerializationClient')
+    @mock.patch('policy_tags_manager.datacatalog.PolicyTagManagerClient')
+    def test_export_taxonomies_should_request_serialized_taxonomies(self,
+                                                                    mock_policy_tag_manager_client,
+                                                                    mock_serialization_client):
+        datacatalog_facade = policy_tags_manager.DataCatalogFacade()
+        mock_serialization_client.common_location_path.return_value = \
+            'projects/test-project/locations/us'
+        serialization_client = mock_serialization_client.return_value
+
+        datacatalog_facade.export_taxonomies('test-project', [_TEST_TAXONOMY_NAME])
+
+        request = serialization_client.export_taxonomies.call_args[1]['request']
+        self.assertEqual([_TEST_TAXONOMY_NAME], list(request.taxonomies))
+        self.assertTrue(request.serialized_taxonomies)
+
+
+@mock.patch('policy_tags_manager.open', new_callable=mock.mock_open)
+class PolicyTagsTreeReaderTest(unittest.TestCase):
+
+    def test_read_should_handle_json_files(self, mock_open):
+        mock_open.return_value = io.StringIO(
+            '[{"display_name": "PII", "children": [{"display_name": "Email",'
+            ' "description": "Emails"}]}]')
+
+        tree = policy_tags_manager.PolicyTagsTreeReader.read('tree.json')
+
+        self.assertEqual(
+            [{
+                'display_name': 'PII',
+                'description': None,
+                'children': [{
+                    'display_name': 'Email',
+                    'description': 'Emails',
+                    'children': []
+                }]
+            }], tree)
+
+    def test_read_should_handle_csv_files(self, mock_open):
+        mock_open.return_value = io.StringIO('path,description\n'
+                                             'PII,Personal data\n'
+                                             'PII/Contact/Email,Emails\n'
+                                             'Public,\n')
+
+        tree = policy_tags_manager.PolicyTagsTreeReader.read('tree.csv')
+
+        self.assertEqual(make_tree(descriptions=True), tree)
+
+
+class SerializedTaxonomyFactoryTest(unittest.TestCase):
+
+    def test_make_serialized_taxonomy_should_nest_policy_tags(self):
+        taxonomy = policy_tags_manager.SerializedTaxonomyFactory.make_serialized_taxonomy(
+            'Test Taxonomy', make_tree(descriptions=True))
+
+        self.assertEqual('Test Taxonomy', taxonomy.display_name)
+        self.assertEqual(['PII', 'Public'],
+                         [policy_tag.display_name for policy_tag in taxonomy.policy_tags])
+        email = taxonomy.policy_tags[0].child_policy_tags[0].child_policy_tags[0]
+        self.assertEqual('Email', email.display_name)
+        self.assertEqual('Emails', email.description)
+
+
+class SerializedTaxonomiesFileTest(unittest.TestCase):
+
+    def test_read_should_return_written_taxonomies(self):
+        taxonomy = policy_tags_manager.SerializedTaxonomyFactory.make_serialized_taxonomy(
+            'Test Taxonomy', make_tree(), 'Description')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'taxonomies.json')
+            policy_tags_manager.SerializedTaxonomiesFile.write(file_path, [taxonomy])
+            taxonomies = policy_tags_manager.SerializedTaxonomiesFile.read(file_path)
+
+        self.assertEqual([taxonomy], taxonomies)
+
+
+class PolicyTagsManagerCLITest(unittest.TestCase):
+
+    def test_parse_args_should_require_display_name_for_policy_tags_file(self):
+        self.assertRaises(SystemExit, policy_tags_manager.PolicyTagsManagerCLI._parse_args,
+                          ['import-taxonomies', '--project-id', 'p', '--policy-tags-file', 'f'])
+
+
+def make_tree(descriptions=False):
+    return [{
+        'display_name':
+        'PII',
+        'description':
+        'Personal data' if descriptions else None,
+        'children': [{
+            'display_name':
+            'Contact',
+            'description':
+            None,
+            'children': [{
+                'display_name': 'Email',
+                'description': 'Emails' if descriptions else None,
+                'children': []
+            }]
+        }]
+    }, {
+        'display_name': 'Public',
+        'description': None,
+        'children': []
+    }]
+
+
+def make_taxonomy():
+    taxonomy = datacatalog.Taxonomy()
+    taxonomy.name = _TEST_TAXONOMY_NAME
+    return taxonomy
+
+
+def make_policy_tag(taxonomy_name, display_name, *args):
+    policy_tag = datacatalog.PolicyTag()
+    policy_tag.name = f'{taxonomy_name}/policyTags/{display_name}'
+    policy_tag.display_name = display_name
+    return policy_tag
+
+
+def make_existing_policy_tags(paths):
+    """Make Policy Tags named after their display names, e.g. 'PII/Contact' for Contact."""
+    policy_tags = []
+    for path in paths:
+        display_names = path.split('/')
+        parent_name = make_policy_tag(_TEST_TAXONOMY_NAME, display_names[-2]).name \
+            if len(display_names) > 1 else None
+        policy_tag = make_policy_tag(_TEST_TAXONOMY_NAME, display_names[-1])
+        policy_tag.parent_policy_tag = parent_name or ''
+        policy_tags.append(policy_tag)
+    return policy_tags
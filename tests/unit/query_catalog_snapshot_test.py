@@ -0,0 +1,169 @@
+import os
+import tempfile
+import unittest
+
+import export_catalog_snapshot
+import query_catalog_snapshot
+
+_TEST_ENTRY_NAME_PREFIX = 'projects/test-project/locations/us/entryGroups/@bigquery/entries'
+
+
+class SnapshotIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_snapshot(temp_dir)
+            cls.snapshot_index = query_catalog_snapshot.SnapshotIndex.build(temp_dir)
+
+    def test_search_should_match_system_and_type(self):
+        results = self.snapshot_index.search('system=BigQuery type=table')
+
+        self.assertEqual(['customers', 'orders'], get_entries_ids(results))
+
+    def test_search_should_match_column_names(self):
+        self.assertEqual(['customers'],
+                         get_entries_ids(self.snapshot_index.search('column:email')))
+        # Nested columns are matched by their own names and by their full paths.
+        self.assertEqual(['customers'], get_entries_ids(self.snapshot_index.search('column:city')))
+        self.assertEqual(['customers'],
+                         get_entries_ids(self.snapshot_index.search('column:address.city')))
+
+    def test_search_should_match_tag_templates_and_values(self):
+        self.assertEqual(['customers', 'orders'],
+                         get_entries_ids(self.snapshot_index.search('tag:pii_template')))
+        self.assertEqual(['customers'],
+                         get_entries_ids(
+                             self.snapshot_index.search('tag:pii_template.has_pii=True')))
+        self.assertEqual(['orders'],
+                         get_entries_ids(
+                             self.snapshot_index.search('tag:pii_template.score=0.50')))
+
+    def test_search_should_match_double_tag_values_exactly(self):
+        self.assertEqual(['orders'],
+                         get_entries_ids(
+                             self.snapshot_index.search('tag:pii_template.rows=1234567')))
+        self.assertEqual([],
+                         get_entries_ids(
+                             self.snapshot_index.search('tag:pii_template.rows=1234568')))
+
+    def test_search_should_match_string_tag_values_verbatim(self):
+        self.assertEqual(['customers'],
+                         get_entries_ids(self.snapshot_index.search('tag:pii_template.code=007')))
+        self.assertEqual([],
+                         get_entries_ids(self.snapshot_index.search('tag:pii_template.code=7')))
+
+    def test_search_should_match_keywords(self):
+        results = self.snapshot_index.search('system=bigquery quickstart')
+
+        self.assertEqual(['orders'], get_entries_ids(results))
+
+    def test_search_should_index_latest_export_only(self):
+        # The orders Entry had an email column in the first export only.
+        self.assertEqual([], get_entries_ids(self.snapshot_index.search('column:email orders')))
+
+    def test_search_should_raise_for_unsupported_predicates(self):
+        self.assertRaises(ValueError, self.snapshot_index.search, 'createtime>2020-01-01')
+        self.assertRaises(ValueError, self.snapshot_index.search, ' ')
+
+    def test_load_should_return_saved_index(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file = os.path.join(temp_dir, 'index.pickle')
+            self.snapshot_index.save(index_file)
+            snapshot_index = query_catalog_snapshot.SnapshotIndex.load(index_file)
+
+        self.assertEqual(['customers'], get_entries_ids(snapshot_index.search('column:email')))
+
+
+class NormalizeTagValueTest(unittest.TestCase):
+
+    def test_normalize_tag_value_should_make_values_comparable(self):
+        normalize_tag_value = query_catalog_snapshot.normalize_tag_value
+
+        self.assertEqual(normalize_tag_value(True), normalize_tag_value('TRUE'))
+        self.assertEqual(normalize_tag_value(0.5, True), normalize_tag_value('0.50', True))
+        self.assertEqual(normalize_tag_value('EMAIL'), normalize_tag_value('email'))
+
+    def test_normalize_tag_value_should_not_collide_double_values(self):
+        normalize_tag_value = query_catalog_snapshot.normalize_tag_value
+
+        self.assertNotEqual(normalize_tag_value(1234567.0, True),
+                            normalize_tag_value('1234568', True))
+
+    def test_normalize_tag_value_should_keep_strings_verbatim(self):
+        normalize_tag_value = query_catalog_snapshot.normalize_tag_value
+
+        self.assertEqual('007', normalize_tag_value('007'))
+        self.assertEqual('nan', normalize_tag_value('NaN'))
+        self.assertRaises(ValueError, normalize_tag_value, 'email', True)
+
+
+def write_snapshot(folder):
+    partition = ('bigquery', 'test-project')
+
+    for export_id, entries_ids in [('20200101T000000-a', ['orders']),
+                                   ('20200102T000000-b', ['customers', 'orders'])]:
+        writers = {
+            table_name:
+            export_catalog_snapshot.PartitionedTableWriter(folder, table_name, schema, 'parquet',
+                                                           export_id, 1000)
+            for table_name, schema in export_catalog_snapshot._TABLES_SCHEMAS.items()
+        }
+
+        for entry_id in entries_ids:
+            entry_name = f'{_TEST_ENTRY_NAME_PREFIX}/{entry_id}'
+            writers['entries'].add_rows(
+                partition, [{
+                    'name': entry_name,
+                    'type': 'TABLE',
+                    'display_name': entry_id,
+                    'description': 'Quickstart orders' if entry_id == 'orders' else None
+                }])
+            writers['tags'].add_rows(partition, make_tags_rows(entry_name, entry_id))
+
+        first_export = export_id.endswith('-a')
+        writers['columns'].add_rows(partition, [{
+            'entry_name': f'{_TEST_ENTRY_NAME_PREFIX}/orders',
+            'column': 'email' if first_export else 'amount'
+        }])
+        if not first_export:
+            writers['columns'].add_rows(partition, [{
+                'entry_name': f'{_TEST_ENTRY_NAME_PREFIX}/customers',
+                'column': column
+            } for column in ['email', 'address', 'address.city']])
+
+        for writer in writers.values():
+            writer.close()
+
+
+def make_tags_rows(entry_name, entry_id):
+    if entry_id == 'customers':
+        values = [{
+            'field_id': 'has_pii',
+            'bool_value': True
+        }, {
+            'field_id': 'code',
+            'string_value': '007'
+        }]
+    else:
+        values = [{
+            'field_id': 'score',
+            'double_value': 0.5
+        }, {
+            'field_id': 'rows',
+            'double_value': 1234567.0
+        }]
+
+    tags_rows = []
+    for value in values:
+        tag_row = {
+            'entry_name': entry_name,
+            'template': 'projects/test-project/locations/us/tagTemplates/pii_template',
+        }
+        tag_row.update(value)
+        tags_rows.append(tag_row)
+    return tags_rows
+
+
+def get_entries_ids(results):
+    return [result['name'].split('/')[-1] for result in results]
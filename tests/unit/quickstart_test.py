@@ -0,0 +1,287 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+from google.cloud import datacatalog
+
+import quickstart
+
+_TEST_LINKED_RESOURCE = '//bigquery.googleapis.com/projects/test-project/datasets/d/tables/t'
+_TEST_ENTRY_NAME = 'projects/test-project/locations/us/entryGroups/@bigquery/entries/t'
+
+
+class DataCatalogFacadeTest(unittest.TestCase):
+
+    @mock.patch('quickstart.datacatalog.DataCatalogClient')
+    def setUp(self, mock_datacatalog_client):
+        self.__entry_cache = quickstart.EntryCache(error_ttl_seconds=60)
+        self.__datacatalog_facade = quickstart.DataCatalogFacade(self.__entry_cache)
+        # Shortcut for the object assigned to self.__datacatalog_facade.__datacatalog
+        self.__datacatalog_client = mock_datacatalog_client.return_value
+
+    def test_search_catalog_should_return_all_results(self):
+        self.__datacatalog_client.search_catalog.return_value.pages = make_search_pages(2, 3)
+
+        results = self.__datacatalog_facade.search_catalog('test-org', 'system=bigquery')
+
+        self.assertEqual(6, len(results))
+
+    def test_iter_search_catalog_should_set_request_attributes(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.search_catalog.return_value.pages = []
+
+        list(
+            self.__datacatalog_facade.iter_search_catalog('test-org',
+                                                          'system=bigquery',
+                                                          page_size=500,
+                                                          order_by='last_modified_timestamp',
+                                                          page_token='token-1'))
+
+        request = datacatalog_client.search_catalog.call_args[1]['request']
+        self.assertEqual(['test-org'], list(request.scope.include_org_ids))
+        self.assertEqual('system=bigquery', request.query)
+        self.assertEqual(500, request.page_size)
+        self.assertEqual('last_modified_timestamp', request.order_by)
+        self.assertEqual('token-1', request.page_token)
+
+    def test_iter_search_catalog_should_fetch_pages_lazily(self):
+        pages = iter(make_search_pages(3, 2))
+        self.__datacatalog_client.search_catalog.return_value.pages = pages
+
+        results = self.__datacatalog_facade.iter_search_catalog('test-org', 'system=bigquery')
+        next(results)
+
+        # Only the first page was fetched.
+        self.assertEqual(2, len(list(pages)))
+
+    def test_iter_search_catalog_should_resume_from_checkpoint(self):
+        datacatalog_client = self.__datacatalog_client
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = os.path.join(temp_dir, 'search.json')
+
+            datacatalog_client.search_catalog.return_value.pages = make_search_pages(3, 2)
+            results = self.__datacatalog_facade.iter_search_catalog(
+                'test-org', 'system=bigquery', checkpoint_file=checkpoint_file)
+            # Interrupted while consuming the second page.
+            for _ in range(3):
+                next(results)
+            results.close()
+
+            datacatalog_client.search_catalog.return_value.pages = make_search_pages(2, 2)
+            resumed_results = list(
+                self.__datacatalog_facade.iter_search_catalog('test-org',
+                                                              'system=bigquery',
+                                                              checkpoint_file=checkpoint_file))
+
+            checkpoint_file_exists = os.path.isfile(checkpoint_file)
+
+        request = datacatalog_client.search_catalog.call_args[1]['request']
+        self.assertEqual('token-1', request.page_token)
+        self.assertEqual(4, len(resumed_results))
+        self.assertFalse(checkpoint_file_exists)
+
+    def test_iter_search_catalog_should_not_resume_different_search(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = os.path.join(temp_dir, 'search.json')
+            quickstart.SearchCheckpointFile(checkpoint_file, {
+                'query': 'system=bigquery'
+            }).save('token-1', 10)
+
+            results = self.__datacatalog_facade.iter_search_catalog(
+                'test-org', 'system=bigquery', checkpoint_file=checkpoint_file)
+
+            self.assertRaises(ValueError, list, results)
+
+    def test_iter_search_catalog_should_set_project_ids_scope(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.search_catalog.return_value.pages = []
+
+        list(
+            self.__datacatalog_facade.iter_search_catalog(None,
+                                                          'system=bigquery',
+                                                          project_ids=['p-1', 'p-2']))
+
+        request = datacatalog_client.search_catalog.call_args[1]['request']
+        self.assertEqual([], list(request.scope.include_org_ids))
+        self.assertEqual(['p-1', 'p-2'], list(request.scope.include_project_ids))
+
+    def test_lookup_entry_should_use_cached_entry(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.lookup_entry.return_value = make_entry()
+
+        self.__datacatalog_facade.lookup_entry(_TEST_LINKED_RESOURCE)
+        entry = self.__datacatalog_facade.lookup_entry(_TEST_LINKED_RESOURCE)
+
+        self.assertEqual(_TEST_ENTRY_NAME, entry.name)
+        datacatalog_client.lookup_entry.assert_called_once()
+        self.assertEqual(1, self.__entry_cache.hits)
+        self.assertEqual(1, self.__entry_cache.misses)
+
+    def test_get_entry_should_use_entry_cached_by_lookup(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.lookup_entry.return_value = make_entry()
+
+        self.__datacatalog_facade.lookup_entry(_TEST_LINKED_RESOURCE)
+        entry = self.__datacatalog_facade.get_entry(_TEST_ENTRY_NAME)
+
+        self.assertEqual(_TEST_ENTRY_NAME, entry.name)
+        datacatalog_client.get_entry.assert_not_called()
+
+    def test_lookup_entry_should_use_cached_error(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.lookup_entry.side_effect = exceptions.NotFound(message='')
+
+        for _ in range(2):
+            self.assertRaises(exceptions.NotFound, self.__datacatalog_facade.lookup_entry,
+                              _TEST_LINKED_RESOURCE)
+
+        datacatalog_client.lookup_entry.assert_called_once()
+
+    def test_lookup_entry_should_not_cache_transient_errors(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.lookup_entry.side_effect = [
+            exceptions.ServiceUnavailable(message=''),
+            make_entry()
+        ]
+
+        self.assertRaises(exceptions.ServiceUnavailable, self.__datacatalog_facade.lookup_entry,
+                          _TEST_LINKED_RESOURCE)
+        self.__datacatalog_facade.lookup_entry(_TEST_LINKED_RESOURCE)
+
+        self.assertEqual(2, datacatalog_client.lookup_entry.call_count)
+
+    @mock.patch('quickstart.datacatalog.DataCatalogClient')
+    def test_lookup_entry_should_call_api_if_no_cache(self, mock_datacatalog_client):
+        datacatalog_client = mock_datacatalog_client.return_value
+        datacatalog_facade = quickstart.DataCatalogFacade()
+
+        datacatalog_facade.lookup_entry(_TEST_LINKED_RESOURCE)
+        datacatalog_facade.lookup_entry(_TEST_LINKED_RESOURCE)
+
+        self.assertEqual(2, datacatalog_client.lookup_entry.call_count)
+
+
+class ShardedCatalogSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__datacatalog_facade = mock.MagicMock()
+        self.__sharded_search = quickstart.ShardedCatalogSearch(self.__datacatalog_facade,
+                                                                max_workers=2)
+
+    def test_search_projects_should_split_projects_into_shards(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.return_value = []
+
+        _, shards_metrics = self.__sharded_search.search_projects(
+            ['project-1', 'project-2', 'project-3'], 'system=bigquery', projects_per_shard=2)
+
+        calls_project_ids = [
+            call[1]['project_ids']
+            for call in datacatalog_facade.iter_search_catalog.call_args_list
+        ]
+        self.assertEqual([['project-1', 'project-2'], ['project-3']], calls_project_ids)
+        self.assertEqual(['projects[0:2]', 'projects[2:3]'],
+                         [metrics['shard'] for metrics in shards_metrics])
+
+    def test_search_predicates_should_merge_and_deduplicate_results(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.side_effect = [
+            make_search_pages(1, 3)[0].results,
+            make_search_pages(1, 2)[0].results
+        ]
+
+        results, shards_metrics = self.__sharded_search.search_predicates(
+            'test-org', 'system=bigquery', ['type=table', 'type=view'])
+
+        self.assertEqual('system=bigquery type=view',
+                         datacatalog_facade.iter_search_catalog.call_args[1]['query'])
+        self.assertEqual(['entry-0-0', 'entry-0-1', 'entry-0-2'],
+                         [result.relative_resource_name for result in results])
+        self.assertEqual([3, 2], [metrics['results_count'] for metrics in shards_metrics])
+
+    def test_search_predicates_should_raise_first_shard_error(self):
+        datacatalog_facade = self.__datacatalog_facade
+        datacatalog_facade.iter_search_catalog.side_effect = [
+            [], exceptions.PermissionDenied(message='')
+        ]
+
+        self.assertRaises(exceptions.PermissionDenied, self.__sharded_search.search_predicates,
+                          'test-org', 'system=bigquery', ['type=table', 'type=view'])
+
+
+class EntryCacheTest(unittest.TestCase):
+
+    def test_get_should_return_none_if_not_cached(self):
+        entry_cache = quickstart.EntryCache()
+
+        self.assertIsNone(entry_cache.get(_TEST_LINKED_RESOURCE))
+        self.assertEqual(1, entry_cache.misses)
+
+    @mock.patch('quickstart.time.time')
+    def test_get_should_ignore_expired_entries(self, mock_time):
+        mock_time.return_value = 100.0
+        entry_cache = quickstart.EntryCache(ttl_seconds=10)
+        entry_cache.put(_TEST_LINKED_RESOURCE, make_entry())
+
+        mock_time.return_value = 109.0
+        self.assertIsNotNone(entry_cache.get(_TEST_LINKED_RESOURCE))
+        mock_time.return_value = 110.0
+        self.assertIsNone(entry_cache.get(_TEST_LINKED_RESOURCE))
+
+    def test_put_should_evict_least_recently_used_entries(self):
+        # Each Entry is cached for its linked resource and for its name.
+        entry_cache = quickstart.EntryCache(max_size=4)
+        entry_cache.put('resource-1', make_entry('entry-1'))
+        entry_cache.put('resource-2', make_entry('entry-2'))
+
+        entry_cache.get('resource-1')
+        entry_cache.put('resource-3', make_entry('entry-3'))
+
+        self.assertIsNotNone(entry_cache.get('resource-1'))
+        self.assertIsNone(entry_cache.get('entry-2'))
+        self.assertEqual(2, entry_cache.evictions)
+
+    def test_put_error_should_be_ignored_if_errors_caching_disabled(self):
+        entry_cache = quickstart.EntryCache()
+        entry_cache.put_error(_TEST_LINKED_RESOURCE, exceptions.NotFound(message=''))
+
+        self.assertIsNone(entry_cache.get(_TEST_LINKED_RESOURCE))
+
+    def test_get_should_persist_entries_and_errors_between_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'entries.db')
+            entry_cache = quickstart.EntryCache(error_ttl_seconds=60, db_path=db_path)
+            entry_cache.put(_TEST_LINKED_RESOURCE, make_entry())
+            entry_cache.put_error('not-found', exceptions.NotFound(message='Not found'))
+            entry_cache.close()
+
+            entry_cache = quickstart.EntryCache(db_path=db_path)
+            entry = entry_cache.get(_TEST_ENTRY_NAME)
+            self.assertRaises(exceptions.NotFound, entry_cache.get, 'not-found')
+            entry_cache.close()
+
+        self.assertEqual(_TEST_ENTRY_NAME, entry.name)
+        self.assertEqual(2, entry_cache.hits)
+
+
+def make_search_pages(pages_count, results_per_page):
+    pages = []
+    for page_index in range(pages_count):
+        page = datacatalog.SearchCatalogResponse()
+        for result_index in range(results_per_page):
+            result = datacatalog.SearchCatalogResult()
+            result.relative_resource_name = f'entry-{page_index}-{result_index}'
+            page.results.append(result)
+        if page_index < pages_count - 1:
+            page.next_page_token = f'token-{page_index + 1}'
+        pages.append(page)
+    return pages
+
+
+def make_entry(name=_TEST_ENTRY_NAME):
+    entry = datacatalog.Entry()
+    entry.name = name
+    return entry
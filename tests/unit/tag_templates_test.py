@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions
+
+import tag_templates
+
+_TEST_TEMPLATE_NAME = 'projects/test-project/locations/us-central1/tagTemplates/test_template'
+
+
+class DataCatalogFacadeTest(unittest.TestCase):
+
+    @mock.patch('tag_templates.datacatalog.DataCatalogClient')
+    def setUp(self, mock_datacatalog_client):
+        self.__datacatalog_facade = tag_templates.DataCatalogFacade()
+        # Shortcut for the object assigned to self.__datacatalog_facade.__datacatalog
+        self.__datacatalog_client = mock_datacatalog_client.return_value
+
+    def test_constructor_should_set_instance_attributes(self):
+        self.assertIsNotNone(self.__datacatalog_facade.__dict__['_DataCatalogFacade__datacatalog'])
+
+    def test_create_tag_template_should_handle_described_fields(self):
+        self.__datacatalog_facade.create_tag_template(
+            project_id='project-id',
+            template_id='template_id',
+            display_name='Test Display Name',
+            fields_descriptors=[[
+                'test-string-field-id', 'Test String Field Display Name', 'STRING'
+            ], ['test-enum-field-id', 'Test ENUM Field Display Name', 'ENUM']],
+            enums_names={'test-enum-field-id': ['TEST_ENUM_VALUE']})
+
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.create_tag_template.assert_called_once()
+
+    def test_create_tag_template_if_not_exists_should_return_true_created(self):
+        created = self.__datacatalog_facade.create_tag_template_if_not_exists(
+            project_id='project-id',
+            template_id='template_id',
+            display_name='Test Display Name',
+            fields_descriptors=[['test-bool-field-id', 'Test BOOL Field Display Name', 'BOOL']])
+
+        self.assertTrue(created)
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.create_tag_template.assert_called_once()
+        datacatalog_client.get_tag_template.assert_not_called()
+
+    def test_create_tag_template_if_not_exists_should_return_false_existing(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.create_tag_template.side_effect = exceptions.AlreadyExists(message='')
+
+        created = self.__datacatalog_facade.create_tag_template_if_not_exists(
+            project_id='project-id',
+            template_id='template_id',
+            display_name='Test Display Name',
+            fields_descriptors=[['test-bool-field-id', 'Test BOOL Field Display Name', 'BOOL']])
+
+        self.assertFalse(created)
+        datacatalog_client.get_tag_template.assert_not_called()
+
+    def test_delete_tag_template_should_call_client_library_method(self):
+        self.__datacatalog_facade.delete_tag_template('template_name')
+
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.delete_tag_template.assert_called_once()
+
+    def test_delete_tag_template_should_handle_nonexistent(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.delete_tag_template.side_effect = \
+            exceptions.PermissionDenied(message='')
+
+        self.__datacatalog_facade.delete_tag_template('template_name')
+
+        datacatalog_client.delete_tag_template.assert_called_once()
+
+    def test_tag_template_exists_should_return_true_existing(self):
+        tag_template_exists = self.__datacatalog_facade.tag_template_exists('template_name')
+
+        self.assertTrue(tag_template_exists)
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.get_tag_template.assert_called_once()
+
+    def test_tag_template_exists_should_return_false_nonexistent(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.get_tag_template.side_effect = exceptions.PermissionDenied(message='')
+
+        tag_template_exists = self.__datacatalog_facade.tag_template_exists('template_name')
+
+        self.assertFalse(tag_template_exists)
+        datacatalog_client.get_tag_template.assert_called_once()
+
+    def test_get_tag_template_should_return_none_nonexistent(self):
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.get_tag_template.side_effect = exceptions.PermissionDenied(message='')
+
+        self.assertIsNone(self.__datacatalog_facade.get_tag_template('template_name'))
+
+    def test_sync_tag_template_should_call_client_library_methods(self):
+        tag_template = make_tag_template('Test Display Name',
+                                         [['test_bool_field_id', 'Test BOOL Field', 'BOOL']])
+
+        changes_count = self.__datacatalog_facade.sync_tag_template(
+            tag_template=tag_template,
+            display_name='Test Display Name',
+            fields_descriptors=[['test_bool_field_id', 'Test BOOL Field', 'BOOL'],
+                                ['test_string_field_id', 'Test STRING Field', 'STRING']])
+
+        self.assertEqual(1, changes_count)
+        datacatalog_client = self.__datacatalog_client
+        datacatalog_client.create_tag_template_field.assert_called_once()
+        datacatalog_client.delete_tag_template.assert_not_called()
+
+    def test_sync_tag_template_should_not_call_api_up_to_date(self):
+        tag_template = make_tag_template('Test Display Name',
+                                         [['test_bool_field_id', 'Test BOOL Field', 'BOOL']])
+
+        changes_count = self.__datacatalog_facade.sync_tag_template(
+            tag_template=tag_template,
+            display_name='Test Display Name',
+            fields_descriptors=[['test_bool_field_id', 'Test BOOL Field', 'BOOL']])
+
+        self.assertEqual(0, changes_count)
+        self.assertEqual([], self.__datacatalog_client.method_calls)
+
+
+@mock.patch('tag_templates.datacatalog.DataCatalogAsyncClient')
+class AsyncDataCatalogFacadeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__datacatalog_facade = tag_templates.AsyncDataCatalogFacade()
+
+    def test_constructor_should_not_initialize_client(self, mock_datacatalog_client):
+        self.assertIsNone(
+            self.__datacatalog_facade.__dict__['_AsyncDataCatalogFacade__datacatalog'])
+        mock_datacatalog_client.assert_not_called()
+
+    def test_create_tag_template_should_handle_described_fields(self, mock_datacatalog_client):
+        datacatalog_client = mock_datacatalog_client.return_value
+        datacatalog_client.create_tag_template = make_coroutine_mock(mock.MagicMock())
+
+        run_until_complete(
+            self.__datacatalog_facade.create_tag_template(
+                project_id='project-id',
+                template_id='template_id',
+                display_name='Test Display Name',
+                fields_descriptors=[[
+                    'test-string-field-id', 'Test String Field Display Name', 'STRING'
+                ], ['test-enum-field-id', 'Test ENUM Field Display Name', 'ENUM']],
+                enums_names={'test-enum-field-id': ['TEST_ENUM_VALUE']}))
+
+        datacatalog_client.create_tag_template.assert_called_once()
+
+    def test_delete_tag_template_should_handle_nonexistent(self, mock_datacatalog_client):
+        datacatalog_client = mock_datacatalog_client.return_value
+        datacatalog_client.delete_tag_template = \
+            make_coroutine_mock(exception=exceptions.PermissionDenied(message=''))
+
+        run_until_complete(self.__datacatalog_facade.delete_tag_template('template_name'))
+
+        datacatalog_client.delete_tag_template.assert_called_once()
+
+    def test_tag_template_exists_should_return_true_existing(self, mock_datacatalog_client):
+        datacatalog_client = mock_datacatalog_client.return_value
+        datacatalog_client.get_tag_template = make_coroutine_mock()
+
+        self.assertTrue(
+            run_until_complete(self.__datacatalog_facade.tag_template_exists('template_name')))
+
+    def test_tag_template_exists_should_return_false_nonexistent(self, mock_datacatalog_client):
+        datacatalog_client = mock_datacatalog_client.return_value
+        datacatalog_client.get_tag_template = \
+            make_coroutine_mock(exception=exceptions.PermissionDenied(message=''))
+
+        self.assertFalse(
+            run_until_complete(self.__datacatalog_facade.tag_template_exists('template_name')))
+
+    def test_sync_tag_template_should_call_client_library_methods(self, mock_datacatalog_client):
+        datacatalog_client = mock_datacatalog_client.return_value
+        datacatalog_client.update_tag_template = make_coroutine_mock()
+
+        tag_template = make_tag_template('Test Display Name',
+                                         [['test_bool_field_id', 'Test BOOL Field', 'BOOL']])
+
+        changes_count = run_until_complete(
+            self.__datacatalog_facade.sync_tag_template(
+                tag_template=tag_template,
+                display_name='New Test Display Name',
+                fields_descriptors=[['test_bool_field_id', 'Test BOOL Field', 'BOOL']]))
+
+        self.assertEqual(1, changes_count)
+        datacatalog_client.update_tag_template.assert_called_once()
+
+
+class TagTemplateDifferTest(unittest.TestCase):
+
+    def test_diff_should_return_no_requests_up_to_date(self):
+        fields_descriptors = [['bool_field', 'BOOL Field', 'BOOL'],
+                              ['enum_field', 'ENUM Field', 'ENUM']]
+        enums_names = {'enum_field': ['VALUE_1', 'VALUE_2']}
+
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', fields_descriptors, enums_names),
+            make_tag_template('Test Template', fields_descriptors, enums_names))
+
+        self.assertEqual([], requests)
+
+    def test_diff_should_update_template_display_name(self):
+        fields_descriptors = [['bool_field', 'BOOL Field', 'BOOL']]
+
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', fields_descriptors),
+            make_tag_template('New Test Template', fields_descriptors))
+
+        self.assertEqual(1, len(requests))
+        method_name, kwargs = requests[0]
+        self.assertEqual('update_tag_template', method_name)
+        self.assertEqual('New Test Template', kwargs['tag_template'].display_name)
+        self.assertEqual(['display_name'], kwargs['update_mask']['paths'])
+
+    def test_diff_should_create_added_fields_before_deleting_removed_ones(self):
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', [['bool_field', 'BOOL Field', 'BOOL']]),
+            make_tag_template('Test Template', [['string_field', 'STRING Field', 'STRING']]))
+
+        self.assertEqual(['create_tag_template_field', 'delete_tag_template_field'],
+                         [method_name for method_name, _ in requests])
+        self.assertEqual('string_field', requests[0][1]['tag_template_field_id'])
+        self.assertEqual(f'{_TEST_TEMPLATE_NAME}/fields/bool_field', requests[1][1]['name'])
+
+    def test_diff_should_rename_field_same_display_name_and_type(self):
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', [['bool_field', 'BOOL Field', 'BOOL']]),
+            make_tag_template('Test Template', [['new_bool_field', 'BOOL Field', 'BOOL']]))
+
+        self.assertEqual(1, len(requests))
+        method_name, kwargs = requests[0]
+        self.assertEqual('rename_tag_template_field', method_name)
+        self.assertEqual(f'{_TEST_TEMPLATE_NAME}/fields/bool_field', kwargs['name'])
+        self.assertEqual('new_bool_field', kwargs['new_tag_template_field_id'])
+
+    def test_diff_should_update_field_display_name(self):
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', [['bool_field', 'BOOL Field', 'BOOL']]),
+            make_tag_template('Test Template', [['bool_field', 'New BOOL Field', 'BOOL']]))
+
+        self.assertEqual(1, len(requests))
+        method_name, kwargs = requests[0]
+        self.assertEqual('update_tag_template_field', method_name)
+        self.assertEqual('New BOOL Field', kwargs['tag_template_field'].display_name)
+        self.assertEqual(['display_name'], kwargs['update_mask']['paths'])
+
+    def test_diff_should_recreate_field_type_changed(self):
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', [['test_field', 'Test Field', 'BOOL']]),
+            make_tag_template('Test Template', [['test_field', 'Test Field', 'STRING']]))
+
+        self.assertEqual(['delete_tag_template_field', 'create_tag_template_field'],
+                         [method_name for method_name, _ in requests])
+
+    def test_diff_should_add_enum_values_not_renamed(self):
+        fields_descriptors = [['enum_field', 'ENUM Field', 'ENUM']]
+
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', fields_descriptors,
+                              {'enum_field': ['VALUE_1', 'VALUE_2']}),
+            make_tag_template('Test Template', fields_descriptors,
+                              {'enum_field': ['VALUE_1', 'VALUE_3']}))
+
+        # VALUE_2 is kept, so the Tags it is assigned to are not relabeled as VALUE_3.
+        self.assertEqual(1, len(requests))
+        method_name, kwargs = requests[0]
+        self.assertEqual('update_tag_template_field', method_name)
+        allowed_values = kwargs['tag_template_field'].type_.enum_type.allowed_values
+        self.assertEqual(['VALUE_3'], [value.display_name for value in allowed_values])
+        self.assertEqual(['type.enum_type'], kwargs['update_mask']['paths'])
+
+    def test_diff_should_rename_enum_values_if_requested(self):
+        fields_descriptors = [['enum_field', 'ENUM Field', 'ENUM']]
+
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', fields_descriptors,
+                              {'enum_field': ['VALUE_1', 'VALUE_2']}),
+            make_tag_template('Test Template', fields_descriptors,
+                              {'enum_field': ['VALUE_1', 'VALUE_3', 'VALUE_4']}),
+            enum_values_renames={'enum_field': {
+                'VALUE_2': 'VALUE_4'
+            }})
+
+        self.assertEqual(2, len(requests))
+        method_name, kwargs = requests[0]
+        self.assertEqual('rename_tag_template_field_enum_value', method_name)
+        self.assertEqual(f'{_TEST_TEMPLATE_NAME}/fields/enum_field/enumValues/VALUE_2',
+                         kwargs['name'])
+        self.assertEqual('VALUE_4', kwargs['new_enum_value_display_name'])
+
+        method_name, kwargs = requests[1]
+        self.assertEqual('update_tag_template_field', method_name)
+        allowed_values = kwargs['tag_template_field'].type_.enum_type.allowed_values
+        self.assertEqual(['VALUE_3'], [value.display_name for value in allowed_values])
+
+    def test_diff_should_keep_removed_enum_values(self):
+        fields_descriptors = [['enum_field', 'ENUM Field', 'ENUM']]
+
+        requests = tag_templates.TagTemplateDiffer.diff(
+            make_tag_template('Test Template', fields_descriptors,
+                              {'enum_field': ['VALUE_1', 'VALUE_2']}),
+            make_tag_template('Test Template', fields_descriptors, {'enum_field': ['VALUE_1']}))
+
+        self.assertEqual([], requests)
+
+
+class StringFormatterTest(unittest.TestCase):
+
+    def test_format_elements_snakecase_list(self):
+        test_list = ['AA-AA', 'BB-BB']
+        tag_templates.StringFormatter.format_elements_to_snakecase(test_list)
+        self.assertListEqual(['aa_aa', 'bb_bb'], test_list)
+
+    def test_format_elements_snakecase_internal_index(self):
+        test_list = [['AA-AA', 'Test A'], ['BB-BB', 'Test B']]
+        tag_templates.StringFormatter.format_elements_to_snakecase(test_list, internal_index=0)
+        self.assertListEqual([['aa_aa', 'Test A'], ['bb_bb', 'Test B']], test_list)
+
+    def test_format_many_should_keep_strings_order(self):
+        test_list = ['BB-BB', 'AA-AA', 'BB-BB']
+        formatted_strings = tag_templates.StringFormatter.format_many(test_list)
+        self.assertListEqual(['bb_bb', 'aa_aa', 'bb_bb'], formatted_strings)
+
+    def test_format_string_to_snakecase_abbreviation(self):
+        self.assertEqual('aaa', tag_templates.StringFormatter.format_to_snakecase('AAA'))
+        self.assertEqual('aaa_aaa', tag_templates.StringFormatter.format_to_snakecase('AAA-AAA'))
+
+    def test_format_string_to_snakecase_camelcase(self):
+        self.assertEqual('camel_case',
+                         tag_templates.StringFormatter.format_to_snakecase('camelCase'))
+
+    def test_format_string_to_snakecase_leading_number(self):
+        self.assertEqual('1_number', tag_templates.StringFormatter.format_to_snakecase('1 number'))
+
+    def test_format_string_to_snakecase_repeated_special_chars(self):
+        self.assertEqual(
+            'repeated_special_chars',
+            tag_templates.StringFormatter.format_to_snakecase('repeated   special___chars'))
+
+    def test_format_string_to_snakecase_whitespaces(self):
+        self.assertEqual(
+            'no_leading_and_trailing',
+            tag_templates.StringFormatter.format_to_snakecase(' no leading and trailing '))
+        self.assertEqual(
+            'no_leading_and_trailing',
+            tag_templates.StringFormatter.format_to_snakecase('\nno leading and trailing\t'))
+
+    def test_format_string_to_snakecase_special_chars(self):
+        self.assertEqual('special_chars',
+                         tag_templates.StringFormatter.format_to_snakecase('special!#@-_ chars'))
+        self.assertEqual('special_chars',
+                         tag_templates.StringFormatter.format_to_snakecase('! special chars ?'))
+
+    def test_format_string_to_snakecase_unicode(self):
+        self.assertEqual('a_a_e_o_u',
+                         tag_templates.StringFormatter.format_to_snakecase(u'å ä ß é ö ü'))
+
+    def test_format_string_to_snakecase_uppercase(self):
+        self.assertEqual('uppercase',
+                         tag_templates.StringFormatter.format_to_snakecase('UPPERCASE'))
+        self.assertEqual('upper_case',
+                         tag_templates.StringFormatter.format_to_snakecase('UPPER CASE'))
+
+
+class TagTemplatesCLITest(unittest.TestCase):
+
+    def test_get_enum_values_renames_should_group_renames_by_field_id(self):
+        parser = argparse.ArgumentParser()
+        tag_templates.add_arguments(parser)
+        args = parser.parse_args([
+            '--rename-enum-value', 'Enum Field', 'VALUE_1', 'VALUE_A', '--rename-enum-value',
+            'enum_field', 'VALUE_2', 'VALUE_B'
+        ])
+
+        self.assertDictEqual({'enum_field': {
+            'VALUE_1': 'VALUE_A',
+            'VALUE_2': 'VALUE_B'
+        }}, tag_templates.get_enum_values_renames(args))
+
+
+def make_tag_template(display_name, fields_descriptors, enums_names=None):
+    tag_template = tag_templates.DataCatalogEntityFactory.make_tag_template(
+        display_name, fields_descriptors, enums_names)
+    tag_template.name = _TEST_TEMPLATE_NAME
+    return tag_template
+
+
+def make_coroutine(return_value=None, exception=None):
+
+    async def coroutine():
+        if exception:
+            raise exception
+        return return_value
+
+    return coroutine()
+
+
+def make_coroutine_mock(return_value=None, exception=None):
+    return mock.MagicMock(
+        side_effect=lambda *args, **kwargs: make_coroutine(return_value, exception))
+
+
+def run_until_complete(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()